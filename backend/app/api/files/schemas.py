@@ -105,6 +105,15 @@ class ProcessingConfig(BaseModel):
     skip_empty_rows: bool = True
     batch_size: int = 100
 
+    # Hybrid routing: settle unambiguous names with the rule-based parser and
+    # send only the rest to Gemini
+    local_routing_enabled: bool = False
+    local_routing_min_confidence: float = 0.85
+
+    # Streaming ingestion for large files (read, parse and write in row chunks)
+    streaming_mode: bool = False
+    stream_chunk_rows: int = 50000
+
     # Output options
     include_confidence_scores: bool = True
     include_original_text: bool = True
@@ -116,6 +125,20 @@ class ProcessingConfig(BaseModel):
             raise ValueError("Batch size must be between 1 and 1000")
         return v
 
+    @validator("local_routing_min_confidence")
+    def validate_local_routing_min_confidence(cls, v):
+        if v < 0.5 or v > 1.0:
+            raise ValueError(
+                "Local routing confidence threshold must be between 0.5 and 1.0"
+            )
+        return v
+
+    @validator("stream_chunk_rows")
+    def validate_stream_chunk_rows(cls, v):
+        if v < 1000 or v > 500000:
+            raise ValueError("Stream chunk rows must be between 1000 and 500000")
+        return v
+
 
 class DownloadInfo(BaseModel):
     download_url: str
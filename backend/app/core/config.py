@@ -120,6 +120,9 @@ class Settings(BaseSettings):
     CELERY_RESULT_SERIALIZER: str = "json"
     CELERY_TIMEZONE: str = "UTC"
     CELERY_ENABLE_UTC: bool = True
+    # One event loop, HTTP session and Gemini service per worker process,
+    # reused by every task (False: build and tear them down per job)
+    WORKER_PERSISTENT_RUNTIME: bool = True
 
     # File Upload Settings
     MAX_FILE_SIZE_MB: int = 200
@@ -149,7 +152,12 @@ class Settings(BaseSettings):
     GEMINI_MODEL: str = "gemini-2.5-flash"
     GEMINI_FALLBACK_MODEL: str = "gemini-2.5-flash"
     GEMINI_MAX_CONCURRENT: int = 20
+    # Cluster-wide quota, shared by all workers through Redis. Off by default:
+    # when on, the per-minute limits should match the project's Gemini tier
+    GEMINI_RATE_LIMIT_ENABLED: bool = False
     GEMINI_RATE_LIMIT_PER_MINUTE: int = 60
+    GEMINI_TOKENS_PER_MINUTE: int = 1000000
+    GEMINI_MAX_IN_FLIGHT: int = 100
     GEMINI_TIMEOUT_SECONDS: int = 30
     GOOGLE_CLIENT_ID: str = ""
     GOOGLE_CLIENT_SECRET: str = ""
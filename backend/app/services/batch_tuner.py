@@ -0,0 +1,371 @@
+"""
+Adaptive batch sizing for Gemini requests
+
+Learns, per model, how many names to put in one request and how many output
+tokens to allow for them. Every response reports its finishReason, token usage
+(thoughtsTokenCount + candidatesTokenCount) and latency:
+
+- Output budget tracks observed tokens per name with headroom. When the
+  caller supplies an estimated token cost (token-packed batches), the budget
+  instead tracks the observed actual/estimated ratio, so a batch of long trust
+  strings gets more room than one of short person names. A MAX_TOKENS
+  truncation raises the budget and shrinks the batch straight away.
+- Batch size hill-climbs on names/sec measured per request. It grows in small
+  steps while throughput improves and steps back when it drops.
+
+Learned settings are persisted per model in Redis (when available), so new
+worker processes start from the last tuned values instead of the defaults.
+"""
+
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+import structlog
+
+from .name_result_cache import RedisResultStore
+
+logger = structlog.get_logger()
+
+
+class AdaptiveBatchController:
+    """Online batch-size and output-token controller for one model"""
+
+    # Learned tokens/name is multiplied by this to size maxOutputTokens
+    TOKEN_HEADROOM = 1.5
+    MIN_TOKENS_PER_NAME = 150
+    MAX_TOKENS_PER_NAME = 4000
+    MIN_OUTPUT_TOKENS = 2048
+    MAX_OUTPUT_TOKENS = 65536
+
+    # Hill climbing: responses averaged per decision, and step size
+    WINDOW = 5
+    GROW_STEP = 5
+    # Clean responses after which a truncation-imposed ceiling is lifted
+    CEILING_RESET_RESPONSES = 20
+    # Responses after which a throughput-imposed ceiling is re-probed
+    PROBE_RESET_RESPONSES = 200
+    EMA_ALPHA = 0.2
+
+    def __init__(
+        self,
+        model_name: str,
+        initial_batch_size: int,
+        min_batch_size: int = 5,
+        max_batch_size: int = 50,
+        initial_tokens_per_name: float = 800.0,
+        store: Optional[RedisResultStore] = None,
+    ):
+        self.model_name = model_name
+        self.min_batch_size = min_batch_size
+        self.max_batch_size = max_batch_size
+        self.batch_size = self._clamp_size(initial_batch_size)
+        self.budget_tokens_per_name = initial_tokens_per_name
+        self.observed_tokens_per_name: Optional[float] = None
+        self.observed_cost_ratio: Optional[float] = None
+        # Growth limits: one from truncations, one from throughput drops
+        self.truncation_ceiling = max_batch_size
+        self.throughput_ceiling = max_batch_size
+
+        self.store = store
+        self._loaded = store is None
+
+        # Hill-climb state
+        self._window: List[float] = []
+        self._throughput_by_size: Dict[int, float] = {}
+        self._previous_size: Optional[int] = None
+        self._clean_since_truncation = 0
+        self._since_throughput_ceiling = 0
+
+        self.stats = {
+            "responses": 0,
+            "max_tokens_truncations": 0,
+            "size_increases": 0,
+            "size_decreases": 0,
+            "throughput_names_per_sec": 0.0,
+            "avg_latency_seconds": 0.0,
+        }
+
+    @property
+    def store_key(self) -> str:
+        return f"batch_tuner:{self.model_name}"
+
+    @property
+    def ceiling(self) -> int:
+        return min(self.truncation_ceiling, self.throughput_ceiling)
+
+    def _clamp_size(self, size: int) -> int:
+        return max(self.min_batch_size, min(self.max_batch_size, int(size)))
+
+    def output_token_budget(
+        self,
+        names_count: int,
+        estimated_tokens: Optional[int] = None,
+        batch_units: Optional[float] = None,
+    ) -> int:
+        """maxOutputTokens for a request carrying names_count names"""
+        if estimated_tokens and self.observed_cost_ratio is not None:
+            budget = int(
+                estimated_tokens * self.observed_cost_ratio * self.TOKEN_HEADROOM
+            )
+        else:
+            units = batch_units or names_count
+            budget = int(units * self.budget_tokens_per_name)
+        return max(self.MIN_OUTPUT_TOKENS, min(self.MAX_OUTPUT_TOKENS, budget))
+
+    def record(
+        self,
+        names_count: int,
+        finish_reason: str,
+        thoughts_tokens: int,
+        output_tokens: int,
+        latency: float,
+        estimated_tokens: Optional[int] = None,
+        batch_units: Optional[float] = None,
+    ) -> None:
+        """
+        Feed one API response into the controller.
+
+        estimated_tokens is the caller's cost estimate for the batch, and
+        batch_units its size in the units batch_size is measured in (defaults
+        to names_count).
+        """
+        if names_count <= 0:
+            return
+
+        self.stats["responses"] += 1
+        used_tokens = thoughts_tokens + output_tokens
+        units = batch_units or names_count
+        per_name = used_tokens / units
+        ratio = used_tokens / estimated_tokens if estimated_tokens else None
+
+        if finish_reason == "MAX_TOKENS":
+            self._on_truncation(names_count, per_name, ratio)
+            return
+
+        if ratio:
+            self.observed_cost_ratio = self._ema(self.observed_cost_ratio, ratio)
+
+        self._clean_since_truncation += 1
+        if self._clean_since_truncation >= self.CEILING_RESET_RESPONSES:
+            self.truncation_ceiling = self.max_batch_size
+        self._since_throughput_ceiling += 1
+        if self._since_throughput_ceiling >= self.PROBE_RESET_RESPONSES:
+            # Conditions drift; occasionally test larger sizes again
+            self.throughput_ceiling = self.max_batch_size
+
+        # Token budget follows observed usage (EMA) with headroom
+        if per_name > 0:
+            self.observed_tokens_per_name = self._ema(
+                self.observed_tokens_per_name, per_name
+            )
+            self.budget_tokens_per_name = min(
+                self.MAX_TOKENS_PER_NAME,
+                max(
+                    self.MIN_TOKENS_PER_NAME,
+                    self.observed_tokens_per_name * self.TOKEN_HEADROOM,
+                ),
+            )
+
+        if latency > 0:
+            throughput = units / latency
+            self.stats["throughput_names_per_sec"] += self.EMA_ALPHA * (
+                throughput - self.stats["throughput_names_per_sec"]
+            )
+            self.stats["avg_latency_seconds"] += self.EMA_ALPHA * (
+                latency - self.stats["avg_latency_seconds"]
+            )
+
+            # Only full-sized batches say anything about the current size
+            if units >= self.batch_size * 0.8:
+                self._window.append(throughput)
+                if len(self._window) >= self.WINDOW:
+                    self._decide()
+
+    def _ema(self, current: Optional[float], value: float) -> float:
+        if current is None:
+            return value
+        return current + self.EMA_ALPHA * (value - current)
+
+    def _on_truncation(
+        self,
+        names_count: int,
+        per_name: float,
+        ratio: Optional[float],
+    ) -> None:
+        """MAX_TOKENS: raise the token budget and shrink the batch"""
+        self.stats["max_tokens_truncations"] += 1
+        self._clean_since_truncation = 0
+
+        if ratio:
+            # The ratio at truncation is only a lower bound; budgets built on
+            # it already exceed the one that just failed
+            self.observed_cost_ratio = max(self.observed_cost_ratio or 0.0, ratio)
+
+        # Usage at truncation is only a lower bound on what was needed
+        self.observed_tokens_per_name = max(
+            self.observed_tokens_per_name or 0.0, per_name
+        )
+        self.budget_tokens_per_name = min(
+            self.MAX_TOKENS_PER_NAME,
+            max(self.budget_tokens_per_name * 1.5, per_name * self.TOKEN_HEADROOM),
+        )
+
+        new_size = self._clamp_size(self.batch_size * 0.75)
+        self.truncation_ceiling = max(
+            self.min_batch_size, min(self.truncation_ceiling, self.batch_size)
+        )
+        # Throughput measured at sizes that truncate is not worth returning to
+        self._throughput_by_size = {
+            size: value
+            for size, value in self._throughput_by_size.items()
+            if size < self.batch_size
+        }
+        if new_size < self.batch_size:
+            self.stats["size_decreases"] += 1
+        self._set_size(new_size, track_previous=False)
+
+        logger.warning(
+            "batch_tuner_truncation",
+            model=self.model_name,
+            names_count=names_count,
+            batch_size=self.batch_size,
+            budget_tokens_per_name=round(self.budget_tokens_per_name),
+        )
+
+    def _decide(self) -> None:
+        """Close a measurement window and take one hill-climb step"""
+        size = self.batch_size
+        avg = sum(self._window) / len(self._window)
+        self._window = []
+        self._throughput_by_size[size] = avg
+
+        previous = self._previous_size
+        if (
+            previous is not None
+            and previous in self._throughput_by_size
+            and avg < self._throughput_by_size[previous]
+        ):
+            # Last step made things worse: go back and cap growth below it
+            if size > previous:
+                self.throughput_ceiling = max(
+                    self.min_batch_size, min(self.throughput_ceiling, size - 1)
+                )
+                self._since_throughput_ceiling = 0
+                self.stats["size_decreases"] += 1
+            self._set_size(previous, track_previous=False)
+        elif size < self.ceiling:
+            self.stats["size_increases"] += 1
+            self._set_size(self._clamp_size(min(size + self.GROW_STEP, self.ceiling)))
+
+    def _set_size(self, new_size: int, track_previous: bool = True) -> None:
+        if new_size != self.batch_size:
+            self._previous_size = self.batch_size if track_previous else None
+            self.batch_size = new_size
+            self._window = []
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def to_state(self) -> Dict[str, Any]:
+        return {
+            "batch_size": self.batch_size,
+            "budget_tokens_per_name": self.budget_tokens_per_name,
+            "observed_tokens_per_name": self.observed_tokens_per_name,
+            "observed_cost_ratio": self.observed_cost_ratio,
+            "updated_at": time.time(),
+        }
+
+    def apply_state(self, state: Dict[str, Any]) -> None:
+        self.batch_size = self._clamp_size(state.get("batch_size", self.batch_size))
+        self.budget_tokens_per_name = float(
+            state.get("budget_tokens_per_name", self.budget_tokens_per_name)
+        )
+        self.observed_tokens_per_name = state.get("observed_tokens_per_name")
+        self.observed_cost_ratio = state.get("observed_cost_ratio")
+
+    async def ensure_loaded(self) -> None:
+        """Load persisted settings once per process"""
+        if self._loaded:
+            return
+        self._loaded = True
+        state = (await self.store.get_many([self.store_key]))[0]
+        if state:
+            self.apply_state(state)
+            logger.info(
+                "batch_tuner_loaded",
+                model=self.model_name,
+                batch_size=self.batch_size,
+                budget_tokens_per_name=round(self.budget_tokens_per_name),
+            )
+
+    async def persist(self) -> None:
+        """Save current settings for this model"""
+        if self.store is not None:
+            await self.store.put_many([(self.store_key, self.to_state())])
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current values for performance stats"""
+        responses = self.stats["responses"]
+        return {
+            "model": self.model_name,
+            "batch_size": self.batch_size,
+            "batch_size_ceiling": self.ceiling,
+            "budget_tokens_per_name": round(self.budget_tokens_per_name, 1),
+            "observed_tokens_per_name": (
+                round(self.observed_tokens_per_name, 1)
+                if self.observed_tokens_per_name is not None
+                else None
+            ),
+            "observed_cost_ratio": (
+                round(self.observed_cost_ratio, 3)
+                if self.observed_cost_ratio is not None
+                else None
+            ),
+            "truncation_rate": (
+                self.stats["max_tokens_truncations"] / responses if responses else 0
+            ),
+            **self.stats,
+        }
+
+
+# Controllers are per model and shared by every service in the process
+_controllers: Dict[str, AdaptiveBatchController] = {}
+
+
+def get_batch_controller(
+    model_name: str, initial_batch_size: int, max_names_per_request: int = 50
+) -> AdaptiveBatchController:
+    """
+    Get or create the process-wide controller for a model
+
+    GEMINI_ADAPTIVE_MAX_BATCH is capped at max_names_per_request, the most
+    names one prompt carries.
+    """
+    controller = _controllers.get(model_name)
+    if controller is None:
+        store = None
+        if os.getenv("GEMINI_ADAPTIVE_PERSIST", "true").lower() == "true":
+            try:
+                import redis.asyncio  # noqa: F401
+
+                store = RedisResultStore(
+                    redis_url=os.getenv("REDIS_URL", "redis://localhost:6379/0"),
+                    ttl_seconds=30 * 24 * 3600,
+                )
+            except ImportError:
+                logger.warning("batch_tuner_persist_disabled", reason="redis not installed")
+
+        controller = AdaptiveBatchController(
+            model_name,
+            initial_batch_size=initial_batch_size,
+            min_batch_size=int(os.getenv("GEMINI_ADAPTIVE_MIN_BATCH", "5")),
+            max_batch_size=min(
+                int(os.getenv("GEMINI_ADAPTIVE_MAX_BATCH", "50")),
+                max_names_per_request,
+            ),
+            store=store,
+        )
+        _controllers[model_name] = controller
+    return controller
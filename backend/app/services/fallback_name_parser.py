@@ -3,8 +3,14 @@ Fallback name parser for when Gemini AI is unavailable
 Provides basic name parsing functionality without AI
 """
 
+import os
 import re
-from typing import Dict, List, Optional
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, Dict, List, Mapping, NamedTuple, Optional
+
+if TYPE_CHECKING:
+    from .name_lexicon import NameLexicon
 
 try:
     import structlog
@@ -25,6 +31,37 @@ except ImportError:
     logger = MockLogger()
 
 
+# Standalone words that join two people ("John & Mary Smith")
+JOINT_SEPARATORS = frozenset({"&", "and"})
+
+# Name lexicon frequency (per million) -> base score for names the built-in
+# tables don't list; checked in order, names missing from the lexicon keep
+# the default
+FREQUENCY_SCORES = ((1000.0, 80), (100.0, 70), (10.0, 60), (0.0, 50))
+
+
+def frequency_score(per_million: float, default: int) -> int:
+    """Base name score for a lexicon frequency (default when not listed)"""
+    if per_million > 0:
+        for threshold, score in FREQUENCY_SCORES:
+            if per_million >= threshold:
+                return score
+    return default
+
+
+class NameToken(NamedTuple):
+    """One whitespace-separated word of a name with the flags the rules use"""
+
+    text: str  # word without surrounding ".,()", original case
+    bare: str  # text without commas
+    lower: str
+    is_marker: bool  # in ENTITY_MARKERS
+    is_initial: bool  # single letter (middle initial)
+    has_digit: bool
+    is_joint: bool  # bare "&" or "and" (separates two people)
+    has_entity_keyword: bool  # contains a single-word ENTITY_KEYWORDS entry
+
+
 class FallbackNameParser:
     """Rule-based name parser using same logic as Gemini prompt for consistency"""
 
@@ -377,32 +414,290 @@ class FallbackNameParser:
         "association",
     }
 
-    def parse_name(self, name_text: str) -> Dict[str, Optional[str]]:
+    # Words that type a (non-trust) entity as a company
+    COMPANY_KEYWORDS = (
+        "llc",
+        "inc",
+        "corp",
+        "corporation",
+        "company",
+        "limited",
+        "ltd",
+        "properties",
+        "enterprises",
+        "holdings",
+        "group",
+    )
+
+    # Entity keywords match as substrings. Single-word keywords are looked
+    # for once per distinct word (NameToken.has_entity_keyword), keywords
+    # spanning words once per name; each set is one compiled alternation
+    _ENTITY_WORD_PATTERN = re.compile(
+        "|".join(re.escape(k) for k in sorted(ENTITY_KEYWORDS) if " " not in k)
+    )
+    _ENTITY_PHRASE_PATTERN = re.compile(
+        "|".join(re.escape(k) for k in sorted(ENTITY_KEYWORDS) if " " in k)
+        or "(?!)"  # no phrases: never matches
+    )
+
+    # Standalone words that settle "company" without needing the API
+    STRONG_COMPANY_MARKERS = {
+        "llc",
+        "inc",
+        "corp",
+        "corporation",
+        "incorporated",
+        "ltd",
+        "llp",
+        "lp",
+        "pllc",
+    }
+
+    # Ownership markers that make a record ambiguous (trust/estate/joint)
+    AMBIGUOUS_OWNERSHIP_MARKERS = {
+        "trust",
+        "tr",
+        "ttee",
+        "trs",
+        "tste",
+        "trustee",
+        "rev",
+        "revocable",
+        "irrevocable",
+        "living",
+        "estate",
+        "foundation",
+        "fund",
+        "etal",
+        "et",
+        "le",
+        "l/e",
+        "fbo",
+        "c/o",
+    }
+
+    SURNAME_PREFIX_TUPLE = tuple(SURNAME_PREFIXES)
+
+    # Distinct words kept tokenized; the cache is dropped when it fills up
+    TOKEN_CACHE_SIZE = 100000
+
+    # Base scores for _score_as_first_name; names not listed score 45
+    # (tiers from lowest to highest, so a name in several gets the highest)
+    FIRST_NAME_SCORES = {
+        **dict.fromkeys(COMMON_FIRST_NAMES, 80),
+        **dict.fromkeys(
+            ("parker", "carter", "taylor", "morgan", "cameron", "hunter"), 65
+        ),
+        **dict.fromkeys(
+            ("cole", "dale", "drew", "blake", "jordan", "tyler", "amber", "crystal"),
+            75,
+        ),
+        **dict.fromkeys(
+            (
+                "dennis",
+                "phyllis",
+                "warren",
+                "marilyn",
+                "edwin",
+                "gloria",
+                "virgil",
+                "carl",
+                "harold",
+                "beverly",
+                "donald",
+                "nancy",
+            ),
+            85,
+        ),
+        **dict.fromkeys(
+            (
+                "john",
+                "mary",
+                "james",
+                "linda",
+                "robert",
+                "patricia",
+                "michael",
+                "jennifer",
+                "david",
+                "elizabeth",
+                "william",
+                "barbara",
+            ),
+            95,
+        ),
+    }
+
+    # Base scores for _score_as_last_name; names not listed score 45
+    # (tiers from lowest to highest, so a name in several gets the highest)
+    LAST_NAME_SCORES = {
+        **dict.fromkeys(COMMON_LAST_NAMES, 80),
+        **dict.fromkeys(
+            ("baker", "carter", "parker", "mason", "hunter", "turner", "cooper"), 65
+        ),
+        **dict.fromkeys(
+            (
+                "mcculley",
+                "daake",
+                "pudenz",
+                "chicoine",
+                "birch",
+                "cheslak",
+                "glasnapp",
+                "fry",
+                "mills",
+                "musselman",
+                "petersen",
+            ),
+            75,
+        ),
+        **dict.fromkeys(
+            (
+                "hansen",
+                "peterson",
+                "nelson",
+                "robinson",
+                "clark",
+                "lewis",
+                "walker",
+                "hall",
+                "allen",
+                "young",
+                "king",
+                "wright",
+                "lopez",
+            ),
+            85,
+        ),
+        **dict.fromkeys(
+            (
+                "smith",
+                "johnson",
+                "williams",
+                "brown",
+                "jones",
+                "davis",
+                "miller",
+                "wilson",
+                "moore",
+                "taylor",
+                "anderson",
+                "thomas",
+            ),
+            95,
+        ),
+    }
+
+    def __init__(
+        self, memo_size: int = 10000, lexicon: Optional["NameLexicon"] = None
+    ):
+        """
+        Args:
+            memo_size: Parsed names kept in the LRU memo (0 disables it)
+            lexicon: Name-frequency tables scoring names the built-in tables
+                don't know (None: built-in tables only)
+        """
+        self.lexicon = lexicon
+        self._tokens: Dict[str, NameToken] = {}
+
+        # Stripped input -> frozen result, least recently used first
+        self.memo_size = max(0, memo_size)
+        self._memo: "OrderedDict[str, Mapping[str, Any]]" = OrderedDict()
+        self.memo_stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def parse_name(self, name_text: str) -> Mapping[str, Any]:
         """
         Parse a name into components using rule-based logic
 
+        The result depends only on the stripped input, so it is memoized and
+        shared between callers; it is read-only ("warnings" is a tuple).
+
         Args:
             name_text: The raw name string to parse
 
         Returns:
-            Dictionary with parsed name components
+            Read-only mapping with parsed name components
         """
         if not name_text:
-            return self._empty_result()
+            return self._freeze(self._empty_result())
 
-        # Clean and normalize the input
         name_text = name_text.strip()
+        if not self.memo_size:
+            return self._freeze(self._parse_stripped(name_text))
+
+        result = self._memo.get(name_text)
+        if result is not None:
+            self._memo.move_to_end(name_text)
+            self.memo_stats["hits"] += 1
+            return result
+
+        self.memo_stats["misses"] += 1
+        result = self._memo[name_text] = self._freeze(self._parse_stripped(name_text))
+        if len(self._memo) > self.memo_size:
+            self._memo.popitem(last=False)
+            self.memo_stats["evictions"] += 1
+        return result
+
+    @staticmethod
+    def _freeze(result: Dict[str, Any]) -> Mapping[str, Any]:
+        """Read-only view of a result, safe to share between callers"""
+        result["warnings"] = tuple(result["warnings"])
+        return MappingProxyType(result)
+
+    def memo_snapshot(self) -> dict:
+        """Memo size and hit rate"""
+        lookups = self.memo_stats["hits"] + self.memo_stats["misses"]
+        return {
+            "enabled": bool(self.memo_size),
+            "size": len(self._memo),
+            "max_size": self.memo_size,
+            "hit_rate": self.memo_stats["hits"] / lookups if lookups else 0.0,
+            **self.memo_stats,
+        }
+
+    def clear_memo(self) -> None:
+        self._memo.clear()
+
+    def _parse_stripped(self, name_text: str) -> Dict[str, Optional[str]]:
+        """parse_name on stripped input, without the memo"""
+        # Every rule works on the same tokens
+        lower_text = name_text.lower()
+        tokens = self._tokenize(name_text)
 
         # Check if it's an entity
-        if self._is_entity(name_text):
-            return self._parse_entity(name_text)
+        if self._is_entity(name_text, lower_text, tokens):
+            return self._parse_entity(name_text, lower_text, tokens)
 
         # Check for multiple names (couples)
-        if self._has_multiple_names(name_text):
-            return self._parse_multiple_names(name_text)
+        if self._has_multiple_names(name_text, tokens):
+            return self._parse_multiple_names(name_text, tokens)
 
         # Parse as individual name
-        return self._parse_individual_name(name_text)
+        return self._parse_individual_name(name_text, tokens)
+
+    def _tokenize(self, name_text: str) -> List[NameToken]:
+        """Split a name into NameTokens (each distinct word is flagged once)"""
+        cached = self._tokens.get
+        return [cached(raw) or self._new_token(raw) for raw in name_text.split()]
+
+    def _new_token(self, raw: str) -> NameToken:
+        word = raw.strip(".,()")
+        lower = word.lower()
+        is_alpha = word.isalpha()
+        token = NameToken(
+            word,
+            word.replace(",", ""),
+            lower,
+            lower in self.ENTITY_MARKERS,
+            is_alpha and len(word) == 1,
+            not is_alpha and any(char.isdigit() for char in word),
+            lower in JOINT_SEPARATORS and word == raw,
+            self._ENTITY_WORD_PATTERN.search(lower) is not None,
+        )
+        if len(self._tokens) >= self.TOKEN_CACHE_SIZE:
+            self._tokens.clear()
+        self._tokens[raw] = token
+        return token
 
     def _empty_result(self) -> Dict[str, Optional[str]]:
         """Return empty result structure"""
@@ -424,22 +719,23 @@ class FallbackNameParser:
             "warnings": [],
         }
 
-    def _is_entity(self, name_text: str) -> bool:
+    def _is_entity(
+        self, name_text: str, lower_text: str, tokens: List[NameToken]
+    ) -> bool:
         """Check if the text represents an entity rather than a person"""
-        lower_text = name_text.lower()
-
-        # Check for entity keywords
-        for keyword in self.ENTITY_KEYWORDS:
-            if keyword in lower_text:
+        # Check for entity keywords (anywhere in the text)
+        for token in tokens:
+            if token.has_entity_keyword:
                 return True
-
-        # Check for patterns like "The X Foundation"
-        if lower_text.startswith("the "):
+        if self._ENTITY_PHRASE_PATTERN.search(lower_text):
             return True
 
-        return False
+        # Check for patterns like "The X Foundation"
+        return lower_text.startswith("the ")
 
-    def _parse_entity(self, name_text: str) -> Dict[str, Optional[str]]:
+    def _parse_entity(
+        self, name_text: str, lower_text: str, tokens: List[NameToken]
+    ) -> Dict[str, Optional[str]]:
         """Parse entity name with intelligent name extraction for trusts"""
         result = self._empty_result()
         result["entity_name"] = name_text
@@ -447,32 +743,16 @@ class FallbackNameParser:
         result["confidence"] = 0.7
 
         # Try to identify entity type
-        lower_text = name_text.lower()
         if "trust" in lower_text or "estate" in lower_text:
             result["entity_type"] = "trust"
             # For trusts, extract beneficiary names while maintaining trust entity type
-            extracted_names = self._extract_person_from_trust(name_text)
+            extracted_names = self._extract_person_from_trust(lower_text, tokens)
             result["first_name"] = extracted_names.get("first_name", "")
             result["last_name"] = extracted_names.get("last_name", "")
             # Keep entity_type as trust but show extracted names
             result["is_entity"] = False  # This allows showing person names
             result.pop("entity_name", None)  # Remove entity_name to show person names
-        elif any(
-            x in lower_text
-            for x in [
-                "llc",
-                "inc",
-                "corp",
-                "corporation",
-                "company",
-                "limited",
-                "ltd",
-                "properties",
-                "enterprises",
-                "holdings",
-                "group",
-            ]
-        ):
+        elif any(x in lower_text for x in self.COMPANY_KEYWORDS):
             result["entity_type"] = "company"  # Lowercase
             # Companies don't get person names extracted
         elif any(x in lower_text for x in ["foundation", "fund"]):
@@ -482,12 +762,22 @@ class FallbackNameParser:
 
         return result
 
-    def _has_multiple_names(self, name_text: str) -> bool:
+    def _has_multiple_names(self, name_text: str, tokens: List[NameToken]) -> bool:
         """Check if text contains multiple names (e.g., couples)"""
         # Look for patterns like "John & Mary Smith", "John and Mary Smith", or "Name/Name"
-        return bool(re.search(r"(\s+(&|and)\s+|/)", name_text, re.IGNORECASE))
+        return "/" in name_text or self._joint_index(tokens) is not None
+
+    @staticmethod
+    def _joint_index(tokens: List[NameToken]) -> Optional[int]:
+        """Index of the first "&"/"and" token with a name on both sides"""
+        for index in range(1, len(tokens) - 1):
+            if tokens[index].is_joint:
+                return index
+        return None
 
-    def _parse_multiple_names(self, name_text: str) -> Dict[str, Optional[str]]:
+    def _parse_multiple_names(
+        self, name_text: str, tokens: List[NameToken]
+    ) -> Dict[str, Optional[str]]:
         """Parse text containing multiple names with intelligent analysis"""
         # Enhanced joint name parsing with position-based preference
 
@@ -520,14 +810,10 @@ class FallbackNameParser:
                 first_part = slash_parts[0].strip()
                 parsed_names = self._parse_person_name_parts(first_part)
         else:
-            # Standard & or 'and' patterns
-            parts = re.split(r"\s+(?:&|and)\s+", name_text, flags=re.IGNORECASE)
-            if not parts:
-                return self._empty_result()
-
+            # Standard & or 'and' patterns: the tokens before the separator
             # Handle complex patterns like "Clark Jason R & Shari A"
-            first_part = parts[0].strip()
-            parsed_names = self._parse_person_name_parts(first_part)
+            joint = self._joint_index(tokens)
+            parsed_names = self._person_from_tokens(tokens[:joint])
 
         result = self._empty_result()
         result["first_name"] = parsed_names.get("first_name", "")
@@ -538,7 +824,9 @@ class FallbackNameParser:
 
         return result
 
-    def _parse_individual_name(self, name_text: str) -> Dict[str, Optional[str]]:
+    def _parse_individual_name(
+        self, name_text: str, tokens: List[NameToken]
+    ) -> Dict[str, Optional[str]]:
         """Parse an individual person's name using enhanced heuristics"""
         result = self._empty_result()
         result["parsing_confidence"] = 0.6
@@ -552,13 +840,13 @@ class FallbackNameParser:
             result["first_name"] = parts[1].strip()
         else:
             # Use standard person name parsing for non-trust individuals
-            parsed_names = self._parse_person_name_parts(name_text)
+            parsed_names = self._person_from_tokens(tokens)
             result["first_name"] = parsed_names.get("first_name", "")
             result["last_name"] = parsed_names.get("last_name", "")
 
         return result
 
-    def parse_batch(self, names: List[str]) -> List[Dict[str, Optional[str]]]:
+    def parse_batch(self, names: List[str]) -> List[Mapping[str, Any]]:
         """Parse a batch of names"""
         results = []
         for name in names:
@@ -567,11 +855,92 @@ class FallbackNameParser:
                 results.append(result)
             except Exception as e:
                 logger.error(f"Error parsing name '{name}': {e}")
-                results.append(self._empty_result())
+                results.append(self._freeze(self._empty_result()))
 
         return results
 
-    def _extract_person_from_trust(self, trust_text: str) -> Dict[str, str]:
+    def route_unambiguous(
+        self, name_text: str, min_confidence: float = 0.85
+    ) -> Optional[Dict[str, Optional[str]]]:
+        """
+        Parse a name only if its structure is unambiguous
+
+        Used to decide which names can skip the Gemini API. Two shapes qualify:
+        companies with a standalone strong marker (LLC, Inc, Corp...) and no
+        trust/estate wording, and two-token persons where exactly one token is
+        a known first name and the other scores as a surname.
+
+        Args:
+            name_text: The raw name string
+            min_confidence: Minimum routing confidence (0-1) to accept locally
+
+        Returns:
+            Parsed result with "routing_reason", or None if the API should decide
+        """
+        if not name_text or not name_text.strip():
+            return None
+
+        name_text = name_text.strip()
+        tokens = self._tokenize(name_text)
+        token_set = {token.lower for token in tokens}
+
+        if token_set & self.AMBIGUOUS_OWNERSHIP_MARKERS:
+            return None
+
+        # Company: strong marker as a whole word
+        if token_set & self.STRONG_COMPANY_MARKERS:
+            result = self._empty_result()
+            result["entity_type"] = "company"
+            result["entity_name"] = name_text
+            result["is_entity"] = True
+            result["confidence"] = 0.95
+            result["parsing_confidence"] = 0.95
+            result["routing_reason"] = "company_marker"
+            return result if result["confidence"] >= min_confidence else None
+
+        # Person: exactly two alphabetic tokens, no joint or entity wording
+        parts = name_text.split()
+        if len(parts) != 2 or not all(p.isalpha() and len(p) > 1 for p in parts):
+            return None
+        if token_set & self.ENTITY_KEYWORDS or self._has_multiple_names(
+            name_text, tokens
+        ):
+            return None
+
+        candidates = []
+        for first, last in ((parts[0], parts[1]), (parts[1], parts[0])):
+            first_lower, last_lower = first.lower(), last.lower()
+            if (
+                first_lower in self.COMMON_FIRST_NAMES
+                and last_lower not in self.COMMON_FIRST_NAMES
+            ):
+                score = min(
+                    self._score_as_first_name(first_lower),
+                    self._score_as_last_name(last_lower),
+                )
+                candidates.append((first, last, score / 100))
+
+        # Both orders plausible (or neither) -> let the API decide
+        if len(candidates) != 1:
+            return None
+
+        first, last, confidence = candidates[0]
+        confidence = min(confidence, 0.95)
+        if confidence < min_confidence:
+            return None
+
+        result = self._empty_result()
+        result["first_name"] = first
+        result["last_name"] = last
+        result["entity_type"] = "person"
+        result["confidence"] = confidence
+        result["parsing_confidence"] = confidence
+        result["routing_reason"] = "known_person"
+        return result
+
+    def _extract_person_from_trust(
+        self, lower_text: str, tokens: List[NameToken]
+    ) -> Dict[str, str]:
         """
         Extract person names from trust using name recognition instead of position
         Examples:
@@ -582,25 +951,17 @@ class FallbackNameParser:
         - "Daake Dennis R. Living Trust" → {"first_name": "Dennis", "last_name": "Daake"}
         """
 
-        # Step 1: Extract only name words
-        words = trust_text.split()
-        name_words = []
-
-        for word in words:
-            clean_word = word.strip(".,()").lower()
-            original_word = word.strip(".,()")
-
-            # Skip entity markers
-            if clean_word in self.ENTITY_MARKERS:
-                continue
-            # Skip single letters (middle initials)
-            if len(clean_word) == 1 and clean_word.isalpha():
-                continue
-            # Skip numbers
-            if any(char.isdigit() for char in clean_word):
-                continue
-
-            name_words.append(original_word)
+        # Step 1: Extract only name words (skip entity markers, middle
+        # initials and numbers)
+        name_words = [
+            token.text
+            for token in tokens
+            if not (
+                token.is_marker
+                or (token.is_initial and len(token.lower) == 1)
+                or token.has_digit
+            )
+        ]
 
         if not name_words:
             return {"first_name": "", "last_name": ""}
@@ -617,7 +978,7 @@ class FallbackNameParser:
                 name_words = first_person.split()
 
         # Special handling for Family Trust
-        if "family trust" in trust_text.lower():
+        if "family trust" in lower_text:
             if len(name_words) == 1:
                 # Single name family trust - use as last name only
                 return {"first_name": "", "last_name": name_words[0]}
@@ -684,37 +1045,22 @@ class FallbackNameParser:
         Parse individual person name for non-trust entities
         Handles both FirstName LastName and LastName FirstName patterns
         """
-        parts = name_text.strip().split()
-        if not parts:
-            return {"first_name": "", "last_name": ""}
+        return self._person_from_tokens(self._tokenize(name_text))
 
+    def _person_from_tokens(self, tokens: List[NameToken]) -> Dict[str, str]:
+        """_parse_person_name_parts on an already tokenized name"""
         # Remove middle initials (single letters)
-        filtered_parts = []
-        for part in parts:
-            clean_part = part.strip(".,()").replace(",", "")
-            if len(clean_part) == 1 and clean_part.isalpha():
-                continue  # Skip middle initials
-            filtered_parts.append(clean_part)
+        filtered_parts = [token.bare for token in tokens if not token.is_initial]
 
         if len(filtered_parts) == 0:
             return {"first_name": "", "last_name": ""}
         elif len(filtered_parts) == 1:
             # Single name - could be first or last
             return {"first_name": filtered_parts[0], "last_name": ""}
-        elif len(filtered_parts) == 2:
-            # For non-trust persons, check the context
-            first_part, second_part = filtered_parts
-
-            # If there was a comma in the original text, it's LastName, FirstName
-            if "," in name_text:
-                return {"first_name": second_part, "last_name": first_part}
-
-            # For agricultural/ownership data, the pattern is typically LastName FirstName
-            # So default to that interpretation
-            return {"first_name": second_part, "last_name": first_part}
         else:
-            # 3+ parts: In agricultural data, pattern is LastName FirstName Middle...
-            # So first part is last name, second is first name
+            # With or without a comma ("LastName, FirstName"), agricultural and
+            # ownership data is LastName FirstName [Middle...], so the first
+            # part is the last name and the second the first name
             return {"first_name": filtered_parts[1], "last_name": filtered_parts[0]}
 
     def _looks_like_surname(self, name_part: str) -> bool:
@@ -800,51 +1146,15 @@ class FallbackNameParser:
 
     def _score_as_first_name(self, name_lower: str) -> int:
         """Calculate probability score that name is a first name (0-100 scale)"""
-        # Base scores for very common first names
-        very_common = {
-            "john",
-            "mary",
-            "james",
-            "linda",
-            "robert",
-            "patricia",
-            "michael",
-            "jennifer",
-            "david",
-            "elizabeth",
-            "william",
-            "barbara",
-        }
-        common = {
-            "dennis",
-            "phyllis",
-            "warren",
-            "marilyn",
-            "edwin",
-            "gloria",
-            "virgil",
-            "carl",
-            "harold",
-            "beverly",
-            "donald",
-            "nancy",
-        }
-        often = {"cole", "dale", "drew", "blake", "jordan", "tyler", "amber", "crystal"}
-        sometimes = {"parker", "carter", "taylor", "morgan", "cameron", "hunter"}
-
-        # Start with base score
-        if name_lower in very_common:
-            score = 95
-        elif name_lower in common:
-            score = 85
-        elif name_lower in often:
-            score = 75
-        elif name_lower in sometimes:
-            score = 65
-        elif name_lower in self.COMMON_FIRST_NAMES:
-            score = 80  # Default for other known first names
-        else:
-            score = 45  # Ambiguous default
+        # Base score: known first names by frequency, then the lexicon's
+        # frequency, 45 if ambiguous
+        score = self.FIRST_NAME_SCORES.get(name_lower)
+        if score is None:
+            score = 45
+            if self.lexicon is not None:
+                score = frequency_score(
+                    self.lexicon.first_name_frequency(name_lower), score
+                )
 
         # Adjustments
         # Female name endings
@@ -857,10 +1167,8 @@ class FallbackNameParser:
 
         # Penalties
         # Has surname prefix
-        for prefix in self.SURNAME_PREFIXES:
-            if name_lower.startswith(prefix):
-                score -= 20
-                break
+        if name_lower.startswith(self.SURNAME_PREFIX_TUPLE):
+            score -= 20
 
         # Has surname ending
         if name_lower.endswith(("son", "sen", "berg", "stein", "man", "mann")):
@@ -870,71 +1178,20 @@ class FallbackNameParser:
 
     def _score_as_last_name(self, name_lower: str) -> int:
         """Calculate probability score that name is a last name (0-100 scale)"""
-        # Base scores for common surnames
-        very_common = {
-            "smith",
-            "johnson",
-            "williams",
-            "brown",
-            "jones",
-            "davis",
-            "miller",
-            "wilson",
-            "moore",
-            "taylor",
-            "anderson",
-            "thomas",
-        }
-        common = {
-            "hansen",
-            "peterson",
-            "nelson",
-            "robinson",
-            "clark",
-            "lewis",
-            "walker",
-            "hall",
-            "allen",
-            "young",
-            "king",
-            "wright",
-            "lopez",
-        }
-        regional = {
-            "mcculley",
-            "daake",
-            "pudenz",
-            "chicoine",
-            "birch",
-            "cheslak",
-            "glasnapp",
-            "fry",
-            "mills",
-            "musselman",
-            "petersen",
-        }
-        often = {"baker", "carter", "parker", "mason", "hunter", "turner", "cooper"}
-
-        # Start with base score
-        if name_lower in very_common:
-            score = 95
-        elif name_lower in common:
-            score = 85
-        elif name_lower in regional:
-            score = 75
-        elif name_lower in often:
-            score = 65
-        elif name_lower in self.COMMON_LAST_NAMES:
-            score = 80  # Default for other known surnames
-        else:
-            score = 45  # Ambiguous default
+        # Base score: known surnames by frequency, then the lexicon's
+        # frequency, 45 if ambiguous
+        score = self.LAST_NAME_SCORES.get(name_lower)
+        if score is None:
+            score = 45
+            if self.lexicon is not None:
+                score = frequency_score(
+                    self.lexicon.last_name_frequency(name_lower), score
+                )
 
         # Adjustments
         # Surname prefix bonus
-        for prefix in self.SURNAME_PREFIXES:
-            if name_lower.startswith(prefix):
-                score += 20
-                break
+        if name_lower.startswith(self.SURNAME_PREFIX_TUPLE):
+            score += 20
 
         # Surname ending bonus
         if name_lower.endswith(
@@ -972,11 +1229,9 @@ class FallbackNameParser:
     def _check_compound_surname(self, name_words: List[str]) -> Optional[str]:
         """Check if name words contain a compound surname"""
         for i, word in enumerate(name_words):
-            word_lower = word.lower()
-            for prefix in self.SURNAME_PREFIXES:
-                if word_lower == prefix and i < len(name_words) - 1:
-                    # Found surname prefix, combine with next word
-                    return f"{word} {name_words[i + 1]}"
+            if word.lower() in self.SURNAME_PREFIX_TUPLE and i < len(name_words) - 1:
+                # Found surname prefix, combine with next word
+                return f"{word} {name_words[i + 1]}"
 
         # Check for hyphenated surnames
         for word in name_words:
@@ -1000,5 +1255,11 @@ def get_fallback_parser() -> FallbackNameParser:
     """Get or create the global fallback parser instance"""
     global _fallback_parser
     if _fallback_parser is None:
-        _fallback_parser = FallbackNameParser()
+        # Imported here: the lexicon needs numpy, the parser itself does not
+        from .name_lexicon import get_name_lexicon
+
+        _fallback_parser = FallbackNameParser(
+            memo_size=int(os.getenv("GEMINI_FALLBACK_MEMO_SIZE", "10000")),
+            lexicon=get_name_lexicon(),
+        )
     return _fallback_parser
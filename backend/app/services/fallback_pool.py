@@ -0,0 +1,249 @@
+"""
+Process-pool engine for whole-file rule-based parsing
+
+When Gemini is not used at all (no API key) or the circuit breaker is open,
+every name goes through FallbackNameParser. That is pure Python, ~10us per
+name, so a 1M-row file keeps one core busy while the others idle. This
+engine shards the names across a process pool instead:
+
+- one pool per worker process, created on first use and kept for later jobs
+  (spawned, not forked: the parent runs an event loop, HTTP sessions and
+  Redis clients that a forked child must not inherit)
+- each pool process builds its parser once, in the pool initializer
+- shards come back as columns (one list per field) rather than one dict per
+  name, which keeps pickling between processes cheap
+
+The pool has GEMINI_FALLBACK_WORKERS processes. The default is the CPUs this
+process may use (its affinity mask, capped by the cgroup CPU quota, so a
+container limited to 0.6 CPUs gets 1), at most DEFAULT_MAX_WORKERS since each
+one imports the app. Small inputs (below GEMINI_FALLBACK_POOL_MIN_NAMES),
+hosts with a single worker and daemonic processes are parsed in-process, as
+is everything if the pool cannot start.
+
+Celery's default prefork pool runs tasks in daemonic children, which may not
+have children of their own; to use this pool there, run the worker with
+-P solo or -P threads.
+"""
+
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Tuple
+
+import structlog
+
+from .fallback_name_parser import FallbackNameParser, get_fallback_parser
+
+logger = structlog.get_logger()
+
+# Columns of a parsed shard; fallback_reason is None unless the record has
+# its own reason (empty input), in which case callers keep it
+FALLBACK_COLUMNS = (
+    "first_name",
+    "last_name",
+    "entity_type",
+    "parsing_confidence",
+    "fallback_reason",
+)
+
+_ENTITY_TYPE_ALIASES = {
+    "company": "company",
+    "organization": "company",
+    "corp": "company",
+    "corporation": "company",
+    "trust": "trust",
+    "estate": "trust",
+    "foundation": "trust",
+    "person": "person",
+}
+
+
+def fallback_record(
+    parser: FallbackNameParser, name: str
+) -> Tuple[str, str, str, float, Optional[str]]:
+    """
+    One name through the rule-based parser, normalized the way results are
+    reported: (first_name, last_name, entity_type, confidence, reason)
+    """
+    if not name or not name.strip():
+        return "", "", "unknown", 0.1, "Empty input"
+
+    result = parser.parse_name(name.strip())
+    entity_type = str(result.get("entity_type", "person") or "person").lower()
+    return (
+        result.get("first_name", "") or "",
+        result.get("last_name", "") or "",
+        _ENTITY_TYPE_ALIASES.get(entity_type, "unknown"),
+        result.get("confidence", 0.6),
+        None,
+    )
+
+
+def parse_shard(names: List[str]) -> Dict[str, list]:
+    """Parse names into FALLBACK_COLUMNS (runs in pool processes)"""
+    parser = get_fallback_parser()
+    columns: Dict[str, list] = {column: [] for column in FALLBACK_COLUMNS}
+    appends = [columns[column].append for column in FALLBACK_COLUMNS]
+    for name in names:
+        for append, value in zip(appends, fallback_record(parser, name)):
+            append(value)
+    return columns
+
+
+def _in_daemon_process() -> bool:
+    """True in a daemonic process (multiprocessing or billiard), which cannot
+    start pool processes"""
+    if multiprocessing.current_process().daemon:
+        return True
+    try:
+        import billiard
+    except ImportError:
+        return False
+    return bool(billiard.current_process().daemon)
+
+
+def _cgroup_cpu_quota() -> Optional[float]:
+    """CPU quota from cgroup v2 cpu.max or v1 cpu.cfs_*; None if unlimited"""
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as handle:
+            quota, period = handle.read().split()[:2]
+        return None if quota == "max" else int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    try:
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as handle:
+            quota = int(handle.read())
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as handle:
+            period = int(handle.read())
+    except (OSError, ValueError):
+        return None
+    return quota / period if quota > 0 and period > 0 else None
+
+
+def _available_cpus() -> int:
+    """Whole CPUs this process may use: affinity, capped by the cgroup quota"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    quota = _cgroup_cpu_quota()
+    if quota is not None:
+        cpus = min(cpus, int(quota))
+    return max(1, cpus)
+
+
+def _init_pool_process() -> None:
+    # Build the parser (name tables, compiled patterns) once per process
+    get_fallback_parser()
+
+
+class FallbackPool:
+    """Per-process pool that parses name lists into columns"""
+
+    # Shards per pool process: enough to even out uneven shards
+    SHARDS_PER_WORKER = 4
+    # Pool processes when workers is not given (each one imports the app)
+    DEFAULT_MAX_WORKERS = 4
+
+    def __init__(self, workers: Optional[int] = None, min_names: int = 20000):
+        self.pid = os.getpid()
+        self.workers = max(
+            1, workers or min(self.DEFAULT_MAX_WORKERS, _available_cpus())
+        )
+        if self.workers > 1 and _in_daemon_process():
+            logger.info("fallback_pool_in_process", reason="daemonic process")
+            self.workers = 1
+        self.min_names = min_names
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.stats = {
+            "calls": 0,
+            "pooled_calls": 0,
+            "names": 0,
+            "shards": 0,
+            "pool_failures": 0,
+        }
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_pool_process,
+            )
+            logger.info("fallback_pool_started", workers=self.workers)
+        return self._executor
+
+    async def parse(self, names: List[str]) -> Dict[str, list]:
+        """Parse names (in order) into FALLBACK_COLUMNS"""
+        self.stats["calls"] += 1
+        self.stats["names"] += len(names)
+        if self.workers == 1 or len(names) < self.min_names:
+            return parse_shard(names)
+
+        shard_count = self.workers * self.SHARDS_PER_WORKER
+        shard_size = -(-len(names) // shard_count)
+        shards = [
+            names[i : i + shard_size] for i in range(0, len(names), shard_size)
+        ]
+        loop = asyncio.get_running_loop()
+        try:
+            executor = self._get_executor()
+            parts = await asyncio.gather(
+                *(
+                    loop.run_in_executor(executor, parse_shard, shard)
+                    for shard in shards
+                )
+            )
+        except (BrokenProcessPool, OSError, RuntimeError, AssertionError) as e:
+            # Pool could not start (AssertionError: daemonic processes are not
+            # allowed to have children) or a process died: parse here instead
+            self.stats["pool_failures"] += 1
+            logger.warning("fallback_pool_failed", error=str(e))
+            self.shutdown()
+            return parse_shard(names)
+
+        self.stats["pooled_calls"] += 1
+        self.stats["shards"] += len(shards)
+        columns: Dict[str, list] = {column: [] for column in FALLBACK_COLUMNS}
+        for part in parts:
+            for column in FALLBACK_COLUMNS:
+                columns[column].extend(part[column])
+        return columns
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def snapshot(self) -> dict:
+        return {
+            "workers": self.workers,
+            "min_names": self.min_names,
+            "running": self._executor is not None,
+            **self.stats,
+        }
+
+
+_pool: Optional[FallbackPool] = None
+
+
+def get_fallback_pool() -> FallbackPool:
+    """The calling process's fallback pool (a forked child builds its own)"""
+    global _pool
+    if _pool is None or _pool.pid != os.getpid():
+        workers = os.getenv("GEMINI_FALLBACK_WORKERS")
+        _pool = FallbackPool(
+            workers=int(workers) if workers else None,
+            min_names=int(os.getenv("GEMINI_FALLBACK_POOL_MIN_NAMES", "20000")),
+        )
+    return _pool
+
+
+def shutdown_fallback_pool() -> None:
+    """Stop this process's pool processes (worker shutdown)"""
+    global _pool
+    if _pool is not None and _pool.pid == os.getpid():
+        _pool.shutdown()
+    _pool = None
@@ -24,6 +24,7 @@ class FallbackReason(str, Enum):
     RATE_LIMIT = "rate_limit"
     NETWORK_ERROR = "network_error"
     AUTH_ERROR = "auth_error"
+    CIRCUIT_OPEN = "circuit_open"
     UNKNOWN_ERROR = "unknown_error"
 
 
@@ -196,6 +197,7 @@ class FallbackTracker:
             FallbackReason.RATE_LIMIT: "rate limit exceeded",
             FallbackReason.NETWORK_ERROR: "network error",
             FallbackReason.AUTH_ERROR: "authentication error",
+            FallbackReason.CIRCUIT_OPEN: "Gemini API unavailable (circuit open)",
             FallbackReason.UNKNOWN_ERROR: "unknown error",
         }
         return reason_map.get(reason, reason)
@@ -247,6 +249,7 @@ class FallbackTracker:
             "total_results": len(results),
             "gemini_used": 0,
             "fallback_used": 0,
+            "local_routed": 0,
             "fallback_reasons": {},
             "low_confidence_results": 0,
             "results_with_warnings": 0,
@@ -259,6 +262,8 @@ class FallbackTracker:
             # Count parsing methods
             if result.get("parsing_method") == "gemini":
                 summary["gemini_used"] += 1
+            elif result.get("parsing_method") == "local":
+                summary["local_routed"] += 1
             elif result.get("parsing_method") == "fallback":
                 summary["fallback_used"] += 1
 
@@ -278,10 +283,55 @@ class FallbackTracker:
                 summary["results_with_warnings"] += 1
                 summary["total_warnings"] += len(warnings)
 
+        return self._finalize_warning_summary(summary)
+
+    def combine_warning_summaries(
+        self, summaries: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Merge per-chunk warning summaries into one job-level summary"""
+        summary = {
+            "total_results": 0,
+            "gemini_used": 0,
+            "fallback_used": 0,
+            "local_routed": 0,
+            "fallback_reasons": {},
+            "low_confidence_results": 0,
+            "results_with_warnings": 0,
+            "total_warnings": 0,
+            "quality_score": 0.0,
+            "recommendations": [],
+        }
+
+        for part in summaries:
+            if not part.get("total_results"):
+                continue
+            for key in (
+                "total_results",
+                "gemini_used",
+                "fallback_used",
+                "local_routed",
+                "low_confidence_results",
+                "results_with_warnings",
+                "total_warnings",
+            ):
+                summary[key] += part.get(key, 0)
+            for reason, count in part.get("fallback_reasons", {}).items():
+                summary["fallback_reasons"][reason] = (
+                    summary["fallback_reasons"].get(reason, 0) + count
+                )
+
+        if summary["total_results"] == 0:
+            return {"total_results": 0}
+
+        return self._finalize_warning_summary(summary)
+
+    def _finalize_warning_summary(self, summary: Dict[str, Any]) -> Dict[str, Any]:
+        """Fill in quality score and recommendations from summary counts"""
         # Calculate quality score
         total = summary["total_results"]
         quality_factors = [
-            summary["gemini_used"] / total,  # Gemini usage rate
+            (summary["gemini_used"] + summary["local_routed"])
+            / total,  # Gemini or confident rule-based parse rate
             (total - summary["low_confidence_results"]) / total,  # High confidence rate
             (total - summary["results_with_warnings"])
             / total
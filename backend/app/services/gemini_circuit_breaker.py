@@ -0,0 +1,166 @@
+"""
+Circuit breaker for the Gemini client
+
+When the API is down or the key has been revoked, every batch of a large job
+would otherwise go through its own retries, backoff and timeouts before
+falling back. The breaker is shared by every service in a worker process:
+
+- closed: requests go through; consecutive failures (timeouts, connection
+  errors, 5xx, 401/403) are counted and any response resets the count
+- open: after GEMINI_BREAKER_FAILURES consecutive failures, requests are
+  refused without touching the network and batches go straight to the
+  fallback parser
+- half-open: after the recovery period one probe request is let through. A
+  successful probe closes the breaker; a failed one re-opens it with the
+  recovery period doubled (up to a cap)
+
+Transitions are kept (bounded) with timestamps so jobs can report the ones
+that happened while they ran.
+"""
+
+import os
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+import structlog
+
+logger = structlog.get_logger()
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker for one model's endpoint"""
+
+    MAX_TRANSITIONS = 200
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        recovery_seconds: float = 30.0,
+        max_recovery_seconds: float = 300.0,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.base_recovery_seconds = recovery_seconds
+        self.max_recovery_seconds = max_recovery_seconds
+
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.recovery_seconds = recovery_seconds
+        self.opened_at = 0.0
+        self.probe_started: Optional[float] = None
+        self.last_failure: Optional[str] = None
+        self.rejected = 0
+        self.transitions: deque = deque(maxlen=self.MAX_TRANSITIONS)
+
+    @property
+    def rejecting(self) -> bool:
+        """True while requests would be refused (no side effects)"""
+        now = time.monotonic()
+        if self.state == OPEN:
+            return now - self.opened_at < self.recovery_seconds
+        if self.state == HALF_OPEN:
+            return not self._probe_expired(now)
+        return False
+
+    def allow_request(self) -> bool:
+        """Gate for one request; in half-open state only the probe passes"""
+        now = time.monotonic()
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and now - self.opened_at >= self.recovery_seconds:
+            self._transition(HALF_OPEN, "recovery period elapsed")
+        if self.state == HALF_OPEN and self._probe_expired(now):
+            self.probe_started = now
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        """The endpoint answered (any response that is not a failure)"""
+        self.consecutive_failures = 0
+        if self.state != CLOSED:
+            self.recovery_seconds = self.base_recovery_seconds
+            self.probe_started = None
+            self._transition(CLOSED, "request succeeded")
+
+    def record_failure(self, reason: str) -> None:
+        """A timeout, connection error or server/auth error"""
+        self.consecutive_failures += 1
+        self.last_failure = reason
+        if self.state == HALF_OPEN:
+            self.recovery_seconds = min(
+                self.recovery_seconds * 2, self.max_recovery_seconds
+            )
+            self.probe_started = None
+            self._open(f"probe failed: {reason}")
+        elif (
+            self.state == CLOSED
+            and self.consecutive_failures >= self.failure_threshold
+        ):
+            self._open(f"{self.consecutive_failures} consecutive failures: {reason}")
+
+    def transitions_since(self, since: float) -> List[dict]:
+        """Transitions at or after a wall-clock timestamp (time.time())"""
+        return [t for t in self.transitions if t["time"] >= since]
+
+    def snapshot(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "recovery_seconds": self.recovery_seconds,
+            "rejected_requests": self.rejected,
+            "last_failure": self.last_failure,
+            "transitions": len(self.transitions),
+        }
+
+    def _probe_expired(self, now: float) -> bool:
+        # A probe that never reported back (cancelled task) frees the slot
+        # after one recovery period
+        return (
+            self.probe_started is None
+            or now - self.probe_started >= self.recovery_seconds
+        )
+
+    def _open(self, reason: str) -> None:
+        self.opened_at = time.monotonic()
+        self._transition(OPEN, reason)
+
+    def _transition(self, state: str, reason: str) -> None:
+        previous, self.state = self.state, state
+        self.transitions.append(
+            {"time": time.time(), "from": previous, "to": state, "reason": reason}
+        )
+        logger.warning(
+            "gemini_circuit_breaker_transition",
+            breaker=self.name,
+            from_state=previous,
+            to_state=state,
+            reason=reason,
+            recovery_seconds=self.recovery_seconds,
+        )
+
+
+# Breakers are per model and shared by every service in the process
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_circuit_breaker(model_name: str) -> CircuitBreaker:
+    """Get or create the process-wide breaker for a model"""
+    breaker = _breakers.get(model_name)
+    if breaker is None:
+        breaker = CircuitBreaker(
+            model_name,
+            failure_threshold=int(os.getenv("GEMINI_BREAKER_FAILURES", "5")),
+            recovery_seconds=float(os.getenv("GEMINI_BREAKER_RECOVERY_SECONDS", "30")),
+            max_recovery_seconds=float(
+                os.getenv("GEMINI_BREAKER_MAX_RECOVERY_SECONDS", "300")
+            ),
+        )
+        _breakers[model_name] = breaker
+    return breaker
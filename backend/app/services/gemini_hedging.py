@@ -0,0 +1,123 @@
+"""
+Request hedging for Gemini batches
+
+A job's wall time is set by its slowest batch, and a few batch requests
+regularly take several times the median latency. With hedging on, a batch
+request that has not answered by a percentile of recent request latencies
+(GEMINI_HEDGE_PERCENTILE, p95 by default) gets a duplicate; the first 200
+wins and the other request is cancelled.
+
+Hedging is per HTTP request, not per batch: latencies and the deadline run
+from the request's quota grant, so limiter waits, retries, salvage
+re-requests and thinking escalations are neither measured nor hedged. A
+duplicate takes its own quota slot and concurrency slot: when every slot is
+busy it waits for one, and is dropped if the original answers first.
+
+Hedges are capped at GEMINI_HEDGE_BUDGET (5% by default) of the requests
+seen, and none are sent until the latency window holds MIN_SAMPLES requests.
+Latencies are tracked whether hedging is on or not, for p50/p95/p99
+reporting. Policies are per model and shared by every service in a process.
+"""
+
+import os
+from collections import deque
+from typing import Dict, Optional
+
+
+class HedgePolicy:
+    """Recent request latencies, hedge deadline and hedge budget for one model"""
+
+    WINDOW = 500
+    MIN_SAMPLES = 20
+
+    def __init__(
+        self,
+        model_name: str,
+        enabled: bool = False,
+        percentile: float = 95.0,
+        budget_ratio: float = 0.05,
+    ):
+        self.model_name = model_name
+        self.enabled = enabled
+        self.percentile = percentile
+        self.budget_ratio = budget_ratio
+        self.latencies: deque = deque(maxlen=self.WINDOW)
+        self.batches = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.budget_denied = 0
+        self.slot_waits = 0
+
+    def record(self, seconds: float) -> None:
+        """Latency of a batch request, from its quota grant to the whole response"""
+        self.latencies.append(seconds)
+
+    def quantile(self, percentile: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        index = min(int(len(ordered) * percentile / 100), len(ordered) - 1)
+        return ordered[index]
+
+    def deadline(self) -> Optional[float]:
+        """
+        Seconds after its quota grant to wait before hedging a new batch
+        request, or None if it will not be hedged (hedging off or too few
+        samples)
+        """
+        self.batches += 1
+        if not self.enabled or len(self.latencies) < self.MIN_SAMPLES:
+            return None
+        return self.quantile(self.percentile)
+
+    def take_hedge(self) -> bool:
+        """Reserve one hedge request if the budget allows"""
+        if self.hedges + 1 > self.budget_ratio * self.batches:
+            self.budget_denied += 1
+            return False
+        self.hedges += 1
+        return True
+
+    def record_win(self) -> None:
+        self.hedge_wins += 1
+
+    def record_slot_wait(self) -> None:
+        """A hedge was due but had to wait for a concurrency slot"""
+        self.slot_waits += 1
+
+    def snapshot(self) -> dict:
+        return {
+            "samples": len(self.latencies),
+            "p50_seconds": self.quantile(50),
+            "p95_seconds": self.quantile(95),
+            "p99_seconds": self.quantile(99),
+            "hedging": {
+                "enabled": self.enabled,
+                "percentile": self.percentile,
+                "budget_ratio": self.budget_ratio,
+                "batches": self.batches,
+                "hedges": self.hedges,
+                "hedge_wins": self.hedge_wins,
+                "hedge_win_rate": self.hedge_wins / self.hedges if self.hedges else 0.0,
+                "budget_denied": self.budget_denied,
+                "slot_waits": self.slot_waits,
+            },
+        }
+
+
+# Policies are per model and shared by every service in the process
+_policies: Dict[str, HedgePolicy] = {}
+
+
+def get_hedge_policy(model_name: str) -> HedgePolicy:
+    """Get or create the process-wide hedging policy for a model"""
+    policy = _policies.get(model_name)
+    if policy is None:
+        policy = HedgePolicy(
+            model_name,
+            enabled=os.getenv("GEMINI_HEDGING", "false").lower() == "true",
+            percentile=float(os.getenv("GEMINI_HEDGE_PERCENTILE", "95")),
+            budget_ratio=float(os.getenv("GEMINI_HEDGE_BUDGET", "0.05")),
+        )
+        _policies[model_name] = policy
+    return policy
@@ -0,0 +1,223 @@
+"""
+Where the static parsing instructions travel in Gemini requests
+
+The instructions are several kilobytes and identical for every batch. Modes:
+
+- inline: instructions are part of every request's text (original behaviour)
+- system: instructions go in systemInstruction; the text carries only names
+- cached: instructions are stored once as a cachedContents resource with a
+  TTL, and requests reference it by name
+
+The context for a model is shared by every service in the process. If the API
+rejects a mode (caching unavailable for the model/key, systemInstruction not
+supported) it drops to the next one for a cool-down period, so requests keep
+flowing with inline prompts in the worst case.
+"""
+
+import asyncio
+import time
+import weakref
+from typing import Any, Dict, Optional, Tuple
+
+import structlog
+
+logger = structlog.get_logger()
+
+PROMPT_MODES = ("inline", "system", "cached")
+
+# Error texts that mean "this mode is not available", not "bad batch"
+_MODE_ERROR_MARKERS = {
+    "cached": ("cachedcontent", "cached content", "cachedcontents"),
+    "system": ("systeminstruction", "system instruction", "developer instruction"),
+}
+
+
+class PromptContext:
+    """Prompt mode selection and cachedContents handle for one model"""
+
+    # Refresh the cache TTL this long before it expires
+    CACHE_REFRESH_MARGIN_SECONDS = 300
+    # How long a rejected mode stays disabled
+    DOWNGRADE_SECONDS = 600
+
+    def __init__(
+        self,
+        model_name: str,
+        instruction: str,
+        mode: str,
+        api_base: str,
+        cache_ttl_seconds: int = 3600,
+    ):
+        if mode not in PROMPT_MODES:
+            logger.warning("unknown_prompt_mode", mode=mode, using="system")
+            mode = "system"
+        self.model_name = model_name
+        self.instruction = instruction
+        self.mode = mode
+        self.api_base = api_base.rstrip("/")
+        self.cache_ttl_seconds = cache_ttl_seconds
+
+        self._cache_name: Optional[str] = None
+        self._cache_expires_at = 0.0
+        # asyncio locks are bound to one event loop, and worker threads may
+        # run loops of their own: one lock per loop
+        self._cache_locks: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+        self._disabled_until = {"cached": 0.0, "system": 0.0}
+
+        self.stats = {
+            "cache_creates": 0,
+            "cache_refreshes": 0,
+            "cache_errors": 0,
+            "downgrades": 0,
+        }
+
+    def effective_mode(self) -> str:
+        """Configured mode, minus any that are cooling down after a rejection"""
+        now = time.time()
+        mode = self.mode
+        if mode == "cached" and now < self._disabled_until["cached"]:
+            mode = "system"
+        if mode == "system" and now < self._disabled_until["system"]:
+            mode = "inline"
+        return mode
+
+    def downgrade(self, mode: str, reason: str) -> None:
+        """Stop using mode for a while (the next mode down takes over)"""
+        if mode not in self._disabled_until:
+            return
+        self._disabled_until[mode] = time.time() + self.DOWNGRADE_SECONDS
+        if mode == "cached":
+            self._cache_name = None
+        self.stats["downgrades"] += 1
+        logger.warning(
+            "prompt_mode_downgraded",
+            model=self.model_name,
+            mode=mode,
+            now_using=self.effective_mode(),
+            reason=reason[:200],
+        )
+
+    @staticmethod
+    def is_mode_error(mode: str, error_text: str) -> bool:
+        """True if an API error is about the prompt mode itself"""
+        text = error_text.lower()
+        return any(marker in text for marker in _MODE_ERROR_MARKERS.get(mode, ()))
+
+    async def request_fields(
+        self, session: Any, api_key: str
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        Mode for the next request and the payload fields it needs.
+
+        Returns:
+            (mode, fields) where fields holds systemInstruction or
+            cachedContent, or nothing for inline prompts
+        """
+        mode = self.effective_mode()
+        if mode == "cached":
+            name = await self._ensure_cache(session, api_key)
+            if name:
+                return mode, {"cachedContent": name}
+            mode = self.effective_mode()
+        if mode == "system":
+            return mode, {"systemInstruction": {"parts": [{"text": self.instruction}]}}
+        return "inline", {}
+
+    def _get_cache_lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        lock = self._cache_locks.get(loop)
+        if lock is None:
+            lock = self._cache_locks[loop] = asyncio.Lock()
+        return lock
+
+    async def _ensure_cache(self, session: Any, api_key: str) -> Optional[str]:
+        """Create the cachedContents resource, or extend its TTL when due"""
+        if (
+            self._cache_name
+            and time.time() < self._cache_expires_at - self.CACHE_REFRESH_MARGIN_SECONDS
+        ):
+            return self._cache_name
+
+        async with self._get_cache_lock():
+            # Another request may have refreshed it, or given up on caching,
+            # while we waited
+            if self.effective_mode() != "cached":
+                return None
+            now = time.time()
+            if (
+                self._cache_name
+                and now < self._cache_expires_at - self.CACHE_REFRESH_MARGIN_SECONDS
+            ):
+                return self._cache_name
+
+            ttl = f"{self.cache_ttl_seconds}s"
+            try:
+                if self._cache_name and now < self._cache_expires_at:
+                    url = (
+                        f"{self.api_base}/{self._cache_name}"
+                        f"?key={api_key}&updateMask=ttl"
+                    )
+                    async with session.patch(url, json={"ttl": ttl}) as response:
+                        if response.status == 200:
+                            self._cache_expires_at = now + self.cache_ttl_seconds
+                            self.stats["cache_refreshes"] += 1
+                            return self._cache_name
+                    # Refresh failed (expired or evicted): create a new one
+
+                payload = {
+                    "model": f"models/{self.model_name}",
+                    "systemInstruction": {"parts": [{"text": self.instruction}]},
+                    "ttl": ttl,
+                }
+                url = f"{self.api_base}/cachedContents?key={api_key}"
+                async with session.post(url, json=payload) as response:
+                    if response.status != 200:
+                        error = await response.text()
+                        self.stats["cache_errors"] += 1
+                        self.downgrade("cached", f"{response.status}: {error}")
+                        return None
+                    result = await response.json()
+            except Exception as e:
+                self.stats["cache_errors"] += 1
+                self.downgrade("cached", str(e))
+                return None
+
+            self._cache_name = result["name"]
+            self._cache_expires_at = now + self.cache_ttl_seconds
+            self.stats["cache_creates"] += 1
+            logger.info(
+                "prompt_cache_created",
+                model=self.model_name,
+                cache_name=self._cache_name,
+                ttl_seconds=self.cache_ttl_seconds,
+            )
+            return self._cache_name
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "configured_mode": self.mode,
+            "mode": self.effective_mode(),
+            **self.stats,
+        }
+
+
+# Contexts are per model and shared by every service in the process
+_contexts: Dict[Tuple[str, str], PromptContext] = {}
+
+
+def get_prompt_context(
+    model_name: str, instruction: str, mode: str, api_base: str, cache_ttl_seconds: int
+) -> PromptContext:
+    """Get or create the process-wide prompt context for a model"""
+    key = (model_name, mode)
+    context = _contexts.get(key)
+    if context is None or context.instruction != instruction:
+        context = PromptContext(
+            model_name,
+            instruction,
+            mode,
+            api_base,
+            cache_ttl_seconds=cache_ttl_seconds,
+        )
+        _contexts[key] = context
+    return context
@@ -0,0 +1,561 @@
+"""
+Cluster-wide rate limiting for Gemini API calls
+
+Every ConsolidatedGeminiService has its own semaphore, so without this module
+total concurrency against Gemini is workers x tasks x GEMINI_MAX_CONCURRENT.
+The limiter enforces one quota per model across all worker processes:
+
+- requests per minute and tokens per minute, as token buckets that refill
+  continuously
+- a cap on in-flight requests, as leases that expire if a worker dies
+
+State lives in Redis and every check-and-take is a single Lua script, so
+concurrent workers never overdraw a bucket. Script time comes from Redis TIME,
+so worker clock skew does not matter.
+
+429 responses feed back into the shared state: the request bucket is drained,
+every worker waits out Retry-After, and the refill rate is cut (then recovers
+additively on successful grants), so a quota set higher than the project's
+real limit settles instead of causing retry storms.
+
+The limiter is off unless GEMINI_RATE_LIMIT_ENABLED is set; the quotas must
+then match the project's Gemini tier, or jobs queue for a budget they don't
+need.
+
+LocalQuotaBackend implements the same rules in-process. It is used for tests
+and as a stand-in while Redis is unreachable (the quota then applies per
+process).
+"""
+
+import asyncio
+import json
+import os
+import random
+import re
+import threading
+import time
+import uuid
+import weakref
+from typing import Any, Dict, Optional, Tuple
+
+import structlog
+
+from app.core.config import settings
+
+logger = structlog.get_logger()
+
+# Refill-rate scale after a 429 (multiplicative decrease) and per grant
+# (additive increase)
+RATE_SCALE_DECREASE = 0.7
+RATE_SCALE_INCREASE = 0.002
+RATE_SCALE_MIN = 0.1
+
+# Leases of requests that never released (worker killed) expire after this
+LEASE_TTL_SECONDS = 120
+
+# Wait suggested when all in-flight slots are taken
+INFLIGHT_RETRY_SECONDS = 0.05
+
+
+# Shared bucket helper; level is refilled lazily from the last update time
+_LUA_LEVEL = """
+local function bucket_level(key, capacity, rate, now)
+  local state = redis.call('HMGET', key, 'level', 'ts')
+  local level = tonumber(state[1]) or capacity
+  local ts = tonumber(state[2]) or now
+  if now > ts then
+    level = level + (now - ts) * rate
+  end
+  return math.min(capacity, level)
+end
+
+local function rate_scale(key)
+  return tonumber(redis.call('HGET', key, 'scale') or '1')
+end
+
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+"""
+
+# KEYS: request bucket, token bucket, in-flight leases, blocked-until
+# ARGV: rpm, tpm, max_inflight, tokens, lease_id, lease_ttl, scale_increase
+# Returns {granted, wait_seconds}
+ACQUIRE_SCRIPT = (
+    _LUA_LEVEL
+    + """
+local rpm = tonumber(ARGV[1])
+local tpm = tonumber(ARGV[2])
+local max_inflight = tonumber(ARGV[3])
+local tokens = math.min(tonumber(ARGV[4]), tpm)
+
+local blocked_until = tonumber(redis.call('GET', KEYS[4]) or '0')
+if blocked_until > now then
+  return {0, tostring(blocked_until - now)}
+end
+
+redis.call('ZREMRANGEBYSCORE', KEYS[3], '-inf', now)
+if redis.call('ZCARD', KEYS[3]) >= max_inflight then
+  return {0, 'inflight'}
+end
+
+local scale = rate_scale(KEYS[1])
+local requests = bucket_level(KEYS[1], rpm, rpm * scale / 60, now)
+local budget = bucket_level(KEYS[2], tpm, tpm * scale / 60, now)
+
+local wait = 0
+if requests < 1 then
+  wait = (1 - requests) * 60 / (rpm * scale)
+end
+if budget < tokens then
+  wait = math.max(wait, (tokens - budget) * 60 / (tpm * scale))
+end
+if wait > 0 then
+  return {0, tostring(wait)}
+end
+
+scale = math.min(1, scale + tonumber(ARGV[7]))
+redis.call('HSET', KEYS[1], 'level', requests - 1, 'ts', now, 'scale', scale)
+redis.call('HSET', KEYS[2], 'level', budget - tokens, 'ts', now)
+redis.call('ZADD', KEYS[3], now + tonumber(ARGV[6]), ARGV[5])
+redis.call('EXPIRE', KEYS[1], 3600)
+redis.call('EXPIRE', KEYS[2], 3600)
+redis.call('EXPIRE', KEYS[3], 2 * tonumber(ARGV[6]))
+return {1, '0'}
+"""
+)
+
+# KEYS: request bucket, token bucket, in-flight leases
+# ARGV: lease_id, tpm, token_correction (positive refunds the reservation)
+RELEASE_SCRIPT = (
+    _LUA_LEVEL
+    + """
+redis.call('ZREM', KEYS[3], ARGV[1])
+local correction = tonumber(ARGV[3])
+if correction ~= 0 then
+  local tpm = tonumber(ARGV[2])
+  local scale = rate_scale(KEYS[1])
+  local budget = bucket_level(KEYS[2], tpm, tpm * scale / 60, now)
+  redis.call('HSET', KEYS[2], 'level', math.min(tpm, budget + correction), 'ts', now)
+end
+return 1
+"""
+)
+
+# KEYS: request bucket, blocked-until
+# ARGV: retry_after_seconds, scale_decrease, scale_min
+PENALIZE_SCRIPT = (
+    _LUA_LEVEL
+    + """
+local retry_after = tonumber(ARGV[1])
+local blocked_until = now + retry_after
+local current = tonumber(redis.call('GET', KEYS[2]) or '0')
+if blocked_until > current then
+  redis.call('SET', KEYS[2], tostring(blocked_until), 'EX', math.ceil(retry_after) + 1)
+end
+local scale = math.max(tonumber(ARGV[3]), rate_scale(KEYS[1]) * tonumber(ARGV[2]))
+-- Drained bucket starts refilling only once the block is over
+redis.call('HSET', KEYS[1], 'level', 0, 'ts', math.max(blocked_until, current), 'scale', scale)
+redis.call('EXPIRE', KEYS[1], 3600)
+return tostring(scale)
+"""
+)
+
+
+def parse_retry_after(headers: Any, body: str) -> Optional[float]:
+    """
+    Seconds to wait from a 429 response.
+
+    Checks the Retry-After header, then Gemini's RetryInfo detail
+    ({"error": {"details": [{"retryDelay": "12s"}]}}) in the body.
+    """
+    value = headers.get("Retry-After") if headers else None
+    if value:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass  # HTTP-date form; fall through to the body
+
+    try:
+        details = json.loads(body).get("error", {}).get("details", [])
+    except (ValueError, AttributeError):
+        return None
+    for detail in details:
+        delay = detail.get("retryDelay") if isinstance(detail, dict) else None
+        match = re.fullmatch(r"([\d.]+)s", delay or "")
+        if match:
+            return float(match.group(1))
+    return None
+
+
+class LocalQuotaBackend:
+    """In-process implementation of the quota rules (tests, Redis outages)"""
+
+    name = "local"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._requests = None  # (level, ts) pairs, created on first use
+        self._tokens = None
+        self._scale = 1.0
+        self._blocked_until = 0.0
+        self._leases: Dict[str, float] = {}
+
+    @staticmethod
+    def _level(state, capacity: float, rate: float, now: float) -> float:
+        if state is None:
+            return capacity
+        level, ts = state
+        if now > ts:
+            level += (now - ts) * rate
+        return min(capacity, level)
+
+    async def acquire(
+        self, rpm: int, tpm: int, max_inflight: int, tokens: int, lease_id: str
+    ) -> Tuple[bool, float]:
+        with self._lock:
+            now = time.monotonic()
+            tokens = min(tokens, tpm)
+            if self._blocked_until > now:
+                return False, self._blocked_until - now
+
+            self._leases = {
+                lease: expires
+                for lease, expires in self._leases.items()
+                if expires > now
+            }
+            if len(self._leases) >= max_inflight:
+                return False, INFLIGHT_RETRY_SECONDS
+
+            requests = self._level(self._requests, rpm, rpm * self._scale / 60, now)
+            budget = self._level(self._tokens, tpm, tpm * self._scale / 60, now)
+            wait = 0.0
+            if requests < 1:
+                wait = (1 - requests) * 60 / (rpm * self._scale)
+            if budget < tokens:
+                wait = max(wait, (tokens - budget) * 60 / (tpm * self._scale))
+            if wait > 0:
+                return False, wait
+
+            self._scale = min(1.0, self._scale + RATE_SCALE_INCREASE)
+            self._requests = (requests - 1, now)
+            self._tokens = (budget - tokens, now)
+            self._leases[lease_id] = now + LEASE_TTL_SECONDS
+            return True, 0.0
+
+    async def release(self, lease_id: str, tpm: int, correction: int) -> None:
+        with self._lock:
+            self._leases.pop(lease_id, None)
+            if correction:
+                now = time.monotonic()
+                budget = self._level(self._tokens, tpm, tpm * self._scale / 60, now)
+                self._tokens = (min(tpm, budget + correction), now)
+
+    async def penalize(self, retry_after: float) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._blocked_until = max(self._blocked_until, now + retry_after)
+            self._scale = max(RATE_SCALE_MIN, self._scale * RATE_SCALE_DECREASE)
+            self._requests = (0.0, self._blocked_until)
+            return self._scale
+
+
+class RedisQuotaBackend:
+    """Quota state in Redis, shared by every worker process"""
+
+    name = "redis"
+
+    def __init__(self, redis_url: str, key_prefix: str, retry_after: float = 30.0):
+        self.redis_url = redis_url
+        self.keys = {
+            part: f"{key_prefix}:{part}"
+            for part in ("requests", "tokens", "inflight", "blocked")
+        }
+        self.retry_after = retry_after
+
+        # redis.asyncio clients are bound to the event loop that created
+        # them: scripts (and their client) per loop, since worker threads may
+        # run loops of their own at the same time
+        self._scripts: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+        self._scripts_lock = threading.Lock()
+        self._disabled_until = 0.0
+
+    @property
+    def available(self) -> bool:
+        return time.time() >= self._disabled_until
+
+    def _get_scripts(self):
+        """Registered scripts for a client bound to the running event loop"""
+        loop = asyncio.get_running_loop()
+        with self._scripts_lock:
+            scripts = self._scripts.get(loop)
+            if scripts is None:
+                import redis.asyncio as aioredis
+
+                client = aioredis.from_url(
+                    self.redis_url,
+                    decode_responses=True,
+                    socket_connect_timeout=0.5,
+                    socket_timeout=1.0,
+                )
+                scripts = {
+                    "acquire": client.register_script(ACQUIRE_SCRIPT),
+                    "release": client.register_script(RELEASE_SCRIPT),
+                    "penalize": client.register_script(PENALIZE_SCRIPT),
+                }
+                self._scripts[loop] = scripts
+        return scripts
+
+    def mark_unavailable(self, error: Exception) -> None:
+        self._disabled_until = time.time() + self.retry_after
+        with self._scripts_lock:
+            self._scripts.clear()
+        logger.warning(
+            "gemini_rate_limiter_redis_unavailable",
+            error=str(error),
+            retry_after_seconds=self.retry_after,
+        )
+
+    async def acquire(
+        self, rpm: int, tpm: int, max_inflight: int, tokens: int, lease_id: str
+    ) -> Tuple[bool, float]:
+        keys = self.keys
+        granted, wait = await self._get_scripts()["acquire"](
+            keys=[keys["requests"], keys["tokens"], keys["inflight"], keys["blocked"]],
+            args=[
+                rpm,
+                tpm,
+                max_inflight,
+                tokens,
+                lease_id,
+                LEASE_TTL_SECONDS,
+                RATE_SCALE_INCREASE,
+            ],
+        )
+        if wait == "inflight":
+            return False, INFLIGHT_RETRY_SECONDS
+        return bool(int(granted)), float(wait)
+
+    async def release(self, lease_id: str, tpm: int, correction: int) -> None:
+        keys = self.keys
+        await self._get_scripts()["release"](
+            keys=[keys["requests"], keys["tokens"], keys["inflight"]],
+            args=[lease_id, tpm, correction],
+        )
+
+    async def penalize(self, retry_after: float) -> float:
+        keys = self.keys
+        scale = await self._get_scripts()["penalize"](
+            keys=[keys["requests"], keys["blocked"]],
+            args=[retry_after, RATE_SCALE_DECREASE, RATE_SCALE_MIN],
+        )
+        return float(scale)
+
+
+class RateLimitSlot:
+    """One granted request; reports actual token usage back on release"""
+
+    def __init__(self, limiter: "GeminiRateLimiter", tokens: int):
+        self.limiter = limiter
+        self.reserved_tokens = tokens
+        self.used_tokens: Optional[int] = None
+        self.lease_id: Optional[str] = None
+        self.backend = None
+        self.granted_at = 0.0
+
+    def record_usage(self, usage_metadata: Dict[str, Any]) -> None:
+        total = usage_metadata.get("totalTokenCount")
+        if total:
+            self.used_tokens = int(total)
+
+    async def rate_limited(self, retry_after: float) -> None:
+        """The request got a 429; nothing was spent, everyone backs off"""
+        self.used_tokens = 0
+        await self.limiter.on_rate_limited(retry_after)
+
+    async def __aenter__(self) -> "RateLimitSlot":
+        await self.limiter.acquire(self)
+        self.granted_at = time.time()
+        return self
+
+    async def __aexit__(self, *exc) -> bool:
+        await self.limiter.release(self)
+        return False
+
+
+class GeminiRateLimiter:
+    """Requests/tokens per minute and in-flight cap for one model"""
+
+    def __init__(
+        self,
+        model_name: str,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        max_inflight: int,
+        enabled: bool = True,
+        backend: Optional[Any] = None,
+        max_wait_seconds: float = 120.0,
+    ):
+        self.model_name = model_name
+        self.rpm = requests_per_minute
+        self.tpm = tokens_per_minute
+        self.max_inflight = max_inflight
+        self.enabled = enabled
+        self.backend = backend or LocalQuotaBackend()
+        # Stand-in while a Redis backend is unavailable
+        self.local_backend = (
+            self.backend
+            if isinstance(self.backend, LocalQuotaBackend)
+            else LocalQuotaBackend()
+        )
+        self.max_wait_seconds = max_wait_seconds
+
+        self.stats = {
+            "granted": 0,
+            "waits": 0,
+            "wait_seconds": 0.0,
+            "rate_limited_429": 0,
+            "wait_timeouts": 0,
+            "backend_errors": 0,
+            "rate_scale": 1.0,
+        }
+
+    def slot(self, tokens: int) -> RateLimitSlot:
+        """Async context manager that holds one request's quota"""
+        return RateLimitSlot(self, tokens)
+
+    def _active_backend(self):
+        backend = self.backend
+        if isinstance(backend, RedisQuotaBackend) and not backend.available:
+            return self.local_backend
+        return backend
+
+    async def _call(self, method: str, *args):
+        """Run a backend call, degrading to the local stand-in on Redis errors"""
+        backend = self._active_backend()
+        try:
+            return backend, await getattr(backend, method)(*args)
+        except Exception as e:
+            if backend is self.local_backend:
+                raise
+            self.stats["backend_errors"] += 1
+            backend.mark_unavailable(e)
+            return self.local_backend, await getattr(self.local_backend, method)(*args)
+
+    async def acquire(self, slot: RateLimitSlot) -> None:
+        if not self.enabled:
+            return
+
+        lease_id = uuid.uuid4().hex
+        start = time.monotonic()
+        waited = False
+        while True:
+            backend, (granted, wait) = await self._call(
+                "acquire",
+                self.rpm,
+                self.tpm,
+                self.max_inflight,
+                slot.reserved_tokens,
+                lease_id,
+            )
+            if granted:
+                slot.lease_id = lease_id
+                slot.backend = backend
+                self.stats["granted"] += 1
+                break
+
+            elapsed = time.monotonic() - start
+            if elapsed + wait > self.max_wait_seconds:
+                # Let the request through; a 429 will push back if needed
+                self.stats["wait_timeouts"] += 1
+                logger.warning(
+                    "gemini_rate_limit_wait_exceeded",
+                    model=self.model_name,
+                    waited_seconds=round(elapsed, 2),
+                )
+                break
+
+            waited = True
+            # Jitter so workers woken together do not retry in lockstep
+            await asyncio.sleep(wait + random.uniform(0, 0.05))
+
+        if waited:
+            self.stats["waits"] += 1
+            self.stats["wait_seconds"] += time.monotonic() - start
+
+    async def release(self, slot: RateLimitSlot) -> None:
+        if slot.lease_id is None:
+            return
+        correction = 0
+        if slot.used_tokens is not None:
+            correction = slot.reserved_tokens - slot.used_tokens
+        try:
+            await slot.backend.release(slot.lease_id, self.tpm, correction)
+        except Exception as e:
+            # The lease expires on its own; only the token correction is lost
+            self.stats["backend_errors"] += 1
+            if isinstance(slot.backend, RedisQuotaBackend):
+                slot.backend.mark_unavailable(e)
+
+    async def on_rate_limited(self, retry_after: float) -> None:
+        """Feed a 429 into the shared quota (or just back off when disabled)"""
+        self.stats["rate_limited_429"] += 1
+        if not self.enabled:
+            await asyncio.sleep(retry_after)
+            return
+
+        _, scale = await self._call("penalize", retry_after)
+        self.stats["rate_scale"] = round(scale, 3)
+        logger.warning(
+            "gemini_rate_limited",
+            model=self.model_name,
+            retry_after_seconds=retry_after,
+            rate_scale=round(scale, 3),
+        )
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current settings and counters for performance stats"""
+        return {
+            "enabled": self.enabled,
+            "backend": self._active_backend().name,
+            "requests_per_minute": self.rpm,
+            "tokens_per_minute": self.tpm,
+            "max_inflight": self.max_inflight,
+            **self.stats,
+            "wait_seconds": round(self.stats["wait_seconds"], 2),
+        }
+
+
+# Limiters are per model and shared by every service in the process
+_limiters: Dict[str, GeminiRateLimiter] = {}
+
+
+def get_gemini_rate_limiter(model_name: str) -> GeminiRateLimiter:
+    """Get or create the process-wide limiter for a model"""
+    limiter = _limiters.get(model_name)
+    if limiter is None:
+        enabled = settings.GEMINI_RATE_LIMIT_ENABLED
+        backend = None
+        if enabled:
+            try:
+                import redis.asyncio  # noqa: F401
+
+                backend = RedisQuotaBackend(
+                    redis_url=os.getenv("REDIS_URL", "redis://localhost:6379/0"),
+                    key_prefix=f"gemini_quota:{model_name}",
+                )
+            except ImportError:
+                logger.warning(
+                    "gemini_rate_limiter_local_only", reason="redis not installed"
+                )
+
+        limiter = GeminiRateLimiter(
+            model_name,
+            requests_per_minute=settings.GEMINI_RATE_LIMIT_PER_MINUTE,
+            tokens_per_minute=settings.GEMINI_TOKENS_PER_MINUTE,
+            max_inflight=settings.GEMINI_MAX_IN_FLIGHT,
+            enabled=enabled,
+            backend=backend,
+            max_wait_seconds=float(os.getenv("GEMINI_RATE_LIMIT_MAX_WAIT", "120")),
+        )
+        _limiters[model_name] = limiter
+    return limiter
@@ -7,11 +7,12 @@ Gilfoyle-approved implementation.
 import asyncio
 import json
 import os
+import re
 import time
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field, replace
 from enum import Enum
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
 import structlog
 
@@ -35,7 +36,19 @@ except ImportError:
 import aiohttp
 
 # Import fallback parser
+from .batch_tuner import get_batch_controller
 from .fallback_name_parser import get_fallback_parser
+from .fallback_pool import FALLBACK_COLUMNS, fallback_record, get_fallback_pool
+from .gemini_circuit_breaker import get_circuit_breaker
+from .gemini_hedging import get_hedge_policy
+from .gemini_prompt_context import get_prompt_context
+from .gemini_rate_limiter import get_gemini_rate_limiter, parse_retry_after
+from .gender_index import get_gender_index
+from .name_result_cache import (
+    get_name_result_cache,
+    normalize_name_key,
+    prompt_version_hash,
+)
 
 logger = structlog.get_logger()
 
@@ -53,6 +66,213 @@ class NameComplexity(Enum):
     ENTITY = "entity"  # ABC Corporation
 
 
+# Estimated output + thinking tokens per name for each complexity class.
+# Entities only need classification; joint owners and trusts need name
+# extraction plus prioritization, which is where the thinking goes.
+COMPLEXITY_TOKEN_COST = {
+    NameComplexity.ENTITY: 120,
+    NameComplexity.SIMPLE: 250,
+    NameComplexity.MODERATE: 350,
+    NameComplexity.COMPLEX: 550,
+}
+
+# Thinking budget per name when GEMINI_THINKING_CONTROL is on: plain person
+# names and entities need no reasoning, joint owners and trusts do. Requests
+# re-sent because their output failed validation get the escalated budget
+# per name, doubled for each further escalation.
+THINKING_TOKENS_PER_NAME = {
+    NameComplexity.ENTITY: 0,
+    NameComplexity.SIMPLE: 0,
+    NameComplexity.MODERATE: 64,
+    NameComplexity.COMPLEX: 256,
+}
+ESCALATED_THINKING_PER_NAME = 512
+# Output tokens per name on top of a set thinking budget (maxOutputTokens
+# covers both)
+OUTPUT_TOKENS_PER_NAME = 100
+
+# Validator repairs meaning the model failed to extract the names (as opposed
+# to tidy-ups such as dropping an entity marker); with thinking control these
+# names are re-sent with a larger budget
+EXTRACTION_FAILURE_WARNINGS = frozenset(
+    {
+        "Names recovered from validation",
+        "Only last name recovered",
+        "Missing name recovered",
+        "Person entity with no names extracted",
+        "Invalid first name removed",
+        "Invalid last name removed",
+    }
+)
+
+# (smallest non-zero budget, largest budget, whether 0 turns thinking off)
+# per model; models not listed get no thinkingConfig
+THINKING_BUDGET_LIMITS = {
+    "gemini-2.5-flash": (1, 24576, True),
+    "gemini-2.5-flash-lite": (512, 24576, True),
+    "gemini-2.5-pro": (128, 32768, False),
+}
+
+_COMPANY_MARKER_RE = re.compile(
+    r"\b(llc|inc|corp|corporation|incorporated|ltd|limited|company|co|lp|llp|"
+    r"partnership|properties|enterprises|holdings|group)\b",
+    re.IGNORECASE,
+)
+_COMPLEX_MARKER_RE = re.compile(
+    r"&|/|\b(and|trust|trs|tr|ttee|tste|trustee|rev|revocable|irrevocable|"
+    r"living|estate|etal|et al|le|fbo)\b",
+    re.IGNORECASE,
+)
+_MODERATE_MARKER_RE = re.compile(
+    r"\d|\b(dr|mr|mrs|ms|jr|sr|ii|iii|iv)\b\.?", re.IGNORECASE
+)
+
+
+def classify_name_complexity(name: str) -> NameComplexity:
+    """Cheap structural complexity class for a raw name string"""
+    # Trust/joint wording wins over company words ("co-trustees", "family
+    # holdings trust"): overestimating costs budget, underestimating truncates
+    if _COMPLEX_MARKER_RE.search(name):
+        return NameComplexity.COMPLEX
+    if _COMPANY_MARKER_RE.search(name):
+        return NameComplexity.ENTITY
+    if len(name.split()) > 3 or _MODERATE_MARKER_RE.search(name):
+        return NameComplexity.MODERATE
+    return NameComplexity.SIMPLE
+
+
+def estimate_name_tokens(name: str) -> int:
+    """Estimated output + thinking tokens Gemini spends on one name"""
+    # ~4 characters per token; longer strings also take more reasoning
+    return COMPLEXITY_TOKEN_COST[classify_name_complexity(name)] + len(name) // 4
+
+
+def thinking_budget_for(
+    model_name: str, names: List[str], escalation: int = 0
+) -> Optional[int]:
+    """
+    thinkingBudget for a batch from its composition (0 for a batch of
+    simple names and entities), raised for escalated re-sends. None when
+    the model takes no thinkingConfig.
+    """
+    limits = THINKING_BUDGET_LIMITS.get(model_name)
+    if limits is None:
+        return None
+    low, high, can_disable = limits
+    budget = sum(
+        THINKING_TOKENS_PER_NAME[classify_name_complexity(name)] for name in names
+    )
+    if escalation:
+        budget = max(
+            budget, ESCALATED_THINKING_PER_NAME * len(names) * 2 ** (escalation - 1)
+        )
+    if budget == 0 and can_disable:
+        return 0
+    return max(low, min(budget, high))
+
+
+# USD per 1M (input, output) tokens; thinking tokens are billed as output.
+# Unknown models are priced as gemini-2.5-flash.
+MODEL_PRICES_PER_MILLION = {
+    "gemini-2.5-flash-lite": (0.10, 0.40),
+    "gemini-2.0-flash": (0.10, 0.40),
+    "gemini-2.5-flash": (0.30, 2.50),
+    "gemini-2.5-pro": (1.25, 10.00),
+}
+
+# Model used for a tier when GEMINI_TIER_<TIER> is not set; other tiers use
+# GEMINI_MODEL
+DEFAULT_TIER_MODELS = {NameComplexity.SIMPLE: "gemini-2.5-flash-lite"}
+
+# Tier model that sends names to the rule-based parser instead of an API
+LOCAL_TIER_MODEL = "local"
+
+
+def estimate_model_cost(
+    model_name: str, input_tokens: int, output_tokens: int
+) -> float:
+    """Estimated USD cost of a token count on a model"""
+    input_price, output_price = MODEL_PRICES_PER_MILLION.get(
+        model_name, MODEL_PRICES_PER_MILLION["gemini-2.5-flash"]
+    )
+    return (input_tokens * input_price + output_tokens * output_price) / 1_000_000
+
+
+@dataclass(frozen=True)
+class TierConfig:
+    """Model cascade settings for one complexity tier"""
+
+    model: str
+    # None keeps the service's batching (adaptive controller or BATCH_SIZE)
+    batch_size: Optional[int] = None
+    # Static output-token budget per name; None keeps the service's formula
+    tokens_per_name: Optional[int] = None
+
+    @classmethod
+    def parse(cls, spec: str) -> "TierConfig":
+        """Parse "model[:batch_size[:tokens_per_name]]" ("" = unset)"""
+        model, *settings = [part.strip() for part in spec.split(":")]
+        batch_size, tokens_per_name = (settings + ["", ""])[:2]
+        return cls(
+            model=model,
+            batch_size=int(batch_size) if batch_size else None,
+            tokens_per_name=int(tokens_per_name) if tokens_per_name else None,
+        )
+
+    def __str__(self) -> str:
+        return ":".join(
+            str(part) if part is not None else ""
+            for part in (self.model, self.batch_size, self.tokens_per_name)
+        ).rstrip(":")
+
+
+def load_tier_configs(default_model: str) -> Dict[NameComplexity, TierConfig]:
+    """Per-tier cascade settings from GEMINI_TIER_<TIER> environment variables"""
+    return {
+        tier: TierConfig.parse(
+            os.getenv(
+                f"GEMINI_TIER_{tier.name}",
+                DEFAULT_TIER_MODELS.get(tier, default_model),
+            )
+        )
+        for tier in NameComplexity
+    }
+
+
+def combine_tier_stats(parts: List[Dict[str, dict]]) -> Dict[str, dict]:
+    """Merge per-tier stats of several BatchResults (e.g. streamed chunks)"""
+    combined: Dict[str, dict] = {}
+    for part in parts:
+        for tier, stats in part.items():
+            total = combined.setdefault(
+                tier,
+                {
+                    "model": stats["model"],
+                    "names": 0,
+                    "seconds": 0.0,
+                    "input_tokens": 0,
+                    "output_tokens": 0,
+                    "cost_estimate": 0.0,
+                    "confidence_sum": 0.0,
+                    "fallback": 0,
+                },
+            )
+            for key in ("names", "seconds", "input_tokens", "output_tokens"):
+                total[key] += stats[key]
+            total["cost_estimate"] += stats["cost_estimate"]
+            total["confidence_sum"] += stats["avg_confidence"] * stats["names"]
+            total["fallback"] += stats["fallback"]
+    for total in combined.values():
+        confidence_sum = total.pop("confidence_sum")
+        total["names_per_second"] = (
+            total["names"] / total["seconds"] if total["seconds"] else 0.0
+        )
+        total["avg_confidence"] = (
+            confidence_sum / total["names"] if total["names"] else 0.0
+        )
+    return combined
+
+
 @dataclass
 class ParsedName:
     """
@@ -107,11 +327,28 @@ class BatchResult:
     processing_time: float = 0.0
     cost_estimate: float = 0.0
     api_call_count: int = 0
+    unique_names: int = 0
+    local_routed: int = 0
+    # Model cascade: per complexity tier model, names, seconds, names/s,
+    # tokens, cost, average confidence and fallback count (empty when off)
+    tier_stats: Dict[str, dict] = field(default_factory=dict)
+
+    @property
+    def duplicates_collapsed(self) -> int:
+        """Rows answered by another row's parse (in-file duplicates)"""
+        return max(self.total_processed - self.unique_names, 0)
+
+    @property
+    def dedup_ratio(self) -> float:
+        """Share of rows that did not need their own parse slot"""
+        if self.total_processed == 0:
+            return 0.0
+        return self.duplicates_collapsed / self.total_processed
 
     @property
     def successful_parses(self) -> int:
-        """Compatibility property"""
-        return self.gemini_used
+        """Compatibility property (Gemini parses plus locally routed names)"""
+        return self.gemini_used + self.local_routed
 
     @property
     def total_tokens_used(self) -> int:
@@ -119,17 +356,185 @@ class BatchResult:
         return self.total_tokens
 
 
+@dataclass
+class RetryBudget:
+    """
+    Per-job cap on extra work: names the low-confidence retry pass may
+    resend, or requests split-and-retry may issue
+    """
+
+    limit: int
+    used: int = 0
+
+    @property
+    def remaining(self) -> int:
+        return max(self.limit - self.used, 0)
+
+    def take(self, requested: int) -> int:
+        """Reserve up to requested names; returns how many were granted"""
+        granted = min(requested, self.remaining)
+        self.used += granted
+        return granted
+
+
+@dataclass
+class ApiExchange:
+    """One generateContent request: status, decoded body or error text"""
+
+    status: int
+    body: Optional[dict] = None
+    text: str = ""
+    # Seconds from the quota grant to the whole response
+    latency: float = 0.0
+
+
+def collapse_duplicate_names(names: List[str]) -> Tuple[List[str], List[int]]:
+    """
+    Map every row to one slot per unique normalized name.
+
+    Returns:
+        (unique_names, slot_for_row) where unique_names keeps the first
+        occurrence's original text and slot_for_row[i] indexes into it.
+    """
+    slot_by_key = {}
+    unique_names = []
+    slot_for_row = []
+
+    for name in names:
+        key = normalize_name_key(name)
+        slot = slot_by_key.get(key)
+        if slot is None:
+            slot = len(unique_names)
+            slot_by_key[key] = slot
+            unique_names.append(name)
+        slot_for_row.append(slot)
+
+    return unique_names, slot_for_row
+
+
+def fan_out_results(
+    unique_results: List[ParsedName], slot_for_row: List[int]
+) -> List[ParsedName]:
+    """Expand per-unique results back to rows, one independent object per row"""
+    results = []
+    used_slots = set()
+    for slot in slot_for_row:
+        result = unique_results[slot]
+        if slot in used_slots:
+            result = replace(result, warnings=list(result.warnings))
+        else:
+            used_slots.add(slot)
+        results.append(result)
+    return results
+
+
+class IncrementalRecordDecoder:
+    """
+    Decodes the elements of a JSON array as its text arrives in pieces.
+
+    feed() returns every element completed by the new text; an element that
+    does not decode yet is retried on the next feed (a damaged one never
+    will, so nothing after it is returned). Text before the opening '['
+    (a markdown fence, a preamble) is skipped.
+    """
+
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = -1  # Next element starts here; -1 until '[' is seen
+        self.finished = False  # Closing ']' reached
+
+    def feed(self, text: str) -> list:
+        self._buffer += text
+        if self._pos < 0:
+            start = self._buffer.find("[")
+            if start < 0:
+                return []
+            self._pos = start + 1
+
+        records = []
+        buffer = self._buffer
+        while not self.finished:
+            pos = self._pos
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            self._pos = pos
+            if pos >= len(buffer):
+                break
+            if buffer[pos] == "]":
+                self.finished = True
+                break
+            try:
+                record, self._pos = self._decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                break
+            records.append(record)
+        return records
+
+
+def decode_complete_records(text: str) -> list:
+    """
+    Every complete element of a possibly truncated JSON array.
+
+    Decoding stops at the first element that does not parse, so a response
+    cut off mid-record (MAX_TOKENS) or damaged partway keeps all the records
+    before the break.
+    """
+    return IncrementalRecordDecoder().feed(text)
+
+
 # =============================================================================
 # OPTIMIZED PROMPT TEMPLATES - ML/AI ENGINEERED
 # =============================================================================
 
 
+def _with_output_format(prompt: str, output_format: str) -> str:
+    """Swap the body of a prompt's "## OUTPUT FORMAT" section"""
+    head, _, rest = prompt.partition("## OUTPUT FORMAT\n")
+    _, _, tail = rest.partition("\n\nCRITICAL REMINDERS:")
+    return f"{head}## OUTPUT FORMAT\n{output_format}\n\nCRITICAL REMINDERS:{tail}"
+
+
+def _without_batch_fields(prompt: str) -> str:
+    """A batch prompt template as static instructions (no {names}/{count})"""
+    return (
+        prompt.replace(
+            "Parse {count} ownership records", "Parse the numbered ownership records"
+        )
+        .replace("## Input\n{names}\n\n", "")
+        .replace(
+            "Return EXACTLY {count} JSON objects",
+            "Return EXACTLY one JSON object per input record",
+        )
+        .replace("{{", "{")
+        .replace("}}", "}")
+    )
+
+
+def _without_gender(prompt: str) -> str:
+    """A prompt template whose records leave out gender and gender_confidence"""
+    return (
+        re.sub(r'"gender":"[^"]*","gender_confidence":[^,]*,', "", prompt)
+        .replace(
+            "entity_type, gender, and confidence scores",
+            "entity_type, and a parsing confidence score",
+        )
+        .replace(
+            "### Step 5: Gender Detection\n",
+            "### Step 5: Gender Detection (for Step 3 only; gender is not returned)\n",
+        )
+    )
+
+
 class OptimizedPromptTemplates:
     """
     Expert-engineered prompt using advanced prompting techniques
     Target: 98%+ accuracy for name parsing and entity classification
     """
 
+    # format_batch_prompt never sends more names than this in one request
+    MAX_NAMES_PER_PROMPT = 50
+
     PROPERTY_OWNERSHIP_PROMPT = """You are an expert legal name parser specializing in property ownership records.
 
 ## TASK
@@ -359,14 +764,173 @@ CRITICAL: Return ONLY the JSON array. No explanations, no reasoning, no extra te
 Return EXACTLY {count} JSON objects in a valid JSON array.
 Start your response with '[' and end with ']'."""
 
+    # Structured output: responseSchema fixes the record shape, and records
+    # use short keys plus the input number so they map back to their name
+    # even if the model reorders or skips rows
+    COMPACT_FIELDS = {
+        "f": "first_name",
+        "l": "last_name",
+        "t": "entity_type",
+        "g": "gender",
+        "gc": "gender_confidence",
+        "pc": "parsing_confidence",
+    }
+    RESPONSE_SCHEMA = {
+        "type": "ARRAY",
+        "items": {
+            "type": "OBJECT",
+            "properties": {
+                "i": {"type": "INTEGER"},
+                "f": {"type": "STRING"},
+                "l": {"type": "STRING"},
+                "t": {"type": "STRING", "enum": ["person", "company", "trust"]},
+                "g": {"type": "STRING", "enum": ["male", "female", "unknown"]},
+                "gc": {"type": "NUMBER"},
+                "pc": {"type": "NUMBER"},
+            },
+            "required": ["i", "f", "l", "t", "g", "gc", "pc"],
+            "propertyOrdering": ["i", "f", "l", "t", "g", "gc", "pc"],
+        },
+    }
+    COMPACT_OUTPUT_FORMAT = """Return JSON array with one record per input, using short keys:
+[{{"i":1,"f":"string","l":"string","t":"person|company|trust","g":"male|female|unknown","gc":0.0-1.0,"pc":0.0-1.0}}]
+- i = the record's number in the input list
+- f = first_name, l = last_name, t = entity_type, g = gender,
+  gc = gender_confidence, pc = parsing_confidence (the examples above use
+  the long names)"""
+    COMPACT_PROPERTY_OWNERSHIP_PROMPT = _with_output_format(
+        PROPERTY_OWNERSHIP_PROMPT, COMPACT_OUTPUT_FORMAT
+    )
+
+    # Local gender (GEMINI_LOCAL_GENDER): records without gender fields; the
+    # service fills them from the first-name gender index after parsing
+    NO_GENDER_RESPONSE_SCHEMA = {
+        "type": "ARRAY",
+        "items": {
+            "type": "OBJECT",
+            "properties": {
+                key: value
+                for key, value in RESPONSE_SCHEMA["items"]["properties"].items()
+                if key not in ("g", "gc")
+            },
+            "required": ["i", "f", "l", "t", "pc"],
+            "propertyOrdering": ["i", "f", "l", "t", "pc"],
+        },
+    }
+    COMPACT_NO_GENDER_OUTPUT_FORMAT = """Return JSON array with one record per input, using short keys:
+[{{"i":1,"f":"string","l":"string","t":"person|company|trust","pc":0.0-1.0}}]
+- i = the record's number in the input list
+- f = first_name, l = last_name, t = entity_type, pc = parsing_confidence
+  (the examples above use the long names)"""
+    NO_GENDER_PROPERTY_OWNERSHIP_PROMPT = _without_gender(PROPERTY_OWNERSHIP_PROMPT)
+    COMPACT_NO_GENDER_PROPERTY_OWNERSHIP_PROMPT = _with_output_format(
+        NO_GENDER_PROPERTY_OWNERSHIP_PROMPT, COMPACT_NO_GENDER_OUTPUT_FORMAT
+    )
+
+    # The same instructions without the per-batch parts, for systemInstruction
+    # and cached-content modes (requests then carry only format_batch_input)
+    SYSTEM_INSTRUCTION = _without_batch_fields(PROPERTY_OWNERSHIP_PROMPT)
+    COMPACT_SYSTEM_INSTRUCTION = _without_batch_fields(
+        COMPACT_PROPERTY_OWNERSHIP_PROMPT
+    )
+    NO_GENDER_SYSTEM_INSTRUCTION = _without_batch_fields(
+        NO_GENDER_PROPERTY_OWNERSHIP_PROMPT
+    )
+    COMPACT_NO_GENDER_SYSTEM_INSTRUCTION = _without_batch_fields(
+        COMPACT_NO_GENDER_PROPERTY_OWNERSHIP_PROMPT
+    )
+
+    @staticmethod
+    def batch_template(compact: bool = False, gender: bool = True) -> str:
+        """The batch prompt template for an output format"""
+        if gender:
+            return (
+                OptimizedPromptTemplates.COMPACT_PROPERTY_OWNERSHIP_PROMPT
+                if compact
+                else OptimizedPromptTemplates.PROPERTY_OWNERSHIP_PROMPT
+            )
+        return (
+            OptimizedPromptTemplates.COMPACT_NO_GENDER_PROPERTY_OWNERSHIP_PROMPT
+            if compact
+            else OptimizedPromptTemplates.NO_GENDER_PROPERTY_OWNERSHIP_PROMPT
+        )
+
     @staticmethod
-    def format_batch_prompt(names: List[str]) -> str:
+    def system_instruction(compact: bool = False, gender: bool = True) -> str:
+        """batch_template without the per-batch parts"""
+        if gender:
+            return (
+                OptimizedPromptTemplates.COMPACT_SYSTEM_INSTRUCTION
+                if compact
+                else OptimizedPromptTemplates.SYSTEM_INSTRUCTION
+            )
+        return (
+            OptimizedPromptTemplates.COMPACT_NO_GENDER_SYSTEM_INSTRUCTION
+            if compact
+            else OptimizedPromptTemplates.NO_GENDER_SYSTEM_INSTRUCTION
+        )
+
+    @staticmethod
+    def _numbered_names(names: List[str]) -> str:
+        return "\n".join(
+            f"{i + 1}. {name}"
+            for i, name in enumerate(
+                names[: OptimizedPromptTemplates.MAX_NAMES_PER_PROMPT]
+            )
+        )
+
+    @staticmethod
+    def format_batch_input(names: List[str]) -> str:
+        """Per-batch request text when the instructions are sent separately"""
+        return (
+            f"Parse these {len(names)} ownership records.\n\n"
+            f"## Input\n{OptimizedPromptTemplates._numbered_names(names)}\n\n"
+            f"Return EXACTLY {len(names)} JSON objects in a valid JSON array."
+        )
+
+    @staticmethod
+    def format_batch_prompt(
+        names: List[str], compact: bool = False, gender: bool = True
+    ) -> str:
         """Format names with clear numbering and count"""
+        template = OptimizedPromptTemplates.batch_template(compact, gender)
         # Number names for clear correlation
-        formatted = "\n".join(f"{i + 1}. {name}" for i, name in enumerate(names[:50]))
-        return OptimizedPromptTemplates.PROPERTY_OWNERSHIP_PROMPT.format(
-            names=formatted, count=len(names)
+        return template.format(
+            names=OptimizedPromptTemplates._numbered_names(names), count=len(names)
+        )
+
+    @staticmethod
+    def format_retry_prompt(
+        names: List[str],
+        include_instructions: bool = True,
+        compact: bool = False,
+        gender: bool = True,
+    ) -> str:
+        """Format a multi-name retry prompt for low-confidence parses"""
+        batch = (
+            OptimizedPromptTemplates.format_batch_prompt(
+                names, compact=compact, gender=gender
+            )
+            if include_instructions
+            else OptimizedPromptTemplates.format_batch_input(names)
         )
+        return f"""
+CRITICAL PARSING - RETRY REQUIRED
+
+These {len(names)} records had LOW CONFIDENCE on the first pass.
+Re-parse each one with EXTRA CARE.
+
+{batch}
+
+DOUBLE-CHECK REQUIREMENTS:
+✓ Entity type: Is this person/company/trust?
+✓ Name extraction: Did I extract ALL names?
+✓ Name assignment: Did I use the scoring table correctly?
+✓ Trust names: If trust, do I have at least one name?
+✓ Company markers: Did I check word boundaries?
+
+Return ONLY the JSON array with your improved parses, one per record, in input order.
+"""
 
 
 # =============================================================================
@@ -380,8 +944,21 @@ class ConsolidatedGeminiService:
     No duplicate code, no bullshit, just performance.
     """
 
-    def __init__(self, api_key: Optional[str] = None):
-        """Initialize with API key from env or parameter"""
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        model_name: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        tokens_per_name: Optional[int] = None,
+        cascade: Optional[bool] = None,
+    ):
+        """
+        Initialize with API key from env or parameter.
+
+        model_name, batch_size and tokens_per_name override GEMINI_MODEL,
+        BATCH_SIZE and the static output-token formula; pinning either batch
+        setting turns adaptive batching off. Cascade tiers are built this way.
+        """
         # Load from .env file first, then fallback to parameter
         self.api_key = os.getenv("GEMINI_API_KEY") or api_key
 
@@ -393,14 +970,29 @@ class ConsolidatedGeminiService:
             )
 
         # Load configuration from environment with defaults
-        self.model_name = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
+        self.model_name = model_name or os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
         # Optimized batch size for better accuracy and performance
         # gemini-2.5-flash handles larger batches better than lite: 30 is optimal
-        self.max_batch_size = int(os.getenv("BATCH_SIZE", "30"))
+        self.max_batch_size = batch_size or int(os.getenv("BATCH_SIZE", "30"))
+        # Static output-token budget per name (thinking + output)
+        self.tokens_per_name = tokens_per_name or 800
         self.max_concurrent_requests = int(os.getenv("GEMINI_MAX_CONCURRENT", "20"))
         self.max_retries = 2
         self.timeout = int(os.getenv("GEMINI_TIMEOUT_SECONDS", "10"))
-        self.base_url = "https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent"
+        self.api_base = os.getenv(
+            "GEMINI_API_BASE_URL", "https://generativelanguage.googleapis.com/v1beta"
+        ).rstrip("/")
+        self.base_url = self.api_base + "/models/{model}:generateContent"
+
+        # Streaming transport (streamGenerateContent over SSE): records reach
+        # the result sink as they complete, and a stream that goes quiet is
+        # cut off with the records decoded so far kept
+        self.streaming = os.getenv("GEMINI_STREAMING", "false").lower() == "true"
+        self.stream_url = self.api_base + "/models/{model}:streamGenerateContent"
+        self.stream_timeout = aiohttp.ClientTimeout(
+            total=int(os.getenv("GEMINI_STREAM_TIMEOUT_SECONDS", "60")),
+            sock_read=float(os.getenv("GEMINI_STREAM_STALL_SECONDS", "10")),
+        )
 
         # Connection pool configuration
         self.connector_config = {
@@ -411,6 +1003,78 @@ class ConsolidatedGeminiService:
         }
         self.session = None  # Will be created when needed
         self.semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+        # The semaphore bounds this task; the limiter bounds the whole cluster
+        # (requests/tokens per minute and in-flight requests, via Redis)
+        self.rate_limiter = get_gemini_rate_limiter(self.model_name)
+        # Shared per process: once the endpoint keeps failing, batches skip the
+        # API (and its retries and timeouts) until a probe request succeeds
+        self.circuit_breaker = (
+            get_circuit_breaker(self.model_name)
+            if os.getenv("GEMINI_BREAKER_ENABLED", "true").lower() == "true"
+            else None
+        )
+        # Batch latency percentiles, and hedged requests for slow batches
+        # (GEMINI_HEDGING); shared per model like the breaker
+        self.hedge_policy = get_hedge_policy(self.model_name)
+        # Batches waiting for a consumer; bounds peak memory of the pipeline
+        self.pipeline_queue_depth = int(
+            os.getenv(
+                "GEMINI_PIPELINE_QUEUE_DEPTH", str(self.max_concurrent_requests * 2)
+            )
+        )
+
+        # Online batch-size / output-token controller, shared per model
+        self.adaptive_batching = (
+            os.getenv("GEMINI_ADAPTIVE_BATCHING", "true").lower() == "true"
+            and batch_size is None
+            and tokens_per_name is None
+        )
+        self.batch_controller = (
+            get_batch_controller(
+                self.model_name,
+                self.max_batch_size,
+                OptimizedPromptTemplates.MAX_NAMES_PER_PROMPT,
+            )
+            if self.adaptive_batching
+            else None
+        )
+
+        # Pack batches by estimated token cost instead of a fixed name count.
+        # The controller's batch size is then read as "reference names" of
+        # MODERATE cost, so both mechanisms share one size knob.
+        self.token_packing = os.getenv("GEMINI_TOKEN_PACKING", "true").lower() == "true"
+
+        # Low-confidence retry pass: names below the threshold are re-sent in
+        # multi-name batches after the main pass, up to a per-job budget
+        self.retry_confidence_threshold = 0.70
+        self.retry_batch_size = int(os.getenv("GEMINI_RETRY_BATCH_SIZE", "10"))
+        self.retry_budget_per_job = int(os.getenv("GEMINI_RETRY_BUDGET", "500"))
+
+        # Split-and-retry: a failed batch is bisected and each half re-sent,
+        # down to single names, so one bad input does not send the whole batch
+        # to the fallback parser. Depth 5 reaches single names from 30.
+        self.split_retry = os.getenv("GEMINI_SPLIT_RETRY", "true").lower() == "true"
+        self.split_max_depth = int(os.getenv("GEMINI_SPLIT_MAX_DEPTH", "5"))
+        self.split_budget_per_job = int(os.getenv("GEMINI_SPLIT_BUDGET", "200"))
+
+        # Thinking budget per batch (thinkingConfig) from its complexity mix;
+        # names whose output fails validation are re-sent with a larger
+        # budget, up to GEMINI_THINKING_MAX_ESCALATIONS times
+        self.thinking_control = (
+            os.getenv("GEMINI_THINKING_CONTROL", "false").lower() == "true"
+        )
+        self.thinking_max_escalations = int(
+            os.getenv("GEMINI_THINKING_MAX_ESCALATIONS", "1")
+        )
+
+        # Model cascade: names are grouped by NameComplexity and each tier is
+        # sent to its own model (GEMINI_TIER_<TIER>=model[:batch:tokens],
+        # "local" = rule-based parser). Tiers run concurrently; a tier whose
+        # settings match this service's runs here, others on tier services.
+        if cascade is None:
+            cascade = os.getenv("GEMINI_CASCADE", "false").lower() == "true"
+        self.tier_configs = load_tier_configs(self.model_name) if cascade else {}
+        self._tier_services: Dict[TierConfig, "ConsolidatedGeminiService"] = {}
 
         # API validation
         self.use_fallback = False
@@ -424,24 +1088,112 @@ class ConsolidatedGeminiService:
             "total_processed": 0,
             "gemini_success": 0,
             "fallback_used": 0,
+            "local_routed": 0,
             "api_calls": 0,
             "total_tokens": 0,
             "start_time": time.time(),
             "cache_hits": 0,
-            "concurrent_batches": 0,
+            "batches_enqueued": 0,
             "retry_attempts": 0,
             "retry_success": 0,
             "retry_no_improvement": 0,
             "retry_failed": 0,
+            "retry_batches": 0,
+            "retry_budget_skipped": 0,
+            # Input tokens as reported by usageMetadata, and what inline
+            # prompts would have sent for the same batches (chars)
+            "prompt_tokens": 0,
+            "cached_prompt_tokens": 0,
+            "output_tokens": 0,
+            "thoughts_tokens": 0,
+            "prompt_names": 0,
+            "inline_prompt_chars": 0,
+            # Responses that were not valid JSON, and input records the
+            # model's response left out (both go to the fallback parser)
+            "response_parse_errors": 0,
+            "response_records_missing": 0,
+            # Complete records kept from truncated/damaged responses, follow-up
+            # requests for the names they left out, and output tokens a full
+            # re-send would have spent regenerating the kept records
+            "salvaged_records": 0,
+            "salvage_followups": 0,
+            "salvage_tokens_saved": 0,
+            # Streaming transport: streams, streams cut off after stalling,
+            # and time from request to first decoded record
+            "stream_requests": 0,
+            "stream_stalls": 0,
+            "stream_first_records": 0,
+            "stream_first_record_seconds": 0.0,
+            # Split-and-retry of failed batches: per depth (1 = halves of the
+            # original batch) requests sent, names recovered by Gemini and
+            # names that still went to the fallback parser
+            "split_batches": 0,
+            "split_by_depth": {},
+            "split_budget_skipped": 0,
+            # Names sent to the fallback parser while the breaker was open
+            "breaker_short_circuited": 0,
+            # Thinking control: per escalation level (0 = budget from batch
+            # composition) requests, names, thinking tokens and latency, and
+            # names re-sent / recovered after failing validation
+            "thinking_by_level": {},
+            "thinking_escalations": 0,
+            "thinking_escalated_names": 0,
+            "thinking_escalation_recovered": 0,
         }
+        # A worker process reuses one service for many jobs: self.stats covers
+        # the current job (see begin_job), these counters the whole process
+        self.process_started_at = time.time()
+        self.jobs_started = 0
+        self.sessions_created = 0
+        self.finished_job_totals: Dict[str, float] = {}
+
+        # On MAX_TOKENS keep the complete records and re-request only the rest
+        self.salvage_truncated = (
+            os.getenv("GEMINI_SALVAGE_TRUNCATED", "true").lower() == "true"
+        )
+        self.max_salvage_depth = 2
+
+        # Structured output: responseMimeType/responseSchema with compact
+        # records (short keys + input number) instead of free-form JSON text
+        self.structured_output = (
+            os.getenv("GEMINI_STRUCTURED_OUTPUT", "true").lower() == "true"
+        )
+
+        # Local gender: records leave out gender/gender_confidence and persons
+        # get them from the first-name gender index after parsing. While
+        # Gemini still returns gender, confident labels train the index.
+        self.local_gender = os.getenv("GEMINI_LOCAL_GENDER", "false").lower() == "true"
+        self.gender_learning = (
+            os.getenv("GEMINI_GENDER_LEARN", "true").lower() == "true"
+        )
 
-        # Initialize cache for repeated names (if enabled)
+        # Tiered cache for repeated names (if enabled). Shared across jobs:
+        # L1 is process-wide, L2 is Redis shared by all workers.
         self.cache_enabled = os.getenv("ENABLE_CACHING", "true").lower() == "true"
-        self.cache = {} if self.cache_enabled else None
-        self.max_cache_size = 10000
+        self.cache = get_name_result_cache() if self.cache_enabled else None
+        # With the cascade on, cached results depend on the tier models too
+        self.prompt_version = prompt_version_hash(
+            OptimizedPromptTemplates.batch_template(
+                self.structured_output, gender=not self.local_gender
+            )
+            + "".join(f"|{config}" for config in self.tier_configs.values())
+        )
 
         # Prompt templates
         self.prompts = OptimizedPromptTemplates()
+        self.instructions = self.prompts.system_instruction(
+            self.structured_output, gender=not self.local_gender
+        )
+
+        # Static instructions: inline, systemInstruction or cached content
+        prompt_mode = os.getenv("GEMINI_PROMPT_MODE", "system").lower()
+        self.prompt_context = get_prompt_context(
+            self.model_name,
+            self.instructions,
+            prompt_mode,
+            self.api_base,
+            cache_ttl_seconds=int(os.getenv("GEMINI_PROMPT_CACHE_TTL", "3600")),
+        )
 
         # CRITICAL: Verify prompt template on initialization
         logger.info(
@@ -456,67 +1208,124 @@ class ConsolidatedGeminiService:
         )
 
     async def parse_names_batch(
-        self, names: List[str], progress_callback=None
+        self,
+        names: List[str],
+        progress_callback=None,
+        local_routing_min_confidence: Optional[float] = None,
+        retry_budget: Optional[RetryBudget] = None,
+        split_budget: Optional[RetryBudget] = None,
     ) -> BatchResult:
         """
         Optimized concurrent batch processing for high throughput.
         Uses parallel requests to achieve 50+ names/second.
+
+        When local_routing_min_confidence is set, names the rule-based parser
+        can settle unambiguously at that confidence skip the API.
+
+        Low-confidence Gemini parses are retried in a second phase, limited by
+        retry_budget. Pass one budget for all calls belonging to the same job;
+        a fresh GEMINI_RETRY_BUDGET-sized budget is used otherwise.
+        split_budget caps the requests spent bisecting failed batches the
+        same way (GEMINI_SPLIT_BUDGET).
         """
         if not names:
             return BatchResult(results=[])
 
         start_time = time.time()
 
+        # Collapse in-file duplicates: only unique normalized names get parsed
+        row_names = names
+        names, slot_for_row = collapse_duplicate_names(row_names)
+
         # Check cache first
         cached_results = []
         uncached_names = []
         uncached_indices = []
 
+        cache_hits = (
+            await self.cache.get_many(names, self.model_name, self.prompt_version)
+            if self.cache is not None
+            else {}
+        )
+
         for i, name in enumerate(names):
-            cache_key = self._get_cache_key(name)
-            if self.cache and cache_key in self.cache:
-                cached_results.append((i, self.cache[cache_key]))
+            if i in cache_hits:
+                cached_results.append((i, self._result_from_cache(cache_hits[i])))
                 self.stats["cache_hits"] += 1
             else:
                 uncached_names.append(name)
                 uncached_indices.append(i)
 
-        # Process uncached names concurrently
+        # Route structurally unambiguous names to the rule-based parser
+        local_results = []
+        if local_routing_min_confidence is not None and uncached_names:
+            uncached_names, uncached_indices, local_results = self._route_locally(
+                uncached_names, uncached_indices, local_routing_min_confidence
+            )
+
+        all_results = [None] * len(names)
+        for idx, result in cached_results + local_results:
+            all_results[idx] = result
+
+        # Process remaining names concurrently
+        tier_stats = {}
         if uncached_names:
-            if not self.use_fallback:
-                # Create concurrent tasks for all batches
-                batch_tasks = []
-                for i in range(0, len(uncached_names), self.max_batch_size):
-                    batch = uncached_names[i : i + self.max_batch_size]
-                    batch_indices = uncached_indices[i : i + self.max_batch_size]
-
-                    if progress_callback:
-                        progress_callback(i, len(uncached_names))
-
-                    # Create task with semaphore for rate limiting
-                    task = self._process_batch_with_semaphore(batch, batch_indices)
-                    batch_tasks.append(task)
-
-                # Execute all batches concurrently
-                self.stats["concurrent_batches"] = len(batch_tasks)
-                batch_results = await asyncio.gather(
-                    *batch_tasks, return_exceptions=True
+            if self.use_fallback or self._breaker_open():
+                # No API, or the breaker is refusing requests: the whole call
+                # goes to the rule-based parser, sharded over a process pool
+                pooled = await self._pool_fallback(
+                    uncached_names,
+                    "circuit_open" if not self.use_fallback else None,
                 )
-
-                # Aggregate results
-                all_results = self._aggregate_concurrent_results(
-                    batch_results, cached_results, len(names)
+                for idx, result in zip(uncached_indices, pooled):
+                    all_results[idx] = result
+            elif self.tier_configs:
+                tier_stats = await self._run_cascade(
+                    all_results,
+                    names,
+                    uncached_names,
+                    uncached_indices,
+                    progress_callback,
+                    retry_budget or RetryBudget(limit=self.retry_budget_per_job),
+                    split_budget or RetryBudget(limit=self.split_budget_per_job),
                 )
             else:
-                # Fallback to sequential processing if no API
-                all_results = []
-                for name in names:
-                    all_results.append(self._fallback_parse(name))
-        else:
-            # All results were cached
-            all_results = [None] * len(names)
-            for idx, result in cached_results:
-                all_results[idx] = result
+                if self.batch_controller is not None:
+                    await self.batch_controller.ensure_loaded()
+
+                def sink(batch_result: dict):
+                    for idx, result in zip(
+                        batch_result["indices"], batch_result["results"]
+                    ):
+                        all_results[idx] = result
+
+                # Bounded producer/consumer pipeline over lazily built batches
+                await self._run_batch_pipeline(
+                    self._iter_batches(uncached_names, uncached_indices),
+                    sink,
+                    total_names=len(uncached_names),
+                    progress_callback=progress_callback,
+                    split_budget=split_budget
+                    or RetryBudget(limit=self.split_budget_per_job),
+                )
+
+                # Second phase: re-batched retries for low-confidence parses
+                await self._retry_low_confidence_pass(
+                    all_results,
+                    names,
+                    uncached_indices,
+                    retry_budget or RetryBudget(limit=self.retry_budget_per_job),
+                )
+
+                if self.batch_controller is not None:
+                    await self.batch_controller.persist()
+        self._fill_missing_results(all_results)
+        await self._apply_gender_index(all_results, uncached_indices)
+
+        # Fan unique results back out to every row
+        unique_count = len(names)
+        names = row_names
+        all_results = fan_out_results(all_results, slot_for_row)
 
         # Calculate stats
         processing_time = time.time() - start_time
@@ -524,26 +1333,32 @@ class ConsolidatedGeminiService:
         fallback_used = sum(
             1 for r in all_results if r and r.parsing_method == "fallback"
         )
+        local_routed = sum(1 for r in all_results if r and r.parsing_method == "local")
         total_tokens = self.stats.get("batch_tokens", 0)
 
         # Update stats
         self.stats["total_processed"] += len(names)
         self.stats["gemini_success"] += gemini_used
         self.stats["fallback_used"] += fallback_used
+        self.stats["local_routed"] += local_routed
         self.stats["total_tokens"] += total_tokens
 
         # Calculate actual throughput
         throughput = len(names) / processing_time if processing_time > 0 else 0
-        cache_hit_rate = (len(cached_results) / len(names) * 100) if names else 0
+        cache_hit_rate = (len(cached_results) / unique_count * 100) if names else 0
+        self.stats["unique_names"] = self.stats.get("unique_names", 0) + unique_count
 
         logger.info(
             "batch_processing_complete",
             total=len(names),
             gemini=gemini_used,
             fallback=fallback_used,
+            local_routed=local_routed,
             cache_hits=len(cached_results),
             cache_hit_rate=f"{cache_hit_rate:.1f}%",
-            concurrent_batches=self.stats.get("concurrent_batches", 0),
+            unique_names=unique_count,
+            duplicates_collapsed=len(names) - unique_count,
+            batches_enqueued=self.stats.get("batches_enqueued", 0),
             time=f"{processing_time:.2f}s",
             speed=f"{throughput:.1f} names/sec",
         )
@@ -555,289 +1370,1338 @@ class ConsolidatedGeminiService:
             fallback_used=fallback_used,
             total_tokens=total_tokens,
             processing_time=processing_time,
-            cost_estimate=total_tokens * 0.0000001,  # Gemini 2.5 Flash Lite pricing
+            cost_estimate=(
+                sum(stats["cost_estimate"] for stats in tier_stats.values())
+                if tier_stats
+                else total_tokens * 0.0000001  # Gemini 2.5 Flash Lite pricing
+            ),
             api_call_count=self.stats["api_calls"],
+            unique_names=unique_count,
+            local_routed=local_routed,
+            tier_stats=tier_stats,
         )
 
-    def _get_cache_key(self, name: str) -> str:
-        """Generate cache key for a name"""
-        import hashlib
-
-        normalized = name.lower().strip()
-        return hashlib.md5(normalized.encode()).hexdigest()
-
-    async def _process_batch_with_semaphore(
-        self, batch: List[str], indices: List[int]
-    ) -> dict:
-        """Process a batch with semaphore for rate limiting"""
-        async with self.semaphore:
-            try:
-                results = await self._process_with_gemini(batch)
-                if results:
-                    # Cache successful results (only if caching is enabled)
-                    if self.cache is not None:
-                        for name, result in zip(batch, results):
-                            cache_key = self._get_cache_key(name)
-                            if len(self.cache) < self.max_cache_size:
-                                self.cache[cache_key] = result
-                    return {"indices": indices, "results": results, "success": True}
-                else:
-                    # Fallback for this batch
-                    fallback_results = [self._fallback_parse(name) for name in batch]
-                    return {
-                        "indices": indices,
-                        "results": fallback_results,
-                        "success": False,
-                    }
-            except Exception as e:
-                logger.error("batch_processing_error", error=str(e))
-                # Return fallback results on error
-                fallback_results = [self._fallback_parse(name) for name in batch]
-                return {
-                    "indices": indices,
-                    "results": fallback_results,
-                    "success": False,
-                }
+    async def _run_cascade(
+        self,
+        all_results: List[Optional[ParsedName]],
+        names: List[str],
+        uncached_names: List[str],
+        uncached_indices: List[int],
+        progress_callback,
+        retry_budget: RetryBudget,
+        split_budget: RetryBudget,
+    ) -> Dict[str, dict]:
+        """
+        Model cascade: parse each complexity tier with its own model.
 
-    def _aggregate_concurrent_results(
-        self, batch_results: List, cached_results: List, total_count: int
-    ) -> List[ParsedName]:
-        """Aggregate results from concurrent batches and cache"""
-        all_results = [None] * total_count
+        Tiers sharing a model and settings run one after another on the same
+        service (each pipeline already fills its concurrency), so per-tier
+        token counts are exact; different services run concurrently. The
+        retry and split budgets are shared by all tiers.
 
-        # Add cached results first
-        for idx, result in cached_results:
-            all_results[idx] = result
+        Returns per-tier stats keyed by tier value.
+        """
+        groups: Dict[NameComplexity, Tuple[List[str], List[int]]] = {}
+        for name, idx in zip(uncached_names, uncached_indices):
+            tier_names, tier_indices = groups.setdefault(
+                classify_name_complexity(name), ([], [])
+            )
+            tier_names.append(name)
+            tier_indices.append(idx)
 
-        # Add batch results
-        for batch_result in batch_results:
-            if isinstance(batch_result, dict) and "indices" in batch_result:
-                indices = batch_result["indices"]
-                results = batch_result["results"]
-                for idx, result in zip(indices, results):
-                    all_results[idx] = result
-            elif isinstance(batch_result, Exception):
-                logger.error("batch_exception", error=str(batch_result))
+        lanes: Dict[TierConfig, List[NameComplexity]] = {}
+        for tier in groups:
+            lanes.setdefault(self.tier_configs[tier], []).append(tier)
 
-        # Fill any missing with fallback
-        for i, result in enumerate(all_results):
-            if result is None:
-                # This shouldn't happen, but handle gracefully
-                all_results[i] = ParsedName(
-                    first_name="",
-                    last_name="",
-                    entity_type="unknown",
-                    gender="unknown",
-                    gender_confidence=0.0,
-                    parsing_confidence=0.0,
-                    parsing_method="error",
-                    original_input="",
-                )
+        processed: Dict[NameComplexity, int] = {}
+        tier_stats: Dict[str, dict] = {}
 
-        return all_results
+        def sink(batch_result: dict):
+            for idx, result in zip(batch_result["indices"], batch_result["results"]):
+                all_results[idx] = result
 
-    async def _get_or_create_session(self):
-        """Get or create an optimized aiohttp session"""
-        if self.session is None or self.session.closed:
-            connector = aiohttp.TCPConnector(**self.connector_config)
-            timeout = aiohttp.ClientTimeout(total=self.timeout)
-            self.session = aiohttp.ClientSession(connector=connector, timeout=timeout)
-        return self.session
+        def tier_progress(tier: NameComplexity):
+            def report(done: int, _total: int):
+                processed[tier] = done
+                if progress_callback:
+                    progress_callback(sum(processed.values()), len(uncached_names))
 
-    async def _process_with_gemini(
-        self, names: List[str]
-    ) -> Optional[List[ParsedName]]:
-        """Process batch with Gemini API - SDK or direct call"""
+            return report
 
-        prompt = self.prompts.format_batch_prompt(names)
+        async def run_lane(config: TierConfig, tiers: List[NameComplexity]):
+            lane = (
+                self._tier_service(config)
+                if config.model != LOCAL_TIER_MODEL
+                else None
+            )
+            for tier in tiers:
+                tier_names, tier_indices = groups[tier]
+                started = time.time()
+                if lane is None:
+                    for name, idx in zip(tier_names, tier_indices):
+                        all_results[idx] = self._local_result(name)
+                    tier_progress(tier)(len(tier_names), len(tier_names))
+                    input_tokens = output_tokens = 0
+                else:
+                    input_before = lane.stats["prompt_tokens"]
+                    output_before = lane.stats["output_tokens"]
+                    if lane.batch_controller is not None:
+                        await lane.batch_controller.ensure_loaded()
+                    await lane._run_batch_pipeline(
+                        lane._iter_batches(tier_names, tier_indices),
+                        sink,
+                        total_names=len(tier_names),
+                        progress_callback=tier_progress(tier),
+                        split_budget=split_budget,
+                    )
+                    await lane._retry_low_confidence_pass(
+                        all_results, names, tier_indices, retry_budget
+                    )
+                    if lane is not self:
+                        # Tier services have no cache; store under this
+                        # service's key, which covers the tier settings
+                        await self._cache_results(
+                            tier_names, [all_results[i] for i in tier_indices]
+                        )
+                    input_tokens = lane.stats["prompt_tokens"] - input_before
+                    output_tokens = lane.stats["output_tokens"] - output_before
+
+                elapsed = time.time() - started
+                results = [all_results[i] for i in tier_indices if all_results[i]]
+                tier_stats[tier.value] = {
+                    "model": config.model,
+                    "names": len(tier_names),
+                    "seconds": elapsed,
+                    "names_per_second": len(tier_names) / elapsed if elapsed else 0.0,
+                    "input_tokens": input_tokens,
+                    "output_tokens": output_tokens,
+                    "cost_estimate": estimate_model_cost(
+                        config.model, input_tokens, output_tokens
+                    ),
+                    "avg_confidence": (
+                        sum(r.parsing_confidence for r in results) / len(results)
+                        if results
+                        else 0.0
+                    ),
+                    "fallback": sum(
+                        1 for r in results if r.parsing_method == "fallback"
+                    ),
+                }
+            if lane is not None and lane.batch_controller is not None:
+                await lane.batch_controller.persist()
 
-        # CRITICAL LOGGING: Verify correct prompt is being sent
-        prompt_length = len(prompt)
-        estimated_tokens = len(prompt.split())  # Better token estimation
+        await asyncio.gather(
+            *(run_lane(config, tiers) for config, tiers in lanes.items())
+        )
 
-        # Log first 1000 chars of prompt to verify it's correct
         logger.info(
-            "gemini_api_call_prepared",
-            names_count=len(names),
-            prompt_length=prompt_length,
-            estimated_tokens=estimated_tokens,
-            model=self.model_name,
-            has_hierarchical_prompt="HIERARCHICAL PARSING APPROACH" in prompt,
-            has_entity_classification="ENTITY TYPE CLASSIFICATION" in prompt,
-            prompt_preview=prompt[:1000] if len(prompt) > 1000 else prompt,
-            input_names=names[:3] if len(names) > 3 else names,
+            "cascade_complete",
+            tiers={
+                tier: {
+                    "model": stats["model"],
+                    "names": stats["names"],
+                    "cost": round(stats["cost_estimate"], 6),
+                }
+                for tier, stats in tier_stats.items()
+            },
         )
+        return tier_stats
+
+    def _tier_service(self, config: TierConfig) -> "ConsolidatedGeminiService":
+        """Service for a cascade tier: this one, or a lazily built tier service"""
+        if config == TierConfig(model=self.model_name):
+            return self
+        service = self._tier_services.get(config)
+        if service is None:
+            service = ConsolidatedGeminiService(
+                self.api_key,
+                model_name=config.model,
+                batch_size=config.batch_size,
+                tokens_per_name=config.tokens_per_name,
+                cascade=False,
+            )
+            # Results are cached by the cascading service (see _run_cascade)
+            service.cache = None
+            self._tier_services[config] = service
+        return service
+
+    def _local_result(self, name: str) -> ParsedName:
+        """Rule-based parse for a cascade tier routed to the local parser"""
+        result = self._fallback_parse(name)
+        if result.fallback_reason != "Empty input":
+            result.parsing_method = "local"
+            result.fallback_reason = ""
+        return result
 
-        # Use aiohttp for all API calls (consolidated approach)
-        return await self._direct_api_call_async(prompt, names)
+    def _route_locally(
+        self, names: List[str], indices: List[int], min_confidence: float
+    ) -> Tuple[List[str], List[int], List[Tuple[int, ParsedName]]]:
+        """
+        Split off names the rule-based parser can settle without the API.
 
-    async def _direct_api_call_async(
-        self, prompt: str, names: List[str]
-    ) -> Optional[List[ParsedName]]:
-        """Direct API call using aiohttp (preferred)"""
+        Returns:
+            (remaining_names, remaining_indices, [(index, result), ...])
+        """
+        fallback_parser = get_fallback_parser()
+        remaining_names = []
+        remaining_indices = []
+        routed = []
+
+        for name, idx in zip(names, indices):
+            parsed = fallback_parser.route_unambiguous(name, min_confidence)
+            if parsed is None:
+                remaining_names.append(name)
+                remaining_indices.append(idx)
+                continue
+
+            routed.append(
+                (
+                    idx,
+                    ParsedName(
+                        first_name=parsed.get("first_name") or "",
+                        last_name=parsed.get("last_name") or "",
+                        entity_type=parsed["entity_type"],
+                        parsing_confidence=parsed["parsing_confidence"],
+                        parsing_method="local",
+                        warnings=[],
+                    ),
+                )
+            )
 
-        if not self.api_key:
-            return None
+        return remaining_names, remaining_indices, routed
 
-        url = self.base_url.format(model=self.model_name)
-        url += f"?key={self.api_key}"
+    async def _apply_gender_index(
+        self, all_results: List[ParsedName], parsed_indices: List[int]
+    ) -> None:
+        """
+        Fill person gender from the first-name gender index (local gender),
+        or teach the index the genders Gemini just returned
+        """
+        index = get_gender_index()
+        await index.ensure_loaded()
+        if self.local_gender:
+            for result in all_results:
+                if (
+                    result.entity_type == "person"
+                    and result.gender == "unknown"
+                    and result.first_name
+                ):
+                    result.gender, result.gender_confidence = index.infer(
+                        result.first_name
+                    )
+        elif self.gender_learning:
+            for idx in parsed_indices:
+                result = all_results[idx]
+                if result.parsing_method == "gemini" and result.entity_type == "person":
+                    index.observe(
+                        result.first_name, result.gender, result.gender_confidence
+                    )
+            await index.persist()
 
-        # gemini-2.5-flash uses substantial thinking tokens (~250-300 per name with complex prompts)
-        # These count against maxOutputTokens, so we need large budgets
-        # Formula: 6000 base + 800 per name (ensures ~4000-5000 thinking + 7000+ output)
-        base_tokens = max(6000, len(names) * 800)
+    def _result_from_cache(self, payload: dict) -> ParsedName:
+        """Build a fresh ParsedName from a cached payload (never share lists)"""
+        result = ParsedName(**payload)
+        result.warnings = list(result.warnings)
+        return result
 
-        payload = {
-            "contents": [{"parts": [{"text": prompt}]}],
-            "generationConfig": {
-                "temperature": 0.1,
-                "topK": 10,
-                "topP": 0.95,
-                "maxOutputTokens": base_tokens,
-                "candidateCount": 1,
-            },
-        }
+    async def _cache_results(self, names: List[str], results: List[ParsedName]):
+        """Store Gemini-parsed results in the tiered cache"""
+        if self.cache is None:
+            return
+        items = [
+            (name, asdict(result))
+            for name, result in zip(names, results)
+            if result.parsing_method == "gemini"
+        ]
+        await self.cache.put_many(items, self.model_name, self.prompt_version)
 
-        # Use shared session for better connection pooling
-        session = await self._get_or_create_session()
+    async def _process_batch_with_semaphore(
+        self,
+        batch: List[str],
+        indices: List[int],
+        on_record: Optional[Callable[[int, ParsedName], None]] = None,
+        split_budget: Optional[RetryBudget] = None,
+    ) -> dict:
+        """
+        Process a batch with semaphore for rate limiting
 
-        for attempt in range(self.max_retries):
+        With streaming, on_record gets (batch position, result) for each
+        record as soon as it is decoded, before the batch completes.
+        A batch that fails as a whole is bisected and retried (within
+        split_budget) before anything goes to the fallback parser.
+        """
+        if self._breaker_open():
+            return {
+                "indices": indices,
+                "results": self._short_circuit(batch),
+                "success": False,
+            }
+
+        results = None
+        async with self.semaphore:
             try:
-                async with session.post(url, json=payload) as response:
-                    if response.status == 200:
-                        result = await response.json()
+                results = await self._process_with_gemini(
+                    batch, on_record, hedge=True
+                )
+            except Exception as e:
+                logger.error("batch_processing_error", error=str(e))
 
-                        # Validate response has candidates
-                        if "candidates" not in result or not result["candidates"]:
-                            logger.warning(
-                                "no_candidates_in_response",
-                                attempt=attempt,
-                                names_count=len(names)
-                            )
-                            continue  # Retry
+        if results:
+            try:
+                # Outside the slot: escalated re-sends queue for slots of
+                # their own
+                results = await self._escalate_thinking(batch, results)
+                # Cache successful results (only if caching is enabled)
+                await self._cache_results(batch, results)
+            except Exception as e:
+                logger.error("batch_processing_error", error=str(e))
+            return {"indices": indices, "results": results, "success": True}
 
-                        candidate = result["candidates"][0]
-                        finish_reason = candidate.get("finishReason", "UNKNOWN")
-                        usage_metadata = result.get("usageMetadata", {})
+        # Outside the slot: the halves queue for slots of their own
+        results = await self._split_and_retry(
+            batch,
+            split_budget or RetryBudget(limit=self.split_budget_per_job),
+            on_record=on_record,
+        )
+        return {"indices": indices, "results": results, "success": False}
+
+    async def _split_and_retry(
+        self,
+        names: List[str],
+        budget: RetryBudget,
+        depth: int = 1,
+        on_record: Optional[Callable[[int, ParsedName], None]] = None,
+    ) -> List[ParsedName]:
+        """
+        Bisect a failed batch and retry each half, splitting failing halves
+        again down to single names.
 
-                        # Check for MAX_TOKENS and implement progressive retry
-                        if finish_reason == "MAX_TOKENS":
-                            thoughts_tokens = usage_metadata.get("thoughtsTokenCount", 0)
-                            logger.warning(
-                                "max_tokens_exceeded",
-                                attempt=attempt,
-                                current_max=payload["generationConfig"]["maxOutputTokens"],
-                                thoughts_tokens=thoughts_tokens,
-                                names_count=len(names)
-                            )
+        Halves get proportionally smaller output budgets (the budget is per
+        name). Names in a half that still fails as a single name, is deeper
+        than split_max_depth, or finds the job's split budget spent, go to the
+        fallback parser.
+        """
+        if self._breaker_open():
+            return self._short_circuit(names)
+        if not self.split_retry or len(names) < 2:
+            return [self._fallback_parse(name) for name in names]
+        if depth == 1:
+            self.stats["split_batches"] += 1
+
+        middle = (len(names) + 1) // 2
+        halves = [(0, names[:middle]), (middle, names[middle:])]
+        level = self.stats["split_by_depth"].setdefault(
+            depth, {"requests": 0, "recovered": 0, "fallback": 0}
+        )
 
-                            # Progressive retry: double tokens and try again
-                            if attempt < self.max_retries - 1:
-                                payload["generationConfig"]["maxOutputTokens"] *= 2
-                                logger.info(
-                                    "retrying_with_more_tokens",
-                                    new_max=payload["generationConfig"]["maxOutputTokens"]
-                                )
-                                await asyncio.sleep(0.5)  # Brief pause before retry
-                                continue
-
-                        # Validate content has parts (critical for gemini-2.5-flash)
-                        content = candidate.get("content", {})
-                        if "parts" not in content or not content["parts"]:
-                            logger.error(
-                                "no_parts_in_response",
-                                finish_reason=finish_reason,
-                                has_content=bool(content),
-                                attempt=attempt
-                            )
-                            continue  # Retry
+        async def retry_half(offset: int, half: List[str]) -> List[ParsedName]:
+            if self._breaker_open():
+                level["fallback"] += len(half)
+                return self._short_circuit(half)
+            if depth > self.split_max_depth or not budget.take(1):
+                if depth <= self.split_max_depth:
+                    self.stats["split_budget_skipped"] += len(half)
+                level["fallback"] += len(half)
+                return [self._fallback_parse(name) for name in half]
+
+            half_record = (
+                (lambda i, result: on_record(offset + i, result)) if on_record else None
+            )
+            level["requests"] += 1
+            results = None
+            async with self.semaphore:
+                try:
+                    results = await self._process_with_gemini(half, half_record)
+                except Exception as e:
+                    logger.error("split_batch_error", depth=depth, error=str(e))
+            if results:
+                results = await self._escalate_thinking(half, results)
+                await self._cache_results(half, results)
+                level["recovered"] += len(half)
+                return results
+            if len(half) == 1:
+                level["fallback"] += 1
+                logger.warning("split_retry_isolated_failure", depth=depth)
+                return [self._fallback_parse(half[0])]
+            return await self._split_and_retry(half, budget, depth + 1, half_record)
+
+        parts = await asyncio.gather(
+            *(retry_half(offset, half) for offset, half in halves)
+        )
+        return parts[0] + parts[1]
+
+    async def _post(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        payload: dict,
+        request_options: dict,
+        names: List[str],
+        on_record: Optional[Callable[[int, ParsedName], None]],
+        attempt: int,
+        granted: Optional[asyncio.Event] = None,
+    ) -> ApiExchange:
+        """
+        One request inside a quota slot. A 200's body is read in full (the
+        stream decoded, with on_record per record); a 429 backs off every
+        worker before the slot is released. granted is set once the quota
+        slot is held.
+        """
+        quota = self.rate_limiter.slot(self._quota_tokens(payload))
+        async with quota:
+            if granted is not None:
+                granted.set()
+            async with session.post(url, json=payload, **request_options) as response:
+                if response.status == 200:
+                    if self.streaming:
+                        result = await self._read_stream(response, names, on_record)
+                    else:
+                        result = await response.json()
+                    quota.record_usage(result.get("usageMetadata", {}))
+                    # From quota grant, so limiter waits are not latency
+                    return ApiExchange(
+                        200, body=result, latency=time.time() - quota.granted_at
+                    )
+                text = await response.text()
+                if response.status == 429:
+                    # Shared backoff: every worker waits out Retry-After
+                    retry_after = parse_retry_after(response.headers, text)
+                    await quota.rate_limited(
+                        retry_after if retry_after is not None else 2**attempt
+                    )
+                return ApiExchange(response.status, text=text)
+
+    async def _post_hedged(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        payload: dict,
+        request_options: dict,
+        names: List[str],
+        on_record: Optional[Callable[[int, ParsedName], None]],
+        attempt: int,
+    ) -> ApiExchange:
+        """
+        _post, hedged: if the request has not answered by the policy's
+        latency deadline (counted from its quota grant), a duplicate is sent
+        once a concurrency slot is free (within the hedge budget); the first
+        200 wins and the other request is cancelled
+        """
+        request = (session, url, payload, request_options, names, on_record, attempt)
+        policy = self.hedge_policy
+        deadline = policy.deadline()
+        if deadline is None:
+            response = await self._post(*request)
+            if response.status == 200:
+                policy.record(response.latency)
+            return response
+
+        granted = asyncio.Event()
+        primary = asyncio.ensure_future(self._post(*request, granted=granted))
+        hedge = None
+        hedge_slot = False
+        pending = {primary}
+        winner = None
+        other = None
+        error = None
+        try:
+            # Quota waits are not latency: the deadline starts at the grant
+            waiter = asyncio.ensure_future(granted.wait())
+            try:
+                await asyncio.wait(
+                    {primary, waiter}, return_when=asyncio.FIRST_COMPLETED
+                )
+            finally:
+                waiter.cancel()
+            if not primary.done():
+                await asyncio.wait(pending, timeout=deadline)
+            if not primary.done() and await self._take_hedge_slot(primary):
+                hedge_slot = True
+                logger.info(
+                    "gemini_batch_hedged",
+                    names_count=len(names),
+                    deadline=round(deadline, 2),
+                )
+                hedge = asyncio.ensure_future(self._post(*request))
+                pending.add(hedge)
+            while pending and winner is None:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is not None:
+                        error = error or task.exception()
+                    elif task.result().status == 200 and winner is None:
+                        winner = task.result()
+                        if task is hedge:
+                            policy.record_win()
+                    else:
+                        other = other or task.result()
+        finally:
+            # The loser (or both, if this task was cancelled) gives up its
+            # connection and quota slot before the concurrency slots
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            if hedge_slot:
+                self.semaphore.release()
+
+        if winner is not None:
+            policy.record(winner.latency)
+            return winner
+        if other is not None:
+            return other
+        raise error
+
+    async def _take_hedge_slot(self, primary: asyncio.Future) -> bool:
+        """
+        Wait for a concurrency slot for a hedge of primary, so duplicates
+        never exceed GEMINI_MAX_CONCURRENT. False (no slot held) if primary
+        finishes first or the hedge budget is spent.
+        """
+        if self.semaphore.locked():
+            self.hedge_policy.record_slot_wait()
+        slot = asyncio.ensure_future(self.semaphore.acquire())
+        try:
+            await asyncio.wait({primary, slot}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            slot.cancel()
+            await asyncio.gather(slot, return_exceptions=True)
+        if slot.cancelled():
+            return False
+        if primary.done() or not self.hedge_policy.take_hedge():
+            self.semaphore.release()
+            return False
+        return True
+
+    def _breaker_open(self) -> bool:
+        """True while the circuit breaker refuses Gemini requests"""
+        return self.circuit_breaker is not None and self.circuit_breaker.rejecting
+
+    def _breaker_allows(self) -> bool:
+        """Gate one request (in half-open state, only the probe passes)"""
+        return self.circuit_breaker is None or self.circuit_breaker.allow_request()
+
+    def _breaker_failure(self, reason: str) -> bool:
+        """Record a failed request; True if the breaker now refuses requests"""
+        if self.circuit_breaker is None:
+            return False
+        self.circuit_breaker.record_failure(reason)
+        return self.circuit_breaker.rejecting
+
+    def _short_circuit(self, names: List[str]) -> List[ParsedName]:
+        """Fallback results for names the open breaker kept off the API"""
+        self.stats["breaker_short_circuited"] += len(names)
+        return [self._fallback_parse(name, "circuit_open") for name in names]
+
+    def breaker_transitions(self, since: float) -> List[dict]:
+        """Circuit breaker transitions since a time.time() timestamp"""
+        if self.circuit_breaker is None:
+            return []
+        return self.circuit_breaker.transitions_since(since)
+
+    def _iter_batches(
+        self, names: List[str], indices: List[int]
+    ) -> Iterator[Tuple[List[str], List[int]]]:
+        """
+        Lazily yield (batch, batch_indices) slices.
 
-                        # Extract text (now safe after validation)
-                        text = content["parts"][0]["text"]
+        The size is read per batch, so adaptive batching takes effect
+        mid-job as the controller learns. With thinking control on, names
+        are grouped by complexity first so that batches of simple names get
+        a zero thinking budget instead of paying for the trusts mixed in.
+        """
+        if self.thinking_control:
+            order = sorted(
+                range(len(names)),
+                key=lambda i: THINKING_TOKENS_PER_NAME[
+                    classify_name_complexity(names[i])
+                ],
+            )
+            names = [names[i] for i in order]
+            indices = [indices[i] for i in order]
+
+        if self.token_packing:
+            yield from self._pack_batches(names, indices)
+            return
+
+        i = 0
+        while i < len(names):
+            size = (
+                self.batch_controller.batch_size
+                if self.batch_controller is not None
+                else self.max_batch_size
+            )
+            # format_batch_prompt drops names beyond this
+            size = min(size, OptimizedPromptTemplates.MAX_NAMES_PER_PROMPT)
+            yield names[i : i + size], indices[i : i + size]
+            i += size
+
+    def _current_batch_size(self) -> int:
+        if self.batch_controller is not None:
+            return self.batch_controller.batch_size
+        return self.max_batch_size
+
+    def _pack_batches(
+        self, names: List[str], indices: List[int]
+    ) -> Iterator[Tuple[List[str], List[int]]]:
+        """
+        Pack names into batches that fill a target token budget.
+
+        Names are taken in input order and a batch closes once its estimated
+        cost reaches the target: a run of short person names fills one request
+        with many names, a run of trust strings with fewer. The target is the
+        current batch size in MODERATE-name units. Batches stay mixed, so the
+        estimator's per-class bias averages out instead of landing on whole
+        requests, and every name keeps its original index.
+        """
+        reference_cost = COMPLEXITY_TOKEN_COST[NameComplexity.MODERATE]
+        max_names = OptimizedPromptTemplates.MAX_NAMES_PER_PROMPT
 
-                        # Log detailed API response metrics
-                        logger.info(
-                            "gemini_api_response",
-                            finish_reason=finish_reason,
-                            total_tokens=usage_metadata.get("totalTokenCount", 0),
-                            thoughts_tokens=usage_metadata.get("thoughtsTokenCount", 0),
-                            output_tokens=usage_metadata.get("candidatesTokenCount", 0),
-                            response_length=len(text),
-                            names_count=len(names),
-                            attempt=attempt
+        start = 0
+        batch_cost = 0
+        target = self._current_batch_size() * reference_cost
+        for i, name in enumerate(names):
+            cost = estimate_name_tokens(name)
+            if i > start and (batch_cost + cost > target or i - start >= max_names):
+                yield names[start:i], indices[start:i]
+                start, batch_cost = i, 0
+                # Re-read per batch so controller changes apply mid-job
+                target = self._current_batch_size() * reference_cost
+            batch_cost += cost
+        if start < len(names):
+            yield names[start:], indices[start:]
+
+    async def _run_batch_pipeline(
+        self,
+        batches: Iterator[Tuple[List[str], List[int]]],
+        sink: Callable[[dict], None],
+        total_names: int,
+        progress_callback=None,
+        split_budget: Optional[RetryBudget] = None,
+    ) -> None:
+        """
+        Bounded producer/consumer pipeline.
+
+        A producer pulls batches from the iterator into a queue of fixed depth;
+        a fixed pool of consumers processes them and hands each result to the
+        sink as soon as it completes. Only queue-depth + consumer-count batches
+        (prompts, responses) are alive at any time, regardless of file size.
+        """
+        num_consumers = self.max_concurrent_requests
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.pipeline_queue_depth)
+        processed = 0
+
+        async def producer():
+            for batch, batch_indices in batches:
+                await queue.put((batch, batch_indices))
+                self.stats["batches_enqueued"] += 1
+            for _ in range(num_consumers):
+                await queue.put(None)
+
+        async def consumer():
+            nonlocal processed
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                batch, batch_indices = item
+                streamed = set()
+
+                def on_record(position: int, result: ParsedName):
+                    # Streamed record: visible (and counted) before the batch
+                    # completes; the final batch result replaces it
+                    nonlocal processed
+                    sink(
+                        {
+                            "indices": [batch_indices[position]],
+                            "results": [result],
+                            "success": True,
+                        }
+                    )
+                    if position not in streamed:
+                        streamed.add(position)
+                        processed += 1
+                        if progress_callback:
+                            progress_callback(processed, total_names)
+
+                try:
+                    batch_result = await self._process_batch_with_semaphore(
+                        batch,
+                        batch_indices,
+                        on_record if self.streaming else None,
+                        split_budget,
+                    )
+                    sink(batch_result)
+                except Exception as e:
+                    logger.error("batch_pipeline_error", error=str(e))
+                    sink(
+                        {
+                            "indices": batch_indices,
+                            "results": [self._fallback_parse(n) for n in batch],
+                            "success": False,
+                        }
+                    )
+
+                processed += len(batch) - len(streamed)
+                if progress_callback:
+                    progress_callback(processed, total_names)
+
+        await asyncio.gather(producer(), *(consumer() for _ in range(num_consumers)))
+
+    def _fill_missing_results(self, all_results: List[Optional[ParsedName]]) -> None:
+        """Fill any slot no batch answered (shouldn't happen) with an error result"""
+        for i, result in enumerate(all_results):
+            if result is None:
+                all_results[i] = ParsedName(
+                    first_name="",
+                    last_name="",
+                    entity_type="unknown",
+                    gender="unknown",
+                    gender_confidence=0.0,
+                    parsing_confidence=0.0,
+                    parsing_method="error",
+                )
+
+    async def _get_or_create_session(self):
+        """Get or create an optimized aiohttp session"""
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(**self.connector_config)
+            timeout = aiohttp.ClientTimeout(total=self.timeout)
+            self.session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+            self.sessions_created += 1
+        return self.session
+
+    async def _process_with_gemini(
+        self,
+        names: List[str],
+        on_record: Optional[Callable[[int, ParsedName], None]] = None,
+        hedge: bool = False,
+    ) -> Optional[List[ParsedName]]:
+        """Process batch with Gemini API - SDK or direct call"""
+
+        # CRITICAL LOGGING: Verify correct prompt is being sent
+        instructions = self.instructions
+        logger.info(
+            "gemini_api_call_prepared",
+            names_count=len(names),
+            model=self.model_name,
+            prompt_mode=self.prompt_context.effective_mode(),
+            streaming=self.streaming,
+            instructions_length=len(instructions),
+            has_hierarchical_prompt="HIERARCHICAL PARSING APPROACH" in instructions,
+            has_entity_classification="ENTITY TYPE CLASSIFICATION" in instructions,
+            input_names=names[:3] if len(names) > 3 else names,
+        )
+
+        # Use aiohttp for all API calls (consolidated approach)
+        return await self._direct_api_call_async(
+            names, on_record=on_record, hedge=hedge
+        )
+
+    async def _build_request(
+        self,
+        names: List[str],
+        max_output_tokens: int,
+        retry: bool = False,
+        thinking_budget: Optional[int] = None,
+    ) -> Tuple[dict, str]:
+        """
+        generateContent payload for names in the current prompt mode.
+
+        The instructions travel inline, as systemInstruction or as a
+        cachedContent reference; in the last two the request text carries
+        only the numbered names. thinking_budget, when set, goes into
+        thinkingConfig.
+
+        Returns:
+            (payload, prompt mode used)
+        """
+        session = await self._get_or_create_session()
+        mode, fields = await self.prompt_context.request_fields(session, self.api_key)
+        inline = mode == "inline"
+        compact = self.structured_output
+        gender = not self.local_gender
+        if retry:
+            text = self.prompts.format_retry_prompt(
+                names, include_instructions=inline, compact=compact, gender=gender
+            )
+        elif inline:
+            text = self.prompts.format_batch_prompt(
+                names, compact=compact, gender=gender
+            )
+        else:
+            text = self.prompts.format_batch_input(names)
+
+        payload = {
+            "contents": [{"parts": [{"text": text}]}],
+            **fields,
+            "generationConfig": {
+                "temperature": 0.1,
+                "topK": 10,
+                "topP": 0.95,
+                "maxOutputTokens": max_output_tokens,
+                "candidateCount": 1,
+            },
+        }
+        if compact:
+            payload["generationConfig"]["responseMimeType"] = "application/json"
+            payload["generationConfig"]["responseSchema"] = (
+                self.prompts.RESPONSE_SCHEMA
+                if gender
+                else self.prompts.NO_GENDER_RESPONSE_SCHEMA
+            )
+        if thinking_budget is not None:
+            payload["generationConfig"]["thinkingConfig"] = {
+                "thinkingBudget": thinking_budget
+            }
+        return payload, mode
+
+    def _prompt_chars(self, payload: dict) -> Tuple[int, int]:
+        """(characters sent, characters an inline prompt would have sent)"""
+        sent = sum(
+            len(part.get("text", ""))
+            for content in payload["contents"]
+            for part in content["parts"]
+        )
+        if "systemInstruction" in payload or "cachedContent" in payload:
+            return sent, sent + len(self.instructions)
+        return sent, sent
+
+    def _quota_tokens(self, payload: dict) -> int:
+        """Tokens to reserve against the per-minute quota for one request"""
+        # ~4 characters per input token (system and cached instructions still
+        # count). Output is reserved at half its budget; the slot corrects
+        # this from usageMetadata on release.
+        _, input_chars = self._prompt_chars(payload)
+        return input_chars // 4 + payload["generationConfig"]["maxOutputTokens"] // 2
+
+    def _record_prompt_usage(
+        self, usage_metadata: dict, payload: dict, names_count: int
+    ) -> None:
+        """Input-token accounting for prompt_stats"""
+        self.stats["prompt_tokens"] += usage_metadata.get("promptTokenCount", 0)
+        self.stats["cached_prompt_tokens"] += usage_metadata.get(
+            "cachedContentTokenCount", 0
+        )
+        self.stats["output_tokens"] += usage_metadata.get(
+            "candidatesTokenCount", 0
+        ) + usage_metadata.get("thoughtsTokenCount", 0)
+        self.stats["thoughts_tokens"] += usage_metadata.get("thoughtsTokenCount", 0)
+        self.stats["prompt_names"] += names_count
+        self.stats["inline_prompt_chars"] += self._prompt_chars(payload)[1]
+
+    def _record_thinking(
+        self, level: int, names_count: int, usage_metadata: dict, latency: float
+    ) -> None:
+        """Per-escalation-level counters for requests with a thinking budget"""
+        stats = self.stats["thinking_by_level"].setdefault(
+            level,
+            {"requests": 0, "names": 0, "thoughts_tokens": 0, "latency_seconds": 0.0},
+        )
+        stats["requests"] += 1
+        stats["names"] += names_count
+        stats["thoughts_tokens"] += usage_metadata.get("thoughtsTokenCount", 0)
+        stats["latency_seconds"] += latency
+
+    async def _direct_api_call_async(
+        self,
+        names: List[str],
+        min_output_tokens: int = 0,
+        salvage_depth: int = 0,
+        on_record: Optional[Callable[[int, ParsedName], None]] = None,
+        thinking_level: int = 0,
+        hedge: bool = False,
+    ) -> Optional[List[ParsedName]]:
+        """
+        Direct API call using aiohttp (preferred)
+
+        With hedge, each request is hedged at the transport level (see
+        _post_hedged) and its latency feeds the batch latency percentiles.
+        """
+
+        if not self.api_key:
+            return None
+        if not self._breaker_allows():
+            return None
+
+        if self.streaming:
+            url = self.stream_url.format(model=self.model_name)
+            url += f"?alt=sse&key={self.api_key}"
+            # Per-read stall limit instead of one deadline for the generation
+            request_options = {"timeout": self.stream_timeout}
+        else:
+            url = self.base_url.format(model=self.model_name)
+            url += f"?key={self.api_key}"
+            request_options = {}
+
+        # gemini-2.5-flash uses substantial thinking tokens (~250-300 per name with complex prompts)
+        # These count against maxOutputTokens, so we need large budgets
+        # Static formula: 6000 base + 800 per name (ensures ~4000-5000 thinking + 7000+ output)
+        # The adaptive controller replaces it with a budget learned from usage
+        # Packed batches are sized in MODERATE-name units, so the static
+        # formula charges a trust string more than a short person name
+        estimated_tokens = None
+        batch_units = None
+        if self.token_packing:
+            estimated_tokens = sum(estimate_name_tokens(name) for name in names)
+            batch_units = (
+                estimated_tokens / COMPLEXITY_TOKEN_COST[NameComplexity.MODERATE]
+            )
+        if self.batch_controller is not None:
+            base_tokens = self.batch_controller.output_token_budget(
+                len(names), estimated_tokens, batch_units
+            )
+        else:
+            base_tokens = max(
+                6000, int((batch_units or len(names)) * self.tokens_per_name)
+            )
+        base_tokens = max(base_tokens, min_output_tokens)
+
+        thinking_budget = (
+            thinking_budget_for(self.model_name, names, thinking_level)
+            if self.thinking_control
+            else None
+        )
+        if thinking_budget:
+            base_tokens = max(
+                base_tokens, thinking_budget + OUTPUT_TOKENS_PER_NAME * len(names)
+            )
+
+        payload, prompt_mode = await self._build_request(
+            names, base_tokens, thinking_budget=thinking_budget
+        )
+        # Results kept from a truncated response, completed after the loop
+        # (outside the quota slot)
+        partial = None
+        # Decoded results, checked for escalation after the loop
+        parsed = None
+
+        # Use shared session for better connection pooling
+        session = await self._get_or_create_session()
+
+        for attempt in range(self.max_retries):
+            try:
+                post = self._post_hedged if hedge else self._post
+                response = await post(
+                    session, url, payload, request_options, names, on_record, attempt
+                )
+                if response.status == 200:
+                    result = response.body
+                    latency = response.latency
+                    self._record_prompt_usage(
+                        result.get("usageMetadata", {}), payload, len(names)
+                    )
+                    if thinking_budget is not None:
+                        self._record_thinking(
+                            thinking_level,
+                            len(names),
+                            result.get("usageMetadata", {}),
+                            latency,
+                        )
+
+                    # Validate response has candidates
+                    if "candidates" not in result or not result["candidates"]:
+                        logger.warning(
+                            "no_candidates_in_response",
+                            attempt=attempt,
+                            names_count=len(names)
                         )
+                        continue  # Retry
 
-                        # Parse response
-                        parsed_results = self._parse_gemini_response(text, names)
+                    candidate = result["candidates"][0]
+                    finish_reason = candidate.get("finishReason", "UNKNOWN")
+                    usage_metadata = result.get("usageMetadata", {})
+
+                    # Success only once the whole body has arrived: a
+                    # stream that stalls after the 200 counts as a failure
+                    stalled_open = False
+                    if finish_reason == "STALLED":
+                        stalled_open = self._breaker_failure("stream_stalled")
+                    elif self.circuit_breaker is not None:
+                        self.circuit_breaker.record_success()
+
+                    if self.batch_controller is not None and finish_reason != "STALLED":
+                        self.batch_controller.record(
+                            len(names),
+                            finish_reason,
+                            usage_metadata.get("thoughtsTokenCount", 0),
+                            usage_metadata.get("candidatesTokenCount", 0),
+                            latency,
+                            estimated_tokens=estimated_tokens,
+                            batch_units=batch_units,
+                        )
+
+                    # Check for MAX_TOKENS and implement progressive retry
+                    if finish_reason == "MAX_TOKENS":
+                        thoughts_tokens = usage_metadata.get("thoughtsTokenCount", 0)
+                        logger.warning(
+                            "max_tokens_exceeded",
+                            attempt=attempt,
+                            current_max=payload["generationConfig"]["maxOutputTokens"],
+                            thoughts_tokens=thoughts_tokens,
+                            names_count=len(names)
+                        )
 
-                        # Apply retry logic for low-confidence results
-                        improved_results = []
-                        for i, result in enumerate(parsed_results):
-                            original_name = names[i] if i < len(names) else ""
-                            improved_result = await self._retry_low_confidence(
-                                result, original_name
+                        if (
+                            self.salvage_truncated
+                            and salvage_depth < self.max_salvage_depth
+                        ):
+                            partial = self._salvage_truncated(
+                                candidate, names, usage_metadata
                             )
-                            improved_results.append(improved_result)
+                            if partial is not None:
+                                break
 
-                        return improved_results
+                        # Progressive retry: double tokens and try again
+                        if attempt < self.max_retries - 1:
+                            payload["generationConfig"]["maxOutputTokens"] *= 2
+                            logger.info(
+                                "retrying_with_more_tokens",
+                                new_max=payload["generationConfig"]["maxOutputTokens"]
+                            )
+                            await asyncio.sleep(0.5)  # Brief pause before retry
+                            continue
+
+                    if finish_reason == "STALLED":
+                        # Keep what the stream delivered; only the names
+                        # it did not reach are requested again
+                        if salvage_depth < self.max_salvage_depth:
+                            partial = self._salvage_truncated(
+                                candidate, names, usage_metadata
+                            )
+                            if partial is not None:
+                                break
+                        if stalled_open:
+                            break
+                        continue
 
-                    elif response.status == 429:
-                        await asyncio.sleep(2**attempt)
-                    else:
-                        error = await response.text()
+                    # Validate content has parts (critical for gemini-2.5-flash)
+                    content = candidate.get("content", {})
+                    if "parts" not in content or not content["parts"]:
                         logger.error(
-                            "api_error", status=response.status, error=error[:200]
+                            "no_parts_in_response",
+                            finish_reason=finish_reason,
+                            has_content=bool(content),
+                            attempt=attempt
+                        )
+                        continue  # Retry
+
+                    # Extract text (now safe after validation)
+                    text = content["parts"][0]["text"]
+
+                    # Log detailed API response metrics
+                    logger.info(
+                        "gemini_api_response",
+                        finish_reason=finish_reason,
+                        total_tokens=usage_metadata.get("totalTokenCount", 0),
+                        thoughts_tokens=usage_metadata.get("thoughtsTokenCount", 0),
+                        output_tokens=usage_metadata.get("candidatesTokenCount", 0),
+                        response_length=len(text),
+                        names_count=len(names),
+                        attempt=attempt
+                    )
+
+                    # Parse response (low-confidence retries run later, in
+                    # their own phase, so this slot is released right away)
+                    parsed = self._parse_gemini_response(text, names)
+                    break
+
+                elif response.status != 429:
+                    # (a 429 was already waited out in _post, by every worker)
+                    error = response.text
+                    if prompt_mode != "inline" and self.prompt_context.is_mode_error(
+                        prompt_mode, error
+                    ):
+                        # Instructions cannot travel this way for this
+                        # model/key: drop to the next mode and resend
+                        self.prompt_context.downgrade(prompt_mode, error)
+                        payload, prompt_mode = await self._build_request(
+                            names,
+                            payload["generationConfig"]["maxOutputTokens"],
+                            thinking_budget=thinking_budget,
                         )
-                        break
+                        continue
+                    logger.error("api_error", status=response.status, error=error[:200])
+                    if response.status >= 500 or response.status in (401, 403):
+                        self._breaker_failure(f"http_{response.status}")
+                    break
             except asyncio.TimeoutError:
                 logger.warning("timeout", attempt=attempt)
+                if self._breaker_failure("timeout"):
+                    break
+            except aiohttp.ClientError as e:
+                logger.error("request_failed", error=str(e), attempt=attempt)
+                if self._breaker_failure("network_error"):
+                    break
             except Exception as e:
                 logger.error("request_failed", error=str(e), attempt=attempt)
 
+        if parsed is not None:
+            # Names that failed validation are escalated by the caller, once
+            # it has released its concurrency slot
+            return parsed
+        if partial is not None:
+            return await self._complete_salvaged(
+                names,
+                partial,
+                payload["generationConfig"]["maxOutputTokens"],
+                salvage_depth,
+                on_record,
+            )
         return None
 
+    async def _escalate_thinking(
+        self, names: List[str], results: List[ParsedName], level: int = 0
+    ) -> List[ParsedName]:
+        """
+        Re-send the names whose output failed validation (fallback records,
+        or names the validator had to recover) with the next thinking level.
+        A re-parse replaces the original if it passes, or if the original
+        was a fallback.
+
+        Called outside the concurrency slot: each re-send takes a slot of its
+        own, so a slow escalation does not hold the batch's slot.
+        """
+        if (
+            not self.thinking_control
+            or self.model_name not in THINKING_BUDGET_LIMITS
+            or level >= self.thinking_max_escalations
+        ):
+            return results
+        failed = [
+            i
+            for i, result in enumerate(results)
+            if not self._passed_validation(result)
+        ]
+        if not failed:
+            return results
+
+        self.stats["thinking_escalations"] += 1
+        self.stats["thinking_escalated_names"] += len(failed)
+        failed_names = [names[i] for i in failed]
+        async with self.semaphore:
+            retried = await self._direct_api_call_async(
+                failed_names, thinking_level=level + 1
+            )
+        if retried:
+            retried = await self._escalate_thinking(failed_names, retried, level + 1)
+        for i, result in zip(failed, retried or []):
+            if self._passed_validation(result) or (
+                result.parsing_method == "gemini"
+                and results[i].parsing_method != "gemini"
+            ):
+                results[i] = result
+                self.stats["thinking_escalation_recovered"] += 1
+        return results
+
+    @staticmethod
+    def _passed_validation(result: ParsedName) -> bool:
+        return result.parsing_method == "gemini" and not any(
+            warning in EXTRACTION_FAILURE_WARNINGS for warning in result.warnings
+        )
+
+    async def _read_stream(
+        self,
+        response: aiohttp.ClientResponse,
+        names: List[str],
+        on_record: Optional[Callable[[int, ParsedName], None]],
+    ) -> dict:
+        """
+        Consume a streamGenerateContent SSE response.
+
+        Each record is decoded as soon as its text is complete and handed to
+        on_record. Returns the chunks merged into the shape of a
+        generateContent response; finishReason is STALLED if the stream went
+        quiet (GEMINI_STREAM_STALL_SECONDS) or overran its deadline.
+        """
+        self.stats["stream_requests"] += 1
+        started = time.time()
+        decoder = IncrementalRecordDecoder()
+        fields = OptimizedPromptTemplates.COMPACT_FIELDS
+        texts = []
+        finish_reason = None
+        usage_metadata = {}
+        decoded = 0
+
+        try:
+            async for line in response.content:
+                if not line.startswith(b"data:"):
+                    continue
+                chunk = json.loads(line[5:])
+                usage_metadata = chunk.get("usageMetadata", usage_metadata)
+                candidate = (chunk.get("candidates") or [{}])[0]
+                finish_reason = candidate.get("finishReason", finish_reason)
+                for part in candidate.get("content", {}).get("parts", []):
+                    if part.get("thought") or "text" not in part:
+                        continue
+                    texts.append(part["text"])
+                    for record in decoder.feed(part["text"]):
+                        decoded += 1
+                        if decoded == 1:
+                            self.stats["stream_first_records"] += 1
+                            self.stats["stream_first_record_seconds"] += (
+                                time.time() - started
+                            )
+                        if on_record is None or not isinstance(record, dict):
+                            continue
+                        # Compact records say where they belong; others are
+                        # positional, as in _align_records
+                        try:
+                            position = int(record.get("i", decoded)) - 1
+                        except (TypeError, ValueError):
+                            continue
+                        if 0 <= position < len(names):
+                            item = {fields.get(k, k): v for k, v in record.items()}
+                            on_record(
+                                position, self._record_to_result(item, names[position])
+                            )
+        except asyncio.TimeoutError:
+            finish_reason = "STALLED"
+            self.stats["stream_stalls"] += 1
+            logger.warning(
+                "gemini_stream_stalled",
+                names_count=len(names),
+                records_decoded=decoded,
+                seconds=round(time.time() - started, 2),
+            )
+
+        content = {"parts": [{"text": "".join(texts)}] if texts else []}
+        return {
+            "candidates": [
+                {"finishReason": finish_reason or "UNKNOWN", "content": content}
+            ],
+            "usageMetadata": usage_metadata,
+        }
+
+    def _salvage_truncated(
+        self, candidate: dict, names: List[str], usage_metadata: dict
+    ) -> Optional[List[Optional[ParsedName]]]:
+        """
+        Complete records from a MAX_TOKENS response, None where a name has none.
+
+        Returns None if nothing usable came back (the caller then re-sends
+        the whole batch with a larger budget, as before).
+        """
+        parts = candidate.get("content", {}).get("parts", [])
+        text = "".join(part.get("text", "") for part in parts)
+        if not text:
+            return None
+        partial = self._parse_gemini_response(text, names, fill_missing=False)
+        kept = sum(result is not None for result in partial)
+        if not kept:
+            return None
+
+        # A full re-send would have regenerated the kept records too
+        used_tokens = usage_metadata.get("thoughtsTokenCount", 0) + usage_metadata.get(
+            "candidatesTokenCount", 0
+        )
+        self.stats["salvage_tokens_saved"] += int(used_tokens * kept / len(names))
+        logger.info(
+            "truncated_response_salvaged",
+            names_count=len(names),
+            kept=kept,
+            missing=len(names) - kept,
+        )
+        return partial
+
+    async def _complete_salvaged(
+        self,
+        names: List[str],
+        partial: List[Optional[ParsedName]],
+        truncated_budget: int,
+        salvage_depth: int,
+        on_record: Optional[Callable[[int, ParsedName], None]] = None,
+    ) -> List[ParsedName]:
+        """Fill the gaps of a salvaged batch with a follow-up for those names only"""
+        missing = [i for i, result in enumerate(partial) if result is None]
+        if missing:
+            self.stats["salvage_followups"] += 1
+            # At least double the per-name budget the truncated response had
+            tail_budget = int(truncated_budget * 2 * len(missing) / len(names))
+            tail = await self._direct_api_call_async(
+                [names[i] for i in missing],
+                min_output_tokens=tail_budget,
+                salvage_depth=salvage_depth + 1,
+                on_record=(
+                    (lambda i, result: on_record(missing[i], result))
+                    if on_record
+                    else None
+                ),
+            )
+            if tail is None:
+                tail = [self._fallback_parse(names[i]) for i in missing]
+            for i, result in zip(missing, tail):
+                partial[i] = result
+        return partial
+
     async def _call_gemini_api_raw(
-        self, prompt: str, max_output_tokens: int = 1500
+        self,
+        names: List[str],
+        max_output_tokens: int = 1500,
+        thinking_level: Optional[int] = None,
     ) -> Optional[str]:
         """
         Raw API call that returns just the text response.
-        Used by retry logic for single-name parsing.
+        Used by the low-confidence retry pass.
 
         Args:
-            prompt: The prompt to send to Gemini
+            names: Names to re-parse (sent with the retry prompt)
             max_output_tokens: Token budget (default 1500 for retries)
+            thinking_level: Escalation level for a thinking budget, or None
+                to leave thinking to the model
 
         Returns:
             str: Raw text response from Gemini, or None if failed
         """
         if not self.api_key:
             return None
+        if not self._breaker_allows():
+            return None
 
         url = self.base_url.format(model=self.model_name)
         url += f"?key={self.api_key}"
 
-        payload = {
-            "contents": [{"parts": [{"text": prompt}]}],
-            "generationConfig": {
-                "temperature": 0.1,
-                "topK": 10,
-                "topP": 0.95,
-                "maxOutputTokens": max_output_tokens,
-                "candidateCount": 1,
-            },
-        }
+        thinking_budget = (
+            thinking_budget_for(self.model_name, names, thinking_level)
+            if thinking_level is not None
+            else None
+        )
+        if thinking_budget:
+            max_output_tokens = max(
+                max_output_tokens,
+                thinking_budget + OUTPUT_TOKENS_PER_NAME * len(names),
+            )
+        payload, prompt_mode = await self._build_request(
+            names, max_output_tokens, retry=True, thinking_budget=thinking_budget
+        )
 
         session = await self._get_or_create_session()
 
         try:
-            async with session.post(url, json=payload) as response:
+            quota = self.rate_limiter.slot(self._quota_tokens(payload))
+            async with quota, session.post(url, json=payload) as response:
                 if response.status == 200:
                     result = await response.json()
+                    quota.record_usage(result.get("usageMetadata", {}))
+                    self._record_prompt_usage(
+                        result.get("usageMetadata", {}), payload, len(names)
+                    )
+                    if thinking_budget is not None:
+                        self._record_thinking(
+                            thinking_level,
+                            len(names),
+                            result.get("usageMetadata", {}),
+                            time.time() - quota.granted_at,
+                        )
 
                     # Validate response structure
                     if "candidates" not in result or not result["candidates"]:
                         logger.warning("retry_no_candidates")
                         return None
+                    # Success only once the body has been read and checked
+                    if self.circuit_breaker is not None:
+                        self.circuit_breaker.record_success()
 
                     candidate = result["candidates"][0]
                     finish_reason = candidate.get("finishReason", "UNKNOWN")
@@ -856,88 +2720,170 @@ class ConsolidatedGeminiService:
 
                     return content["parts"][0]["text"]
 
+                elif response.status == 429:
+                    retry_after = parse_retry_after(
+                        response.headers, await response.text()
+                    )
+                    await quota.rate_limited(
+                        retry_after if retry_after is not None else 1.0
+                    )
+
                 else:
                     error = await response.text()
+                    if prompt_mode != "inline" and self.prompt_context.is_mode_error(
+                        prompt_mode, error
+                    ):
+                        self.prompt_context.downgrade(prompt_mode, error)
                     logger.error(
                         "retry_api_error",
                         status=response.status,
                         error=error[:200]
                     )
+                    if response.status >= 500 or response.status in (401, 403):
+                        self._breaker_failure(f"http_{response.status}")
 
+        except asyncio.TimeoutError:
+            logger.error("retry_api_call_failed", error="timeout")
+            self._breaker_failure("timeout")
+        except aiohttp.ClientError as e:
+            logger.error("retry_api_call_failed", error=str(e))
+            self._breaker_failure("network_error")
         except Exception as e:
             logger.error("retry_api_call_failed", error=str(e))
 
         return None
 
+    @staticmethod
+    def _extract_json_array(text: str) -> str:
+        """Cut the JSON array out of free-form model text"""
+        # Strategy 1: Clean markdown
+        text = text.strip()
+        if "```json" in text.lower():
+            parts = text.split("```json")
+            if len(parts) > 1:
+                text = parts[1].split("```")[0]
+        elif "```" in text:
+            text = text.replace("```json", "").replace("```", "")
+
+        # Remove any text before the first '['
+        # This handles cases like "Here is the JSON: [{..." or "Extra data: [{..."
+        if "[" in text:
+            first_bracket = text.find("[")
+            if first_bracket > 0:
+                # Check if there's non-whitespace before the bracket
+                prefix = text[:first_bracket].strip()
+                if prefix:
+                    logger.warning("removing_json_prefix", prefix=prefix[:50])
+                    text = text[first_bracket:]
+
+        # Strategy 2: Find JSON array boundaries with better validation
+        if "[" in text and "]" in text:
+            start = text.find("[")
+            # Find balanced brackets, considering strings
+            bracket_count = 0
+            end = start
+            in_string = False
+            escape_next = False
+
+            for i in range(start, len(text)):
+                char = text[i]
+
+                # Handle escape sequences
+                if escape_next:
+                    escape_next = False
+                    continue
+                if char == "\\" and in_string:
+                    escape_next = True
+                    continue
+
+                # Handle string boundaries
+                if char == '"':
+                    in_string = not in_string
+                    continue
+
+                # Count brackets only outside strings
+                if not in_string:
+                    if char == "[":
+                        bracket_count += 1
+                    elif char == "]":
+                        bracket_count -= 1
+                        if bracket_count == 0:
+                            end = i + 1
+                            break
+
+            text = text[start:end]
+        return text
+
+    @staticmethod
+    def _align_records(parsed: list, count: int) -> List[Any]:
+        """
+        Response records in input order, None where a record is missing.
+
+        Compact records carry their 1-based input number ("i") and are placed
+        by it, so reordered, duplicated or skipped rows cannot shift results
+        onto the wrong name. Records without one are taken by position.
+        """
+        fields = OptimizedPromptTemplates.COMPACT_FIELDS
+        if not any(isinstance(item, dict) and "i" in item for item in parsed):
+            aligned = [
+                {fields.get(key, key): value for key, value in item.items()}
+                if isinstance(item, dict)
+                else item
+                for item in parsed[:count]
+            ]
+            return aligned + [None] * (count - len(aligned))
+
+        aligned: List[Any] = [None] * count
+        for item in parsed:
+            if not isinstance(item, dict):
+                continue
+            try:
+                index = int(item["i"]) - 1
+            except (KeyError, TypeError, ValueError):
+                continue
+            if 0 <= index < count and aligned[index] is None:
+                aligned[index] = {
+                    fields.get(key, key): value for key, value in item.items()
+                }
+        return aligned
+
     def _parse_gemini_response(
-        self, text: str, original_names: List[str]
-    ) -> List[ParsedName]:
-        """Ultra-robust parsing with multiple fallback strategies"""
+        self, text: str, original_names: List[str], fill_missing: bool = True
+    ) -> List[Optional[ParsedName]]:
+        """
+        Ultra-robust parsing with multiple fallback strategies
+
+        Names without a usable record get a fallback parse, or None when
+        fill_missing is False (the caller re-requests them).
+        """
         results = []
+        raw_text = text
 
         try:
             # Log for debugging
             logger.debug("gemini_raw_response", length=len(text), preview=text[:200])
 
-            # Strategy 1: Clean markdown
-            text = text.strip()
-            if "```json" in text.lower():
-                parts = text.split("```json")
-                if len(parts) > 1:
-                    text = parts[1].split("```")[0]
-            elif "```" in text:
-                text = text.replace("```json", "").replace("```", "")
-
-            # Remove any text before the first '['
-            # This handles cases like "Here is the JSON: [{..." or "Extra data: [{..."
-            if "[" in text:
-                first_bracket = text.find("[")
-                if first_bracket > 0:
-                    # Check if there's non-whitespace before the bracket
-                    prefix = text[:first_bracket].strip()
-                    if prefix:
-                        logger.warning("removing_json_prefix", prefix=prefix[:50])
-                        text = text[first_bracket:]
-
-            # Strategy 2: Find JSON array boundaries with better validation
-            if "[" in text and "]" in text:
-                start = text.find("[")
-                # Find balanced brackets, considering strings
-                bracket_count = 0
-                end = start
-                in_string = False
-                escape_next = False
-
-                for i in range(start, len(text)):
-                    char = text[i]
-
-                    # Handle escape sequences
-                    if escape_next:
-                        escape_next = False
-                        continue
-                    if char == "\\" and in_string:
-                        escape_next = True
-                        continue
-
-                    # Handle string boundaries
-                    if char == '"':
-                        in_string = not in_string
-                        continue
-
-                    # Count brackets only outside strings
-                    if not in_string:
-                        if char == "[":
-                            bracket_count += 1
-                        elif char == "]":
-                            bracket_count -= 1
-                            if bracket_count == 0:
-                                end = i + 1
-                                break
-
-                text = text[start:end]
-
-            # Strategy 3: Try to parse
-            parsed = json.loads(text)
+            # Structured output is bare JSON; anything else is cut out of the
+            # surrounding text first
+            try:
+                parsed = json.loads(text)
+            except json.JSONDecodeError:
+                text = self._extract_json_array(text)
+                try:
+                    # Strategy 3: Try to parse
+                    parsed = json.loads(text)
+                except json.JSONDecodeError:
+                    # Strategy 4: truncated or damaged array - keep every
+                    # complete record before the break
+                    parsed = decode_complete_records(raw_text)
+                    if not parsed:
+                        raise
+                    self.stats["salvaged_records"] += len(parsed)
+                    logger.warning(
+                        "partial_response_decoded",
+                        records=len(parsed),
+                        names_count=len(original_names),
+                    )
 
             # Ensure list format
             if isinstance(parsed, dict):
@@ -946,86 +2892,27 @@ class ConsolidatedGeminiService:
                 raise ValueError(f"Unexpected type: {type(parsed)}")
 
             # Process each result with validation
-            for i, item in enumerate(parsed[: len(original_names)]):
+            for i, item in enumerate(
+                self._align_records(parsed, len(original_names))
+            ):
+                if item is None:
+                    self.stats["response_records_missing"] += 1
+                    if not fill_missing:
+                        results.append(None)
+                        continue
+                    fallback = self._fallback_parse(original_names[i])
+                    fallback.warnings.append("Missing from Gemini response")
+                    results.append(fallback)
+                    continue
                 if not isinstance(item, dict):
                     logger.warning("non_dict_item", index=i, item=item)
                     results.append(self._fallback_parse(original_names[i]))
                     continue
 
-                # Safe extraction with normalization
-                first_name = str(item.get("first_name", "") or "").strip()
-                last_name = str(item.get("last_name", "") or "").strip()
-                entity_type = str(item.get("entity_type", "unknown")).lower().strip()
-                gender = str(item.get("gender", "unknown")).lower().strip()
-
-                # Normalize entity types
-                entity_map = {
-                    "corporation": "company",
-                    "corp": "company",
-                    "business": "company",
-                    "organization": "company",
-                    "llc": "company",
-                    "inc": "company",
-                    "estate": "trust",
-                    "foundation": "trust",
-                    "revocable": "trust",
-                }
-                entity_type = entity_map.get(entity_type, entity_type)
-                if entity_type not in ["person", "company", "trust"]:
-                    entity_type = "unknown"
-
-                # Normalize gender
-                if gender not in ["male", "female"]:
-                    gender = "unknown"
-
-                # CRITICAL: Enforce trust/company gender rules
-                # Non-person entities MUST have unknown gender
-                if entity_type in ["company", "trust", "estate"]:
-                    gender = "unknown"
-                    gender_conf = 0.0
-                else:
-                    # Get confidence scores with validation for persons
-                    try:
-                        gender_conf = float(item.get("gender_confidence", 0.7))
-                        gender_conf = max(0.0, min(1.0, gender_conf))  # Clamp to [0,1]
-                    except (TypeError, ValueError):
-                        gender_conf = 0.7
-
-                try:
-                    parse_conf = float(item.get("parsing_confidence", 0.8))
-                    parse_conf = max(0.0, min(1.0, parse_conf))  # Clamp to [0,1]
-                except (TypeError, ValueError):
-                    parse_conf = 0.8
-
-                result = ParsedName(
-                    first_name=first_name,
-                    last_name=last_name,
-                    entity_type=entity_type,
-                    gender=gender,
-                    gender_confidence=gender_conf,
-                    parsing_confidence=parse_conf,
-                    parsing_method="gemini",
-                )
-
-                # Apply validation and fixes
-                result = self._validate_and_fix_extraction(
-                    result,
-                    (
-                        original_names[len(results)]
-                        if len(results) < len(original_names)
-                        else ""
-                    ),
-                )
-
-                results.append(result)
-
-            # Fill missing with fallback
-            while len(results) < len(original_names):
-                fallback = self._fallback_parse(original_names[len(results)])
-                fallback.warnings.append("Missing from Gemini response")
-                results.append(fallback)
+                results.append(self._record_to_result(item, original_names[i]))
 
         except json.JSONDecodeError as e:
+            self.stats["response_parse_errors"] += 1
             logger.error(
                 "json_decode_error",
                 error=str(e),
@@ -1034,7 +2921,11 @@ class ConsolidatedGeminiService:
                 response_preview=text[:300] if text else "empty",
             )
             # Use fallback for all
+            results = []
             for name in original_names:
+                if not fill_missing:
+                    results.append(None)
+                    continue
                 fb = self._fallback_parse(name)
                 fb.warnings.append(f"JSON error: {str(e)[:30]}")
                 results.append(fb)
@@ -1042,11 +2933,73 @@ class ConsolidatedGeminiService:
         except Exception as e:
             logger.error("unexpected_error", error=str(e), type=type(e).__name__)
             # Use fallback
+            results = []
             for name in original_names:
-                results.append(self._fallback_parse(name))
+                results.append(self._fallback_parse(name) if fill_missing else None)
 
         return results
 
+    def _record_to_result(self, item: dict, original_name: str) -> ParsedName:
+        """One decoded response record (long field names) as a validated result"""
+        # Safe extraction with normalization
+        first_name = str(item.get("first_name", "") or "").strip()
+        last_name = str(item.get("last_name", "") or "").strip()
+        entity_type = str(item.get("entity_type", "unknown")).lower().strip()
+        gender = str(item.get("gender", "unknown")).lower().strip()
+
+        # Normalize entity types
+        entity_map = {
+            "corporation": "company",
+            "corp": "company",
+            "business": "company",
+            "organization": "company",
+            "llc": "company",
+            "inc": "company",
+            "estate": "trust",
+            "foundation": "trust",
+            "revocable": "trust",
+        }
+        entity_type = entity_map.get(entity_type, entity_type)
+        if entity_type not in ["person", "company", "trust"]:
+            entity_type = "unknown"
+
+        # Normalize gender
+        if gender not in ["male", "female"]:
+            gender = "unknown"
+
+        # CRITICAL: Enforce trust/company gender rules
+        # Non-person entities MUST have unknown gender; records from the
+        # local-gender prompt carry none (filled in after parsing)
+        if entity_type in ["company", "trust", "estate"] or "gender" not in item:
+            gender = "unknown"
+            gender_conf = 0.0
+        else:
+            # Get confidence scores with validation for persons
+            try:
+                gender_conf = float(item.get("gender_confidence", 0.7))
+                gender_conf = max(0.0, min(1.0, gender_conf))  # Clamp to [0,1]
+            except (TypeError, ValueError):
+                gender_conf = 0.7
+
+        try:
+            parse_conf = float(item.get("parsing_confidence", 0.8))
+            parse_conf = max(0.0, min(1.0, parse_conf))  # Clamp to [0,1]
+        except (TypeError, ValueError):
+            parse_conf = 0.8
+
+        result = ParsedName(
+            first_name=first_name,
+            last_name=last_name,
+            entity_type=entity_type,
+            gender=gender,
+            gender_confidence=gender_conf,
+            parsing_confidence=parse_conf,
+            parsing_method="gemini",
+        )
+
+        # Apply validation and fixes
+        return self._validate_and_fix_extraction(result, original_name)
+
     def _validate_and_fix_extraction(
         self, result: ParsedName, original_name: str
     ) -> ParsedName:
@@ -1187,139 +3140,196 @@ class ConsolidatedGeminiService:
 
         return result
 
-    async def _retry_low_confidence(
-        self, result: ParsedName, original_name: str
-    ) -> ParsedName:
-        """
-        Retry parsing for low-confidence results with enhanced prompt.
-        Only retries if confidence < 70% and not already a retry.
+    async def _retry_low_confidence_pass(
+        self,
+        all_results: List[Optional[ParsedName]],
+        names: List[str],
+        indices: List[int],
+        budget: RetryBudget,
+    ) -> None:
         """
-        # Skip if confidence is acceptable
-        if result.parsing_confidence >= 0.70:
-            return result
-
-        # Skip if this is already a retry (prevent infinite loops)
-        if "Retried due to low confidence" in result.warnings:
-            return result
-
-        logger.info(
-            f"Retrying low-confidence parse: '{original_name}' "
-            f"(confidence: {result.parsing_confidence:.2f})"
-        )
-
-        # Track retry attempt
-        self.stats["retry_attempts"] = self.stats.get("retry_attempts", 0) + 1
-
-        # Enhanced prompt with extra instructions
-        enhanced_prompt = f"""
-CRITICAL PARSING - RETRY REQUIRED
-
-Original parse had LOW CONFIDENCE: {result.parsing_confidence:.2f}
+        Retry low-confidence Gemini parses as a separate phase.
 
-Re-parse this name with EXTRA CARE:
-"{original_name}"
-
-{OptimizedPromptTemplates.PROPERTY_OWNERSHIP_PROMPT.replace('{names}', original_name).replace('{count}', '1')}
-
-DOUBLE-CHECK REQUIREMENTS:
-✓ Entity type: Is this person/company/trust?
-✓ Name extraction: Did I extract ALL names?
-✓ Name assignment: Did I use the scoring table correctly?
-✓ Trust names: If trust, do I have at least one name?
-✓ Company markers: Did I check word boundaries?
-
-Return ONLY the JSON array with your improved parse.
-"""
+        Candidates from every batch are re-packed into multi-name retry batches
+        that run concurrently under the shared semaphore. A retry result
+        replaces the original (by index) only if confidence improves by more
+        than 5 points.
+        """
+        candidates = [
+            i
+            for i in indices
+            if all_results[i] is not None
+            and all_results[i].parsing_method == "gemini"
+            and all_results[i].parsing_confidence < self.retry_confidence_threshold
+        ]
+        if not candidates:
+            return
 
-        try:
-            # Call Gemini API with enhanced prompt
-            response = await self._call_gemini_api_raw(
-                enhanced_prompt, max_output_tokens=500
+        granted = budget.take(len(candidates))
+        if granted < len(candidates):
+            self.stats["retry_budget_skipped"] += len(candidates) - granted
+            logger.info(
+                "retry_budget_exhausted",
+                candidates=len(candidates),
+                granted=granted,
+                budget_limit=budget.limit,
             )
-
+        candidates = candidates[:granted]
+        if not candidates:
+            return
+
+        self.stats["retry_attempts"] += len(candidates)
+
+        async def retry_batch(batch_indices: List[int]):
+            batch_names = [names[i] for i in batch_indices]
+            async with self.semaphore:
+                self.stats["retry_batches"] += 1
+                response = await self._call_gemini_api_raw(
+                    batch_names,
+                    max_output_tokens=max(1500, len(batch_names) * 800),
+                    # Low confidence is a validation failure: think harder
+                    thinking_level=1 if self.thinking_control else None,
+                )
             if not response:
-                self.stats["retry_failed"] = self.stats.get("retry_failed", 0) + 1
-                return result
-
-            # Parse retry response
-            retry_results = self._parse_gemini_response(response, [original_name])
+                return batch_indices, None
+            return batch_indices, self._parse_gemini_response(response, batch_names)
 
-            if retry_results and len(retry_results) > 0:
-                retry_result = retry_results[0]
+        batches = [
+            candidates[i : i + self.retry_batch_size]
+            for i in range(0, len(candidates), self.retry_batch_size)
+        ]
+        outcomes = await asyncio.gather(
+            *(retry_batch(batch) for batch in batches), return_exceptions=True
+        )
 
-                # Use retry result if confidence improved by at least 5%
-                if retry_result.parsing_confidence > result.parsing_confidence + 0.05:
+        improved_names = []
+        improved_results = []
+        for outcome in outcomes:
+            if isinstance(outcome, Exception):
+                logger.warning("retry_batch_failed", error=str(outcome))
+                continue
+            batch_indices, retry_results = outcome
+            if retry_results is None:
+                self.stats["retry_failed"] += len(batch_indices)
+                continue
+
+            for idx, retry_result in zip(batch_indices, retry_results):
+                original = all_results[idx]
+                if (
+                    retry_result.parsing_method == "gemini"
+                    and retry_result.parsing_confidence
+                    > original.parsing_confidence + 0.05
+                ):
                     retry_result.warnings.append(
                         f"Retried due to low confidence "
-                        f"(original: {result.parsing_confidence:.2f}, "
+                        f"(original: {original.parsing_confidence:.2f}, "
                         f"improved: {retry_result.parsing_confidence:.2f})"
                     )
-                    self.stats["retry_success"] = (
-                        self.stats.get("retry_success", 0) + 1
-                    )
-                    logger.info(
-                        f"Retry SUCCESS for '{original_name}': "
-                        f"{result.parsing_confidence:.2f} → "
-                        f"{retry_result.parsing_confidence:.2f}"
-                    )
-                    return retry_result
+                    all_results[idx] = retry_result
+                    improved_names.append(names[idx])
+                    improved_results.append(retry_result)
+                    self.stats["retry_success"] += 1
                 else:
-                    self.stats["retry_no_improvement"] = (
-                        self.stats.get("retry_no_improvement", 0) + 1
-                    )
-                    logger.debug(
-                        f"Retry NO IMPROVEMENT for '{original_name}': "
-                        f"{result.parsing_confidence:.2f} → "
-                        f"{retry_result.parsing_confidence:.2f}"
-                    )
+                    self.stats["retry_no_improvement"] += 1
 
-        except Exception as e:
-            logger.warning(f"Retry failed for '{original_name}': {e}")
-            self.stats["retry_failed"] = self.stats.get("retry_failed", 0) + 1
+        # Replace the low-confidence entries cached during the first pass
+        if improved_results:
+            await self._cache_results(improved_names, improved_results)
 
-        # Return original if retry failed or didn't improve
-        return result
+        logger.info(
+            "retry_pass_complete",
+            retried=len(candidates),
+            batches=len(batches),
+            improved=len(improved_results),
+            budget_remaining=budget.remaining,
+        )
 
-    def _fallback_parse(self, name: str) -> ParsedName:
+    def _fallback_parse(
+        self, name: str, reason: str = "Delegated to fallback parser"
+    ) -> ParsedName:
         """Simplified fallback parser using dedicated fallback service"""
-        if not name or not name.strip():
-            return ParsedName(
-                first_name="",
-                last_name="",
-                entity_type="unknown",
-                parsing_confidence=0.1,
-                parsing_method="fallback",
-                fallback_reason="Empty input",
-            )
-
-        # Use the dedicated fallback parser
-        fallback_parser = get_fallback_parser()
-        result = fallback_parser.parse_name(name.strip())
-
-        # Convert to our ParsedName format with normalization
-        entity_type = str(result.get("entity_type", "person") or "person").lower()
-        # Normalize entity type variants
-        if entity_type in ["company", "organization", "corp", "corporation"]:
-            entity_type = "company"
-        elif entity_type in ["trust", "estate", "foundation"]:
-            entity_type = "trust"
-        elif entity_type not in ["person", "company", "trust"]:
-            entity_type = "unknown"
-
+        first_name, last_name, entity_type, confidence, own_reason = (
+            fallback_record(get_fallback_parser(), name)
+        )
         return ParsedName(
-            first_name=result.get("first_name", "") or "",
-            last_name=result.get("last_name", "") or "",
+            first_name=first_name,
+            last_name=last_name,
             entity_type=entity_type,
-            parsing_confidence=result.get("confidence", 0.6),
+            parsing_confidence=confidence,
             parsing_method="fallback",
-            fallback_reason="Delegated to fallback parser",
+            fallback_reason=own_reason or reason,
             warnings=[],
         )
 
+    async def _pool_fallback(
+        self, names: List[str], reason: Optional[str] = None
+    ) -> List[ParsedName]:
+        """
+        Rule-based parse of a whole name list on the process pool; results
+        match _fallback_parse name for name
+        """
+        if reason == "circuit_open":
+            self.stats["breaker_short_circuited"] += len(names)
+        reason = reason or "Delegated to fallback parser"
+        columns = await get_fallback_pool().parse(names)
+        return [
+            ParsedName(
+                first_name=first_name,
+                last_name=last_name,
+                entity_type=entity_type,
+                parsing_confidence=confidence,
+                parsing_method="fallback",
+                fallback_reason=own_reason or reason,
+                warnings=[],
+            )
+            for first_name, last_name, entity_type, confidence, own_reason in zip(
+                *(columns[column] for column in FALLBACK_COLUMNS)
+            )
+        ]
+
+    def begin_job(self) -> None:
+        """
+        Start per-job stats. The previous job's counters are added to the
+        process totals and reset; process-wide state (session, caches,
+        learned batch settings, breaker) is kept.
+        """
+        for key, value in self.stats.items():
+            if key == "start_time":
+                continue
+            if isinstance(value, (int, float)):
+                self.finished_job_totals[key] = (
+                    self.finished_job_totals.get(key, 0) + value
+                )
+            self.stats[key] = type(value)()
+        self.stats["start_time"] = time.time()
+        self.jobs_started += 1
+
+    def get_process_stats(self) -> dict:
+        """Counters for the life of this service (all jobs, current included)"""
+        totals = dict(self.finished_job_totals)
+        for key, value in self.stats.items():
+            if key != "start_time" and isinstance(value, (int, float)):
+                totals[key] = totals.get(key, 0) + value
+        return {
+            "jobs": self.jobs_started,
+            "uptime_seconds": time.time() - self.process_started_at,
+            "sessions_created": self.sessions_created,
+            "total_processed": totals.get("total_processed", 0),
+            "gemini_used": totals.get("gemini_success", 0),
+            "fallback_used": totals.get("fallback_used", 0),
+            "cache_hits": totals.get("cache_hits", 0),
+            "totals": totals,
+        }
+
     async def cleanup(self):
         """Clean up resources (close session, etc.)"""
+        if self.gender_learning and not self.local_gender:
+            # Learned gender labels still below the write threshold
+            await get_gender_index().persist(force=True)
         if self.session and not self.session.closed:
             await self.session.close()
+        for service in self._tier_services.values():
+            await service.cleanup()
 
     def get_performance_stats(self) -> dict:
         """Get performance statistics"""
@@ -1332,6 +3342,13 @@ Return ONLY the JSON array with your improved parse.
             "total_processed": self.stats["total_processed"],
             "gemini_used": self.stats["gemini_success"],
             "fallback_used": self.stats["fallback_used"],
+            # Rows settled by the rule-based router without an API call
+            "local_routed": self.stats["local_routed"],
+            "local_routed_rate": (
+                self.stats["local_routed"] / self.stats["total_processed"]
+                if self.stats["total_processed"] > 0
+                else 0
+            ),
             "gemini_success_rate": (
                 self.stats["gemini_success"] / self.stats["total_processed"]
                 if self.stats["total_processed"] > 0
@@ -1341,12 +3358,102 @@ Return ONLY the JSON array with your improved parse.
                 self.stats["total_processed"] / duration if duration > 0 else 0
             ),
             "cache_hits": self.stats.get("cache_hits", 0),
+            # Cache lookups happen per unique name, not per row
             "cache_hit_rate": (
-                self.stats.get("cache_hits", 0) / self.stats["total_processed"]
+                self.stats.get("cache_hits", 0) / self.stats["unique_names"]
+                if self.stats.get("unique_names", 0) > 0
+                else 0
+            ),
+            "batches_enqueued": self.stats.get("batches_enqueued", 0),
+            # Low-confidence retry phase
+            "retry_stats": {
+                "attempts": self.stats["retry_attempts"],
+                "improved": self.stats["retry_success"],
+                "no_improvement": self.stats["retry_no_improvement"],
+                "failed": self.stats["retry_failed"],
+                "batches": self.stats["retry_batches"],
+                "budget_skipped": self.stats["retry_budget_skipped"],
+            },
+            # Per-process circuit breaker (None when disabled)
+            "circuit_breaker": (
+                {
+                    **self.circuit_breaker.snapshot(),
+                    "short_circuited_names": self.stats["breaker_short_circuited"],
+                }
+                if self.circuit_breaker is not None
+                else None
+            ),
+            # Model cascade tier settings ({} when GEMINI_CASCADE is off)
+            "cascade": {
+                tier.value: str(config) for tier, config in self.tier_configs.items()
+            },
+            # Process-pool engine for whole-call rule-based parsing
+            "fallback_pool": get_fallback_pool().snapshot(),
+            # LRU memo of rule-based parses in this process (pool processes
+            # keep their own)
+            "fallback_memo": get_fallback_parser().memo_snapshot(),
+            # First-name gender index (process-wide counters)
+            "gender_index": {
+                "local_gender": self.local_gender,
+                **get_gender_index().snapshot(),
+            },
+            # Process-wide counters (per-job figures are everything else here)
+            "process": self.get_process_stats(),
+            # Thinking tokens per name and, with thinking control, per level
+            "thinking": {
+                "control": self.thinking_control,
+                "max_escalations": self.thinking_max_escalations,
+                "thoughts_tokens_per_name": (
+                    self.stats["thoughts_tokens"] / self.stats["prompt_names"]
+                    if self.stats["prompt_names"]
+                    else 0
+                ),
+                "escalations": self.stats["thinking_escalations"],
+                "escalated_names": self.stats["thinking_escalated_names"],
+                "escalation_recovered": self.stats["thinking_escalation_recovered"],
+                "by_level": {
+                    level: {
+                        **stats,
+                        "thoughts_tokens_per_name": (
+                            stats["thoughts_tokens"] / stats["names"]
+                            if stats["names"]
+                            else 0
+                        ),
+                        "avg_latency_seconds": (
+                            stats["latency_seconds"] / stats["requests"]
+                            if stats["requests"]
+                            else 0
+                        ),
+                    }
+                    for level, stats in sorted(
+                        self.stats["thinking_by_level"].items()
+                    )
+                },
+            },
+            # Batch latency (first request to first good answer) and hedging
+            "batch_latency": self.hedge_policy.snapshot(),
+            # Split-and-retry of failed batches, per bisection depth
+            "split_stats": {
+                "batches": self.stats["split_batches"],
+                "budget_skipped": self.stats["split_budget_skipped"],
+                "by_depth": {
+                    depth: {
+                        **level,
+                        "fallback_rate": (
+                            level["fallback"] / (level["recovered"] + level["fallback"])
+                            if level["recovered"] + level["fallback"]
+                            else 0
+                        ),
+                    }
+                    for depth, level in sorted(self.stats["split_by_depth"].items())
+                },
+            },
+            "unique_names": self.stats.get("unique_names", 0),
+            "dedup_ratio": (
+                1 - self.stats.get("unique_names", 0) / self.stats["total_processed"]
                 if self.stats["total_processed"] > 0
                 else 0
             ),
-            "concurrent_batches": self.stats.get("concurrent_batches", 0),
             "total_api_calls": self.stats["api_calls"],
             "total_tokens": self.stats["total_tokens"],
             "estimated_cost": self.stats["total_tokens"]
@@ -1356,6 +3463,57 @@ Return ONLY the JSON array with your improved parse.
             "cost_savings_from_cache": self.stats.get("cache_hits", 0)
             * 400
             * 0.0000001,  # Approx savings
+            # Learned batch size / output budget for this model
+            "adaptive_batching": (
+                self.batch_controller.snapshot()
+                if self.batch_controller is not None
+                else {}
+            ),
+            # Response decoding: unparseable responses, records left out,
+            # and what was kept from truncated responses
+            "response_stats": {
+                "parse_errors": self.stats["response_parse_errors"],
+                "records_missing": self.stats["response_records_missing"],
+                "salvaged_records": self.stats["salvaged_records"],
+                "salvage_followups": self.stats["salvage_followups"],
+                "salvage_tokens_saved": self.stats["salvage_tokens_saved"],
+            },
+            "streaming": {
+                "enabled": self.streaming,
+                "requests": self.stats["stream_requests"],
+                "stalls": self.stats["stream_stalls"],
+                "avg_first_record_seconds": (
+                    self.stats["stream_first_record_seconds"]
+                    / self.stats["stream_first_records"]
+                    if self.stats["stream_first_records"]
+                    else 0
+                ),
+            },
+            # Input tokens per name: observed, minus cached tokens, and an
+            # estimate (chars / 4) of what inline prompts would have sent
+            "prompt_stats": {
+                **self.prompt_context.snapshot(),
+                "input_tokens_per_name": (
+                    self.stats["prompt_tokens"] / self.stats["prompt_names"]
+                    if self.stats["prompt_names"]
+                    else 0
+                ),
+                "uncached_input_tokens_per_name": (
+                    (self.stats["prompt_tokens"] - self.stats["cached_prompt_tokens"])
+                    / self.stats["prompt_names"]
+                    if self.stats["prompt_names"]
+                    else 0
+                ),
+                "inline_input_tokens_per_name_estimate": (
+                    self.stats["inline_prompt_chars"] / 4 / self.stats["prompt_names"]
+                    if self.stats["prompt_names"]
+                    else 0
+                ),
+            },
+            # Process-level cluster quota limiter counters
+            "rate_limiter": self.rate_limiter.snapshot(),
+            # Process-level tiered cache counters (L1 LRU + L2 Redis)
+            "name_cache": self.cache.get_stats() if self.cache is not None else {},
         }
 
 
@@ -0,0 +1,269 @@
+"""
+Local first-name -> gender index
+
+A person's gender is largely a function of the extracted first name, so with
+GEMINI_LOCAL_GENDER on the service stops asking Gemini for gender and
+gender_confidence (output and thinking tokens on every record) and fills them
+from this index after parsing. A first name's female probability comes from,
+in order:
+
+- counts learned from Gemini results: person records Gemini labelled male or
+  female with gender_confidence >= LEARN_MIN_CONFIDENCE, once a name has
+  MIN_OBSERVATIONS of them. Counts are collected while the prompt still asks
+  for gender and are persisted in a Redis hash (when available): worker
+  processes add their labels with HINCRBY, in batches, so none are lost to
+  a concurrent write. A process loads the counts once, and takes the
+  cluster-wide totals of the names it writes from the HINCRBY replies
+- the name lexicon's female probability (SSA first-name data, when built;
+  see name_lexicon.py)
+- the bundled table app/data/first_name_genders.csv
+
+Names whose probability is too close to even, and names found nowhere, stay
+"unknown" with confidence 0.0.
+"""
+
+import csv
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import structlog
+
+from .name_lexicon import NameLexicon, get_name_lexicon
+from .name_result_cache import RedisResultStore
+
+logger = structlog.get_logger()
+
+BUNDLED_TABLE_PATH = (
+    Path(__file__).resolve().parents[1] / "data" / "first_name_genders.csv"
+)
+
+
+def load_bundled_table(path: Path = BUNDLED_TABLE_PATH) -> Dict[str, float]:
+    """lowercased first name -> female probability ("#" lines are comments)"""
+    with open(path, newline="", encoding="utf-8") as handle:
+        rows = csv.DictReader(line for line in handle if not line.startswith("#"))
+        return {
+            row["name"].strip().lower(): float(row["female_probability"])
+            for row in rows
+        }
+
+
+def first_name_key(first_name: str) -> str:
+    """Lookup key for a parsed first name ("" for initials and blanks)"""
+    words = first_name.split()
+    key = words[0].strip(".,").lower() if words else ""
+    return key if len(key) > 1 and key.isalpha() else ""
+
+
+class GenderIndex:
+    """First name -> female probability, for filling gender locally"""
+
+    # A name is labelled only if the likelier gender has at least this share
+    MIN_CONFIDENCE = 0.7
+    # Gemini results worth learning from, and how many a name needs
+    LEARN_MIN_CONFIDENCE = 0.85
+    MIN_OBSERVATIONS = 3
+    # Learned names kept per process (new names are ignored beyond this)
+    MAX_LEARNED_NAMES = 50000
+    # New labels are written once this many are pending, or this long after
+    # the last write
+    FLUSH_LABELS = 1000
+    FLUSH_SECONDS = 60.0
+
+    def __init__(
+        self,
+        bundled: Dict[str, float],
+        lexicon: Optional[NameLexicon] = None,
+        store: Optional[RedisResultStore] = None,
+    ):
+        self.bundled = bundled
+        self.lexicon = lexicon
+        # name -> [female, male] high-confidence Gemini labels
+        self.learned: Dict[str, List[int]] = {}
+        # Labels not yet added to the persisted counts
+        self._pending: Dict[str, List[int]] = {}
+        self._pending_labels = 0
+        self._last_flush = time.monotonic()
+
+        self.store = store
+        self._loaded = store is None
+
+        self.stats = {
+            "filled": 0,
+            "unknown": 0,
+            "observed": 0,
+            "from_learned": 0,
+            "from_lexicon": 0,
+            "from_bundled": 0,
+        }
+
+    @property
+    def store_key(self) -> str:
+        return "gender_index:counts"
+
+    def female_probability(self, first_name: str) -> Optional[float]:
+        """Female probability for a first name, or None if unknown"""
+        probability, _ = self._lookup(first_name_key(first_name))
+        return probability
+
+    def _lookup(self, key: str) -> Tuple[Optional[float], str]:
+        """(female probability or None, source)"""
+        if not key:
+            return None, ""
+        counts = self.learned.get(key)
+        if counts is not None and sum(counts) >= self.MIN_OBSERVATIONS:
+            return counts[0] / sum(counts), "learned"
+        if self.lexicon is not None:
+            probability = self.lexicon.female_probability(key)
+            if probability is not None:
+                return probability, "lexicon"
+        probability = self.bundled.get(key)
+        if probability is not None:
+            return probability, "bundled"
+        return None, ""
+
+    def infer(self, first_name: str) -> Tuple[str, float]:
+        """(gender, gender_confidence) for a person's first name"""
+        probability, source = self._lookup(first_name_key(first_name))
+        if probability is None:
+            self.stats["unknown"] += 1
+            return "unknown", 0.0
+        confidence = max(probability, 1.0 - probability)
+        if confidence < self.MIN_CONFIDENCE:
+            self.stats["unknown"] += 1
+            return "unknown", 0.0
+        self.stats["filled"] += 1
+        self.stats[f"from_{source}"] += 1
+        return (
+            "female" if probability >= 0.5 else "male",
+            round(confidence, 2),
+        )
+
+    def observe(self, first_name: str, gender: str, confidence: float) -> None:
+        """Count a Gemini gender label for a person's first name"""
+        key = first_name_key(first_name)
+        if (
+            not key
+            or gender not in ("female", "male")
+            or confidence < self.LEARN_MIN_CONFIDENCE
+        ):
+            return
+        if key not in self.learned and len(self.learned) >= self.MAX_LEARNED_NAMES:
+            return
+        column = 0 if gender == "female" else 1
+        self.learned.setdefault(key, [0, 0])[column] += 1
+        self._pending.setdefault(key, [0, 0])[column] += 1
+        self._pending_labels += 1
+        self.stats["observed"] += 1
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _field(name: str, column: int) -> str:
+        """Hash field for a name's female (0) or male (1) count"""
+        return f"{name}:{'fm'[column]}"
+
+    def _set_count(self, field: str, value: int) -> None:
+        name, _, column = field.rpartition(":")
+        if name and column in ("f", "m"):
+            self.learned.setdefault(name, [0, 0])["fm".index(column)] = value
+
+    def apply_counts(self, fields: Dict[str, Any]) -> None:
+        """Take the persisted counts, keeping labels not yet persisted"""
+        self.learned = {}
+        for field, value in fields.items():
+            self._set_count(field, int(value))
+        for name, (female, male) in self._pending.items():
+            counts = self.learned.setdefault(name, [0, 0])
+            counts[0] += female
+            counts[1] += male
+
+    async def ensure_loaded(self) -> None:
+        """Load persisted counts once per process"""
+        if self._loaded:
+            return
+        self._loaded = True
+        fields = await self.store.get_hash(self.store_key)
+        if fields:
+            self.apply_counts(fields)
+            logger.info("gender_index_loaded", learned_names=len(self.learned))
+
+    async def persist(self, force: bool = False) -> None:
+        """
+        Add this process's new labels to the persisted counts, once
+        FLUSH_LABELS are pending or FLUSH_SECONDS have passed (any time with
+        force)
+        """
+        if self.store is None or not self._pending:
+            return
+        if (
+            not force
+            and self._pending_labels < self.FLUSH_LABELS
+            and time.monotonic() - self._last_flush < self.FLUSH_SECONDS
+        ):
+            return
+        pending, self._pending, self._pending_labels = self._pending, {}, 0
+        self._last_flush = time.monotonic()
+        # Both fields of every name (a 0 increment reads the other worker's)
+        increments = {
+            self._field(name, column): count
+            for name, counts in pending.items()
+            for column, count in enumerate(counts)
+        }
+        totals = await self.store.increment_hash(self.store_key, increments)
+        if totals is None:
+            # Store unavailable: keep the labels for the next write
+            for name, (female, male) in pending.items():
+                counts = self._pending.setdefault(name, [0, 0])
+                counts[0] += female
+                counts[1] += male
+                self._pending_labels += female + male
+            return
+        # Cluster-wide totals, including other workers' labels
+        for field, total in zip(increments, totals):
+            self._set_count(field, total)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current values for performance stats"""
+        return {
+            "bundled_names": len(self.bundled),
+            "lexicon": self.lexicon is not None,
+            "learned_names": sum(
+                1
+                for counts in self.learned.values()
+                if sum(counts) >= self.MIN_OBSERVATIONS
+            ),
+            "pending_labels": self._pending_labels,
+            **self.stats,
+        }
+
+
+_gender_index: Optional[GenderIndex] = None
+
+
+def get_gender_index() -> GenderIndex:
+    """Get or create the process-wide gender index"""
+    global _gender_index
+    if _gender_index is None:
+        store = None
+        if os.getenv("GEMINI_GENDER_PERSIST", "true").lower() == "true":
+            try:
+                import redis.asyncio  # noqa: F401
+
+                store = RedisResultStore(
+                    redis_url=os.getenv("REDIS_URL", "redis://localhost:6379/0"),
+                    ttl_seconds=90 * 24 * 3600,
+                )
+            except ImportError:
+                logger.warning(
+                    "gender_index_persist_disabled", reason="redis not installed"
+                )
+
+        _gender_index = GenderIndex(
+            load_bundled_table(), lexicon=get_name_lexicon(), store=store
+        )
+    return _gender_index
@@ -0,0 +1,211 @@
+"""
+Memory-mapped first-name and surname frequency lexicon
+
+Large census-style frequency tables (SSA first names by sex, Census surnames)
+are too big to keep as Python sets in every worker process. They are compiled
+once by scripts/build_name_lexicon.py into one binary file:
+
+- a header: magic, then per table (first names, surnames) the entry
+  count, the key width and the offsets of its arrays
+- per table, the lowercased UTF-8 names as fixed-width null-padded keys in
+  byte order, then float32 frequencies (occurrences per million) and, for
+  first names, float32 female probabilities (NaN when the sex is unknown)
+
+The file is opened with mmap and read through numpy views, so opening it
+costs no parsing, worker processes share the same page-cache pages, and a
+lookup is a binary search (numpy searchsorted, O(log n)) over the keys.
+
+Without a lexicon file (NAME_LEXICON_PATH, default app/data/name_lexicon.bin)
+the fallback parser scores names with its built-in tables only.
+"""
+
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import structlog
+
+logger = structlog.get_logger()
+
+MAGIC = b"TFNAMLX1"
+TABLES = ("first", "last")
+# Per table: entry count, key width, names / frequency / female offsets
+_TABLE_HEADER = struct.Struct("<IIQQQ")
+HEADER_SIZE = len(MAGIC) + len(TABLES) * _TABLE_HEADER.size
+
+# Names (fixed-width keys), frequencies, female probabilities (first names)
+_Table = Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]
+
+DEFAULT_LEXICON_PATH = (
+    Path(__file__).resolve().parents[1] / "data" / "name_lexicon.bin"
+)
+
+
+class NameLexicon:
+    """Read-only, memory-mapped frequency tables for first names and surnames"""
+
+    # Looked-up names kept per process; the cache is dropped when it fills up
+    CACHE_SIZE = 50000
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as handle:
+            self._mmap = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[: len(MAGIC)] != MAGIC:
+            self._mmap.close()
+            raise ValueError(f"{self.path} is not a name lexicon")
+
+        self._tables: Dict[str, _Table] = {}
+        for index, table in enumerate(TABLES):
+            count, width, names_at, freq_at, female_at = _TABLE_HEADER.unpack_from(
+                self._mmap, len(MAGIC) + index * _TABLE_HEADER.size
+            )
+            names = np.frombuffer(
+                self._mmap, dtype=f"S{max(width, 1)}", count=count, offset=names_at
+            )
+            frequencies = np.frombuffer(
+                self._mmap, dtype="<f4", count=count, offset=freq_at
+            )
+            female = (
+                np.frombuffer(self._mmap, dtype="<f4", count=count, offset=female_at)
+                if female_at
+                else None
+            )
+            self._tables[table] = (names, frequencies, female)
+        self._cache: Dict[Tuple[str, str], int] = {}
+
+    def __len__(self) -> int:
+        return sum(len(names) for names, _, _ in self._tables.values())
+
+    def _index(self, table: str, name_lower: str) -> int:
+        """Row of name_lower in table, or -1"""
+        key = (table, name_lower)
+        index = self._cache.get(key)
+        if index is None:
+            names = self._tables[table][0]
+            encoded = name_lower.encode("utf-8")
+            index = -1
+            if encoded and len(encoded) <= names.itemsize:
+                row = int(names.searchsorted(encoded))
+                if row < len(names) and names[row] == encoded:
+                    index = row
+            if len(self._cache) >= self.CACHE_SIZE:
+                self._cache.clear()
+            self._cache[key] = index
+        return index
+
+    def first_name_frequency(self, name_lower: str) -> float:
+        """Occurrences per million first names (0.0 if not listed)"""
+        index = self._index("first", name_lower)
+        return float(self._tables["first"][1][index]) if index >= 0 else 0.0
+
+    def last_name_frequency(self, name_lower: str) -> float:
+        """Occurrences per million surnames (0.0 if not listed)"""
+        index = self._index("last", name_lower)
+        return float(self._tables["last"][1][index]) if index >= 0 else 0.0
+
+    def female_probability(self, name_lower: str) -> Optional[float]:
+        """Share of female bearers of a first name (None if unknown)"""
+        female = self._tables["first"][2]
+        index = self._index("first", name_lower)
+        if female is None or index < 0:
+            return None
+        probability = float(female[index])
+        return None if probability != probability else probability  # NaN
+
+    def close(self) -> None:
+        self._tables.clear()
+        self._cache.clear()
+        self._mmap.close()
+
+
+def write_lexicon(
+    path: Path,
+    first_names: Dict[str, Tuple[float, Optional[float]]],
+    surnames: Dict[str, float],
+) -> int:
+    """
+    Write a lexicon file
+
+    Args:
+        path: Output file
+        first_names: lowercased name -> (per-million frequency, female
+            probability or None)
+        surnames: lowercased name -> per-million frequency
+
+    Returns:
+        Size of the file in bytes
+    """
+    tables = {
+        "first": dict(first_names),
+        "last": {name: (frequency, None) for name, frequency in surnames.items()},
+    }
+    headers, blobs = [], []
+    offset = HEADER_SIZE
+    for table in TABLES:
+        entries = sorted(
+            (name.encode("utf-8"), values) for name, values in tables[table].items()
+        )
+        width = max((len(key) for key, _ in entries), default=1)
+        names = np.array([key for key, _ in entries], dtype=f"S{width}")
+        frequencies = np.array([values[0] for _, values in entries], dtype="<f4")
+        arrays = [names.tobytes(), frequencies.tobytes()]
+        if table == "first":
+            female = [values[1] for _, values in entries]
+            arrays.append(
+                np.array(
+                    [np.nan if p is None else p for p in female], dtype="<f4"
+                ).tobytes()
+            )
+
+        # Arrays start on 8-byte boundaries
+        array_offsets = []
+        for array in arrays:
+            padding = -offset % 8
+            blobs.append(b"\0" * padding + array)
+            array_offsets.append(offset + padding)
+            offset += padding + len(array)
+        female_at = array_offsets[2] if table == "first" else 0
+        headers.append(
+            _TABLE_HEADER.pack(
+                len(entries), width, array_offsets[0], array_offsets[1], female_at
+            )
+        )
+
+    header = MAGIC + b"".join(headers)
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, "wb") as handle:
+        handle.write(header)
+        for blob in blobs:
+            handle.write(blob)
+    # Replace atomically: running workers keep their mapping of the old file
+    os.replace(tmp_path, path)
+    return offset
+
+
+_lexicon: Optional[NameLexicon] = None
+_lexicon_loaded = False
+
+
+def get_name_lexicon() -> Optional[NameLexicon]:
+    """The process's lexicon, or None if no lexicon file is available"""
+    global _lexicon, _lexicon_loaded
+    if not _lexicon_loaded:
+        _lexicon_loaded = True
+        path = Path(os.getenv("NAME_LEXICON_PATH") or DEFAULT_LEXICON_PATH)
+        if path.exists():
+            try:
+                _lexicon = NameLexicon(path)
+                logger.info(
+                    "name_lexicon_loaded", path=str(path), names=len(_lexicon)
+                )
+            except (OSError, ValueError, struct.error) as e:
+                logger.warning(
+                    "name_lexicon_unavailable", path=str(path), error=str(e)
+                )
+    return _lexicon
@@ -0,0 +1,383 @@
+"""
+Tiered name-result cache for the Gemini parsing pipeline
+
+L1 is an in-process LRU bounded by entry count and approximate memory. It lives
+at module level, so every ConsolidatedGeminiService created in a worker process
+shares it across jobs.
+
+L2 is Redis, shared by every worker. It is optional: if Redis is unreachable the
+cache degrades to L1 only and retries the connection after a cool-down.
+
+Keys combine the normalized name, the model name and a hash of the prompt
+template, so switching models or editing the prompt never serves stale parses.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import structlog
+
+logger = structlog.get_logger()
+
+
+def normalize_name_key(name: str) -> str:
+    """Normalize name text for cache lookups (case and whitespace insensitive)"""
+    if not name:
+        return ""
+    return " ".join(name.lower().split())
+
+
+def prompt_version_hash(template: str) -> str:
+    """Short stable hash identifying a prompt template version"""
+    return hashlib.sha256(template.encode("utf-8")).hexdigest()[:12]
+
+
+class LRUResultCache:
+    """Thread-safe LRU cache with TTL, entry-count and memory bounds"""
+
+    # Rough per-entry overhead of the OrderedDict slot, tuple and dict objects
+    ENTRY_OVERHEAD_BYTES = 400
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl_seconds: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+
+        # key -> (expires_at, payload, size_bytes)
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any], int]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.RLock()
+        self.current_bytes = 0
+
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+        }
+
+    def _estimate_size(self, key: str, payload: Dict[str, Any]) -> int:
+        """Approximate memory footprint of one entry"""
+        size = self.ENTRY_OVERHEAD_BYTES + len(key)
+        for value in payload.values():
+            size += len(str(value))
+        return size
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return payload for key, or None if missing/expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+
+            expires_at, payload, size = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                self.current_bytes -= size
+                self.stats["expirations"] += 1
+                self.stats["misses"] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return payload
+
+    def put(self, key: str, payload: Dict[str, Any]) -> None:
+        """Insert or refresh an entry, evicting least recently used entries"""
+        size = self._estimate_size(key, payload)
+        with self._lock:
+            existing = self._entries.pop(key, None)
+            if existing is not None:
+                self.current_bytes -= existing[2]
+
+            self._entries[key] = (time.time() + self.ttl_seconds, payload, size)
+            self.current_bytes += size
+
+            while self._entries and (
+                len(self._entries) > self.max_entries
+                or self.current_bytes > self.max_bytes
+            ):
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.stats["evictions"] += 1
+
+    def clear(self) -> None:
+        """Drop all entries"""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisResultStore:
+    """Redis-backed L2 store shared by all worker processes"""
+
+    def __init__(self, redis_url: str, ttl_seconds: int, retry_after: float = 60.0):
+        self.redis_url = redis_url
+        self.ttl_seconds = ttl_seconds
+        self.retry_after = retry_after
+
+        # redis.asyncio clients are bound to the event loop that created
+        # them: one client per loop, since worker threads may run loops of
+        # their own at the same time
+        self._clients: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+        self._clients_lock = threading.Lock()
+        self._disabled_until = 0.0
+
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "writes": 0,
+            "errors": 0,
+        }
+
+    @property
+    def available(self) -> bool:
+        return time.time() >= self._disabled_until
+
+    def _get_client(self):
+        """Get a client bound to the running event loop"""
+        loop = asyncio.get_running_loop()
+        with self._clients_lock:
+            client = self._clients.get(loop)
+            if client is None:
+                import redis.asyncio as aioredis
+
+                client = aioredis.from_url(
+                    self.redis_url,
+                    decode_responses=True,
+                    socket_connect_timeout=0.5,
+                    socket_timeout=1.0,
+                )
+                self._clients[loop] = client
+        return client
+
+    def _mark_unavailable(self, error: Exception) -> None:
+        self.stats["errors"] += 1
+        self._disabled_until = time.time() + self.retry_after
+        with self._clients_lock:
+            self._clients.clear()
+        logger.warning(
+            "name_cache_l2_unavailable",
+            error=str(error),
+            retry_after_seconds=self.retry_after,
+        )
+
+    async def get_many(self, keys: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """Fetch payloads for keys; missing or failed lookups return None"""
+        if not keys or not self.available:
+            return [None] * len(keys)
+
+        try:
+            raw_values = await self._get_client().mget(keys)
+        except Exception as e:
+            self._mark_unavailable(e)
+            return [None] * len(keys)
+
+        results = []
+        for raw in raw_values:
+            if raw is None:
+                self.stats["misses"] += 1
+                results.append(None)
+                continue
+            try:
+                results.append(json.loads(raw))
+                self.stats["hits"] += 1
+            except json.JSONDecodeError:
+                self.stats["misses"] += 1
+                results.append(None)
+        return results
+
+    async def put_many(self, items: List[Tuple[str, Dict[str, Any]]]) -> None:
+        """Store payloads with TTL in a single pipeline round trip"""
+        if not items or not self.available:
+            return
+
+        try:
+            pipe = self._get_client().pipeline(transaction=False)
+            for key, payload in items:
+                pipe.setex(key, self.ttl_seconds, json.dumps(payload))
+            await pipe.execute()
+            self.stats["writes"] += len(items)
+        except Exception as e:
+            self._mark_unavailable(e)
+
+    async def get_hash(self, key: str) -> Optional[Dict[str, str]]:
+        """All fields of a hash; None if it is missing or the lookup failed"""
+        if not self.available:
+            return None
+
+        try:
+            fields = await self._get_client().hgetall(key)
+        except Exception as e:
+            self._mark_unavailable(e)
+            return None
+        return fields or None
+
+    async def increment_hash(
+        self, key: str, increments: Dict[str, int]
+    ) -> Optional[List[int]]:
+        """
+        HINCRBY each field and refresh the TTL in a single pipeline round
+        trip. Returns the new values in order, or None if the write failed.
+        """
+        if not increments or not self.available:
+            return None
+
+        try:
+            pipe = self._get_client().pipeline(transaction=False)
+            for field, amount in increments.items():
+                pipe.hincrby(key, field, amount)
+            pipe.expire(key, self.ttl_seconds)
+            replies = await pipe.execute()
+        except Exception as e:
+            self._mark_unavailable(e)
+            return None
+        self.stats["writes"] += len(increments)
+        return [int(value) for value in replies[:-1]]
+
+
+class TieredNameCache:
+    """
+    L1 (process LRU) + L2 (Redis) cache for parsed names.
+
+    Payloads are plain dicts; callers build fresh result objects from them so
+    a mutation on one job's result never leaks into the shared cache.
+    """
+
+    KEY_PREFIX = "name_cache"
+
+    def __init__(
+        self,
+        l1: LRUResultCache,
+        l2: Optional[RedisResultStore] = None,
+    ):
+        self.l1 = l1
+        self.l2 = l2
+
+    def make_key(self, name: str, model_name: str, prompt_version: str) -> str:
+        """Build cache key from normalized name, model and prompt version"""
+        digest = hashlib.sha1(normalize_name_key(name).encode("utf-8")).hexdigest()
+        return f"{self.KEY_PREFIX}:{model_name}:{prompt_version}:{digest}"
+
+    async def get_many(
+        self, names: List[str], model_name: str, prompt_version: str
+    ) -> Dict[int, Dict[str, Any]]:
+        """
+        Look up names, L1 first then L2.
+
+        Returns:
+            Mapping of input index -> cached payload for every hit
+        """
+        hits: Dict[int, Dict[str, Any]] = {}
+        l2_pending: List[Tuple[int, str]] = []
+
+        for i, name in enumerate(names):
+            key = self.make_key(name, model_name, prompt_version)
+            payload = self.l1.get(key)
+            if payload is not None:
+                hits[i] = payload
+            else:
+                l2_pending.append((i, key))
+
+        if self.l2 is not None and l2_pending:
+            payloads = await self.l2.get_many([key for _, key in l2_pending])
+            for (i, key), payload in zip(l2_pending, payloads):
+                if payload is not None:
+                    hits[i] = payload
+                    # Promote to L1 so the next job in this process skips Redis
+                    self.l1.put(key, payload)
+
+        return hits
+
+    async def put_many(
+        self,
+        items: Iterable[Tuple[str, Dict[str, Any]]],
+        model_name: str,
+        prompt_version: str,
+    ) -> None:
+        """Write (name, payload) pairs to both tiers"""
+        keyed = [
+            (self.make_key(name, model_name, prompt_version), payload)
+            for name, payload in items
+        ]
+        for key, payload in keyed:
+            self.l1.put(key, payload)
+
+        if self.l2 is not None:
+            await self.l2.put_many(keyed)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Process-level cache counters"""
+        stats = {
+            "l1_size": len(self.l1),
+            "l1_max_entries": self.l1.max_entries,
+            "l1_memory_bytes": self.l1.current_bytes,
+            "l1_max_memory_bytes": self.l1.max_bytes,
+            "l1_hits": self.l1.stats["hits"],
+            "l1_misses": self.l1.stats["misses"],
+            "l1_evictions": self.l1.stats["evictions"],
+            "l1_expirations": self.l1.stats["expirations"],
+            "ttl_seconds": self.l1.ttl_seconds,
+            "l2_enabled": self.l2 is not None,
+        }
+        if self.l2 is not None:
+            stats.update(
+                {
+                    "l2_available": self.l2.available,
+                    "l2_hits": self.l2.stats["hits"],
+                    "l2_misses": self.l2.stats["misses"],
+                    "l2_writes": self.l2.stats["writes"],
+                    "l2_errors": self.l2.stats["errors"],
+                }
+            )
+        return stats
+
+
+# Global instance for reuse across jobs in the same worker process
+_name_result_cache = None
+
+
+def get_name_result_cache() -> TieredNameCache:
+    """Get or create the process-wide tiered name cache"""
+    global _name_result_cache
+    if _name_result_cache is None:
+        ttl_seconds = int(os.getenv("NAME_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+        l1 = LRUResultCache(
+            max_entries=int(os.getenv("NAME_CACHE_MAX_ENTRIES", "200000")),
+            max_bytes=int(os.getenv("NAME_CACHE_MAX_MB", "128")) * 1024 * 1024,
+            ttl_seconds=ttl_seconds,
+        )
+
+        l2 = None
+        if os.getenv("NAME_CACHE_L2_ENABLED", "true").lower() == "true":
+            try:
+                import redis.asyncio  # noqa: F401
+
+                l2 = RedisResultStore(
+                    redis_url=os.getenv("REDIS_URL", "redis://localhost:6379/0"),
+                    ttl_seconds=ttl_seconds,
+                )
+            except ImportError:
+                logger.warning("name_cache_l2_disabled", reason="redis not installed")
+
+        _name_result_cache = TieredNameCache(l1, l2)
+        logger.info(
+            "name_cache_initialized",
+            l1_max_entries=l1.max_entries,
+            l1_max_bytes=l1.max_bytes,
+            ttl_seconds=ttl_seconds,
+            l2_enabled=l2 is not None,
+        )
+    return _name_result_cache
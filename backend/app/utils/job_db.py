@@ -125,6 +125,16 @@ def update_job_status(
                         "fallback_usage_count": processing_results.get(
                             "fallback_stats", {}
                         ).get("fallback_used", 0),
+                        "local_routed_count": processing_results.get(
+                            "routing_stats", {}
+                        ).get("local_routed", 0),
+                        "local_routed_rate": processing_results.get(
+                            "routing_stats", {}
+                        ).get("local_routed_rate", 0.0),
+                        "memory_peak_growth_mb": processing_results.get(
+                            "memory_peak_growth_mb"
+                        ),
+                        "streaming": processing_results.get("streaming"),
                     }
                     job.error_details = analytics  # Repurposing for analytics storage
 
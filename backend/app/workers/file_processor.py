@@ -7,20 +7,27 @@ Features:
 - Concurrent processing with cost optimization
 - Smart payload filtering (only name/addressee data sent to API)
 - Proper column ordering (processed columns FIRST, original columns LAST)
+- Opt-in streaming mode for large files (chunked read, parse and write)
+- One event loop, HTTP session and service per worker process, reused by
+  every task (WORKER_PERSISTENT_RUNTIME)
 """
 
 import asyncio
+import codecs
 import os
+import threading
 import time
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 import pandas as pd
 import redis
 import structlog
+from celery.signals import worker_process_init, worker_process_shutdown
 
 from app.core.celery_app import celery_app
 from app.models.job import JobStatus
+from app.services.fallback_pool import shutdown_fallback_pool
 from app.services.fallback_tracker import FallbackTracker
 from app.services.file_service import FileService
 from app.utils.file_utils import detect_encoding, validate_file
@@ -44,6 +51,77 @@ except ImportError as e:
     ConsolidatedGeminiService = None
 
 
+def get_process_rss_mb() -> Optional[float]:
+    """Current resident set size of this process in MB (None without procfs)"""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class JobMemoryTracker:
+    """
+    Peak resident memory one job added to this worker process
+
+    Reports the peak RSS while the job ran minus the RSS when it started, so
+    memory a persistent worker kept from earlier jobs does not count. On
+    Linux the kernel's high-water mark (VmHWM) is reset when the job starts
+    (/proc/self/clear_refs) and read at the end, which includes peaks inside
+    parse_names_batch. Where the reset is not permitted, the peak is the
+    largest RSS seen by sample(). Pool processes are not included.
+    """
+
+    def __init__(self):
+        self.start_mb = get_process_rss_mb()
+        self.peak_mb = self.start_mb
+        try:
+            with open("/proc/self/clear_refs", "w") as f:
+                f.write("5")  # reset VmHWM to the current RSS
+            self._kernel_peak = True
+        except OSError:
+            self._kernel_peak = False
+
+    def sample(self) -> None:
+        rss_mb = get_process_rss_mb()
+        if rss_mb is not None and self.peak_mb is not None:
+            self.peak_mb = max(self.peak_mb, rss_mb)
+
+    def _read_kernel_peak(self) -> None:
+        try:
+            with open("/proc/self/status") as f:
+                for line in f:
+                    if line.startswith("VmHWM:"):
+                        self.peak_mb = max(self.peak_mb, int(line.split()[1]) / 1024)
+                        return
+        except (OSError, ValueError, IndexError):
+            pass
+
+    def peak_growth_mb(self) -> Optional[float]:
+        """Peak RSS during the job minus RSS at its start (None if unknown)"""
+        if self.start_mb is None:
+            return None
+        self.sample()
+        if self._kernel_peak:
+            self._read_kernel_peak()
+        return max(self.peak_mb - self.start_mb, 0.0)
+
+
+def _excel_cell(value: Any) -> Any:
+    """Convert a DataFrame value to something openpyxl can write"""
+    if value is None:
+        return None
+    if isinstance(value, float) and value != value:
+        return None
+    if isinstance(value, (list, dict, tuple, set)):
+        return str(value)
+    if hasattr(value, "item"):
+        # numpy scalar -> python scalar
+        return value.item()
+    return value
+
+
 class OptimizedFileProcessorService:
     """High-performance file processing service with intelligent optimizations"""
 
@@ -51,6 +129,9 @@ class OptimizedFileProcessorService:
     SKIP_COLUMN_WORDS = ["category", "type", "status", "class", "code"]
     NON_NAME_VALUES = ["other", "n/a", "unknown", "none", "null", ""]
 
+    # Block size for the CSV encoding/row-count scan
+    SCAN_BLOCK_BYTES = 1024 * 1024
+
     def __init__(self):
         # CRITICAL: Validate correct service is loaded with entity classification
         if ConsolidatedGeminiService is None:
@@ -89,67 +170,66 @@ class OptimizedFileProcessorService:
         self.chunk_size = 500  # Process in chunks for progress tracking
         self.enable_detailed_logging = True
 
+    # A whole-token match for tokens that are a single character once trailing
+    # "." / "," are stripped (middle initials like "A", "J.", "R,")
+    SINGLE_LETTER_TOKEN_PATTERN = r"(?<!\S)[^\s.,]?[.,]*(?!\S)"
+
     def extract_name_data_optimized(
         self, df: pd.DataFrame, name_columns: List[str]
     ) -> Tuple[List[str], List[int]]:
-        """Extract ONLY name/addressee text - never send full row data to API"""
-        name_texts = []
-        row_indices = []
-
-        for idx, row in df.iterrows():
-            # CRITICAL: Only extract name/addressee text for API calls
-            name_parts = []
-
-            # Extract from identified name columns
-            for col in name_columns:
-                if pd.notna(row[col]) and str(row[col]).strip():
-                    name_parts.append(str(row[col]).strip())
-
-            # Also check for 'addressee' columns (but be smart about what we include)
-            addressee_cols = [col for col in df.columns if "addressee" in col.lower()]
-            for col in addressee_cols:
-                # Skip if it's already in name_columns
-                if col in name_columns:
-                    continue
-
-                # Skip metadata columns like "Addressee Category", "Addressee Type", etc.
-                col_lower = col.lower()
-                if any(skip_word in col_lower for skip_word in self.SKIP_COLUMN_WORDS):
-                    continue
-
-                # Check if this column has actual name data
-                if pd.notna(row[col]) and str(row[col]).strip():
-                    value = str(row[col]).strip()
-                    # Skip non-name values
-                    if value.lower() in self.NON_NAME_VALUES:
-                        continue
-                    # If it looks like a name, add it
-                    name_parts.append(value)
-
-            # Combine name parts intelligently
-            combined_name = " ".join(name_parts).strip()
-
-            # CRITICAL: Remove "Other" if it somehow got into the combined name
-            combined_name = (
-                combined_name.replace(" Other", "").replace("Other ", "").strip()
-            )
+        """
+        Extract ONLY name/addressee text - never send full row data to API
+
+        Column-wise implementation: every step runs as a pandas string
+        operation over whole columns instead of iterating rows.
+        """
+        # Addressee columns to include (resolved once, not per row)
+        addressee_cols = [
+            col
+            for col in df.columns
+            if "addressee" in col.lower()
+            and col not in name_columns
+            and not any(skip in col.lower() for skip in self.SKIP_COLUMN_WORDS)
+        ]
 
-            # CRITICAL: Remove single letters from the name string before processing
-            # Split, filter out single letters, and rejoin
-            name_tokens = combined_name.split()
-            cleaned_tokens = [
-                token for token in name_tokens if len(token.rstrip(".,")) > 1
-            ]
-            combined_name = " ".join(cleaned_tokens).strip()
+        combined = pd.Series("", index=df.index, dtype=object)
 
-            if combined_name:
-                name_texts.append(combined_name)
-            else:
-                name_texts.append("")  # Empty name
+        for col in list(name_columns) + addressee_cols:
+            values = self._clean_name_column(df[col])
+
+            # Skip non-name values in addressee columns
+            if col not in name_columns:
+                is_non_name = values.str.lower().isin(self.NON_NAME_VALUES)
+                values = values.where(~is_non_name.to_numpy(), "")
+
+            # Join non-empty parts with a single space
+            both = (combined != "").to_numpy() & (values != "").to_numpy()
+            combined = (combined + " " + values).where(both, combined + values)
+
+        # CRITICAL: Remove "Other" if it somehow got into the combined name
+        combined = (
+            combined.str.replace(" Other", "", regex=False)
+            .str.replace("Other ", "", regex=False)
+            .str.strip()
+        )
+
+        # CRITICAL: Remove single letters (middle initials) and normalize spacing
+        combined = (
+            combined.str.replace(self.SINGLE_LETTER_TOKEN_PATTERN, "", regex=True)
+            .str.replace(r"\s+", " ", regex=True)
+            .str.strip()
+        )
 
-            row_indices.append(idx)
+        return combined.tolist(), df.index.tolist()
 
-        return name_texts, row_indices
+    @staticmethod
+    def _clean_name_column(column: pd.Series) -> pd.Series:
+        """Stringify and strip a column; missing values become empty strings"""
+        present = column.notna().to_numpy()
+        values = pd.Series("", index=column.index, dtype=object)
+        if present.any():
+            values[present] = column[present].map(str).str.strip().to_numpy()
+        return values
 
     async def process_file_optimized(
         self,
@@ -161,6 +241,20 @@ class OptimizedFileProcessorService:
         """Process file with maximum speed and cost efficiency"""
         start_time = time.time()
         logger.info("optimized_processing_started", job_id=job_id, file_path=file_path)
+        if self.batch_processor is not None:
+            # The service may be shared with earlier jobs of this worker
+            self.batch_processor.begin_job()
+
+        from app.api.files.schemas import ProcessingConfig
+
+        config = ProcessingConfig(**(parsing_config or {}))
+        if config.streaming_mode:
+            return await self.process_file_streaming(
+                job_id, file_path, user_id, parsing_config
+            )
+        local_routing_min_confidence = self._local_routing_threshold(config)
+
+        memory = JobMemoryTracker()
 
         try:
             # Update job status
@@ -171,6 +265,7 @@ class OptimizedFileProcessorService:
             df = await self._load_file_async(file_path)
             total_rows = len(df)
             logger.info("file_loaded", rows=total_rows)
+            memory.sample()
 
             # Validate row count
             from app.core.config import settings
@@ -210,142 +305,31 @@ class OptimizedFileProcessorService:
                 )
 
             batch_result = await self.batch_processor.parse_names_batch(
-                name_texts, progress_callback=progress_callback
+                name_texts,
+                progress_callback=progress_callback,
+                local_routing_min_confidence=local_routing_min_confidence,
             )
 
             set_job_progress_sync(job_id, 85)
 
             # Convert ParsedName objects to dictionaries for compatibility
-            result_dicts = []
-            for r in batch_result.results:
-                try:
-                    if hasattr(r, "to_dict") and callable(getattr(r, "to_dict")):
-                        result_dict = r.to_dict()
-                        # Ensure all required fields are present
-                        result_dict.setdefault("warnings", [])
-                        result_dict.setdefault("original_text", "")
-                        result_dicts.append(result_dict)
-                    elif hasattr(r, "__dict__"):
-                        # If it's a dataclass or similar object, convert to dict
-                        result_dict = {}
-                        for key in [
-                            "first_name",
-                            "last_name",
-                            "entity_type",
-                            "gender",
-                            "gender_confidence",
-                            "parsing_confidence",
-                            "parsing_method",
-                            "fallback_reason",
-                            "warnings",
-                            "original_text",
-                        ]:
-                            if key == "warnings":
-                                result_dict[key] = getattr(r, key, [])
-                            else:
-                                result_dict[key] = getattr(r, key, "")
-                        result_dicts.append(result_dict)
-                    elif isinstance(r, dict):
-                        # Ensure dict has all required fields
-                        r.setdefault("warnings", [])
-                        r.setdefault("original_text", "")
-                        result_dicts.append(r)
-                    else:
-                        # Fallback for unknown types
-                        logger.warning(
-                            "unknown_result_type", result_type=type(r).__name__
-                        )
-                        result_dicts.append(
-                            {
-                                "first_name": "",
-                                "last_name": "",
-                                "entity_type": "unknown",
-                                "gender": "unknown",
-                                "gender_confidence": 0.0,
-                                "parsing_confidence": 0.0,
-                                "parsing_method": "error",
-                                "fallback_reason": "Object conversion failed",
-                                "warnings": ["Failed to convert result object"],
-                                "original_text": "",
-                            }
-                        )
-                except Exception as e:
-                    logger.error(
-                        "result_conversion_error",
-                        error=str(e),
-                        result_type=type(r).__name__,
-                    )
-                    result_dicts.append(
-                        {
-                            "first_name": "",
-                            "last_name": "",
-                            "entity_type": "unknown",
-                            "gender": "unknown",
-                            "gender_confidence": 0.0,
-                            "parsing_confidence": 0.0,
-                            "parsing_method": "error",
-                            "fallback_reason": f"Conversion error: {str(e)}",
-                            "warnings": [f"Failed to convert: {str(e)}"],
-                            "original_text": "",
-                        }
-                    )
+            result_dicts = self._convert_results_to_dicts(batch_result.results)
 
             # Create optimized results DataFrame with proper column ordering and fallback tracking
             results_df = self._create_optimized_results_dataframe(
                 df, result_dicts, name_columns, row_indices
             )
+            memory.sample()
 
             # Generate comprehensive warning summary
             warning_summary = self.fallback_tracker.create_warning_summary(result_dicts)
+            warning_summary["breaker_transitions"] = (
+                self.batch_processor.breaker_transitions(start_time)
+            )
 
             # Calculate analytics from results
-            entity_stats = {
-                "person_count": 0,
-                "company_count": 0,
-                "trust_count": 0,
-                "unknown_count": 0,
-                "error_count": 0,
-            }
-
-            confidence_stats = {
-                "high_confidence_count": 0,  # >= 0.9
-                "medium_confidence_count": 0,  # 0.7 - 0.89
-                "low_confidence_count": 0,  # < 0.7
-                "avg_confidence": 0.0,
-            }
-
-            total_confidence = 0.0
-            valid_rows = 0
-
-            for result in result_dicts:
-                # Count entity types
-                entity_type = result.get("entity_type", "unknown").lower()
-                if entity_type == "person":
-                    entity_stats["person_count"] += 1
-                elif entity_type == "company":
-                    entity_stats["company_count"] += 1
-                elif entity_type == "trust":
-                    entity_stats["trust_count"] += 1
-                elif entity_type == "unknown":
-                    entity_stats["unknown_count"] += 1
-                else:
-                    entity_stats["error_count"] += 1
-
-                # Count confidence levels
-                confidence = result.get("parsing_confidence", 0.0)
-                if confidence > 0:
-                    valid_rows += 1
-                    total_confidence += confidence
-
-                    if confidence >= 0.9:
-                        confidence_stats["high_confidence_count"] += 1
-                    elif confidence >= 0.7:
-                        confidence_stats["medium_confidence_count"] += 1
-                    else:
-                        confidence_stats["low_confidence_count"] += 1
-
-            if valid_rows > 0:
-                confidence_stats["avg_confidence"] = total_confidence / valid_rows
+            tally = self._new_result_tally()
+            self._tally_results(result_dicts, tally)
 
             set_job_progress_sync(job_id, 95)
 
@@ -355,72 +339,22 @@ class OptimizedFileProcessorService:
                 job_id,
                 batch_result,
                 start_time,
-                result_dicts,
+                tally,
                 warning_summary,
             )
+            memory.sample()
 
             set_job_progress_sync(job_id, 100)
 
-            # Calculate final statistics
-            processing_time = time.time() - start_time
-            performance_stats = self.batch_processor.get_performance_stats()
-
-            processing_results = {
-                "total_rows": total_rows,
-                "processed_rows": total_rows,
-                "successful_parses": batch_result.successful_parses,
-                "failed_parses": total_rows - batch_result.successful_parses,
-                "success_rate": (
-                    (batch_result.successful_parses / total_rows) * 100
-                    if total_rows > 0
-                    else 0
-                ),
-                "processing_time": processing_time,
-                "results_path": file_paths["csv_path"],
-                "cache_hit_rate": performance_stats["cache_hit_rate"],
-                "api_calls_made": batch_result.api_call_count,
-                "estimated_cost": batch_result.cost_estimate,
-                "cost_savings": performance_stats.get("cost_savings_from_cache", 0),
-                "tokens_used": batch_result.total_tokens_used,
-                "performance_stats": performance_stats,
-                # Add analytics
-                "entity_stats": entity_stats,
-                "avg_confidence": confidence_stats["avg_confidence"],
-                "high_confidence_count": confidence_stats["high_confidence_count"],
-                "medium_confidence_count": confidence_stats["medium_confidence_count"],
-                "low_confidence_count": confidence_stats["low_confidence_count"],
-                # Add fallback tracking and warnings
-                # Use batch_result stats as primary source, fallback to warning_summary
-                "fallback_stats": {
-                    "gemini_used": (
-                        batch_result.gemini_used
-                        if hasattr(batch_result, "gemini_used")
-                        else warning_summary.get("gemini_used", 0)
-                    ),
-                    "fallback_used": (
-                        batch_result.fallback_used
-                        if hasattr(batch_result, "fallback_used")
-                        else warning_summary.get("fallback_used", 0)
-                    ),
-                    "fallback_reasons": warning_summary.get("fallback_reasons", {}),
-                    "fallback_rate": (
-                        (batch_result.fallback_used / total_rows * 100)
-                        if total_rows > 0 and hasattr(batch_result, "fallback_used")
-                        else 0
-                    ),
-                },
-                "warning_stats": {
-                    "results_with_warnings": warning_summary["results_with_warnings"],
-                    "total_warnings": warning_summary["total_warnings"],
-                    "warning_rate": (
-                        (warning_summary["results_with_warnings"] / total_rows * 100)
-                        if total_rows > 0
-                        else 0
-                    ),
-                },
-                "quality_score": warning_summary["quality_score"],
-                "recommendations": warning_summary["recommendations"],
-            }
+            processing_results = self._build_processing_results(
+                total_rows,
+                batch_result,
+                start_time,
+                file_paths,
+                tally,
+                warning_summary,
+                memory.peak_growth_mb(),
+            )
 
             update_job_status(
                 job_id, JobStatus.COMPLETED, processing_results=processing_results
@@ -431,10 +365,11 @@ class OptimizedFileProcessorService:
                 job_id=job_id,
                 total_rows=total_rows,
                 success_rate=processing_results["success_rate"],
-                processing_time=processing_time,
-                cache_hit_rate=performance_stats["cache_hit_rate"],
+                processing_time=processing_results["processing_time"],
+                cache_hit_rate=processing_results["cache_hit_rate"],
                 api_calls=batch_result.api_call_count,
                 cost_estimate=batch_result.cost_estimate,
+                memory_peak_growth_mb=processing_results["memory_peak_growth_mb"],
             )
 
             return {"status": "completed", **processing_results, **file_paths}
@@ -454,29 +389,516 @@ class OptimizedFileProcessorService:
                 "processing_time": time.time() - start_time,
             }
 
+    async def process_file_streaming(
+        self,
+        job_id: str,
+        file_path: str,
+        user_id: str = None,
+        parsing_config: Dict[str, Any] = None,
+    ) -> Dict[str, Any]:
+        """
+        Opt-in streaming mode for large uploads.
+
+        Reads the file in row chunks and pushes each chunk through extraction,
+        parsing and result writing before reading the next one, so peak memory
+        follows the chunk size instead of the file size.
+        """
+        from app.api.files.schemas import ProcessingConfig
+        from app.core.config import settings
+
+        start_time = time.time()
+        config = ProcessingConfig(**(parsing_config or {}))
+        chunk_rows = config.stream_chunk_rows
+        local_routing_min_confidence = self._local_routing_threshold(config)
+        memory = JobMemoryTracker()
+
+        logger.info(
+            "streaming_processing_started",
+            job_id=job_id,
+            file_path=file_path,
+            chunk_rows=chunk_rows,
+        )
+
+        try:
+            update_job_status(job_id, JobStatus.PROCESSING)
+            set_job_progress_sync(job_id, 5)
+
+            if self.batch_processor is None:
+                logger.error("batch_processor_unavailable", job_id=job_id)
+                raise RuntimeError(
+                    "Gemini service is not available. Cannot process names."
+                )
+
+            chunks, estimated_rows = self._open_chunk_reader(file_path, chunk_rows)
+
+            # One retry (and split) budget for the whole job, shared by every chunk
+            from app.services.gemini_service import (
+                BatchResult,
+                RetryBudget,
+                combine_tier_stats,
+            )
+
+            retry_budget = RetryBudget(limit=self.batch_processor.retry_budget_per_job)
+            split_budget = RetryBudget(limit=self.batch_processor.split_budget_per_job)
+            set_job_progress_sync(job_id, 15)
+
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            csv_filename = f"processed_results_{job_id}_{timestamp}.csv"
+            excel_filename = f"processed_results_{job_id}_{timestamp}.xlsx"
+            csv_path = os.path.join(settings.RESULTS_DIR, csv_filename)
+            excel_path = os.path.join(settings.RESULTS_DIR, excel_filename)
+            os.makedirs(settings.RESULTS_DIR, exist_ok=True)
+
+            # Excel is written in openpyxl write-only mode: rows go straight to disk
+            from openpyxl import Workbook
+
+            workbook = Workbook(write_only=True)
+            results_sheet = workbook.create_sheet("Processed Results")
+
+            name_columns = None
+            total_rows = 0
+            chunk_count = 0
+            warning_summaries = []
+            tier_stats_parts = []
+            tally = self._new_result_tally()
+            totals = {
+                "gemini_used": 0,
+                "fallback_used": 0,
+                "total_tokens": 0,
+                "cost_estimate": 0.0,
+                "unique_names": 0,
+                "local_routed": 0,
+            }
+            api_call_count = 0
+
+            # utf-8-sig writes the BOM once, at the start of the stream
+            with open(csv_path, "w", encoding="utf-8-sig", newline="") as csv_file:
+                for chunk in chunks:
+                    if name_columns is None:
+                        name_columns = self._identify_name_columns_with_config(
+                            chunk, parsing_config
+                        )
+                        if not name_columns:
+                            raise ValueError(
+                                "No name columns found in file. Please specify a column to process."
+                            )
+                        logger.info("name_columns_identified", columns=name_columns)
+
+                    total_rows += len(chunk)
+                    if total_rows > settings.MAX_ROWS_PER_FILE:
+                        raise ValueError(
+                            f"File too large: more than {settings.MAX_ROWS_PER_FILE} rows"
+                        )
+
+                    name_texts, row_indices = self.extract_name_data_optimized(
+                        chunk, name_columns
+                    )
+                    batch_result = await self.batch_processor.parse_names_batch(
+                        name_texts,
+                        local_routing_min_confidence=local_routing_min_confidence,
+                        retry_budget=retry_budget,
+                        split_budget=split_budget,
+                    )
+                    result_dicts = self._convert_results_to_dicts(batch_result.results)
+
+                    results_df = self._create_optimized_results_dataframe(
+                        chunk, result_dicts, name_columns, row_indices
+                    )
+                    results_df.to_csv(csv_file, index=False, header=chunk_count == 0)
+                    if chunk_count == 0:
+                        results_sheet.append(list(results_df.columns))
+                    for row in results_df.itertuples(index=False, name=None):
+                        results_sheet.append([_excel_cell(value) for value in row])
+
+                    warning_summaries.append(
+                        self.fallback_tracker.create_warning_summary(result_dicts)
+                    )
+                    self._tally_results(result_dicts, tally)
+                    totals["gemini_used"] += batch_result.gemini_used
+                    totals["fallback_used"] += batch_result.fallback_used
+                    totals["total_tokens"] += batch_result.total_tokens
+                    totals["cost_estimate"] += batch_result.cost_estimate
+                    totals["unique_names"] += batch_result.unique_names
+                    totals["local_routed"] += batch_result.local_routed
+                    tier_stats_parts.append(batch_result.tier_stats)
+                    api_call_count = batch_result.api_call_count
+
+                    chunk_count += 1
+                    memory.sample()
+
+                    progress = 15 + min(total_rows / max(estimated_rows, 1), 1) * 75
+                    set_job_progress_sync(job_id, int(progress))
+
+                    # Release this chunk's frames before reading the next one
+                    del chunk, results_df, result_dicts, batch_result, name_texts
+
+            if chunk_count == 0:
+                raise ValueError("File is empty")
+
+            set_job_progress_sync(job_id, 95)
+
+            # Aggregate counters stand in for a full BatchResult
+            job_result = BatchResult(
+                results=[],
+                total_processed=total_rows,
+                gemini_used=totals["gemini_used"],
+                fallback_used=totals["fallback_used"],
+                total_tokens=totals["total_tokens"],
+                processing_time=time.time() - start_time,
+                cost_estimate=totals["cost_estimate"],
+                api_call_count=api_call_count,
+                unique_names=totals["unique_names"],
+                local_routed=totals["local_routed"],
+                tier_stats=combine_tier_stats(tier_stats_parts),
+            )
+            warning_summary = self.fallback_tracker.combine_warning_summaries(
+                warning_summaries
+            )
+            warning_summary["breaker_transitions"] = (
+                self.batch_processor.breaker_transitions(start_time)
+            )
+
+            # Summary sheets (small) follow the streamed results sheet
+            self._write_summary_sheets(
+                workbook, job_result, start_time, tally, warning_summary
+            )
+            workbook.save(excel_path)
+
+            file_paths = {
+                "csv_path": csv_path,
+                "excel_path": excel_path,
+                "csv_filename": csv_filename,
+                "excel_filename": excel_filename,
+            }
+
+            set_job_progress_sync(job_id, 100)
+
+            processing_results = self._build_processing_results(
+                total_rows,
+                job_result,
+                start_time,
+                file_paths,
+                tally,
+                warning_summary,
+                memory.peak_growth_mb(),
+            )
+            processing_results["streaming"] = {
+                "chunk_rows": chunk_rows,
+                "chunks_processed": chunk_count,
+            }
+
+            update_job_status(
+                job_id, JobStatus.COMPLETED, processing_results=processing_results
+            )
+
+            logger.info(
+                "streaming_processing_completed",
+                job_id=job_id,
+                total_rows=total_rows,
+                chunks=chunk_count,
+                processing_time=processing_results["processing_time"],
+                memory_peak_growth_mb=processing_results["memory_peak_growth_mb"],
+            )
+
+            return {"status": "completed", **processing_results, **file_paths}
+
+        except Exception as e:
+            logger.error("streaming_processing_failed", job_id=job_id, error=str(e))
+            set_job_progress_sync(job_id, -1)
+            update_job_status(job_id, JobStatus.FAILED, error_message=str(e))
+
+            return {
+                "status": "failed",
+                "error": str(e),
+                "total_rows": 0,
+                "processed_rows": 0,
+                "successful_parses": 0,
+                "failed_parses": 0,
+                "processing_time": time.time() - start_time,
+            }
+
+    @staticmethod
+    def _local_routing_threshold(config: Any) -> Optional[float]:
+        """Routing confidence threshold for the job, or None when routing is off"""
+        if not config.local_routing_enabled:
+            return None
+        return config.local_routing_min_confidence
+
+    def _convert_results_to_dicts(self, results: List[Any]) -> List[Dict[str, Any]]:
+        """Convert ParsedName objects to dictionaries for compatibility"""
+        result_dicts = []
+        for r in results:
+            try:
+                if hasattr(r, "to_dict") and callable(getattr(r, "to_dict")):
+                    result_dict = r.to_dict()
+                    # Ensure all required fields are present
+                    result_dict.setdefault("warnings", [])
+                    result_dict.setdefault("original_text", "")
+                    result_dicts.append(result_dict)
+                elif hasattr(r, "__dict__"):
+                    # If it's a dataclass or similar object, convert to dict
+                    result_dict = {}
+                    for key in [
+                        "first_name",
+                        "last_name",
+                        "entity_type",
+                        "gender",
+                        "gender_confidence",
+                        "parsing_confidence",
+                        "parsing_method",
+                        "fallback_reason",
+                        "warnings",
+                        "original_text",
+                    ]:
+                        if key == "warnings":
+                            result_dict[key] = getattr(r, key, [])
+                        else:
+                            result_dict[key] = getattr(r, key, "")
+                    result_dicts.append(result_dict)
+                elif isinstance(r, dict):
+                    # Ensure dict has all required fields
+                    r.setdefault("warnings", [])
+                    r.setdefault("original_text", "")
+                    result_dicts.append(r)
+                else:
+                    # Fallback for unknown types
+                    logger.warning("unknown_result_type", result_type=type(r).__name__)
+                    result_dicts.append(
+                        {
+                            "first_name": "",
+                            "last_name": "",
+                            "entity_type": "unknown",
+                            "gender": "unknown",
+                            "gender_confidence": 0.0,
+                            "parsing_confidence": 0.0,
+                            "parsing_method": "error",
+                            "fallback_reason": "Object conversion failed",
+                            "warnings": ["Failed to convert result object"],
+                            "original_text": "",
+                        }
+                    )
+            except Exception as e:
+                logger.error(
+                    "result_conversion_error",
+                    error=str(e),
+                    result_type=type(r).__name__,
+                )
+                result_dicts.append(
+                    {
+                        "first_name": "",
+                        "last_name": "",
+                        "entity_type": "unknown",
+                        "gender": "unknown",
+                        "gender_confidence": 0.0,
+                        "parsing_confidence": 0.0,
+                        "parsing_method": "error",
+                        "fallback_reason": f"Conversion error: {str(e)}",
+                        "warnings": [f"Failed to convert: {str(e)}"],
+                        "original_text": "",
+                    }
+                )
+        return result_dicts
+
+    @staticmethod
+    def _new_result_tally() -> Dict[str, Any]:
+        """Empty entity/confidence counters, accumulated across chunks"""
+        return {
+            "entity_stats": {
+                "person_count": 0,
+                "company_count": 0,
+                "trust_count": 0,
+                "unknown_count": 0,
+                "error_count": 0,
+            },
+            "confidence_stats": {
+                "high_confidence_count": 0,  # >= 0.9
+                "medium_confidence_count": 0,  # 0.7 - 0.89
+                "low_confidence_count": 0,  # < 0.7
+                "avg_confidence": 0.0,
+            },
+            # Breakdowns for the Entity Analysis sheet
+            "entity_counts": {},
+            "gender_counts": {},
+            "confidence_ranges": {
+                "Low (0-0.5)": 0,
+                "Medium (0.5-0.8)": 0,
+                "High (0.8-1.0)": 0,
+            },
+            "total_confidence": 0.0,
+            "valid_rows": 0,
+        }
+
+    def _tally_results(
+        self, result_dicts: List[Dict[str, Any]], tally: Dict[str, Any]
+    ) -> None:
+        """Add entity-type and confidence counts for results to the tally"""
+        entity_stats = tally["entity_stats"]
+        confidence_stats = tally["confidence_stats"]
+
+        entity_counts = tally["entity_counts"]
+        gender_counts = tally["gender_counts"]
+        confidence_ranges = tally["confidence_ranges"]
+
+        for result in result_dicts:
+            raw_entity_type = result.get("entity_type", "unknown")
+            entity_counts[raw_entity_type] = entity_counts.get(raw_entity_type, 0) + 1
+            if raw_entity_type == "person":
+                gender = result.get("gender", "unknown")
+                gender_counts[gender] = gender_counts.get(gender, 0) + 1
+
+            # Count entity types
+            entity_type = raw_entity_type.lower()
+            if entity_type == "person":
+                entity_stats["person_count"] += 1
+            elif entity_type == "company":
+                entity_stats["company_count"] += 1
+            elif entity_type == "trust":
+                entity_stats["trust_count"] += 1
+            elif entity_type == "unknown":
+                entity_stats["unknown_count"] += 1
+            else:
+                entity_stats["error_count"] += 1
+
+            # Count confidence levels
+            confidence = result.get("parsing_confidence", 0.0)
+            if confidence < 0.5:
+                confidence_ranges["Low (0-0.5)"] += 1
+            elif confidence < 0.8:
+                confidence_ranges["Medium (0.5-0.8)"] += 1
+            else:
+                confidence_ranges["High (0.8-1.0)"] += 1
+
+            if confidence > 0:
+                tally["valid_rows"] += 1
+                tally["total_confidence"] += confidence
+
+                if confidence >= 0.9:
+                    confidence_stats["high_confidence_count"] += 1
+                elif confidence >= 0.7:
+                    confidence_stats["medium_confidence_count"] += 1
+                else:
+                    confidence_stats["low_confidence_count"] += 1
+
+        if tally["valid_rows"] > 0:
+            confidence_stats["avg_confidence"] = (
+                tally["total_confidence"] / tally["valid_rows"]
+            )
+
+    def _build_processing_results(
+        self,
+        total_rows: int,
+        batch_result: Any,
+        start_time: float,
+        file_paths: Dict[str, str],
+        tally: Dict[str, Any],
+        warning_summary: Dict[str, Any],
+        memory_peak_growth_mb: Optional[float],
+    ) -> Dict[str, Any]:
+        """Assemble the job's processing_results payload"""
+        processing_time = time.time() - start_time
+        performance_stats = self.batch_processor.get_performance_stats()
+        entity_stats = tally["entity_stats"]
+        confidence_stats = tally["confidence_stats"]
+
+        return {
+            "total_rows": total_rows,
+            "processed_rows": total_rows,
+            "successful_parses": batch_result.successful_parses,
+            "failed_parses": total_rows - batch_result.successful_parses,
+            "success_rate": (
+                (batch_result.successful_parses / total_rows) * 100
+                if total_rows > 0
+                else 0
+            ),
+            "processing_time": processing_time,
+            "results_path": file_paths["csv_path"],
+            "cache_hit_rate": performance_stats["cache_hit_rate"],
+            # In-file duplicate collapsing before batching
+            "dedup_stats": {
+                "unique_names": batch_result.unique_names,
+                "duplicates_collapsed": batch_result.duplicates_collapsed,
+                "dedup_ratio": batch_result.dedup_ratio,
+            },
+            # Rows settled by the rule-based router instead of the API
+            "routing_stats": {
+                "local_routed": batch_result.local_routed,
+                "local_routed_rate": (
+                    (batch_result.local_routed / total_rows * 100)
+                    if total_rows > 0
+                    else 0
+                ),
+            },
+            # Model cascade: per complexity tier model, throughput, tokens,
+            # cost and confidence ({} when GEMINI_CASCADE is off)
+            "tier_stats": batch_result.tier_stats,
+            "api_calls_made": batch_result.api_call_count,
+            "estimated_cost": batch_result.cost_estimate,
+            "cost_savings": performance_stats.get("cost_savings_from_cache", 0),
+            "tokens_used": batch_result.total_tokens_used,
+            "performance_stats": performance_stats,
+            # Peak resident memory the job added to the worker process (peak
+            # RSS during the job minus RSS at its start; None without procfs)
+            "memory_peak_growth_mb": (
+                round(memory_peak_growth_mb, 1)
+                if memory_peak_growth_mb is not None
+                else None
+            ),
+            # Add analytics
+            "entity_stats": entity_stats,
+            "avg_confidence": confidence_stats["avg_confidence"],
+            "high_confidence_count": confidence_stats["high_confidence_count"],
+            "medium_confidence_count": confidence_stats["medium_confidence_count"],
+            "low_confidence_count": confidence_stats["low_confidence_count"],
+            # Add fallback tracking and warnings
+            # Use batch_result stats as primary source, fallback to warning_summary
+            "fallback_stats": {
+                "gemini_used": (
+                    batch_result.gemini_used
+                    if hasattr(batch_result, "gemini_used")
+                    else warning_summary.get("gemini_used", 0)
+                ),
+                "fallback_used": (
+                    batch_result.fallback_used
+                    if hasattr(batch_result, "fallback_used")
+                    else warning_summary.get("fallback_used", 0)
+                ),
+                "fallback_reasons": warning_summary.get("fallback_reasons", {}),
+                # Gemini circuit breaker state changes while the job ran
+                "breaker_transitions": warning_summary.get("breaker_transitions", []),
+                "fallback_rate": (
+                    (batch_result.fallback_used / total_rows * 100)
+                    if total_rows > 0 and hasattr(batch_result, "fallback_used")
+                    else 0
+                ),
+            },
+            "warning_stats": {
+                "results_with_warnings": warning_summary["results_with_warnings"],
+                "total_warnings": warning_summary["total_warnings"],
+                "warning_rate": (
+                    (warning_summary["results_with_warnings"] / total_rows * 100)
+                    if total_rows > 0
+                    else 0
+                ),
+            },
+            "quality_score": warning_summary["quality_score"],
+            "recommendations": warning_summary["recommendations"],
+        }
+
     async def _load_file_async(self, file_path: str) -> pd.DataFrame:
         """Load file asynchronously with enhanced error handling"""
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"File not found: {file_path}")
 
-        # Detect encoding and validate
-        encoding = detect_encoding(file_path)
         validate_file(file_path)
 
         # Load based on file type
         file_extension = os.path.splitext(file_path)[1].lower()
 
         if file_extension == ".csv":
-            # Try multiple encodings for CSV files
-            encodings_to_try = [encoding, "utf-8", "latin-1", "cp1252", "iso-8859-1"]
-            for enc in encodings_to_try:
-                try:
-                    df = pd.read_csv(file_path, encoding=enc)
-                    logger.info("csv_loaded_successfully", encoding=enc, rows=len(df))
-                    return df
-                except UnicodeDecodeError:
-                    continue
-            raise ValueError("Could not decode CSV file with any supported encoding")
+            encoding, _ = self._scan_csv(file_path)
+            df = pd.read_csv(file_path, encoding=encoding)
+            logger.info("csv_loaded_successfully", encoding=encoding, rows=len(df))
+            return df
 
         elif file_extension in [".xlsx", ".xls"]:
             df = pd.read_excel(file_path)
@@ -486,6 +908,116 @@ class OptimizedFileProcessorService:
         else:
             raise ValueError(f"Unsupported file type: {file_extension}")
 
+    def _scan_csv(self, file_path: str) -> Tuple[str, int]:
+        """
+        Pick a CSV encoding and estimate the row count in one streaming pass.
+
+        Each candidate encoding is checked with an incremental decoder over
+        fixed-size blocks, so a bad guess costs one byte scan rather than a
+        full DataFrame parse per encoding.
+        """
+        detected = detect_encoding(file_path)
+        encodings_to_try = [detected, "utf-8", "latin-1", "cp1252", "iso-8859-1"]
+
+        for enc in encodings_to_try:
+            try:
+                decoder = codecs.getincrementaldecoder(enc)()
+            except LookupError:
+                continue
+
+            line_count = 0
+            try:
+                with open(file_path, "rb") as f:
+                    while True:
+                        block = f.read(self.SCAN_BLOCK_BYTES)
+                        if not block:
+                            decoder.decode(b"", final=True)
+                            break
+                        decoder.decode(block)
+                        line_count += block.count(b"\n")
+            except UnicodeDecodeError:
+                continue
+
+            # Header line is not a data row
+            return enc, max(line_count - 1, 0)
+
+        raise ValueError("Could not decode CSV file with any supported encoding")
+
+    def _open_chunk_reader(
+        self, file_path: str, chunk_rows: int
+    ) -> Tuple[Iterator[pd.DataFrame], int]:
+        """Return (chunk iterator, estimated row count) for a CSV or Excel file"""
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"File not found: {file_path}")
+
+        validate_file(file_path)
+        file_extension = os.path.splitext(file_path)[1].lower()
+
+        if file_extension == ".csv":
+            encoding, estimated_rows = self._scan_csv(file_path)
+            logger.info(
+                "csv_streaming_opened", encoding=encoding, estimated_rows=estimated_rows
+            )
+            # Read as text: per-chunk dtype inference would otherwise turn an int
+            # column into floats only in the chunks where it has blanks
+            return (
+                pd.read_csv(
+                    file_path, encoding=encoding, dtype=str, chunksize=chunk_rows
+                ),
+                estimated_rows,
+            )
+
+        elif file_extension == ".xlsx":
+            from openpyxl import load_workbook
+
+            workbook = load_workbook(file_path, read_only=True, data_only=True)
+            sheet = workbook.worksheets[0]
+            estimated_rows = max((sheet.max_row or 1) - 1, 0)
+            return self._iter_excel_chunks(workbook, sheet, chunk_rows), estimated_rows
+
+        elif file_extension == ".xls":
+            # Legacy .xls has no streaming reader; load once and slice
+            df = pd.read_excel(file_path)
+            return (
+                (df.iloc[i : i + chunk_rows] for i in range(0, len(df), chunk_rows)),
+                len(df),
+            )
+
+        else:
+            raise ValueError(f"Unsupported file type: {file_extension}")
+
+    @staticmethod
+    def _iter_excel_chunks(workbook, sheet, chunk_rows: int) -> Iterator[pd.DataFrame]:
+        """Yield DataFrames of chunk_rows rows from a read-only openpyxl sheet"""
+        try:
+            rows = sheet.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            columns = [
+                str(col) if col is not None else f"Unnamed: {i}"
+                for i, col in enumerate(header)
+            ]
+
+            start = 0
+            buffer = []
+            for row in rows:
+                buffer.append(row)
+                if len(buffer) >= chunk_rows:
+                    yield pd.DataFrame(
+                        buffer,
+                        columns=columns,
+                        index=range(start, start + len(buffer)),
+                    )
+                    start += len(buffer)
+                    buffer = []
+            if buffer:
+                yield pd.DataFrame(
+                    buffer, columns=columns, index=range(start, start + len(buffer))
+                )
+        finally:
+            workbook.close()
+
     def _identify_name_columns_with_config(
         self, df: pd.DataFrame, parsing_config: Dict[str, Any] = None
     ) -> List[str]:
@@ -606,7 +1138,7 @@ class OptimizedFileProcessorService:
         job_id: str,
         batch_result: Any,
         start_time: float,
-        result_dicts: List[Dict[str, Any]],
+        tally: Dict[str, Any],
         warning_summary: Dict[str, Any] = None,
     ) -> Dict[str, str]:
         """Save results with comprehensive performance metrics"""
@@ -632,64 +1164,11 @@ class OptimizedFileProcessorService:
             # Main results sheet
             results_df.to_excel(writer, sheet_name="Processed Results", index=False)
 
-            # Performance metrics sheet
-            perf_stats = self.batch_processor.get_performance_stats()
-            processing_time = time.time() - start_time
-
-            metrics_data = {
-                "Metric": [
-                    "Total Names Processed",
-                    "Successful Parses",
-                    "Failed Parses",
-                    "Success Rate (%)",
-                    "Cache Hit Rate (%)",
-                    "API Calls Made",
-                    "Total Tokens Used",
-                    "Estimated Cost ($)",
-                    "Cost Savings from Cache ($)",
-                    "Processing Time (seconds)",
-                    "Names per Second",
-                    "Average Tokens per Name",
-                    "Cost per Name ($)",
-                    "Processing Timestamp",
-                ],
-                "Value": [
-                    len(batch_result.results),
-                    batch_result.successful_parses,
-                    len(batch_result.results) - batch_result.successful_parses,
-                    round(
-                        (batch_result.successful_parses / len(batch_result.results))
-                        * 100,
-                        2,
-                    ),
-                    round(perf_stats["cache_hit_rate"] * 100, 2),
-                    batch_result.api_call_count,
-                    batch_result.total_tokens_used,
-                    round(batch_result.cost_estimate, 4),
-                    round(perf_stats.get("cost_savings_from_cache", 0), 4),
-                    round(processing_time, 2),
-                    round(len(batch_result.results) / max(processing_time, 0.001), 2),
-                    round(perf_stats["average_tokens_per_request"], 1),
-                    round(perf_stats["cost_per_request"], 6),
-                    datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC"),
-                ],
-            }
-
-            metrics_df = pd.DataFrame(metrics_data)
-            metrics_df.to_excel(writer, sheet_name="Performance Metrics", index=False)
-
-            # Entity analysis sheet
-            entity_analysis = self._create_entity_analysis(result_dicts)
-            entity_df = pd.DataFrame(entity_analysis)
-            entity_df.to_excel(writer, sheet_name="Entity Analysis", index=False)
-
-            # Fallback and warning analysis sheet
-            if warning_summary:
-                fallback_analysis = self._create_fallback_analysis(warning_summary)
-                fallback_df = pd.DataFrame(fallback_analysis)
-                fallback_df.to_excel(
-                    writer, sheet_name="Fallback Analysis", index=False
-                )
+            # Performance metrics, entity analysis and fallback analysis sheets
+            for sheet_name, sheet_df in self._summary_sheet_frames(
+                batch_result, start_time, tally, warning_summary
+            ):
+                sheet_df.to_excel(writer, sheet_name=sheet_name, index=False)
 
         return {
             "csv_path": csv_path,
@@ -698,43 +1177,138 @@ class OptimizedFileProcessorService:
             "excel_filename": excel_filename,
         }
 
-    def _create_entity_analysis(
-        self, results: List[Dict[str, Any]]
-    ) -> List[Dict[str, Any]]:
-        """Create detailed entity analysis"""
-        entity_counts = {}
-        gender_counts = {}
-        confidence_ranges = {
-            "Low (0-0.5)": 0,
-            "Medium (0.5-0.8)": 0,
-            "High (0.8-1.0)": 0,
+    def _summary_sheet_frames(
+        self,
+        batch_result: Any,
+        start_time: float,
+        tally: Dict[str, Any],
+        warning_summary: Dict[str, Any] = None,
+    ) -> List[Tuple[str, pd.DataFrame]]:
+        """Build the (sheet name, DataFrame) pairs that follow the results sheet"""
+        perf_stats = self.batch_processor.get_performance_stats()
+        processing_time = time.time() - start_time
+        total_names = batch_result.total_processed
+
+        metrics_data = {
+            "Metric": [
+                "Total Names Processed",
+                "Successful Parses",
+                "Failed Parses",
+                "Success Rate (%)",
+                "Cache Hit Rate (%)",
+                "API Calls Made",
+                "Total Tokens Used",
+                "Estimated Cost ($)",
+                "Cost Savings from Cache ($)",
+                "Processing Time (seconds)",
+                "Names per Second",
+                "Average Tokens per Name",
+                "Cost per Name ($)",
+                "Processing Timestamp",
+            ],
+            "Value": [
+                total_names,
+                batch_result.successful_parses,
+                total_names - batch_result.successful_parses,
+                round(
+                    (batch_result.successful_parses / max(total_names, 1)) * 100,
+                    2,
+                ),
+                round(perf_stats["cache_hit_rate"] * 100, 2),
+                batch_result.api_call_count,
+                batch_result.total_tokens_used,
+                round(batch_result.cost_estimate, 4),
+                round(perf_stats.get("cost_savings_from_cache", 0), 4),
+                round(processing_time, 2),
+                round(total_names / max(processing_time, 0.001), 2),
+                round(perf_stats["average_tokens_per_request"], 1),
+                round(perf_stats["cost_per_request"], 6),
+                datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC"),
+            ],
         }
 
-        for result in results:
-            # Entity type counts
-            entity_type = result.get("entity_type", "unknown")
-            entity_counts[entity_type] = entity_counts.get(entity_type, 0) + 1
+        frames = [
+            ("Performance Metrics", pd.DataFrame(metrics_data)),
+            (
+                "Entity Analysis",
+                pd.DataFrame(self._create_entity_analysis(tally, total_names)),
+            ),
+        ]
 
-            # Gender counts for persons
-            if entity_type == "person":
-                gender = result.get("gender", "unknown")
-                gender_counts[gender] = gender_counts.get(gender, 0) + 1
+        # Model cascade tiers
+        if batch_result.tier_stats:
+            frames.append(
+                (
+                    "Model Tiers",
+                    pd.DataFrame(
+                        [
+                            {
+                                "Tier": tier,
+                                "Model": stats["model"],
+                                "Names": stats["names"],
+                                "Seconds": round(stats["seconds"], 2),
+                                "Names per Second": round(
+                                    stats["names_per_second"], 2
+                                ),
+                                "Input Tokens": stats["input_tokens"],
+                                "Output Tokens": stats["output_tokens"],
+                                "Estimated Cost ($)": round(
+                                    stats["cost_estimate"], 4
+                                ),
+                                "Average Confidence": round(
+                                    stats["avg_confidence"], 3
+                                ),
+                                "Fallback": stats["fallback"],
+                            }
+                            for tier, stats in batch_result.tier_stats.items()
+                        ]
+                    ),
+                )
+            )
 
-            # Confidence ranges
-            confidence = result.get("parsing_confidence", 0)
-            if confidence < 0.5:
-                confidence_ranges["Low (0-0.5)"] += 1
-            elif confidence < 0.8:
-                confidence_ranges["Medium (0.5-0.8)"] += 1
-            else:
-                confidence_ranges["High (0.8-1.0)"] += 1
+        # Fallback and warning analysis sheet
+        if warning_summary:
+            frames.append(
+                (
+                    "Fallback Analysis",
+                    pd.DataFrame(self._create_fallback_analysis(warning_summary)),
+                )
+            )
+
+        return frames
+
+    def _write_summary_sheets(
+        self,
+        workbook,
+        batch_result: Any,
+        start_time: float,
+        tally: Dict[str, Any],
+        warning_summary: Dict[str, Any] = None,
+    ) -> None:
+        """Append summary sheets to a write-only openpyxl workbook"""
+        for sheet_name, sheet_df in self._summary_sheet_frames(
+            batch_result, start_time, tally, warning_summary
+        ):
+            sheet = workbook.create_sheet(sheet_name)
+            sheet.append(list(sheet_df.columns))
+            for row in sheet_df.itertuples(index=False, name=None):
+                sheet.append([_excel_cell(value) for value in row])
+
+    def _create_entity_analysis(
+        self, tally: Dict[str, Any], total: int
+    ) -> List[Dict[str, Any]]:
+        """Create detailed entity analysis"""
+        entity_counts = tally["entity_counts"]
+        gender_counts = tally["gender_counts"]
+        confidence_ranges = tally["confidence_ranges"]
+        total = max(total, 1)
 
         analysis = []
 
         # Entity types
         analysis.append({"Category": "Entity Types", "Value": ""})
         for entity_type, count in entity_counts.items():
-            pct = (count / len(results)) * 100
+            pct = (count / total) * 100
             analysis.append(
                 {
                     "Category": f"  {entity_type.title()}",
@@ -762,7 +1336,7 @@ class OptimizedFileProcessorService:
         # Confidence ranges
         analysis.append({"Category": "Parsing Confidence", "Value": ""})
         for range_label, count in confidence_ranges.items():
-            pct = (count / len(results)) * 100
+            pct = (count / total) * 100
             analysis.append(
                 {"Category": f"  {range_label}", "Value": f"{count} ({pct:.1f}%)"}
             )
@@ -783,6 +1357,7 @@ class OptimizedFileProcessorService:
         analysis.append({"Category": "Parsing Methods", "Value": ""})
         gemini_count = warning_summary.get("gemini_used", 0)
         fallback_count = warning_summary.get("fallback_used", 0)
+        local_count = warning_summary.get("local_routed", 0)
 
         gemini_pct = (gemini_count / total) * 100
         fallback_pct = (fallback_count / total) * 100
@@ -799,6 +1374,13 @@ class OptimizedFileProcessorService:
                 "Value": f"{fallback_count} ({fallback_pct:.1f}%)",
             }
         )
+        if local_count:
+            analysis.append(
+                {
+                    "Category": f"  Routed Locally (Rules)",
+                    "Value": f"{local_count} ({(local_count / total) * 100:.1f}%)",
+                }
+            )
         analysis.append({"Category": "", "Value": ""})
 
         # Fallback reasons
@@ -817,6 +1399,20 @@ class OptimizedFileProcessorService:
                 )
             analysis.append({"Category": "", "Value": ""})
 
+        # Circuit breaker transitions (API outages during the job)
+        breaker_transitions = warning_summary.get("breaker_transitions", [])
+        if breaker_transitions:
+            analysis.append({"Category": "Gemini Circuit Breaker", "Value": ""})
+            for transition in breaker_transitions:
+                at = datetime.fromtimestamp(transition["time"]).strftime("%H:%M:%S")
+                analysis.append(
+                    {
+                        "Category": f"  {at} {transition['from']} -> {transition['to']}",
+                        "Value": transition["reason"],
+                    }
+                )
+            analysis.append({"Category": "", "Value": ""})
+
         # Warning statistics
         results_with_warnings = warning_summary.get("results_with_warnings", 0)
         total_warnings = warning_summary.get("total_warnings", 0)
@@ -868,11 +1464,98 @@ class OptimizedFileProcessorService:
             "rate_limit": "Rate Limit",
             "network_error": "Network Error",
             "auth_error": "Authentication Error",
+            "circuit_open": "Gemini Unavailable (Circuit Open)",
             "unknown_error": "Unknown Error",
         }
         return reason_map.get(reason, reason.replace("_", " ").title())
 
 
+class WorkerRuntime:
+    """
+    Event loop and processor service owned by one worker process.
+
+    Every task runs on the same loop, so the Gemini service's pooled aiohttp
+    session (keep-alive connections), its caches and learned settings carry
+    over from one job to the next instead of being rebuilt for each.
+
+    The loop runs one job at a time: callers take lock (without blocking)
+    before run, and under a thread pool a task that finds it held runs on a
+    loop of its own.
+    """
+
+    def __init__(self):
+        self.pid = os.getpid()
+        self.loop = asyncio.new_event_loop()
+        self.processor_service = OptimizedFileProcessorService()
+        self.jobs = 0
+        self.lock = threading.Lock()
+
+    def run(self, coro) -> Any:
+        """Run one job's coroutine to completion on the process loop"""
+        asyncio.set_event_loop(self.loop)
+        self.jobs += 1
+        try:
+            return self.loop.run_until_complete(coro)
+        except BaseException:
+            # A time limit can interrupt the loop mid-job; cancel what that
+            # job left behind so it does not resume during the next one
+            self._cancel_pending()
+            raise
+
+    def _cancel_pending(self) -> None:
+        pending = [task for task in asyncio.all_tasks(self.loop) if not task.done()]
+        for task in pending:
+            task.cancel()
+        if pending:
+            self.loop.run_until_complete(
+                asyncio.gather(*pending, return_exceptions=True)
+            )
+
+    def close(self) -> None:
+        """Close the HTTP session and the loop (worker shutdown)"""
+        batch_processor = self.processor_service.batch_processor
+        try:
+            if batch_processor is not None:
+                self.loop.run_until_complete(batch_processor.cleanup())
+        except Exception as e:
+            logger.warning("cleanup_error", error=str(e))
+        finally:
+            self.loop.close()
+
+
+_worker_runtime: Optional[WorkerRuntime] = None
+_worker_runtime_lock = threading.Lock()
+
+
+def get_worker_runtime() -> WorkerRuntime:
+    """The calling process's runtime (a forked child builds its own)"""
+    global _worker_runtime
+    with _worker_runtime_lock:
+        if _worker_runtime is None or _worker_runtime.pid != os.getpid():
+            _worker_runtime = WorkerRuntime()
+            logger.info("worker_runtime_started", pid=_worker_runtime.pid)
+        return _worker_runtime
+
+
+@worker_process_init.connect
+def init_worker_runtime(**kwargs):
+    """Build the runtime when a pool process starts, not on its first task"""
+    from app.core.config import settings
+
+    if settings.WORKER_PERSISTENT_RUNTIME:
+        get_worker_runtime()
+
+
+@worker_process_shutdown.connect
+def close_worker_runtime(**kwargs):
+    global _worker_runtime
+    if _worker_runtime is not None and _worker_runtime.pid == os.getpid():
+        logger.info("worker_runtime_closed", jobs=_worker_runtime.jobs)
+        _worker_runtime.close()
+    _worker_runtime = None
+    shutdown_fallback_pool()
+
+
 def set_job_progress_sync(job_id: str, progress: int):
     """Store job progress in Redis synchronously"""
     try:
@@ -914,6 +1597,23 @@ def process_file(
     """
 
     try:
+        from app.core.config import settings
+
+        if settings.WORKER_PERSISTENT_RUNTIME:
+            runtime = get_worker_runtime()
+            # Under a thread pool another task may hold the loop; this one
+            # then runs on a loop of its own below (process-wide Redis
+            # clients keep one connection per loop)
+            if runtime.lock.acquire(blocking=False):
+                try:
+                    return runtime.run(
+                        runtime.processor_service.process_file_optimized(
+                            job_id, file_path, user_id, parsing_config
+                        )
+                    )
+                finally:
+                    runtime.lock.release()
+
         # Initialize optimized processor service
         processor_service = OptimizedFileProcessorService()
 
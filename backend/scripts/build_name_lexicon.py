@@ -0,0 +1,127 @@
+"""
+Build the memory-mapped name lexicon used by the fallback parser
+
+Reads census-style frequency tables and writes app/data/name_lexicon.bin
+(see app/services/name_lexicon.py for the format):
+
+- first names: rows of name, sex, count, like the SSA "yob" files; a header
+  row naming the columns (name, sex or gender, count) is optional
+- surnames: rows of name, count, or any CSV with a header naming the name
+  and count columns, like the Census surname tables
+
+Several files of each kind can be given; counts are summed. Frequencies are
+stored per million names of the table, and a first name's female
+probability is its share of counts with sex F.
+
+Usage (from backend/):
+    python scripts/build_name_lexicon.py --first-names data/yob2020.txt \\
+        --surnames data/Names_2010Census.csv [--output app/data/name_lexicon.bin]
+"""
+
+import argparse
+import csv
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.name_lexicon import (  # noqa: E402
+    DEFAULT_LEXICON_PATH,
+    NameLexicon,
+    write_lexicon,
+)
+
+
+def read_rows(path: Path, columns: List[str]) -> Iterator[Tuple[str, ...]]:
+    """Yield the given columns of each row (header optional, else positional)"""
+    aliases = {"sex": ("sex", "gender")}
+    with open(path, newline="", encoding="utf-8-sig") as handle:
+        reader = csv.reader(handle)
+        first = next(reader, None)
+        if first is None:
+            return
+        header = [cell.strip().lower() for cell in first]
+        if "name" in header and "count" in header:
+            positions = []
+            for column in columns:
+                found = [n for n in aliases.get(column, (column,)) if n in header]
+                if not found:
+                    raise ValueError(f"{path}: no {column!r} column")
+                positions.append(header.index(found[0]))
+        else:
+            positions = list(range(len(columns)))
+            reader = iter([first, *reader])
+        for row in reader:
+            if len(row) > max(positions):
+                yield tuple(row[i].strip() for i in positions)
+
+
+def parse_count(value: str) -> float:
+    try:
+        return float(value.replace(",", ""))
+    except ValueError:
+        return 0.0  # suppressed or missing counts, e.g. "(S)"
+
+
+def load_first_names(paths: List[Path]) -> Dict[str, Tuple[float, float]]:
+    """name -> (per-million frequency, female probability)"""
+    counts: Dict[str, List[float]] = defaultdict(lambda: [0.0, 0.0])
+    for path in paths:
+        for name, sex, count in read_rows(path, ["name", "sex", "count"]):
+            name = name.lower()
+            if not name or " " in name:
+                continue
+            value = parse_count(count)
+            counts[name][0] += value
+            if sex.upper().startswith("F"):
+                counts[name][1] += value
+    total = sum(count for count, _ in counts.values()) or 1.0
+    return {
+        name: (count / total * 1e6, female / count)
+        for name, (count, female) in counts.items()
+        if count > 0
+    }
+
+
+def load_surnames(paths: List[Path]) -> Dict[str, float]:
+    """name -> per-million frequency"""
+    counts: Dict[str, float] = defaultdict(float)
+    for path in paths:
+        for name, count in read_rows(path, ["name", "count"]):
+            name = name.lower()
+            # Census tables end with an "ALL OTHER NAMES" row
+            if not name or " " in name:
+                continue
+            counts[name] += parse_count(count)
+    total = sum(counts.values()) or 1.0
+    return {name: count / total * 1e6 for name, count in counts.items() if count > 0}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--first-names", type=Path, action="append", default=[])
+    parser.add_argument("--surnames", type=Path, action="append", default=[])
+    parser.add_argument("--output", type=Path, default=DEFAULT_LEXICON_PATH)
+    args = parser.parse_args()
+
+    if not args.first_names and not args.surnames:
+        parser.error("give at least one --first-names or --surnames file")
+
+    first_names = load_first_names(args.first_names)
+    surnames = load_surnames(args.surnames)
+    size = write_lexicon(args.output, first_names, surnames)
+
+    # Reopen the file the way workers do, as a check
+    lexicon = NameLexicon(args.output)
+    print(
+        f"Wrote {args.output}: {len(first_names)} first names, "
+        f"{len(surnames)} surnames, {size / 1024:.0f} KiB"
+    )
+    lexicon.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -95,7 +95,7 @@ export interface ParseResultResponse {
   gender?: 'male' | 'female' | 'unknown';
   gender_confidence?: number;
   parsing_confidence: number;
-  parsing_method?: 'gemini' | 'fallback' | 'regex' | 'unknown';
+  parsing_method?: 'gemini' | 'fallback' | 'local' | 'regex' | 'unknown';
   has_warnings?: boolean;
   warnings?: string;
   gemini_used?: boolean;
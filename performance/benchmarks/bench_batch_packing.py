@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Batch packing benchmark with a stubbed Gemini API
+
+Runs ConsolidatedGeminiService.parse_names_batch over the names in the bundled
+tests/*.csv files against a fake aiohttp session, comparing fixed-count
+slicing with token-budget packing (GEMINI_TOKEN_PACKING), each with the
+adaptive controller off and on.
+
+The stub charges every name a "true" token cost from a hidden model that is
+deliberately different from the service's estimator (word count, joint/trust
+wording, noise). A response whose total exceeds maxOutputTokens comes back
+as MAX_TOKENS; latency is simulated as a fixed overhead plus generation time
+and scaled down by --time-scale so a run takes seconds. Results report the
+summed simulated API time and the p50/p95 latency of a single request, which
+do not depend on the pipeline's concurrency or on real sleeps in the service.
+
+Usage (from backend/):
+    python ../performance/benchmarks/bench_batch_packing.py [--time-scale 0.01]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import re
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+import pandas as pd
+import structlog
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT / "backend"))
+
+os.environ.setdefault("GEMINI_API_KEY", "benchmark-stub")
+os.environ["ENABLE_CACHING"] = "false"
+os.environ["GEMINI_ADAPTIVE_PERSIST"] = "false"
+# The quota limiter runs in real time; this benchmark compresses time
+os.environ["GEMINI_RATE_LIMIT_ENABLED"] = "false"
+
+from app.services import batch_tuner  # noqa: E402
+from app.services.gemini_service import ConsolidatedGeminiService  # noqa: E402
+from app.workers.file_processor import OptimizedFileProcessorService  # noqa: E402
+
+# Per-request info logging would dominate the (scaled) wall clock
+structlog.configure(
+    wrapper_class=structlog.make_filtering_bound_logger(logging.ERROR)
+)
+
+JOINT_OR_TRUST = re.compile(
+    r"&|/|\b(and|trust|trs|ttee|revocable|living|estate|etal)\b", re.IGNORECASE
+)
+COMPANY = re.compile(r"\b(llc|inc|corp|ltd|company)\b", re.IGNORECASE)
+
+# Simulated API: fixed overhead per request + output generation speed
+REQUEST_OVERHEAD_SECONDS = 0.4
+TOKENS_PER_SECOND = 2500
+
+
+def true_cost(name: str, rng: random.Random) -> int:
+    """Hidden per-name token cost the stub charges (not the service's estimate)"""
+    words = len(name.split())
+    cost = 80 + 45 * words
+    if COMPANY.search(name):
+        cost -= 60
+    elif JOINT_OR_TRUST.search(name):
+        cost += 280
+    return int(cost * rng.uniform(0.85, 1.15))
+
+
+class StubResponse:
+    def __init__(self, body: dict, delay: float):
+        self.status = 200
+        self.body = body
+        self.delay = delay
+
+    async def json(self):
+        return self.body
+
+    async def text(self):
+        return json.dumps(self.body)
+
+    async def __aenter__(self):
+        await asyncio.sleep(self.delay)
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class StubSession:
+    """Fake aiohttp session that answers generateContent requests"""
+
+    closed = False
+
+    def __init__(self, costs: Dict[str, int], time_scale: float):
+        self.costs = costs
+        self.time_scale = time_scale
+        self.metrics = {
+            "requests": 0,
+            "truncations": 0,
+            "reserved_tokens": 0,
+            "used_tokens": 0,
+            "api_seconds": 0.0,
+            "latencies": [],
+        }
+
+    def post(self, url, **kwargs):
+        payload = kwargs["json"]
+        prompt = payload["contents"][0]["parts"][0]["text"]
+        # Works for inline prompts and for names-only requests alike
+        block = prompt.split("## Input\n", 1)[1].split("\n\n", 1)[0]
+        names = [line.split(". ", 1)[1] for line in block.splitlines() if ". " in line]
+        budget = payload["generationConfig"]["maxOutputTokens"]
+        needed = sum(self.costs.get(name, 200) for name in names)
+        used = min(needed, budget)
+
+        self.metrics["requests"] += 1
+        self.metrics["reserved_tokens"] += budget
+        self.metrics["used_tokens"] += used
+        api_seconds = REQUEST_OVERHEAD_SECONDS + used / TOKENS_PER_SECOND
+        self.metrics["api_seconds"] += api_seconds
+        self.metrics["latencies"].append(api_seconds)
+        delay = api_seconds * self.time_scale
+
+        if needed > budget:
+            self.metrics["truncations"] += 1
+            return StubResponse(
+                {
+                    "candidates": [{"finishReason": "MAX_TOKENS", "content": {}}],
+                    "usageMetadata": {
+                        "thoughtsTokenCount": int(budget * 0.8),
+                        "candidatesTokenCount": budget - int(budget * 0.8),
+                    },
+                },
+                delay,
+            )
+
+        items = [
+            {
+                "first_name": "A",
+                "last_name": "B",
+                "entity_type": "person",
+                "gender": "unknown",
+                "gender_confidence": 0.0,
+                "parsing_confidence": 0.9,
+            }
+            for _ in names
+        ]
+        return StubResponse(
+            {
+                "candidates": [
+                    {
+                        "finishReason": "STOP",
+                        "content": {"parts": [{"text": json.dumps(items)}]},
+                    }
+                ],
+                "usageMetadata": {
+                    "thoughtsTokenCount": int(needed * 0.8),
+                    "candidatesTokenCount": needed - int(needed * 0.8),
+                },
+            },
+            delay,
+        )
+
+
+def load_names(csv_file: Path) -> List[str]:
+    df = pd.read_csv(csv_file, encoding="latin-1")
+    processor = OptimizedFileProcessorService.__new__(OptimizedFileProcessorService)
+    names, _ = processor.extract_name_data_optimized(df, ["Primary Addressee"])
+    return names
+
+
+async def run_mode(
+    names: List[str], costs: Dict[str, int], packing: bool, adaptive: bool, scale: float
+) -> dict:
+    os.environ["GEMINI_TOKEN_PACKING"] = "true" if packing else "false"
+    os.environ["GEMINI_ADAPTIVE_BATCHING"] = "true" if adaptive else "false"
+    batch_tuner._controllers.clear()
+
+    service = ConsolidatedGeminiService()
+    session = StubSession(costs, scale)
+
+    async def get_session():
+        return session
+
+    service._get_or_create_session = get_session
+
+    result = await service.parse_names_batch(names)
+
+    metrics = session.metrics
+    latencies = sorted(metrics["latencies"]) or [0.0]
+    return {
+        "requests": metrics["requests"],
+        "truncations": metrics["truncations"],
+        "fallback": result.fallback_used,
+        "utilization": metrics["used_tokens"] / max(metrics["reserved_tokens"], 1),
+        "reserved_k": metrics["reserved_tokens"] / 1000,
+        "api_seconds": metrics["api_seconds"],
+        "p50_seconds": latencies[len(latencies) // 2],
+        "p95_seconds": latencies[int(len(latencies) * 0.95)],
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--time-scale",
+        type=float,
+        default=0.01,
+        help="Real seconds per simulated second of API latency",
+    )
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    csv_files = sorted((REPO_ROOT / "tests").glob("*.csv"))
+    if not csv_files:
+        print("No CSV files found in tests/")
+        return 1
+
+    modes = [
+        ("fixed", False, False),
+        ("packed", True, False),
+        ("fixed+adaptive", False, True),
+        ("packed+adaptive", True, True),
+    ]
+
+    print(
+        f"{'file':<8}{'mode':<17}{'requests':>9}{'trunc':>7}{'fallbk':>8}"
+        f"{'util':>7}{'reserved k':>12}{'api s':>8}{'p50 s':>7}{'p95 s':>7}"
+    )
+    for csv_file in csv_files:
+        names = load_names(csv_file)
+        rng = random.Random(args.seed)
+        costs = {name: true_cost(name, rng) for name in dict.fromkeys(names)}
+        label = csv_file.stem.rsplit(",", 1)[-1].strip()
+
+        for mode, packing, adaptive in modes:
+            stats = asyncio.run(
+                run_mode(names, costs, packing, adaptive, args.time_scale)
+            )
+            print(
+                f"{label:<8}{mode:<17}{stats['requests']:>9}{stats['truncations']:>7}"
+                f"{stats['fallback']:>8}{stats['utilization']:>7.0%}"
+                f"{stats['reserved_k']:>12.0f}{stats['api_seconds']:>8.0f}"
+                f"{stats['p50_seconds']:>7.1f}{stats['p95_seconds']:>7.1f}"
+            )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
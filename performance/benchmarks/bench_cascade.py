@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Model cascade benchmark against the local Gemini HTTP stub
+
+Runs ConsolidatedGeminiService.parse_names_batch over names from a bundled
+tests/*.csv file against gemini_stub.py, where gemini-2.5-flash thinks
+(--thinking-tokens per name, billed as output) and gemini-2.5-flash-lite
+answers without thinking in --lite-speed of the time. Modes:
+
+- single: GEMINI_CASCADE off, every name on gemini-2.5-flash
+- cascade: SIMPLE names on gemini-2.5-flash-lite, the rest on flash
+- local: SIMPLE names on the rule-based parser, the rest on flash
+
+Reports job wall time, estimated cost and requests per model, then the
+per-tier stats of each cascade run. The stub answers every name at the same
+confidence, so per-tier confidence here only shows the local parser's.
+
+Usage (from backend/):
+    python ../performance/benchmarks/bench_cascade.py [--names 6000]
+        [--thinking-tokens 250] [--lite-speed 0.4]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+import pandas as pd
+import structlog
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT / "backend"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+os.environ.setdefault("GEMINI_API_KEY", "benchmark-stub")
+os.environ["ENABLE_CACHING"] = "false"
+os.environ["GEMINI_ADAPTIVE_PERSIST"] = "false"
+os.environ["GEMINI_RATE_LIMIT_ENABLED"] = "false"
+os.environ["GEMINI_PROMPT_MODE"] = "system"
+os.environ["GEMINI_MODEL"] = "gemini-2.5-flash"
+
+from gemini_stub import start_stub  # noqa: E402
+
+from app.services import batch_tuner, gemini_prompt_context  # noqa: E402
+from app.services.gemini_service import (  # noqa: E402
+    ConsolidatedGeminiService,
+    estimate_model_cost,
+)
+from app.workers.file_processor import OptimizedFileProcessorService  # noqa: E402
+
+structlog.configure(
+    wrapper_class=structlog.make_filtering_bound_logger(logging.CRITICAL)
+)
+
+FIRST_TOKEN_SECONDS = 0.3
+RECORD_SECONDS = 0.01
+
+MODES = {
+    "single": None,
+    "cascade": "gemini-2.5-flash-lite",
+    "local": "local",
+}
+
+
+def load_names(csv_file: Path) -> List[str]:
+    df = pd.read_csv(csv_file, encoding="latin-1")
+    processor = OptimizedFileProcessorService.__new__(OptimizedFileProcessorService)
+    names, _ = processor.extract_name_data_optimized(df, ["Primary Addressee"])
+    return names
+
+
+async def run_mode(names: List[str], simple_model, args) -> dict:
+    stub, runner, base_url = await start_stub(
+        first_token_seconds=FIRST_TOKEN_SECONDS,
+        record_seconds=RECORD_SECONDS,
+        model_speeds={"gemini-2.5-flash-lite": args.lite_speed},
+        thinking_tokens={"gemini-2.5-flash": args.thinking_tokens},
+    )
+    os.environ["GEMINI_API_BASE_URL"] = base_url
+    os.environ["GEMINI_CASCADE"] = "true" if simple_model else "false"
+    if simple_model:
+        os.environ["GEMINI_TIER_SIMPLE"] = simple_model
+    gemini_prompt_context._contexts.clear()
+    batch_tuner._controllers.clear()
+
+    service = ConsolidatedGeminiService()
+    start = time.perf_counter()
+    try:
+        result = await service.parse_names_batch(names)
+        total = time.perf_counter() - start
+    finally:
+        await service.cleanup()
+        await runner.cleanup()
+
+    cost = result.cost_estimate
+    if not result.tier_stats:
+        # No cascade: price the single model from its own token counts
+        cost = estimate_model_cost(
+            service.model_name,
+            service.stats["prompt_tokens"],
+            service.stats["output_tokens"],
+        )
+    return {
+        "total": total,
+        "cost": cost,
+        "requests": stub.metrics["requests_by_model"],
+        "fallback": result.fallback_used,
+        "tiers": result.tier_stats,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--names", type=int, default=6000)
+    parser.add_argument("--thinking-tokens", type=int, default=250)
+    parser.add_argument("--lite-speed", type=float, default=0.4)
+    args = parser.parse_args()
+
+    csv_files = sorted((REPO_ROOT / "tests").glob("*.csv"))
+    if not csv_files:
+        print("No CSV files found in tests/")
+        return 1
+    names = load_names(csv_files[0])[: args.names]
+
+    print(
+        f"{'mode':<9}{'names':>7}{'total s':>9}{'cost $':>10}{'fallbk':>8}"
+        f"{'flash req':>11}{'lite req':>10}"
+    )
+    tier_lines = []
+    for label, simple_model in MODES.items():
+        stats = asyncio.run(run_mode(names, simple_model, args))
+        requests = stats["requests"]
+        print(
+            f"{label:<9}{len(names):>7}{stats['total']:>9.2f}{stats['cost']:>10.4f}"
+            f"{stats['fallback']:>8}{requests.get('gemini-2.5-flash', 0):>11}"
+            f"{requests.get('gemini-2.5-flash-lite', 0):>10}"
+        )
+        for tier, tier_stats in stats["tiers"].items():
+            tier_lines.append(
+                f"{label:<9}{tier:<10}{tier_stats['model']:<23}"
+                f"{tier_stats['names']:>7}{tier_stats['names_per_second']:>10.1f}"
+                f"{tier_stats['output_tokens']:>10}"
+                f"{tier_stats['cost_estimate']:>10.4f}"
+                f"{tier_stats['avg_confidence']:>7.2f}"
+            )
+
+    print()
+    print(
+        f"{'mode':<9}{'tier':<10}{'model':<23}{'names':>7}{'names/s':>10}"
+        f"{'out tok':>10}{'cost $':>10}{'conf':>7}"
+    )
+    for line in tier_lines:
+        print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Circuit breaker benchmark: a job running into a dead or flapping Gemini endpoint
+
+Runs the names of all bundled tests/*.csv files as one job against a fake session whose
+requests hang for --timeout seconds and then time out, the way requests to an
+unreachable endpoint do. Scenarios:
+
+- down: the endpoint never answers
+- outage: the endpoint is down for the first --outage seconds, then recovers
+
+Each runs with the breaker off (every batch goes through its own attempts and
+split retries) and on. Reports wall time, requests, names sent to the
+fallback parser and the breaker transitions recorded for the job.
+
+Usage (from backend/):
+    python ../performance/benchmarks/bench_circuit_breaker.py [--timeout 0.2]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+import pandas as pd
+import structlog
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT / "backend"))
+
+os.environ.setdefault("GEMINI_API_KEY", "benchmark-stub")
+os.environ["ENABLE_CACHING"] = "false"
+os.environ["GEMINI_ADAPTIVE_PERSIST"] = "false"
+os.environ["GEMINI_RATE_LIMIT_ENABLED"] = "false"
+os.environ["GEMINI_PROMPT_MODE"] = "system"
+os.environ["GEMINI_STRUCTURED_OUTPUT"] = "true"
+os.environ["GEMINI_ADAPTIVE_BATCHING"] = "false"
+os.environ["GEMINI_BREAKER_RECOVERY_SECONDS"] = "0.1"
+
+from app.services import batch_tuner, gemini_circuit_breaker  # noqa: E402
+from app.services.gemini_service import ConsolidatedGeminiService  # noqa: E402
+from app.workers.file_processor import OptimizedFileProcessorService  # noqa: E402
+
+structlog.configure(
+    wrapper_class=structlog.make_filtering_bound_logger(logging.CRITICAL)
+)
+
+
+def request_names(payload: dict) -> List[str]:
+    text = payload["contents"][0]["parts"][0]["text"]
+    block = text.split("## Input\n", 1)[1].split("\n\n", 1)[0]
+    return [
+        line.split(". ", 1)[1] if ". " in line else "" for line in block.splitlines()
+    ]
+
+
+class StubResponse:
+    status = 200
+
+    def __init__(self, body: dict, hang: float):
+        self.body = body
+        self.hang = hang
+
+    async def json(self):
+        return self.body
+
+    async def text(self):
+        return json.dumps(self.body)
+
+    async def __aenter__(self):
+        if self.hang:
+            await asyncio.sleep(self.hang)
+            raise asyncio.TimeoutError()
+        await asyncio.sleep(0.05)
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class StubSession:
+    """Fake aiohttp session: requests time out until the endpoint is back up"""
+
+    closed = False
+
+    def __init__(self, timeout: float, down_until: float):
+        self.timeout = timeout
+        self.down_until = down_until
+        self.metrics = {"requests": 0, "timeouts": 0}
+
+    def post(self, url, **kwargs):
+        names = request_names(kwargs["json"])
+        self.metrics["requests"] += 1
+        if time.monotonic() < self.down_until:
+            self.metrics["timeouts"] += 1
+            return StubResponse({}, hang=self.timeout)
+        records = [
+            {
+                "i": number,
+                "f": (name.split() or [""])[-1].title(),
+                "l": (name.split() or [""])[0].title(),
+                "t": "person",
+                "g": "unknown",
+                "gc": 0.0,
+                "pc": 0.9,
+            }
+            for number, name in enumerate(names, 1)
+        ]
+        return StubResponse(
+            {
+                "candidates": [
+                    {
+                        "finishReason": "STOP",
+                        "content": {"parts": [{"text": json.dumps(records)}]},
+                    }
+                ],
+                "usageMetadata": {"candidatesTokenCount": 40 * len(names)},
+            },
+            hang=0,
+        )
+
+
+def load_names(csv_file: Path) -> List[str]:
+    df = pd.read_csv(csv_file, encoding="latin-1")
+    processor = OptimizedFileProcessorService.__new__(OptimizedFileProcessorService)
+    names, _ = processor.extract_name_data_optimized(df, ["Primary Addressee"])
+    return names
+
+
+async def run_mode(names: List[str], breaker: bool, timeout: float, down: float):
+    os.environ["GEMINI_BREAKER_ENABLED"] = "true" if breaker else "false"
+    batch_tuner._controllers.clear()
+    gemini_circuit_breaker._breakers.clear()
+    service = ConsolidatedGeminiService()
+    session = StubSession(timeout, time.monotonic() + down)
+
+    async def get_session():
+        return session
+
+    service._get_or_create_session = get_session
+    started_at = time.time()
+    start = time.perf_counter()
+    result = await service.parse_names_batch(names)
+    return {
+        **session.metrics,
+        "seconds": time.perf_counter() - start,
+        "fallback": result.fallback_used,
+        "short_circuited": service.stats["breaker_short_circuited"],
+        "transitions": service.breaker_transitions(started_at),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--timeout", type=float, default=0.2, help="Seconds a dead request hangs"
+    )
+    parser.add_argument(
+        "--outage", type=float, default=0.5, help="Outage length in seconds"
+    )
+    args = parser.parse_args()
+
+    csv_files = sorted((REPO_ROOT / "tests").glob("*.csv"))
+    if not csv_files:
+        print("No CSV files found in tests/")
+        return 1
+    names = [name for csv_file in csv_files for name in load_names(csv_file)]
+
+    print(
+        f"{'scenario':<10}{'breaker':<9}{'names':>7}{'seconds':>9}{'requests':>9}"
+        f"{'timeouts':>9}{'fallbk':>8}{'skipped':>8}{'transitions':>12}"
+    )
+    transition_lines = []
+    for label, down in (("down", float("inf")), ("outage", args.outage)):
+        for breaker in (False, True):
+            stats = asyncio.run(run_mode(names, breaker, args.timeout, down))
+            print(
+                f"{label:<10}{'on' if breaker else 'off':<9}{len(names):>7}"
+                f"{stats['seconds']:>9.2f}{stats['requests']:>9}"
+                f"{stats['timeouts']:>9}{stats['fallback']:>8}"
+                f"{stats['short_circuited']:>8}{len(stats['transitions']):>12}"
+            )
+            if breaker:
+                first = stats["transitions"][0]["time"] if stats["transitions"] else 0
+                for transition in stats["transitions"]:
+                    transition_lines.append(
+                        f"{label:<10}{transition['time'] - first:>7.2f}s "
+                        f"{transition['from']:>9} -> {transition['to']:<9} "
+                        f"{transition['reason']}"
+                    )
+
+    print()
+    for line in transition_lines:
+        print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
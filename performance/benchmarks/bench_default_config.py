@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Default-configuration benchmark against the local Gemini HTTP stub
+
+The other benchmarks switch optional features off to isolate one change.
+This one runs ConsolidatedGeminiService.parse_names_batch over names from a
+bundled tests/*.csv file with nothing but the API key and base URL set, so
+it shows what a default deployment does: requests sent, peak requests in
+flight at the stub, time spent waiting on the quota limiter, and throughput.
+
+A second row turns the quota limiter on at the configured limits
+(GEMINI_RATE_LIMIT_PER_MINUTE, default 60), to show the cost of enabling it
+with a quota below the job's request rate. Exits 1 if the default run waited
+on the limiter or never reached GEMINI_MAX_CONCURRENT requests in flight.
+
+Usage (from backend/):
+    python ../performance/benchmarks/bench_default_config.py [--names 4000]
+        [--no-limiter-row]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+import pandas as pd
+import structlog
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT / "backend"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+os.environ.setdefault("GEMINI_API_KEY", "benchmark-stub")
+
+from gemini_stub import start_stub  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.services import (  # noqa: E402
+    gemini_prompt_context,
+    gemini_rate_limiter,
+    name_result_cache,
+)
+from app.services.gemini_service import ConsolidatedGeminiService  # noqa: E402
+from app.workers.file_processor import OptimizedFileProcessorService  # noqa: E402
+
+structlog.configure(
+    wrapper_class=structlog.make_filtering_bound_logger(logging.CRITICAL)
+)
+
+FIRST_TOKEN_SECONDS = 0.2
+RECORD_SECONDS = 0.005
+
+
+def load_names(csv_file: Path) -> List[str]:
+    df = pd.read_csv(csv_file, encoding="latin-1")
+    processor = OptimizedFileProcessorService.__new__(OptimizedFileProcessorService)
+    names, _ = processor.extract_name_data_optimized(df, ["Primary Addressee"])
+    return names
+
+
+async def run_mode(names: List[str], limiter: bool) -> dict:
+    stub, runner, base_url = await start_stub(
+        first_token_seconds=FIRST_TOKEN_SECONDS, record_seconds=RECORD_SECONDS
+    )
+    os.environ["GEMINI_API_BASE_URL"] = base_url
+    default_enabled = settings.GEMINI_RATE_LIMIT_ENABLED
+    if limiter:
+        settings.GEMINI_RATE_LIMIT_ENABLED = True
+    gemini_rate_limiter._limiters.clear()
+    # Both rows start cold: no cached results or contexts from the last stub
+    name_result_cache._name_result_cache = None
+    gemini_prompt_context._contexts.clear()
+
+    service = ConsolidatedGeminiService()
+    start = time.perf_counter()
+    try:
+        await service.parse_names_batch(names)
+        total = time.perf_counter() - start
+        quota = service.rate_limiter.snapshot()
+    finally:
+        settings.GEMINI_RATE_LIMIT_ENABLED = default_enabled
+        await service.cleanup()
+        await runner.cleanup()
+
+    return {
+        "total": total,
+        "requests": stub.metrics["generate_requests"],
+        "peak": stub.metrics["peak_in_flight"],
+        "waits": quota["waits"],
+        "wait_seconds": quota["wait_seconds"],
+        "names_per_second": len(names) / total,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--names", type=int, default=4000)
+    parser.add_argument("--no-limiter-row", action="store_true")
+    args = parser.parse_args()
+
+    csv_files = sorted((REPO_ROOT / "tests").glob("*.csv"))
+    if not csv_files:
+        print("No CSV files found in tests/")
+        return 1
+    names = load_names(csv_files[0])[: args.names]
+
+    print(
+        f"limiter default: {'on' if settings.GEMINI_RATE_LIMIT_ENABLED else 'off'}"
+        f", {settings.GEMINI_RATE_LIMIT_PER_MINUTE}/min, "
+        f"GEMINI_MAX_CONCURRENT={settings.GEMINI_MAX_CONCURRENT}"
+    )
+    print(
+        f"{'config':<12}{'total s':>8}{'requests':>9}{'peak in flight':>15}"
+        f"{'waits':>7}{'wait s':>8}{'names/s':>9}"
+    )
+    modes = [("default", False)]
+    if not args.no_limiter_row:
+        modes.append(("limiter on", True))
+    failed = False
+    for label, limiter in modes:
+        stats = asyncio.run(run_mode(names, limiter))
+        print(
+            f"{label:<12}{stats['total']:>8.2f}{stats['requests']:>9}"
+            f"{stats['peak']:>15}{stats['waits']:>7}{stats['wait_seconds']:>8.1f}"
+            f"{stats['names_per_second']:>9.0f}"
+        )
+        if not limiter:
+            expected_peak = min(settings.GEMINI_MAX_CONCURRENT, stats["requests"])
+            failed = stats["waits"] > 0 or stats["peak"] < expected_peak
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+Fallback parser micro-benchmark and equivalence check
+
+Compares FallbackNameParser.parse_name (one tokenization per name, token
+flags computed once per distinct word, compiled keyword matchers, score
+tables built once) against the previous implementation (per-rule string
+scans and splits, score sets rebuilt on every call) on the names of the
+bundled tests/*.csv files.
+
+Reports per-name latency for the previous parser, a fresh parser (every
+word tokenized on first sight) and a warm one (words already seen), the
+latter being the steady state of a long job. These runs have the
+parse_name memo off (memo_size=0) so every name goes through the rules.
+
+Two more rows measure the memo (--memo-size entries): a first pass over the
+file with an empty memo (hits are repeated names), and re-parsing each
+--chunk of names right after parsing it, the way recovery paths fall back
+on names of a batch that were already parsed. Exits non-zero if any result
+differs.
+
+Usage (from backend/):
+    python ../performance/benchmarks/bench_fallback_parser.py [--rounds 5]
+        [--memo-size 10000] [--chunk 500]
+"""
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT / "backend"))
+
+from app.services.fallback_name_parser import FallbackNameParser  # noqa: E402
+from app.workers.file_processor import OptimizedFileProcessorService  # noqa: E402
+
+
+class LegacyFallbackNameParser(FallbackNameParser):
+    """Reference implementation (pre-tokenizer) of the parse_name rules"""
+
+    def parse_name(self, name_text: str) -> Dict[str, Optional[str]]:
+        if not name_text:
+            return self._empty_result()
+        name_text = name_text.strip()
+        if self._is_entity(name_text):
+            return self._parse_entity(name_text)
+        if self._has_multiple_names(name_text):
+            return self._parse_multiple_names(name_text)
+        return self._parse_individual_name(name_text)
+
+    def _is_entity(self, name_text: str) -> bool:
+        lower_text = name_text.lower()
+        for keyword in self.ENTITY_KEYWORDS:
+            if keyword in lower_text:
+                return True
+        return lower_text.startswith("the ")
+
+    def _parse_entity(self, name_text: str) -> Dict[str, Optional[str]]:
+        result = self._empty_result()
+        result["entity_name"] = name_text
+        result["is_entity"] = True
+        result["confidence"] = 0.7
+        lower_text = name_text.lower()
+        if "trust" in lower_text or "estate" in lower_text:
+            result["entity_type"] = "trust"
+            extracted_names = self._extract_person_from_trust(name_text)
+            result["first_name"] = extracted_names.get("first_name", "")
+            result["last_name"] = extracted_names.get("last_name", "")
+            result["is_entity"] = False
+            result.pop("entity_name", None)
+        elif any(x in lower_text for x in list(self.COMPANY_KEYWORDS)):
+            result["entity_type"] = "company"
+        elif any(x in lower_text for x in ["foundation", "fund"]):
+            result["entity_type"] = "trust"
+        else:
+            result["entity_type"] = "unknown"
+        return result
+
+    def _has_multiple_names(self, name_text: str) -> bool:
+        return bool(re.search(r"(\s+(&|and)\s+|/)", name_text, re.IGNORECASE))
+
+    def _parse_multiple_names(self, name_text: str) -> Dict[str, Optional[str]]:
+        if "/" in name_text:
+            if "&" in name_text:
+                amp_parts = name_text.split("&")
+                parsed_names = self._parse_person_name_parts(amp_parts[1].strip())
+                if not parsed_names.get("last_name"):
+                    first_part = amp_parts[0].strip()
+                    if "/" in first_part:
+                        parsed_names["last_name"] = first_part.split("/")[0].strip()
+            else:
+                first_part = name_text.split("/")[0].strip()
+                parsed_names = self._parse_person_name_parts(first_part)
+        else:
+            parts = re.split(r"\s+(?:&|and)\s+", name_text, flags=re.IGNORECASE)
+            parsed_names = self._parse_person_name_parts(parts[0].strip())
+
+        result = self._empty_result()
+        result["first_name"] = parsed_names.get("first_name", "")
+        result["last_name"] = parsed_names.get("last_name", "")
+        result["entity_type"] = "person"
+        result["parsing_method"] = "fallback"
+        result["parsing_confidence"] = 0.8
+        return result
+
+    def _parse_individual_name(self, name_text: str) -> Dict[str, Optional[str]]:
+        result = self._empty_result()
+        result["parsing_confidence"] = 0.6
+        result["entity_type"] = "person"
+        result["parsing_method"] = "fallback"
+        if "," in name_text and name_text.count(",") == 1:
+            parts = name_text.split(",")
+            result["last_name"] = parts[0].strip()
+            result["first_name"] = parts[1].strip()
+        else:
+            parsed_names = self._parse_person_name_parts(name_text)
+            result["first_name"] = parsed_names.get("first_name", "")
+            result["last_name"] = parsed_names.get("last_name", "")
+        return result
+
+    def _extract_person_from_trust(self, trust_text: str) -> Dict[str, str]:
+        name_words = []
+        for word in trust_text.split():
+            clean_word = word.strip(".,()").lower()
+            if clean_word in self.ENTITY_MARKERS:
+                continue
+            if len(clean_word) == 1 and clean_word.isalpha():
+                continue
+            if any(char.isdigit() for char in clean_word):
+                continue
+            name_words.append(word.strip(".,()"))
+
+        if not name_words:
+            return {"first_name": "", "last_name": ""}
+        joint_text = " ".join(name_words)
+        if "&" in joint_text or "/" in joint_text:
+            separator = "&" if "&" in joint_text else "/"
+            name_words = joint_text.split(separator)[0].strip().split()
+        if "family trust" in trust_text.lower() and len(name_words) == 1:
+            return {"first_name": "", "last_name": name_words[0]}
+
+        if len(name_words) == 1:
+            return {"first_name": "", "last_name": name_words[0]}
+        elif len(name_words) == 2:
+            return self._recognize_two_names(name_words[0], name_words[1])
+        compound_last = self._check_compound_surname(name_words)
+        if compound_last:
+            remaining = [w for w in name_words if w not in compound_last.split()]
+            if remaining:
+                return self._recognize_name_with_known_last(
+                    remaining[0], compound_last
+                )
+            return {"first_name": "", "last_name": compound_last}
+        return self._recognize_two_names(name_words[0], name_words[1])
+
+    def _parse_person_name_parts(self, name_text: str) -> Dict[str, str]:
+        filtered_parts = []
+        for part in name_text.strip().split():
+            clean_part = part.strip(".,()").replace(",", "")
+            if len(clean_part) == 1 and clean_part.isalpha():
+                continue
+            filtered_parts.append(clean_part)
+        if len(filtered_parts) == 0:
+            return {"first_name": "", "last_name": ""}
+        elif len(filtered_parts) == 1:
+            return {"first_name": filtered_parts[0], "last_name": ""}
+        return {"first_name": filtered_parts[1], "last_name": filtered_parts[0]}
+
+    def _score_as_first_name(self, name_lower: str) -> int:
+        very_common = {"john", "mary", "james", "linda", "robert", "patricia"}
+        very_common |= {"michael", "jennifer", "david", "elizabeth", "william"}
+        very_common |= {"barbara"}
+        common = {"dennis", "phyllis", "warren", "marilyn", "edwin", "gloria"}
+        common |= {"virgil", "carl", "harold", "beverly", "donald", "nancy"}
+        often = {"cole", "dale", "drew", "blake", "jordan", "tyler", "amber", "crystal"}
+        sometimes = {"parker", "carter", "taylor", "morgan", "cameron", "hunter"}
+        if name_lower in very_common:
+            score = 95
+        elif name_lower in common:
+            score = 85
+        elif name_lower in often:
+            score = 75
+        elif name_lower in sometimes:
+            score = 65
+        elif name_lower in self.COMMON_FIRST_NAMES:
+            score = 80
+        else:
+            score = 45
+        if name_lower.endswith(("y", "ie", "a", "ine", "elle", "ette", "een", "lyn")):
+            score += 10
+        if 3 <= len(name_lower) <= 7:
+            score += 5
+        for prefix in self.SURNAME_PREFIXES:
+            if name_lower.startswith(prefix):
+                score -= 20
+                break
+        if name_lower.endswith(("son", "sen", "berg", "stein", "man", "mann")):
+            score -= 15
+        return max(0, min(100, score))
+
+    def _score_as_last_name(self, name_lower: str) -> int:
+        very_common = {"smith", "johnson", "williams", "brown", "jones", "davis"}
+        very_common |= {"miller", "wilson", "moore", "taylor", "anderson", "thomas"}
+        common = {"hansen", "peterson", "nelson", "robinson", "clark", "lewis"}
+        common |= {"walker", "hall", "allen", "young", "king", "wright", "lopez"}
+        regional = {"mcculley", "daake", "pudenz", "chicoine", "birch", "cheslak"}
+        regional |= {"glasnapp", "fry", "mills", "musselman", "petersen"}
+        often = {"baker", "carter", "parker", "mason", "hunter", "turner", "cooper"}
+        if name_lower in very_common:
+            score = 95
+        elif name_lower in common:
+            score = 85
+        elif name_lower in regional:
+            score = 75
+        elif name_lower in often:
+            score = 65
+        elif name_lower in self.COMMON_LAST_NAMES:
+            score = 80
+        else:
+            score = 45
+        for prefix in self.SURNAME_PREFIXES:
+            if name_lower.startswith(prefix):
+                score += 20
+                break
+        if name_lower.endswith(
+            ("son", "sen", "berg", "stein", "man", "mann", "ley", "field", "ford")
+            + ("wood", "worth", "ski", "wicz", "owski", "enko")
+        ):
+            score += 15
+        if 5 <= len(name_lower) <= 12:
+            score += 10
+        if name_lower in self.COMMON_FIRST_NAMES:
+            score -= 10
+        return max(0, min(100, score))
+
+    def _check_compound_surname(self, name_words: List[str]) -> Optional[str]:
+        for i, word in enumerate(name_words):
+            word_lower = word.lower()
+            for prefix in self.SURNAME_PREFIXES:
+                if word_lower == prefix and i < len(name_words) - 1:
+                    return f"{word} {name_words[i + 1]}"
+        for word in name_words:
+            if "-" in word:
+                return word
+        return None
+
+
+def load_names(csv_file: Path) -> List[str]:
+    df = pd.read_csv(csv_file, encoding="latin-1")
+    processor = OptimizedFileProcessorService.__new__(OptimizedFileProcessorService)
+    names, _ = processor.extract_name_data_optimized(df, ["Primary Addressee"])
+    return names
+
+
+def parse_all(parse: Callable, names: List[str]) -> list:
+    results = []
+    for name in names:
+        try:
+            results.append(parse(name))
+        except Exception as e:
+            # Keep failures comparable: both parsers must fail the same way
+            results.append(type(e).__name__)
+    return results
+
+
+def comparable(result):
+    if isinstance(result, str):
+        return result
+    return {**result, "warnings": list(result["warnings"])}
+
+
+def best_seconds(run: Callable[[], None], rounds: int) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--memo-size", type=int, default=10000)
+    parser.add_argument("--chunk", type=int, default=500)
+    args = parser.parse_args()
+
+    csv_files = sorted((REPO_ROOT / "tests").glob("*.csv"))
+    if not csv_files:
+        print("No CSV files found in tests/")
+        return 1
+    names = [name for csv_file in csv_files for name in load_names(csv_file)]
+
+    legacy = LegacyFallbackNameParser()
+    expected = parse_all(legacy.parse_name, names)
+    actual = parse_all(FallbackNameParser(memo_size=0).parse_name, names)
+    mismatches = [
+        name
+        for name, a, b in zip(names, expected, actual)
+        if comparable(a) != comparable(b)
+    ]
+
+    legacy_seconds = best_seconds(
+        lambda: parse_all(legacy.parse_name, names), args.rounds
+    )
+    cold_seconds = best_seconds(
+        lambda: parse_all(FallbackNameParser(memo_size=0).parse_name, names),
+        args.rounds,
+    )
+    warm = FallbackNameParser(memo_size=0)
+    parse_all(warm.parse_name, names)
+    warm_seconds = best_seconds(lambda: parse_all(warm.parse_name, names), args.rounds)
+
+    first_pass = []
+    memo_first_seconds = best_seconds(
+        lambda: first_pass.append(FallbackNameParser(memo_size=args.memo_size))
+        or parse_all(first_pass[-1].parse_name, names),
+        args.rounds,
+    )
+    first_hit_rate = first_pass[-1].memo_snapshot()["hit_rate"]
+
+    memo = FallbackNameParser(memo_size=args.memo_size)
+    reparsed = []
+    reparse_seconds = float("inf")
+    for _ in range(args.rounds):
+        memo.clear_memo()
+        memo.memo_stats.update(hits=0, misses=0)
+        reparsed, seconds = [], 0.0
+        for i in range(0, len(names), args.chunk):
+            chunk = names[i : i + args.chunk]
+            parse_all(memo.parse_name, chunk)
+            start = time.perf_counter()
+            reparsed += parse_all(memo.parse_name, chunk)
+            seconds += time.perf_counter() - start
+        reparse_seconds = min(reparse_seconds, seconds)
+    snapshot = memo.memo_snapshot()
+    mismatches += [
+        name
+        for name, a, b in zip(names, expected, reparsed)
+        if comparable(a) != comparable(b)
+    ]
+
+    print(f"{len(names)} names, {len(warm._tokens)} distinct words")
+    print(f"{'parser':<10}{'us/name':>9}{'speedup':>9}{'memo hit %':>12}")
+    for label, seconds, hit_rate in (
+        ("previous", legacy_seconds, None),
+        ("cold", cold_seconds, None),
+        ("warm", warm_seconds, None),
+        ("memo 1st", memo_first_seconds, first_hit_rate),
+        ("re-parse", reparse_seconds, snapshot["hit_rate"]),
+    ):
+        hits = f"{hit_rate * 100:.1f}" if hit_rate is not None else ""
+        print(
+            f"{label:<10}{seconds / len(names) * 1e6:>9.2f}"
+            f"{legacy_seconds / seconds:>9.2f}{hits:>12}"
+        )
+    print(f"identical results: {len(names) - len(mismatches)}/{len(names)}")
+    for name in mismatches[:10]:
+        print(f"  differs: {name!r}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Fallback pool benchmark: rule-based parsing of a whole file on 1..N cores
+
+Takes the names of all bundled tests/*.csv files, tiled up to --rows, and
+parses them:
+
+- sequential: ConsolidatedGeminiService._fallback_parse name by name (what
+  parse_names_batch did without an API key)
+- pool xK: FallbackPool with K processes (1, 2, 4, ... up to --max-workers,
+  default the CPU count but at least 2), timing the columnar parse and the
+  service path (ConsolidatedGeminiService._pool_fallback: parse plus
+  ParsedName objects)
+- env x2: the service path through get_fallback_pool() configured with
+  GEMINI_FALLBACK_WORKERS=2, as a worker process would run it
+
+Pool start-up (spawning processes, building parsers) is timed on its own and
+excluded from the parse rate. With one process the pool parses in-process,
+so the x2 runs are what exercise sharding and the column merge, even on a
+single-CPU host. Every pooled run is checked against the sequential results
+field by field.
+
+Usage (from backend/):
+    python ../performance/benchmarks/bench_fallback_pool.py [--rows 1000000]
+        [--max-workers 8]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+import pandas as pd
+import structlog
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT / "backend"))
+
+os.environ["GEMINI_API_KEY"] = ""
+os.environ["ENABLE_CACHING"] = "false"
+os.environ["GEMINI_ADAPTIVE_PERSIST"] = "false"
+os.environ["GEMINI_RATE_LIMIT_ENABLED"] = "false"
+
+from app.services import fallback_pool  # noqa: E402
+from app.services.fallback_pool import FallbackPool  # noqa: E402
+from app.services.gemini_service import ConsolidatedGeminiService  # noqa: E402
+from app.workers.file_processor import OptimizedFileProcessorService  # noqa: E402
+
+structlog.configure(
+    wrapper_class=structlog.make_filtering_bound_logger(logging.CRITICAL)
+)
+
+
+def load_names(csv_file: Path) -> List[str]:
+    df = pd.read_csv(csv_file, encoding="latin-1")
+    processor = OptimizedFileProcessorService.__new__(OptimizedFileProcessorService)
+    names, _ = processor.extract_name_data_optimized(df, ["Primary Addressee"])
+    return names
+
+
+def worker_counts(max_workers: int) -> List[int]:
+    counts, workers = [], 1
+    while workers < max_workers:
+        counts.append(workers)
+        workers *= 2
+    return counts + [max_workers]
+
+
+async def run_pool(service, names: List[str], workers: int) -> dict:
+    pool = FallbackPool(workers=workers, min_names=0)
+    start = time.perf_counter()
+    await pool.parse(names[: workers * FallbackPool.SHARDS_PER_WORKER])
+    startup = time.perf_counter() - start
+
+    start = time.perf_counter()
+    columns = await pool.parse(names)
+    parse_seconds = time.perf_counter() - start
+
+    # The same pool behind the service: columnar parse plus ParsedName objects
+    fallback_pool._pool = pool
+    start = time.perf_counter()
+    await service._pool_fallback(names)
+    service_seconds = time.perf_counter() - start
+    fallback_pool.shutdown_fallback_pool()
+    return {
+        "startup": startup,
+        "parse": parse_seconds,
+        "service": service_seconds,
+        "columns": columns,
+    }
+
+
+async def run_env_pool(service, names: List[str]) -> tuple:
+    os.environ["GEMINI_FALLBACK_WORKERS"] = "2"
+    os.environ["GEMINI_FALLBACK_POOL_MIN_NAMES"] = "0"
+    fallback_pool.shutdown_fallback_pool()
+    try:
+        start = time.perf_counter()
+        results = await service._pool_fallback(names)
+        seconds = time.perf_counter() - start
+        pool = fallback_pool.get_fallback_pool()
+        pooled = pool.stats["pooled_calls"] == 1 and pool.workers == 2
+    finally:
+        fallback_pool.shutdown_fallback_pool()
+    return results, seconds, pooled
+
+
+def fields(result) -> tuple:
+    return (
+        result.first_name,
+        result.last_name,
+        result.entity_type,
+        result.parsing_confidence,
+        result.fallback_reason,
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument(
+        "--max-workers", type=int, default=max(2, os.cpu_count() or 1)
+    )
+    args = parser.parse_args()
+
+    csv_files = sorted((REPO_ROOT / "tests").glob("*.csv"))
+    if not csv_files:
+        print("No CSV files found in tests/")
+        return 1
+    base = [name for csv_file in csv_files for name in load_names(csv_file)]
+    names = (base * (args.rows // len(base) + 1))[: args.rows]
+    service = ConsolidatedGeminiService()
+
+    start = time.perf_counter()
+    expected = [service._fallback_parse(name) for name in names]
+    sequential = time.perf_counter() - start
+
+    print(f"{len(names)} names, {os.cpu_count()} CPUs")
+    print(
+        f"{'mode':<12}{'start s':>8}{'parse s':>9}{'names/s':>11}{'service s':>10}"
+        f"{'speedup':>9}{'match':>7}"
+    )
+    print(
+        f"{'sequential':<12}{'':>8}{sequential:>9.2f}"
+        f"{len(names) / sequential:>11.0f}{'':>10}{1.0:>9.2f}{'yes':>7}"
+    )
+    failed = False
+    for workers in worker_counts(args.max_workers):
+        stats = asyncio.run(run_pool(service, names, workers))
+        columns = stats["columns"]
+        match = all(
+            (
+                columns["first_name"][i],
+                columns["last_name"][i],
+                columns["entity_type"][i],
+                columns["parsing_confidence"][i],
+                columns["fallback_reason"][i] or result.fallback_reason,
+            )
+            == fields(result)
+            for i, result in enumerate(expected)
+        )
+        failed = failed or not match
+        print(
+            f"{f'pool x{workers}':<12}{stats['startup']:>8.2f}"
+            f"{stats['parse']:>9.2f}{len(names) / stats['parse']:>11.0f}"
+            f"{stats['service']:>10.2f}{sequential / stats['parse']:>9.2f}"
+            f"{'yes' if match else 'NO':>7}"
+        )
+
+    results, seconds, pooled = asyncio.run(run_env_pool(service, names))
+    match = pooled and [fields(r) for r in results] == [fields(r) for r in expected]
+    failed = failed or not match
+    print(
+        f"{'env x2':<12}{'':>8}{'':>9}{'':>11}{seconds:>10.2f}"
+        f"{sequential / seconds:>9.2f}{'yes' if match else 'NO':>7}"
+    )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Hedged request benchmark against the local Gemini HTTP stub
+
+Runs ConsolidatedGeminiService.parse_names_batch over names from a bundled
+tests/*.csv file against gemini_stub.py with a latency tail: a random share of
+requests (--tail-fraction) takes --tail-factor times as long as usual. Runs
+with GEMINI_HEDGING off and on and reports job wall time, p50/p95/p99 batch
+latency, requests sent (including hedges), hedge wins and the requests the
+stub saw cancelled.
+
+Usage (from backend/):
+    python ../performance/benchmarks/bench_hedging.py [--names 6000]
+        [--tail-fraction 0.04] [--tail-factor 6]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+import pandas as pd
+import structlog
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT / "backend"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+os.environ.setdefault("GEMINI_API_KEY", "benchmark-stub")
+os.environ["ENABLE_CACHING"] = "false"
+os.environ["GEMINI_ADAPTIVE_PERSIST"] = "false"
+os.environ["GEMINI_RATE_LIMIT_ENABLED"] = "false"
+os.environ["GEMINI_PROMPT_MODE"] = "system"
+os.environ["GEMINI_ADAPTIVE_BATCHING"] = "false"
+
+from gemini_stub import start_stub  # noqa: E402
+
+from app.services import gemini_hedging, gemini_prompt_context  # noqa: E402
+from app.services.gemini_service import ConsolidatedGeminiService  # noqa: E402
+from app.workers.file_processor import OptimizedFileProcessorService  # noqa: E402
+
+structlog.configure(
+    wrapper_class=structlog.make_filtering_bound_logger(logging.CRITICAL)
+)
+
+FIRST_TOKEN_SECONDS = 0.3
+RECORD_SECONDS = 0.01
+
+
+def load_names(csv_file: Path) -> List[str]:
+    df = pd.read_csv(csv_file, encoding="latin-1")
+    processor = OptimizedFileProcessorService.__new__(OptimizedFileProcessorService)
+    names, _ = processor.extract_name_data_optimized(df, ["Primary Addressee"])
+    return names
+
+
+async def run_mode(names: List[str], hedging: bool, args) -> dict:
+    stub, runner, base_url = await start_stub(
+        first_token_seconds=FIRST_TOKEN_SECONDS,
+        record_seconds=RECORD_SECONDS,
+        tail_fraction=args.tail_fraction,
+        tail_factor=args.tail_factor,
+    )
+    os.environ["GEMINI_API_BASE_URL"] = base_url
+    os.environ["GEMINI_HEDGING"] = "true" if hedging else "false"
+    gemini_prompt_context._contexts.clear()
+    gemini_hedging._policies.clear()
+
+    service = ConsolidatedGeminiService()
+    start = time.perf_counter()
+    try:
+        result = await service.parse_names_batch(names)
+        total = time.perf_counter() - start
+    finally:
+        await service.cleanup()
+        await runner.cleanup()
+
+    latency = service.get_performance_stats()["batch_latency"]
+    return {
+        "total": total,
+        "p50": latency["p50_seconds"],
+        "p95": latency["p95_seconds"],
+        "p99": latency["p99_seconds"],
+        "hedges": latency["hedging"]["hedges"],
+        "wins": latency["hedging"]["hedge_wins"],
+        "requests": stub.metrics["generate_requests"],
+        "slow": stub.metrics["slow_requests"],
+        "cancelled": stub.metrics["cancelled_requests"],
+        "fallback": result.fallback_used,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--names", type=int, default=6000)
+    parser.add_argument("--tail-fraction", type=float, default=0.04)
+    parser.add_argument("--tail-factor", type=float, default=6.0)
+    args = parser.parse_args()
+
+    csv_files = sorted((REPO_ROOT / "tests").glob("*.csv"))
+    if not csv_files:
+        print("No CSV files found in tests/")
+        return 1
+    names = load_names(csv_files[0])[: args.names]
+
+    print(
+        f"{'hedging':<9}{'total s':>8}{'p50 s':>7}{'p95 s':>7}{'p99 s':>7}"
+        f"{'requests':>9}{'slow':>6}{'hedges':>7}{'wins':>6}{'cancel':>7}"
+        f"{'fallbk':>7}"
+    )
+    for hedging in (False, True):
+        stats = asyncio.run(run_mode(names, hedging, args))
+        print(
+            f"{'on' if hedging else 'off':<9}{stats['total']:>8.2f}"
+            f"{stats['p50']:>7.2f}{stats['p95']:>7.2f}{stats['p99']:>7.2f}"
+            f"{stats['requests']:>9}{stats['slow']:>6}{stats['hedges']:>7}"
+            f"{stats['wins']:>6}{stats['cancelled']:>7}{stats['fallback']:>7}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
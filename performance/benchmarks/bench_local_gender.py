@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Local gender benchmark: Gemini gender fields vs the first-name gender index
+
+Tokens: runs ConsolidatedGeminiService.parse_names_batch over the names in
+the bundled tests/*.csv files against gemini_stub.py with GEMINI_LOCAL_GENDER
+off (records carry gender and gender_confidence) and on (the prompt and
+response schema leave them out), for free-form and schema output. Reports
+prompt and output tokens per name. The stub does not think, so thinking
+tokens saved by not asking for gender are not measured here.
+
+Agreement: compares the index with the genders Gemini returned on the
+current path, taken from earlier job outputs (backend/results/*.xlsx, person
+rows Gemini labelled male or female). For the bundled table alone (plus the
+name lexicon if one is built), and with counts learned from the other half
+of the result files (two-fold, split by file), reports the share of rows the
+index labels and how many of those agree with Gemini.
+
+Coverage: share of person first names from the rule-based parser on the
+test CSVs that the index labels.
+
+Usage (from backend/):
+    python ../performance/benchmarks/bench_local_gender.py [--results DIR]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import List, Tuple
+
+import pandas as pd
+import structlog
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT / "backend"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+os.environ.setdefault("GEMINI_API_KEY", "benchmark-stub")
+os.environ["ENABLE_CACHING"] = "false"
+os.environ["GEMINI_ADAPTIVE_PERSIST"] = "false"
+os.environ["GEMINI_GENDER_PERSIST"] = "false"
+os.environ["GEMINI_RATE_LIMIT_ENABLED"] = "false"
+os.environ["GEMINI_PROMPT_MODE"] = "system"
+
+from gemini_stub import start_stub  # noqa: E402
+
+from app.services import gemini_prompt_context  # noqa: E402
+from app.services.fallback_name_parser import FallbackNameParser  # noqa: E402
+from app.services.gemini_service import ConsolidatedGeminiService  # noqa: E402
+from app.services.gender_index import (  # noqa: E402
+    GenderIndex,
+    load_bundled_table,
+)
+from app.services.name_lexicon import get_name_lexicon  # noqa: E402
+from app.workers.file_processor import OptimizedFileProcessorService  # noqa: E402
+
+structlog.configure(
+    wrapper_class=structlog.make_filtering_bound_logger(logging.CRITICAL)
+)
+
+
+def load_names(csv_file: Path) -> List[str]:
+    df = pd.read_csv(csv_file, encoding="latin-1")
+    processor = OptimizedFileProcessorService.__new__(OptimizedFileProcessorService)
+    names, _ = processor.extract_name_data_optimized(df, ["Primary Addressee"])
+    return names
+
+
+async def run_mode(names: List[str], structured: bool, local_gender: bool) -> dict:
+    stub, runner, base_url = await start_stub()
+    os.environ["GEMINI_API_BASE_URL"] = base_url
+    os.environ["GEMINI_STRUCTURED_OUTPUT"] = "true" if structured else "false"
+    os.environ["GEMINI_LOCAL_GENDER"] = "true" if local_gender else "false"
+    gemini_prompt_context._contexts.clear()
+
+    service = ConsolidatedGeminiService()
+    try:
+        await service.parse_names_batch(names)
+    finally:
+        await service.cleanup()
+        await runner.cleanup()
+
+    prompt_names = max(service.stats["prompt_names"], 1)
+    return {
+        "requests": stub.metrics["generate_requests"],
+        "prompt_per_name": service.stats["prompt_tokens"] / prompt_names,
+        "output_per_name": stub.metrics["output_tokens"] / prompt_names,
+    }
+
+
+def load_reference(results_dir: Path) -> List[Tuple[str, str, str, float]]:
+    """(file, first name, gender, confidence) of Gemini-labelled person rows"""
+    rows = []
+    for path in sorted(results_dir.glob("*.xlsx")):
+        df = pd.read_excel(path)
+        if not {"gender", "first_name", "parsing_method"} <= set(df.columns):
+            continue
+        df = df[
+            (df["parsing_method"] == "gemini")
+            & (df["entity_type"] == "person")
+            & df["gender"].isin(["male", "female"])
+            & df["first_name"].notna()
+        ]
+        confidence = pd.to_numeric(df["gender_confidence"], errors="coerce")
+        rows.extend(
+            (path.name, str(first_name), gender, conf)
+            for first_name, gender, conf in zip(
+                df["first_name"], df["gender"], confidence.fillna(0.0)
+            )
+        )
+    return rows
+
+
+def agreement(index: GenderIndex, rows: list) -> Tuple[int, int, int]:
+    """(rows, rows labelled, labelled rows agreeing with Gemini)"""
+    labelled = agreed = 0
+    for _, first_name, gender, _ in rows:
+        inferred, _ = index.infer(first_name)
+        if inferred != "unknown":
+            labelled += 1
+            agreed += inferred == gender
+    return len(rows), labelled, agreed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--results", type=Path, default=REPO_ROOT / "backend" / "results"
+    )
+    args = parser.parse_args()
+
+    csv_files = sorted((REPO_ROOT / "tests").glob("*.csv"))
+    if not csv_files:
+        print("No CSV files found in tests/")
+        return 1
+    names = [name for csv_file in csv_files for name in load_names(csv_file)]
+
+    print(
+        f"{'output':<12}{'gender':<10}{'requests':>9}{'prompt tok/name':>16}"
+        f"{'out tok/name':>13}"
+    )
+    for structured in (False, True):
+        for local_gender in (False, True):
+            stats = asyncio.run(run_mode(names, structured, local_gender))
+            print(
+                f"{'schema' if structured else 'free-form':<12}"
+                f"{'local' if local_gender else 'gemini':<10}"
+                f"{stats['requests']:>9}{stats['prompt_per_name']:>16.1f}"
+                f"{stats['output_per_name']:>13.1f}"
+            )
+
+    bundled = load_bundled_table()
+    lexicon = get_name_lexicon()
+    reference = load_reference(args.results)
+    print()
+    if reference:
+        files = sorted({row[0] for row in reference})
+        folds = [
+            [row for row in reference if files.index(row[0]) % 2 == fold]
+            for fold in (0, 1)
+        ]
+        base = GenderIndex(bundled, lexicon=lexicon)
+        learned_totals = [0, 0, 0]
+        for fold in (0, 1):
+            trained = GenderIndex(bundled, lexicon=lexicon)
+            for _, first_name, gender, confidence in folds[1 - fold]:
+                trained.observe(first_name, gender, confidence)
+            for i, value in enumerate(agreement(trained, folds[fold])):
+                learned_totals[i] += value
+        print(
+            f"{len(reference)} Gemini-labelled person rows in {len(files)} "
+            f"result files ({'with' if lexicon else 'no'} name lexicon)"
+        )
+        print(f"{'index':<18}{'labelled':>10}{'agree':>10}")
+        for label, (total, labelled, agreed) in (
+            ("bundled", agreement(base, reference)),
+            ("bundled+learned", learned_totals),
+        ):
+            print(
+                f"{label:<18}{labelled / total:>10.1%}"
+                f"{agreed / max(labelled, 1):>10.1%}"
+            )
+    else:
+        print(f"No Gemini-labelled result files in {args.results}")
+
+    fallback = FallbackNameParser(memo_size=0)
+    first_names = []
+    for name in names:
+        try:
+            parsed = fallback.parse_name(name)
+        except Exception:
+            continue
+        if parsed["entity_type"] == "person" and parsed["first_name"]:
+            first_names.append(parsed["first_name"])
+    index = GenderIndex(bundled, lexicon=lexicon)
+    known = sum(index.infer(first_name)[0] != "unknown" for first_name in first_names)
+    print()
+    print(
+        f"coverage: {known} of {len(first_names)} person first names on the "
+        f"test CSVs labelled ({known / max(len(first_names), 1):.1%})"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Name extraction benchmark and equivalence check
+
+Compares the column-wise OptimizedFileProcessorService.extract_name_data_optimized
+against the previous row-by-row (iterrows) implementation on the bundled
+tests/*.csv files. Exits non-zero if any output differs.
+
+Usage (from backend/):
+    python ../performance/benchmarks/bench_name_extraction.py [--scale N]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+import pandas as pd
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT / "backend"))
+
+from app.workers.file_processor import OptimizedFileProcessorService  # noqa: E402
+
+
+def legacy_extract(
+    df: pd.DataFrame, name_columns: List[str]
+) -> Tuple[List[str], List[int]]:
+    """Row-by-row reference implementation (pre-vectorization)"""
+    skip_words = OptimizedFileProcessorService.SKIP_COLUMN_WORDS
+    non_name_values = OptimizedFileProcessorService.NON_NAME_VALUES
+    name_texts = []
+    row_indices = []
+
+    for idx, row in df.iterrows():
+        name_parts = []
+        for col in name_columns:
+            if pd.notna(row[col]) and str(row[col]).strip():
+                name_parts.append(str(row[col]).strip())
+
+        addressee_cols = [col for col in df.columns if "addressee" in col.lower()]
+        for col in addressee_cols:
+            if col in name_columns:
+                continue
+            col_lower = col.lower()
+            if any(skip_word in col_lower for skip_word in skip_words):
+                continue
+            if pd.notna(row[col]) and str(row[col]).strip():
+                value = str(row[col]).strip()
+                if value.lower() in non_name_values:
+                    continue
+                name_parts.append(value)
+
+        combined_name = " ".join(name_parts).strip()
+        combined_name = (
+            combined_name.replace(" Other", "").replace("Other ", "").strip()
+        )
+        name_tokens = combined_name.split()
+        cleaned_tokens = [token for token in name_tokens if len(token.rstrip(".,")) > 1]
+        combined_name = " ".join(cleaned_tokens).strip()
+
+        name_texts.append(combined_name if combined_name else "")
+        row_indices.append(idx)
+
+    return name_texts, row_indices
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--scale",
+        type=int,
+        default=1,
+        help="Repeat each file N times to benchmark larger frames",
+    )
+    args = parser.parse_args()
+
+    # Avoid constructing the full service (it needs upload dirs / API config)
+    processor = OptimizedFileProcessorService.__new__(OptimizedFileProcessorService)
+
+    csv_files = sorted((REPO_ROOT / "tests").glob("*.csv"))
+    if not csv_files:
+        print("No CSV files found in tests/")
+        return 1
+
+    failures = 0
+    print(f"{'file':<12}{'rows':>10}{'legacy rows/s':>16}{'vector rows/s':>16}{'speedup':>10}")
+
+    for csv_file in csv_files:
+        df = pd.read_csv(csv_file, encoding="latin-1")
+        if args.scale > 1:
+            df = pd.concat([df] * args.scale, ignore_index=True)
+
+        name_columns = [c for c in df.columns if "name" in c.lower()] or [
+            df.columns[0]
+        ]
+
+        legacy, legacy_time = timed(legacy_extract, df, name_columns)
+        vector, vector_time = timed(
+            processor.extract_name_data_optimized, df, name_columns
+        )
+
+        if legacy != vector:
+            failures += 1
+            mismatches = [
+                (i, a, b) for i, (a, b) in enumerate(zip(legacy[0], vector[0])) if a != b
+            ]
+            print(f"MISMATCH in {csv_file.name}: {mismatches[:5]}")
+
+        rows = len(df)
+        label = csv_file.stem.rsplit(",", 1)[-1].strip()
+        print(
+            f"{label:<12}{rows:>10}"
+            f"{rows / legacy_time:>16,.0f}{rows / vector_time:>16,.0f}"
+            f"{legacy_time / vector_time:>9.1f}x"
+        )
+
+    print("equivalence:", "FAILED" if failures else "OK")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
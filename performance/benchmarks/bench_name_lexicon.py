@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Name lexicon benchmark: memory-mapped tables vs Python dicts
+
+Writes census-sized synthetic frequency tables (--first-names rows of name,
+sex, count and --surnames rows of name, count, Zipf-distributed counts; the
+words of the bundled tests/*.csv names are included so lookups hit), builds
+the lexicon with scripts/build_name_lexicon.py and compares it with loading
+the same tables into Python dicts, the way a module-level table would be:
+
+- build: CSV to binary file, and file size
+- open: NameLexicon(path) vs reading the CSVs into dicts, with the Python
+  heap each leaves behind (tracemalloc); the lexicon's pages are file-backed
+  page cache, shared by every worker process that maps the file
+- lookup: first_name_frequency on names seen for the first time (binary
+  search), on repeated names (per-process cache) and a dict lookup
+- parse: FallbackNameParser.parse_name over the bundled names with and
+  without the lexicon, and how many results the lexicon scores changed
+
+Usage (from backend/):
+    python ../performance/benchmarks/bench_name_lexicon.py
+        [--first-names 100000] [--surnames 160000]
+"""
+
+import argparse
+import csv
+import random
+import string
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+import pandas as pd
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT / "backend"))
+sys.path.insert(0, str(REPO_ROOT / "backend" / "scripts"))
+
+import build_name_lexicon  # noqa: E402
+
+from app.services.fallback_name_parser import FallbackNameParser  # noqa: E402
+from app.services.name_lexicon import NameLexicon, write_lexicon  # noqa: E402
+from app.workers.file_processor import OptimizedFileProcessorService  # noqa: E402
+
+
+def load_names(csv_file: Path) -> List[str]:
+    df = pd.read_csv(csv_file, encoding="latin-1")
+    processor = OptimizedFileProcessorService.__new__(OptimizedFileProcessorService)
+    names, _ = processor.extract_name_data_optimized(df, ["Primary Addressee"])
+    return names
+
+
+def vocabulary(seed_words: List[str], size: int, rng: random.Random) -> List[str]:
+    words = list(dict.fromkeys(seed_words))[:size]
+    seen = set(words)
+    while len(words) < size:
+        word = "".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 11)))
+        if word not in seen:
+            seen.add(word)
+            words.append(word)
+    rng.shuffle(words)
+    return words
+
+
+def write_tables(directory: Path, args, seed_words: List[str]) -> Tuple[Path, Path]:
+    rng = random.Random(7)
+    first_path, last_path = directory / "first.csv", directory / "last.csv"
+    with open(first_path, "w", newline="") as handle:
+        writer = csv.writer(handle)
+        for rank, name in enumerate(vocabulary(seed_words, args.first_names, rng)):
+            count = int(5_000_000 / (rank + 1)) + 5
+            female = rng.random()
+            writer.writerow([name.capitalize(), "F", int(count * female)])
+            writer.writerow([name.capitalize(), "M", count - int(count * female)])
+    with open(last_path, "w", newline="") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(["name", "rank", "count"])
+        for rank, name in enumerate(vocabulary(seed_words, args.surnames, rng)):
+            writer.writerow([name.upper(), rank + 1, int(2_000_000 / (rank + 1)) + 100])
+    return first_path, last_path
+
+
+def timed(run: Callable):
+    start = time.perf_counter()
+    result = run()
+    return result, time.perf_counter() - start
+
+
+def heap_after(run: Callable):
+    """Result of run() and the Python heap it still holds"""
+    tracemalloc.start()
+    result = run()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+
+def per_call_ns(lookup: Callable[[str], object], keys: List[str]) -> float:
+    start = time.perf_counter()
+    for key in keys:
+        lookup(key)
+    return (time.perf_counter() - start) / len(keys) * 1e9
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--first-names", type=int, default=100_000)
+    parser.add_argument("--surnames", type=int, default=160_000)
+    args = parser.parse_args()
+
+    csv_files = sorted((REPO_ROOT / "tests").glob("*.csv"))
+    if not csv_files:
+        print("No CSV files found in tests/")
+        return 1
+    names = [name for csv_file in csv_files for name in load_names(csv_file)]
+    seed_words = [
+        word.lower()
+        for name in names
+        for word in name.split()
+        if word.isalpha() and len(word) > 1
+    ]
+
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+        first_path, last_path = write_tables(directory, args, seed_words)
+        lexicon_path = directory / "name_lexicon.bin"
+
+        (first_names, surnames), load_seconds = timed(
+            lambda: (
+                build_name_lexicon.load_first_names([first_path]),
+                build_name_lexicon.load_surnames([last_path]),
+            )
+        )
+        size, write_seconds = timed(
+            lambda: write_lexicon(lexicon_path, first_names, surnames)
+        )
+        print(
+            f"{len(first_names)} first names, {len(surnames)} surnames: "
+            f"build {load_seconds + write_seconds:.2f} s "
+            f"(CSV {load_seconds:.2f} s), file {size / 1024:.0f} KiB"
+        )
+
+        # Opening the dicts is the CSV load timed above; tracing slows it down,
+        # so heap sizes come from separate runs
+        tables, heap = heap_after(
+            lambda: (
+                build_name_lexicon.load_first_names([first_path]),
+                build_name_lexicon.load_surnames([last_path]),
+            )
+        )
+        _, lexicon_heap = heap_after(lambda: NameLexicon(lexicon_path).close())
+        lexicon, open_seconds = timed(lambda: NameLexicon(lexicon_path))
+        print()
+        print(f"{'open':<10}{'ms':>10}{'heap KiB':>10}")
+        print(f"{'dicts':<10}{load_seconds * 1000:>10.1f}{heap / 1024:>10.0f}")
+        print(
+            f"{'lexicon':<10}{open_seconds * 1000:>10.3f}{lexicon_heap / 1024:>10.0f}"
+        )
+
+        rng = random.Random(3)
+        keys = rng.sample(sorted(first_names), min(50_000, len(first_names)))
+        keys += [key + "q" for key in keys[:5000]]  # misses
+        first_table = tables[0]
+        lexicon.CACHE_SIZE = len(keys) * 2
+        uncached = per_call_ns(lexicon.first_name_frequency, keys)
+        cached = per_call_ns(lexicon.first_name_frequency, keys)
+        print()
+        print(f"{'lookup':<10}{'ns/call':>10}")
+        print(f"{'lexicon':<10}{uncached:>10.0f}  first sight (binary search)")
+        print(f"{'lexicon':<10}{cached:>10.0f}  repeated (cached)")
+        print(f"{'dict':<10}{per_call_ns(first_table.get, keys):>10.0f}")
+
+        plain = FallbackNameParser(memo_size=0)
+        scored = FallbackNameParser(memo_size=0, lexicon=lexicon)
+        plain_results, plain_seconds = timed(lambda: parse_all(plain, names))
+        scored_results, scored_seconds = timed(lambda: parse_all(scored, names))
+        changed = sum(a != b for a, b in zip(plain_results, scored_results))
+        print()
+        print(f"{'parse':<10}{'us/name':>10}")
+        print(f"{'built-in':<10}{plain_seconds / len(names) * 1e6:>10.2f}")
+        print(
+            f"{'lexicon':<10}{scored_seconds / len(names) * 1e6:>10.2f}"
+            f"  ({changed} of {len(names)} results changed)"
+        )
+        lexicon.close()
+    return 0
+
+
+def parse_all(parser: FallbackNameParser, names: List[str]) -> list:
+    results = []
+    for name in names:
+        try:
+            result = parser.parse_name(name)
+            results.append((result["first_name"], result["last_name"]))
+        except Exception as e:
+            results.append(type(e).__name__)
+    return results
+
+
+if __name__ == "__main__":
+    sys.exit(main())
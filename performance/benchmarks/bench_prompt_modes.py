@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Prompt mode benchmark against the local Gemini HTTP stub
+
+Runs ConsolidatedGeminiService.parse_names_batch over the names in the bundled
+tests/*.csv files once per GEMINI_PROMPT_MODE (inline, system, cached, and
+cached against a stub that refuses to create caches), over real HTTP to
+gemini_stub.py. Reports request bytes and input tokens per name as counted by
+the stub, cached tokens per name, and any request the stub rejected.
+
+Usage (from backend/):
+    python ../performance/benchmarks/bench_prompt_modes.py
+"""
+
+import asyncio
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import List
+
+import pandas as pd
+import structlog
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT / "backend"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+os.environ.setdefault("GEMINI_API_KEY", "benchmark-stub")
+os.environ["ENABLE_CACHING"] = "false"
+os.environ["GEMINI_ADAPTIVE_PERSIST"] = "false"
+os.environ["GEMINI_RATE_LIMIT_ENABLED"] = "false"
+
+from gemini_stub import start_stub  # noqa: E402
+
+from app.services import gemini_prompt_context  # noqa: E402
+from app.services.gemini_service import ConsolidatedGeminiService  # noqa: E402
+from app.workers.file_processor import OptimizedFileProcessorService  # noqa: E402
+
+structlog.configure(
+    wrapper_class=structlog.make_filtering_bound_logger(logging.ERROR)
+)
+
+MODES = [
+    ("inline", "inline", True),
+    ("system", "system", True),
+    ("cached", "cached", True),
+    ("cached/no-cache", "cached", False),
+]
+
+
+def load_names(csv_file: Path) -> List[str]:
+    df = pd.read_csv(csv_file, encoding="latin-1")
+    processor = OptimizedFileProcessorService.__new__(OptimizedFileProcessorService)
+    names, _ = processor.extract_name_data_optimized(df, ["Primary Addressee"])
+    return names
+
+
+async def run_mode(names: List[str], mode: str, caching_enabled: bool) -> dict:
+    stub, runner, base_url = await start_stub(caching_enabled=caching_enabled)
+    os.environ["GEMINI_API_BASE_URL"] = base_url
+    os.environ["GEMINI_PROMPT_MODE"] = mode
+    gemini_prompt_context._contexts.clear()
+
+    service = ConsolidatedGeminiService()
+    try:
+        result = await service.parse_names_batch(names)
+    finally:
+        await service.cleanup()
+        await runner.cleanup()
+
+    prompt_stats = service.get_performance_stats()["prompt_stats"]
+    sent = max(service.stats["prompt_names"], 1)
+    return {
+        "mode_used": prompt_stats["mode"],
+        "requests": stub.metrics["generate_requests"],
+        "rejected": stub.metrics["rejected_requests"],
+        "errors": stub.metrics["errors"],
+        "kb_per_request": stub.metrics["request_bytes"]
+        / 1024
+        / max(stub.metrics["generate_requests"] + stub.metrics["rejected_requests"], 1),
+        "tokens_per_name": prompt_stats["input_tokens_per_name"],
+        "cached_per_name": service.stats["cached_prompt_tokens"] / sent,
+        "inline_estimate": prompt_stats["inline_input_tokens_per_name_estimate"],
+        "fallback": result.fallback_used,
+    }
+
+
+def main() -> int:
+    csv_files = sorted((REPO_ROOT / "tests").glob("*.csv"))
+    if not csv_files:
+        print("No CSV files found in tests/")
+        return 1
+
+    print(
+        f"{'file':<8}{'mode':<17}{'used':<8}{'requests':>9}{'rejected':>9}"
+        f"{'KB/req':>8}{'in tok/name':>12}{'cached/name':>12}{'inline est':>11}"
+    )
+    errors = []
+    for csv_file in csv_files:
+        names = load_names(csv_file)
+        label = csv_file.stem.rsplit(",", 1)[-1].strip()
+        for label_mode, mode, caching_enabled in MODES:
+            stats = asyncio.run(run_mode(names, mode, caching_enabled))
+            errors.extend(stats["errors"])
+            print(
+                f"{label:<8}{label_mode:<17}{stats['mode_used']:<8}"
+                f"{stats['requests']:>9}{stats['rejected']:>9}"
+                f"{stats['kb_per_request']:>8.1f}{stats['tokens_per_name']:>12.1f}"
+                f"{stats['cached_per_name']:>12.1f}{stats['inline_estimate']:>11.1f}"
+            )
+
+    for message in dict.fromkeys(errors):
+        print(f"stub rejected: {message}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Response format benchmark: free-form JSON text vs schema-constrained records
+
+Runs ConsolidatedGeminiService.parse_names_batch over the names in the bundled
+tests/*.csv files against gemini_stub.py with GEMINI_STRUCTURED_OUTPUT off
+(verbose objects in a markdown fence, matched by position) and on
+(responseSchema, compact records matched by input number). Each runs with a
+well-behaved stub and with one that shuffles records and drops every 7th.
+
+Reports output tokens per name, responses that failed to parse, records the
+response left out, and Gemini results assigned to the wrong input name.
+
+Usage (from backend/):
+    python ../performance/benchmarks/bench_response_format.py
+"""
+
+import asyncio
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import List
+
+import pandas as pd
+import structlog
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT / "backend"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+os.environ.setdefault("GEMINI_API_KEY", "benchmark-stub")
+os.environ["ENABLE_CACHING"] = "false"
+os.environ["GEMINI_ADAPTIVE_PERSIST"] = "false"
+os.environ["GEMINI_RATE_LIMIT_ENABLED"] = "false"
+os.environ["GEMINI_PROMPT_MODE"] = "system"
+
+from gemini_stub import start_stub  # noqa: E402
+
+from app.services import gemini_prompt_context  # noqa: E402
+from app.services.gemini_service import ConsolidatedGeminiService  # noqa: E402
+from app.workers.file_processor import OptimizedFileProcessorService  # noqa: E402
+
+structlog.configure(
+    wrapper_class=structlog.make_filtering_bound_logger(logging.CRITICAL)
+)
+
+STUBS = [
+    ("ordered", {}),
+    ("shuffled+drops", {"shuffle": True, "drop_every": 7}),
+]
+
+
+def load_names(csv_file: Path) -> List[str]:
+    df = pd.read_csv(csv_file, encoding="latin-1")
+    processor = OptimizedFileProcessorService.__new__(OptimizedFileProcessorService)
+    names, _ = processor.extract_name_data_optimized(df, ["Primary Addressee"])
+    return names
+
+
+async def run_mode(names: List[str], structured: bool, stub_options: dict) -> dict:
+    stub, runner, base_url = await start_stub(**stub_options)
+    os.environ["GEMINI_API_BASE_URL"] = base_url
+    os.environ["GEMINI_STRUCTURED_OUTPUT"] = "true" if structured else "false"
+    gemini_prompt_context._contexts.clear()
+
+    service = ConsolidatedGeminiService()
+    try:
+        result = await service.parse_names_batch(names)
+    finally:
+        await service.cleanup()
+        await runner.cleanup()
+
+    # The stub answers first = first word, so a Gemini result carrying another
+    # name's first word was matched to the wrong input
+    misassigned = sum(
+        1
+        for name, parsed in zip(names, result.results)
+        if parsed.parsing_method == "gemini"
+        and parsed.first_name
+        and parsed.first_name != (name.split() or [""])[0].title()
+    )
+    return {
+        "requests": stub.metrics["generate_requests"],
+        "output_per_name": stub.metrics["output_tokens"]
+        / max(service.stats["prompt_names"], 1),
+        "parse_errors": service.stats["response_parse_errors"],
+        "missing": service.stats["response_records_missing"],
+        "misassigned": misassigned,
+    }
+
+
+def main() -> int:
+    csv_files = sorted((REPO_ROOT / "tests").glob("*.csv"))
+    if not csv_files:
+        print("No CSV files found in tests/")
+        return 1
+
+    print(
+        f"{'file':<8}{'output':<12}{'stub':<16}{'requests':>9}{'out tok/name':>13}"
+        f"{'parse err':>10}{'missing':>9}{'misassigned':>12}"
+    )
+    for csv_file in csv_files:
+        names = load_names(csv_file)
+        label = csv_file.stem.rsplit(",", 1)[-1].strip()
+        for structured in (False, True):
+            for stub_label, stub_options in STUBS:
+                stats = asyncio.run(run_mode(names, structured, stub_options))
+                print(
+                    f"{label:<8}{'schema' if structured else 'free-form':<12}"
+                    f"{stub_label:<16}{stats['requests']:>9}"
+                    f"{stats['output_per_name']:>13.1f}{stats['parse_errors']:>10}"
+                    f"{stats['missing']:>9}{stats['misassigned']:>12}"
+                )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Split-and-retry benchmark: failed batches bisected instead of sent to fallback
+
+Runs the names in the bundled tests/*.csv files, with a few pathological rows
+mixed in (very long text with control and bidi characters), against a fake
+session that fails any request containing one of them with a 500, the way a
+single bad input can break a whole batch. Compares whole-batch fallback
+(GEMINI_SPLIT_RETRY=false) with bisecting the failed batches.
+
+Usage (from backend/):
+    python ../performance/benchmarks/bench_split_retry.py [--poison-every 400]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import List, Set
+
+import pandas as pd
+import structlog
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT / "backend"))
+
+os.environ.setdefault("GEMINI_API_KEY", "benchmark-stub")
+os.environ["ENABLE_CACHING"] = "false"
+os.environ["GEMINI_ADAPTIVE_PERSIST"] = "false"
+os.environ["GEMINI_RATE_LIMIT_ENABLED"] = "false"
+os.environ["GEMINI_PROMPT_MODE"] = "system"
+os.environ["GEMINI_STRUCTURED_OUTPUT"] = "true"
+os.environ["GEMINI_ADAPTIVE_BATCHING"] = "false"
+
+from app.services import batch_tuner  # noqa: E402
+from app.services.gemini_service import ConsolidatedGeminiService  # noqa: E402
+from app.workers.file_processor import OptimizedFileProcessorService  # noqa: E402
+
+structlog.configure(
+    wrapper_class=structlog.make_filtering_bound_logger(logging.CRITICAL)
+)
+
+POISON = "TRUST \u202e\u0000 " + "\u0301" * 400 + " ESTATE OF " * 150
+
+
+def request_names(payload: dict) -> List[str]:
+    text = payload["contents"][0]["parts"][0]["text"]
+    block = text.split("## Input\n", 1)[1].split("\n\n", 1)[0]
+    return [
+        line.split(". ", 1)[1] if ". " in line else "" for line in block.splitlines()
+    ]
+
+
+class StubResponse:
+    def __init__(self, status: int, body: dict):
+        self.status = status
+        self.body = body
+
+    async def json(self):
+        return self.body
+
+    async def text(self):
+        return json.dumps(self.body)
+
+    async def __aenter__(self):
+        await asyncio.sleep(0)
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class StubSession:
+    """Fake aiohttp session: a 500 for any batch holding a poisoned name"""
+
+    closed = False
+
+    def __init__(self, poisoned: Set[str]):
+        self.poisoned = poisoned
+        self.metrics = {"requests": 0, "failed": 0, "names_sent": 0}
+
+    def post(self, url, **kwargs):
+        names = request_names(kwargs["json"])
+        self.metrics["requests"] += 1
+        self.metrics["names_sent"] += len(names)
+        if any(name in self.poisoned for name in names):
+            self.metrics["failed"] += 1
+            return StubResponse(
+                500, {"error": {"code": 500, "message": "Internal error encountered."}}
+            )
+        records = []
+        for number, name in enumerate(names, 1):
+            words = name.split() or [""]
+            records.append(
+                {
+                    "i": number,
+                    "f": words[-1].title(),
+                    "l": words[0].title(),
+                    "t": "person",
+                    "g": "unknown",
+                    "gc": 0.0,
+                    "pc": 0.9,
+                }
+            )
+        return StubResponse(
+            200,
+            {
+                "candidates": [
+                    {
+                        "finishReason": "STOP",
+                        "content": {"parts": [{"text": json.dumps(records)}]},
+                    }
+                ],
+                "usageMetadata": {"candidatesTokenCount": 40 * len(names)},
+            },
+        )
+
+
+def load_names(csv_file: Path) -> List[str]:
+    df = pd.read_csv(csv_file, encoding="latin-1")
+    processor = OptimizedFileProcessorService.__new__(OptimizedFileProcessorService)
+    names, _ = processor.extract_name_data_optimized(df, ["Primary Addressee"])
+    return names
+
+
+async def run_mode(names: List[str], poisoned: Set[str], split: bool) -> dict:
+    os.environ["GEMINI_SPLIT_RETRY"] = "true" if split else "false"
+    batch_tuner._controllers.clear()
+    session = StubSession(poisoned)
+    service = ConsolidatedGeminiService()
+
+    async def get_session():
+        return session
+
+    service._get_or_create_session = get_session
+    result = await service.parse_names_batch(names)
+    return {
+        **session.metrics,
+        "fallback": result.fallback_used,
+        "split": service.get_performance_stats()["split_stats"],
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--poison-every",
+        type=int,
+        default=400,
+        help="Insert one pathological row every N names",
+    )
+    args = parser.parse_args()
+
+    # Failed requests are retried after timeouts/backoff; not what we measure
+    real_sleep = asyncio.sleep
+
+    async def fast_sleep(delay, *a, **kw):
+        return await real_sleep(0)
+
+    asyncio.sleep = fast_sleep
+
+    csv_files = sorted((REPO_ROOT / "tests").glob("*.csv"))
+    if not csv_files:
+        print("No CSV files found in tests/")
+        return 1
+
+    print(
+        f"{'file':<8}{'mode':<10}{'names':>7}{'poison':>7}{'requests':>9}"
+        f"{'failed':>8}{'names sent':>11}{'fallbk':>8}"
+    )
+    depth_lines = []
+    for csv_file in csv_files:
+        names = load_names(csv_file)
+        poisoned = set()
+        for position in range(args.poison_every // 2, len(names), args.poison_every):
+            row = f"{POISON}{position}"
+            poisoned.add(row)
+            names.insert(position, row)
+        label = csv_file.stem.rsplit(",", 1)[-1].strip()
+        for split in (False, True):
+            stats = asyncio.run(run_mode(names, poisoned, split))
+            print(
+                f"{label:<8}{'split' if split else 'fallback':<10}{len(names):>7}"
+                f"{len(poisoned):>7}{stats['requests']:>9}{stats['failed']:>8}"
+                f"{stats['names_sent']:>11}{stats['fallback']:>8}"
+            )
+            for depth, level in stats["split"]["by_depth"].items():
+                depth_lines.append(
+                    f"{label:<8}{depth:>6}{level['requests']:>9}"
+                    f"{level['recovered']:>10}{level['fallback']:>9}"
+                    f"{level['fallback_rate']:>14.1%}"
+                )
+
+    print()
+    print(
+        f"{'file':<8}{'depth':>6}{'requests':>9}{'recovered':>10}{'fallback':>9}"
+        f"{'fallback rate':>14}"
+    )
+    for line in depth_lines:
+        print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
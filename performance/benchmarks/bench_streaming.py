@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Streaming transport benchmark against the local Gemini SSE stub
+
+Runs ConsolidatedGeminiService.parse_names_batch with GEMINI_STREAMING off
+(generateContent) and on (streamGenerateContent, alt=sse) against
+gemini_stub.py, which simulates thinking time before the first output token
+and generation time per record.
+
+- interactive: a small job (first 40 names of a bundled CSV); reports time
+  until the first result reaches the pipeline (first progress callback) and
+  until the job is done
+- stalls: a larger slice where every 4th request hangs halfway through its
+  output. Non-streaming requests wait out GEMINI_TIMEOUT_SECONDS and re-send
+  the batch; streams are cut after GEMINI_STREAM_STALL_SECONDS without data,
+  keep the decoded records and re-request only the rest.
+
+Usage (from backend/):
+    python ../performance/benchmarks/bench_streaming.py
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+import pandas as pd
+import structlog
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT / "backend"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+os.environ.setdefault("GEMINI_API_KEY", "benchmark-stub")
+os.environ["ENABLE_CACHING"] = "false"
+os.environ["GEMINI_ADAPTIVE_PERSIST"] = "false"
+os.environ["GEMINI_RATE_LIMIT_ENABLED"] = "false"
+os.environ["GEMINI_PROMPT_MODE"] = "system"
+# Normal generation here takes ~2 s; both limits sit above that
+os.environ["GEMINI_TIMEOUT_SECONDS"] = "6"
+os.environ["GEMINI_STREAM_STALL_SECONDS"] = "2"
+
+from gemini_stub import start_stub  # noqa: E402
+
+from app.services import gemini_prompt_context  # noqa: E402
+from app.services.gemini_service import ConsolidatedGeminiService  # noqa: E402
+from app.workers.file_processor import OptimizedFileProcessorService  # noqa: E402
+
+structlog.configure(
+    wrapper_class=structlog.make_filtering_bound_logger(logging.CRITICAL)
+)
+
+FIRST_TOKEN_SECONDS = 0.5
+RECORD_SECONDS = 0.04
+
+
+def load_names(csv_file: Path) -> List[str]:
+    df = pd.read_csv(csv_file, encoding="latin-1")
+    processor = OptimizedFileProcessorService.__new__(OptimizedFileProcessorService)
+    names, _ = processor.extract_name_data_optimized(df, ["Primary Addressee"])
+    return names
+
+
+async def run_mode(names: List[str], streaming: bool, stall_every: int) -> dict:
+    stub, runner, base_url = await start_stub(
+        first_token_seconds=FIRST_TOKEN_SECONDS,
+        record_seconds=RECORD_SECONDS,
+        stall_every=stall_every,
+    )
+    os.environ["GEMINI_API_BASE_URL"] = base_url
+    os.environ["GEMINI_STREAMING"] = "true" if streaming else "false"
+    gemini_prompt_context._contexts.clear()
+
+    service = ConsolidatedGeminiService()
+    first_result = None
+    start = time.perf_counter()
+
+    def progress(processed: int, total: int):
+        nonlocal first_result
+        if first_result is None:
+            first_result = time.perf_counter() - start
+
+    try:
+        result = await service.parse_names_batch(names, progress_callback=progress)
+        total = time.perf_counter() - start
+    finally:
+        await service.cleanup()
+        await runner.cleanup()
+
+    return {
+        "first_result": first_result or 0.0,
+        "total": total,
+        "requests": stub.metrics["generate_requests"],
+        "stalled": stub.metrics["stalled_requests"],
+        "fallback": result.fallback_used,
+        "salvaged": service.stats["salvaged_records"],
+    }
+
+
+def main() -> int:
+    csv_files = sorted((REPO_ROOT / "tests").glob("*.csv"))
+    if not csv_files:
+        print("No CSV files found in tests/")
+        return 1
+    names = load_names(csv_files[0])
+
+    scenarios = [
+        ("interactive", names[:40], 0),
+        ("stalls", names[:400], 4),
+    ]
+    print(
+        f"{'scenario':<13}{'transport':<11}{'first s':>8}{'total s':>8}"
+        f"{'requests':>9}{'stalled':>8}{'fallbk':>7}{'salvaged':>9}"
+    )
+    for label, scenario_names, stall_every in scenarios:
+        for streaming in (False, True):
+            stats = asyncio.run(run_mode(scenario_names, streaming, stall_every))
+            print(
+                f"{label:<13}{'stream' if streaming else 'generate':<11}"
+                f"{stats['first_result']:>8.2f}{stats['total']:>8.2f}"
+                f"{stats['requests']:>9}{stats['stalled']:>8}"
+                f"{stats['fallback']:>7}{stats['salvaged']:>9}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
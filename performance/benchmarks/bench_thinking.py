@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Thinking-budget control benchmark against the local Gemini HTTP stub
+
+Runs ConsolidatedGeminiService.parse_names_batch over names from a bundled
+tests/*.csv file against gemini_stub.py, where gemini-2.5-flash thinks
+--thinking-tokens per name unless thinkingConfig caps it, each thinking
+token costs generation time, and trust/joint records lose their names when
+the request allowed fewer than --hard-thinking tokens per record. Modes:
+
+- default: GEMINI_THINKING_CONTROL off, the model decides how much to think
+- control: budgets from batch composition, no escalation
+- escalate: budgets from batch composition, names failing validation re-sent
+  once with a larger budget
+
+Reports wall time, names/s, thinking tokens per name, p50 batch latency,
+names escalated/recovered, results carrying validation warnings and
+agreement with the default run (first name, last name and entity type).
+The default --hard-thinking is above THINKING_TOKENS_PER_NAME for COMPLEX
+names, so escalation has something to recover; with --hard-thinking 200 the
+composition budgets alone are enough.
+
+--live sends the same runs to the real API (GEMINI_API_KEY) instead, for
+measuring the trade-off on actual model output.
+
+Usage (from backend/):
+    python ../performance/benchmarks/bench_thinking.py [--names 3000]
+        [--thinking-tokens 250] [--hard-thinking 320] [--live]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional
+
+import pandas as pd
+import structlog
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT / "backend"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+os.environ.setdefault("GEMINI_API_KEY", "benchmark-stub")
+os.environ["ENABLE_CACHING"] = "false"
+os.environ["GEMINI_ADAPTIVE_PERSIST"] = "false"
+os.environ["GEMINI_RATE_LIMIT_ENABLED"] = "false"
+os.environ["GEMINI_PROMPT_MODE"] = "system"
+os.environ["GEMINI_MODEL"] = "gemini-2.5-flash"
+
+from gemini_stub import start_stub  # noqa: E402
+
+from app.services import (  # noqa: E402
+    batch_tuner,
+    gemini_hedging,
+    gemini_prompt_context,
+)
+from app.services.gemini_service import ConsolidatedGeminiService  # noqa: E402
+from app.workers.file_processor import OptimizedFileProcessorService  # noqa: E402
+
+structlog.configure(
+    wrapper_class=structlog.make_filtering_bound_logger(logging.CRITICAL)
+)
+
+FIRST_TOKEN_SECONDS = 0.2
+RECORD_SECONDS = 0.01
+THOUGHT_SECONDS = 0.0002
+
+# label -> (GEMINI_THINKING_CONTROL, GEMINI_THINKING_MAX_ESCALATIONS)
+MODES = {
+    "default": ("false", "0"),
+    "control": ("true", "0"),
+    "escalate": ("true", "1"),
+}
+
+
+def load_names(csv_file: Path) -> List[str]:
+    df = pd.read_csv(csv_file, encoding="latin-1")
+    processor = OptimizedFileProcessorService.__new__(OptimizedFileProcessorService)
+    names, _ = processor.extract_name_data_optimized(df, ["Primary Addressee"])
+    return names
+
+
+async def run_mode(names: List[str], control: str, escalations: str, args) -> dict:
+    runner = None
+    if not args.live:
+        _, runner, base_url = await start_stub(
+            first_token_seconds=FIRST_TOKEN_SECONDS,
+            record_seconds=RECORD_SECONDS,
+            thinking_tokens={"gemini-2.5-flash": args.thinking_tokens},
+            thought_seconds=THOUGHT_SECONDS,
+            hard_record_thinking=args.hard_thinking,
+        )
+        os.environ["GEMINI_API_BASE_URL"] = base_url
+    os.environ["GEMINI_THINKING_CONTROL"] = control
+    os.environ["GEMINI_THINKING_MAX_ESCALATIONS"] = escalations
+    gemini_prompt_context._contexts.clear()
+    batch_tuner._controllers.clear()
+    gemini_hedging._policies.clear()
+
+    service = ConsolidatedGeminiService()
+    start = time.perf_counter()
+    try:
+        result = await service.parse_names_batch(names)
+        total = time.perf_counter() - start
+    finally:
+        await service.cleanup()
+        if runner is not None:
+            await runner.cleanup()
+
+    performance = service.get_performance_stats()
+    thinking = performance["thinking"]
+    return {
+        "total": total,
+        "thoughts_per_name": thinking["thoughts_tokens_per_name"],
+        "p50_latency": performance["batch_latency"]["p50_seconds"],
+        "escalated": thinking["escalated_names"],
+        "recovered": thinking["escalation_recovered"],
+        "warnings": sum(1 for r in result.results if r.warnings),
+        "results": [
+            (r.first_name, r.last_name, r.entity_type) for r in result.results
+        ],
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--names", type=int, default=3000)
+    parser.add_argument("--thinking-tokens", type=int, default=250)
+    parser.add_argument("--hard-thinking", type=int, default=320)
+    parser.add_argument("--live", action="store_true")
+    args = parser.parse_args()
+
+    csv_files = sorted((REPO_ROOT / "tests").glob("*.csv"))
+    if not csv_files:
+        print("No CSV files found in tests/")
+        return 1
+    names = load_names(csv_files[0])[: args.names]
+
+    print(
+        f"{'mode':<10}{'total s':>8}{'names/s':>9}{'think/nm':>9}{'p50 s':>7}"
+        f"{'escal':>7}{'recov':>7}{'warn':>6}{'agree %':>9}"
+    )
+    reference: Optional[list] = None
+    for label, (control, escalations) in MODES.items():
+        stats = asyncio.run(run_mode(names, control, escalations, args))
+        if reference is None:
+            reference = stats["results"]
+        agree = sum(a == b for a, b in zip(reference, stats["results"]))
+        print(
+            f"{label:<10}{stats['total']:>8.2f}{len(names) / stats['total']:>9.0f}"
+            f"{stats['thoughts_per_name']:>9.0f}"
+            f"{stats['p50_latency']:>7.2f}"
+            f"{stats['escalated']:>7}{stats['recovered']:>7}"
+            f"{stats['warnings']:>6}{agree / len(names) * 100:>9.1f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
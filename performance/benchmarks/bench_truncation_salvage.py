@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Truncated-response salvage: recorded payloads and a stubbed load run
+
+1. Replays the recorded Gemini responses in recorded/*.json (MAX_TOKENS cut
+   mid-record, fenced free-form JSON, a damaged STOP response, thinking-only
+   truncation). Each must decode to its expected number of complete records,
+   and the batch must come back complete with GEMINI_SALVAGE_TRUNCATED on and
+   off; the script exits non-zero otherwise.
+2. Runs the names in the bundled tests/*.csv files against a fake session
+   whose responses stop at maxOutputTokens the way the API does: every
+   record that fits is returned, followed by a cut-off fragment. Compares
+   salvage (re-request only the missing tail) with the previous behaviour
+   (re-send the whole batch with a doubled budget).
+
+Usage (from backend/):
+    python ../performance/benchmarks/bench_truncation_salvage.py [--cost-scale 2.5]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pandas as pd
+import structlog
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+RECORDED = Path(__file__).resolve().parent / "recorded"
+sys.path.insert(0, str(REPO_ROOT / "backend"))
+
+os.environ.setdefault("GEMINI_API_KEY", "benchmark-stub")
+os.environ["ENABLE_CACHING"] = "false"
+os.environ["GEMINI_ADAPTIVE_PERSIST"] = "false"
+os.environ["GEMINI_RATE_LIMIT_ENABLED"] = "false"
+os.environ["GEMINI_PROMPT_MODE"] = "system"
+os.environ["GEMINI_STRUCTURED_OUTPUT"] = "true"
+# Static output budgets, so both modes see the same truncations
+os.environ["GEMINI_ADAPTIVE_BATCHING"] = "false"
+
+from app.services import batch_tuner  # noqa: E402
+from app.services.gemini_service import (  # noqa: E402
+    ConsolidatedGeminiService,
+    decode_complete_records,
+)
+from app.workers.file_processor import OptimizedFileProcessorService  # noqa: E402
+
+structlog.configure(
+    wrapper_class=structlog.make_filtering_bound_logger(logging.CRITICAL)
+)
+
+
+def request_names(payload: dict) -> List[str]:
+    text = payload["contents"][0]["parts"][0]["text"]
+    block = text.split("## Input\n", 1)[1].split("\n\n", 1)[0]
+    return [
+        line.split(". ", 1)[1] if ". " in line else "" for line in block.splitlines()
+    ]
+
+
+def record(number: int, name: str) -> dict:
+    words = name.split() or [""]
+    return {
+        "i": number,
+        "f": words[-1].title(),
+        "l": words[0].title(),
+        "t": "person",
+        "g": "unknown",
+        "gc": 0.0,
+        "pc": 0.9,
+    }
+
+
+class StubResponse:
+    status = 200
+
+    def __init__(self, body: dict):
+        self.body = body
+
+    async def json(self):
+        return self.body
+
+    async def text(self):
+        return json.dumps(self.body)
+
+    async def __aenter__(self):
+        await asyncio.sleep(0)
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class StubSession:
+    """
+    Fake aiohttp session: replays queued responses first, then answers from a
+    per-name token cost, truncating at maxOutputTokens like the API does
+    """
+
+    closed = False
+
+    def __init__(self, costs: Dict[str, int], replay: Optional[List[dict]] = None):
+        self.costs = costs
+        self.replay = list(replay or [])
+        self.metrics = {
+            "requests": 0,
+            "names_sent": 0,
+            "truncations": 0,
+            "output_tokens": 0,
+        }
+
+    def post(self, url, **kwargs):
+        payload = kwargs["json"]
+        names = request_names(payload)
+        self.metrics["requests"] += 1
+        self.metrics["names_sent"] += len(names)
+        if self.replay:
+            body = self.replay.pop(0)
+            usage = body.get("usageMetadata", {})
+            self.metrics["output_tokens"] += usage.get(
+                "thoughtsTokenCount", 0
+            ) + usage.get("candidatesTokenCount", 0)
+            return StubResponse(body)
+
+        budget = payload["generationConfig"]["maxOutputTokens"]
+        emitted, used = [], 0
+        for number, name in enumerate(names, 1):
+            cost = self.costs.get(name, 200)
+            if used + cost > budget:
+                break
+            emitted.append(json.dumps(record(number, name), separators=(",", ":")))
+            used += cost
+        finish = "STOP"
+        text = "[" + ",".join(emitted) + "]"
+        if len(emitted) < len(names):
+            # Cut off inside the next record, as a real MAX_TOKENS response is
+            finish = "MAX_TOKENS"
+            used = budget
+            text = "[" + ",".join(emitted + ['{"i":%d,"f":"' % (len(emitted) + 1)])
+            self.metrics["truncations"] += 1
+        self.metrics["output_tokens"] += used
+        return StubResponse(
+            {
+                "candidates": [
+                    {"finishReason": finish, "content": {"parts": [{"text": text}]}}
+                ],
+                "usageMetadata": {
+                    "thoughtsTokenCount": int(used * 0.8),
+                    "candidatesTokenCount": used - int(used * 0.8),
+                },
+            }
+        )
+
+
+def new_service(session: StubSession, salvage: bool) -> ConsolidatedGeminiService:
+    os.environ["GEMINI_SALVAGE_TRUNCATED"] = "true" if salvage else "false"
+    batch_tuner._controllers.clear()
+    service = ConsolidatedGeminiService()
+
+    async def get_session():
+        return session
+
+    service._get_or_create_session = get_session
+    return service
+
+
+async def replay_recorded(path: Path) -> List[str]:
+    """Check one recorded payload; returns failure messages"""
+    recorded = json.loads(path.read_text())
+    names = recorded["names"]
+    response = recorded["response"]
+    expected = recorded["expected_records"]
+    candidate = response["candidates"][0]
+    text = "".join(part.get("text", "") for part in candidate["content"]["parts"])
+
+    failures = []
+    service = new_service(StubSession({}), salvage=True)
+    partial = service._parse_gemini_response(text, names, fill_missing=False)
+    kept = sum(result is not None for result in partial)
+    if kept != expected:
+        failures.append(f"decoded {kept} records, expected {expected}")
+    if len(decode_complete_records(text)) < expected:
+        failures.append("decode_complete_records lost records")
+
+    for salvage in (True, False):
+        session = StubSession({name: 100 for name in names}, replay=[response])
+        service = new_service(session, salvage)
+        results = await service._direct_api_call_async(names)
+        label = "salvage" if salvage else "no salvage"
+        if results is None or len(results) != len(names):
+            failures.append(f"{label}: batch incomplete")
+            continue
+        from_gemini = sum(result.parsing_method == "gemini" for result in results)
+        print(
+            f"  {label:<11} requests={session.metrics['requests']} "
+            f"names sent={session.metrics['names_sent']} "
+            f"gemini results={from_gemini}/{len(names)} "
+            f"salvaged={service.stats['salvaged_records']}"
+        )
+    return failures
+
+
+def load_names(csv_file: Path) -> List[str]:
+    df = pd.read_csv(csv_file, encoding="latin-1")
+    processor = OptimizedFileProcessorService.__new__(OptimizedFileProcessorService)
+    names, _ = processor.extract_name_data_optimized(df, ["Primary Addressee"])
+    return names
+
+
+async def run_load(names: List[str], costs: Dict[str, int], salvage: bool) -> dict:
+    session = StubSession(costs)
+    service = new_service(session, salvage)
+    result = await service.parse_names_batch(names)
+    return {
+        **session.metrics,
+        "fallback": result.fallback_used,
+        "salvaged": service.stats["salvaged_records"],
+        "tokens_saved": service.stats["salvage_tokens_saved"],
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--cost-scale",
+        type=float,
+        default=2.5,
+        help="Multiplier on per-name output cost (higher = more truncation)",
+    )
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    # The batch pauses 0.5 s before a doubled-budget retry; not what we measure
+    real_sleep = asyncio.sleep
+
+    async def fast_sleep(delay, *a, **kw):
+        return await real_sleep(0)
+
+    asyncio.sleep = fast_sleep
+
+    failed = False
+    print("Recorded payloads")
+    for path in sorted(RECORDED.glob("*.json")):
+        print(f"{path.name}")
+        failures = asyncio.run(replay_recorded(path))
+        for failure in failures:
+            print(f"  FAIL: {failure}")
+        failed = failed or bool(failures)
+
+    csv_files = sorted((REPO_ROOT / "tests").glob("*.csv"))
+    if csv_files:
+        print()
+        print(
+            f"{'file':<8}{'mode':<12}{'requests':>9}{'trunc':>7}{'names sent':>11}"
+            f"{'output k':>10}{'fallbk':>8}{'salvaged':>9}{'saved k':>9}"
+        )
+    for csv_file in csv_files:
+        names = load_names(csv_file)
+        rng = random.Random(args.seed)
+        costs = {
+            name: int(
+                (150 + 60 * len(name.split())) * args.cost_scale * rng.uniform(0.7, 1.3)
+            )
+            for name in dict.fromkeys(names)
+        }
+        label = csv_file.stem.rsplit(",", 1)[-1].strip()
+        for salvage in (False, True):
+            stats = asyncio.run(run_load(names, costs, salvage))
+            print(
+                f"{label:<8}{'salvage' if salvage else 'resend':<12}"
+                f"{stats['requests']:>9}{stats['truncations']:>7}"
+                f"{stats['names_sent']:>11}{stats['output_tokens'] / 1000:>10.0f}"
+                f"{stats['fallback']:>8}{stats['salvaged']:>9}"
+                f"{stats['tokens_saved'] / 1000:>9.0f}"
+            )
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Worker runtime benchmark: small jobs with and without a per-process runtime
+
+Runs a sequence of small jobs (--jobs jobs of --job-names names each, from a
+bundled tests/*.csv file) against gemini_stub.py, the way a Celery worker
+process runs tasks one after another:
+
+- per-job: what process_file did before WorkerRuntime (new event loop, new
+  OptimizedFileProcessorService and ConsolidatedGeminiService, new aiohttp
+  session, all closed after the job)
+- runtime: one WorkerRuntime (loop, service and session) reused for every job
+
+The stub charges --connect-seconds on the first request of every new
+connection, standing in for the TCP + TLS handshake with the real API.
+Reports first-job and later-job latency, connections opened and aiohttp
+sessions created.
+
+Usage (from backend/):
+    python ../performance/benchmarks/bench_worker_runtime.py [--jobs 20]
+        [--job-names 25] [--connect-seconds 0.15]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import List
+
+import pandas as pd
+import structlog
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT / "backend"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+os.environ.setdefault("GEMINI_API_KEY", "benchmark-stub")
+os.environ["ENABLE_CACHING"] = "false"
+os.environ["GEMINI_ADAPTIVE_PERSIST"] = "false"
+os.environ["GEMINI_RATE_LIMIT_ENABLED"] = "false"
+os.environ["GEMINI_PROMPT_MODE"] = "system"
+
+from gemini_stub import start_stub  # noqa: E402
+
+from app.services import gemini_prompt_context  # noqa: E402
+from app.workers.file_processor import (  # noqa: E402
+    OptimizedFileProcessorService,
+    WorkerRuntime,
+)
+
+structlog.configure(
+    wrapper_class=structlog.make_filtering_bound_logger(logging.CRITICAL)
+)
+
+
+def load_names(csv_file: Path) -> List[str]:
+    df = pd.read_csv(csv_file, encoding="latin-1")
+    processor = OptimizedFileProcessorService.__new__(OptimizedFileProcessorService)
+    names, _ = processor.extract_name_data_optimized(df, ["Primary Addressee"])
+    return names
+
+
+async def run_job(processor: OptimizedFileProcessorService, names: List[str]):
+    processor.batch_processor.begin_job()
+    await processor.batch_processor.parse_names_batch(names)
+
+
+def per_job(jobs: List[List[str]]) -> dict:
+    """process_file before WorkerRuntime: everything built and closed per job"""
+    latencies, sessions = [], 0
+    for names in jobs:
+        start = time.perf_counter()
+        processor = OptimizedFileProcessorService()
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_until_complete(run_job(processor, names))
+        finally:
+            loop.run_until_complete(processor.batch_processor.cleanup())
+            loop.close()
+        latencies.append(time.perf_counter() - start)
+        sessions += processor.batch_processor.sessions_created
+    return {"latencies": latencies, "sessions": sessions}
+
+
+def with_runtime(jobs: List[List[str]]) -> dict:
+    """One runtime for the process, as after worker_process_init"""
+    latencies = []
+    start = time.perf_counter()
+    runtime = WorkerRuntime()
+    for names in jobs:
+        runtime.run(run_job(runtime.processor_service, names))
+        latencies.append(time.perf_counter() - start)
+        start = time.perf_counter()
+    sessions = runtime.processor_service.batch_processor.sessions_created
+    runtime.close()
+    return {"latencies": latencies, "sessions": sessions}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=20)
+    parser.add_argument("--job-names", type=int, default=25)
+    parser.add_argument("--connect-seconds", type=float, default=0.15)
+    args = parser.parse_args()
+
+    csv_files = sorted((REPO_ROOT / "tests").glob("*.csv"))
+    if not csv_files:
+        print("No CSV files found in tests/")
+        return 1
+    names = load_names(csv_files[0])
+    jobs = [
+        names[i * args.job_names : (i + 1) * args.job_names] for i in range(args.jobs)
+    ]
+
+    # The stub gets its own loop in a thread; jobs create and close theirs
+    stub_loop = asyncio.new_event_loop()
+    threading.Thread(target=stub_loop.run_forever, daemon=True).start()
+
+    print(
+        f"{'mode':<10}{'jobs':>5}{'first s':>9}{'later ms':>10}{'total s':>9}"
+        f"{'connections':>12}{'sessions':>9}"
+    )
+    for label, run in (("per-job", per_job), ("runtime", with_runtime)):
+        stub, runner, base_url = asyncio.run_coroutine_threadsafe(
+            start_stub(connect_seconds=args.connect_seconds), stub_loop
+        ).result()
+        os.environ["GEMINI_API_BASE_URL"] = base_url
+        gemini_prompt_context._contexts.clear()
+        stats = run(jobs)
+        asyncio.run_coroutine_threadsafe(runner.cleanup(), stub_loop).result()
+
+        latencies = stats["latencies"]
+        print(
+            f"{label:<10}{len(latencies):>5}{latencies[0]:>9.3f}"
+            f"{statistics.median(latencies[1:]) * 1000:>10.1f}"
+            f"{sum(latencies):>9.2f}{stub.metrics['connections']:>12}"
+            f"{stats['sessions']:>9}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,537 @@
+#!/usr/bin/env python3
+"""
+Local HTTP stand-in for the Gemini generateContent, streamGenerateContent
+and cachedContents APIs
+
+Validates request shapes the way the real API does for the parts this
+backend uses, and answers with well-formed parse results plus usageMetadata
+(promptTokenCount / cachedContentTokenCount at ~4 characters per token), so
+the service can be pointed at it with GEMINI_API_BASE_URL.
+
+Checks:
+- generateContent needs contents[].parts[].text and generationConfig
+- cachedContent must name a live cache for the same model, and cannot be
+  combined with systemInstruction
+- cachedContents POST needs model, systemInstruction/contents and a ttl;
+  PATCH with updateMask=ttl extends a live cache
+- with caching disabled (--no-cache), cachedContents calls fail with the
+  400 the API returns for unsupported models
+- responseSchema needs responseMimeType application/json; with a schema the
+  answer is bare JSON in the schema's compact records (short keys plus the
+  input number "i"), otherwise verbose objects wrapped in a markdown fence
+  (with gender fields only when the instructions mention gender_confidence)
+
+- streamGenerateContent needs alt=sse and answers with server-sent events:
+  "data: <GenerateContentResponse>" chunks of ~120 characters of text, the
+  last carrying finishReason and usageMetadata
+
+--shuffle and --drop-every make the model misbehave: records come back in
+random order, and every Nth record is left out. --record-seconds and
+--first-token-seconds simulate generation time (thinking, then per record);
+--stall-every N makes every Nth request hang halfway through its output;
+--tail-fraction F with --tail-factor X makes a random share F of
+generateContent requests take X times as long (a latency tail);
+--connect-seconds S delays the first request on each new connection (a TLS
+handshake stand-in), so connection reuse shows up in timings.
+model_speeds (model -> delay multiplier) and thinking_tokens (model ->
+thoughtsTokenCount per record) let models differ in latency and billed
+output, e.g. a flash-lite tier that answers faster without thinking.
+A generationConfig.thinkingConfig.thinkingBudget caps the thinking tokens;
+thought_seconds adds generation time per thinking token, and with
+hard_record_thinking set, records for trust/joint names ("&", "and",
+"trust") come back without names unless the request allowed that many
+thinking tokens per record.
+metrics["peak_in_flight"] is the most generate/stream requests the stub
+was answering at once.
+
+Usage:
+    python performance/benchmarks/gemini_stub.py [--port 8765] [--no-cache]
+        [--shuffle] [--drop-every N] [--record-seconds S] [--stall-every N]
+        [--tail-fraction F --tail-factor X] [--connect-seconds S]
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import re
+import time
+from typing import Any, Dict, List, Optional
+
+from aiohttp import web
+
+CHARS_PER_TOKEN = 4
+STREAM_CHUNK_CHARS = 120
+# A stalled request hangs this long (clients are expected to give up first)
+STALL_SECONDS = 60
+NAME_LINE = re.compile(r"^(\d+)\. ?(.*)$", re.MULTILINE)
+HARD_NAME = re.compile(r"&|\b(and|trust)\b", re.IGNORECASE)
+
+
+def _tokens(text: str) -> int:
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+def _error(status: int, message: str) -> web.Response:
+    return web.json_response(
+        {"error": {"code": status, "message": message, "status": "INVALID_ARGUMENT"}},
+        status=status,
+    )
+
+
+def _parts_text(content: Any) -> Optional[str]:
+    """Concatenated text of a Content object, or None if malformed"""
+    if not isinstance(content, dict) or not isinstance(content.get("parts"), list):
+        return None
+    texts = [part.get("text") for part in content["parts"] if isinstance(part, dict)]
+    if not texts or not all(isinstance(text, str) for text in texts):
+        return None
+    return "".join(texts)
+
+
+class GeminiStub:
+    """In-memory API state; create_app() wires it into an aiohttp app"""
+
+    def __init__(
+        self,
+        caching_enabled: bool = True,
+        shuffle: bool = False,
+        drop_every: int = 0,
+        first_token_seconds: float = 0.0,
+        record_seconds: float = 0.0,
+        stall_every: int = 0,
+        tail_fraction: float = 0.0,
+        tail_factor: float = 1.0,
+        connect_seconds: float = 0.0,
+        model_speeds: Optional[Dict[str, float]] = None,
+        thinking_tokens: Optional[Dict[str, int]] = None,
+        thought_seconds: float = 0.0,
+        hard_record_thinking: int = 0,
+    ):
+        self.caching_enabled = caching_enabled
+        self.shuffle = shuffle
+        self.drop_every = drop_every
+        self.first_token_seconds = first_token_seconds
+        self.record_seconds = record_seconds
+        self.stall_every = stall_every
+        self.tail_fraction = tail_fraction
+        self.tail_factor = tail_factor
+        self.connect_seconds = connect_seconds
+        self.model_speeds = model_speeds or {}
+        self.thinking_tokens = thinking_tokens or {}
+        self.thought_seconds = thought_seconds
+        self.hard_record_thinking = hard_record_thinking
+        # Held (not just their ids) so a closed connection's id is not reused
+        self._connections: Dict[int, Any] = {}
+        self._rng = random.Random(7)
+        self.caches: Dict[str, Dict[str, Any]] = {}
+        self._ids = itertools.count(1)
+        self.metrics = {
+            "generate_requests": 0,
+            "stream_requests": 0,
+            "stalled_requests": 0,
+            "slow_requests": 0,
+            "cancelled_requests": 0,
+            "connections": 0,
+            "rejected_requests": 0,
+            "cache_creates": 0,
+            "cache_refreshes": 0,
+            "request_bytes": 0,
+            "output_tokens": 0,
+            "in_flight": 0,
+            "peak_in_flight": 0,
+            "requests_by_model": {},
+            "thinking_budgets": [],
+            "failed_hard_records": 0,
+            "errors": [],
+        }
+
+    def _reject(self, status: int, message: str) -> web.Response:
+        self.metrics["rejected_requests"] += 1
+        self.metrics["errors"].append(message)
+        return _error(status, message)
+
+    def _live_cache(self, name: str) -> Optional[Dict[str, Any]]:
+        cache = self.caches.get(name)
+        if cache and cache["expires_at"] > time.time():
+            return cache
+        return None
+
+    @staticmethod
+    def _ttl_seconds(ttl: Any) -> Optional[float]:
+        if not isinstance(ttl, str) or not ttl.endswith("s"):
+            return None
+        try:
+            return float(ttl[:-1])
+        except ValueError:
+            return None
+
+    def _enter(self) -> None:
+        self.metrics["in_flight"] += 1
+        self.metrics["peak_in_flight"] = max(
+            self.metrics["peak_in_flight"], self.metrics["in_flight"]
+        )
+
+    def _exit(self) -> None:
+        self.metrics["in_flight"] -= 1
+
+    async def generate(self, request: web.Request) -> web.Response:
+        self._enter()
+        try:
+            return await self._generate(request)
+        finally:
+            self._exit()
+
+    async def _generate(self, request: web.Request) -> web.Response:
+        answer = await self._answer(request)
+        if isinstance(answer, web.Response):
+            return answer
+        text, usage, records, stall = answer
+        delay = self._speed(request) * (
+            self.first_token_seconds
+            + self.record_seconds * records
+            + self.thought_seconds * usage.get("thoughtsTokenCount", 0)
+        )
+        if self.tail_fraction and self._rng.random() < self.tail_fraction:
+            self.metrics["slow_requests"] += 1
+            delay *= self.tail_factor
+        try:
+            if stall:
+                await asyncio.sleep(STALL_SECONDS)
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            # The client went away (timed out, or lost a hedge race)
+            self.metrics["cancelled_requests"] += 1
+            raise
+        return web.json_response(
+            {
+                "candidates": [
+                    {"finishReason": "STOP", "content": {"parts": [{"text": text}]}}
+                ],
+                "usageMetadata": usage,
+            }
+        )
+
+    async def stream_generate(self, request: web.Request) -> web.StreamResponse:
+        self._enter()
+        try:
+            return await self._stream_generate(request)
+        finally:
+            self._exit()
+
+    async def _stream_generate(self, request: web.Request) -> web.StreamResponse:
+        if request.query.get("alt") != "sse":
+            return self._reject(400, "this stub only streams with alt=sse")
+        answer = await self._answer(request)
+        if isinstance(answer, web.Response):
+            return answer
+        text, usage, records, stall = answer
+        self.metrics["stream_requests"] += 1
+
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        speed = self._speed(request)
+        await asyncio.sleep(
+            speed
+            * (
+                self.first_token_seconds
+                + self.thought_seconds * usage.get("thoughtsTokenCount", 0)
+            )
+        )
+        pieces = [
+            text[i : i + STREAM_CHUNK_CHARS]
+            for i in range(0, len(text), STREAM_CHUNK_CHARS)
+        ] or [""]
+        piece_seconds = self.record_seconds * speed * records / len(pieces)
+        for n, piece in enumerate(pieces):
+            if stall and n == len(pieces) // 2:
+                await asyncio.sleep(STALL_SECONDS)
+                return response
+            candidate = {"content": {"parts": [{"text": piece}], "role": "model"}}
+            chunk = {"candidates": [candidate]}
+            if n == len(pieces) - 1:
+                candidate["finishReason"] = "STOP"
+                chunk["usageMetadata"] = usage
+            await response.write(f"data: {json.dumps(chunk)}\r\n\r\n".encode())
+            await asyncio.sleep(piece_seconds)
+        await response.write_eof()
+        return response
+
+    def _speed(self, request: web.Request) -> float:
+        return self.model_speeds.get(request.match_info["model"], 1.0)
+
+    async def _answer(self, request: web.Request) -> Any:
+        """
+        Validate a generate request and build its answer.
+
+        Returns an error response, or (text, usageMetadata, record count,
+        whether this request stalls).
+        """
+        if id(request.protocol) not in self._connections:
+            self._connections[id(request.protocol)] = request.protocol
+            self.metrics["connections"] += 1
+            await asyncio.sleep(self.connect_seconds)
+        body = await request.read()
+        self.metrics["request_bytes"] += len(body)
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            return self._reject(400, "Invalid JSON payload received.")
+        model = request.match_info["model"]
+
+        contents = payload.get("contents")
+        if not isinstance(contents, list) or not contents:
+            return self._reject(400, "contents is not specified")
+        texts = [_parts_text(content) for content in contents]
+        if any(text is None for text in texts):
+            return self._reject(400, "contents[].parts[].text must be a string")
+        config = payload.get("generationConfig")
+        if not isinstance(config, dict):
+            return self._reject(400, "generationConfig is required by this stub")
+        schema = config.get("responseSchema")
+        if schema is not None and config.get("responseMimeType") != "application/json":
+            return self._reject(
+                400, "responseSchema requires responseMimeType application/json"
+            )
+
+        prompt_tokens = sum(_tokens(text) for text in texts)
+        cached_tokens = 0
+        # Free-form records carry gender unless the instructions leave it out
+        asks_gender = b"gender_confidence" in body
+        if "systemInstruction" in payload:
+            if "cachedContent" in payload:
+                return self._reject(
+                    400,
+                    "CachedContent can not be used with GenerateContent request "
+                    "setting system_instruction, tools or tool_config.",
+                )
+            instruction = _parts_text(payload["systemInstruction"])
+            if instruction is None:
+                return self._reject(
+                    400, "systemInstruction.parts[].text must be a string"
+                )
+            prompt_tokens += _tokens(instruction)
+        if "cachedContent" in payload:
+            cache = self._live_cache(payload["cachedContent"])
+            if cache is None:
+                return self._reject(
+                    403, f"CachedContent not found (or permission denied): "
+                    f"{payload['cachedContent']}"
+                )
+            if cache["model"] != f"models/{model}":
+                return self._reject(
+                    400, "Model used by GenerateContent request and CachedContent "
+                    "has to be the same."
+                )
+            cached_tokens = cache["tokens"]
+            prompt_tokens += cached_tokens
+            asks_gender = asks_gender or cache["gender"]
+
+        names = NAME_LINE.findall(texts[-1])
+        if not names:
+            return self._reject(400, "no numbered input records in request text")
+
+        self.metrics["generate_requests"] += 1
+        by_model = self.metrics["requests_by_model"]
+        by_model[model] = by_model.get(model, 0) + 1
+        number = self.metrics["generate_requests"]
+        stall = bool(self.stall_every and number % self.stall_every == 0)
+        self.metrics["stalled_requests"] += stall
+        rows = [
+            (int(number), name)
+            for number, name in names
+            if not (self.drop_every and int(number) % self.drop_every == 0)
+        ]
+        if self.shuffle:
+            self._rng.shuffle(rows)
+
+        thinking = config.get("thinkingConfig")
+        budget = thinking.get("thinkingBudget") if isinstance(thinking, dict) else None
+        if budget is not None:
+            self.metrics["thinking_budgets"].append(budget)
+        thoughts = self.thinking_tokens.get(model, 0) * len(rows)
+        if budget is not None:
+            thoughts = min(thoughts, budget)
+        # Without enough thinking, trust/joint records lose their names
+        underthought = bool(
+            self.hard_record_thinking
+            and budget is not None
+            and budget < self.hard_record_thinking * len(rows)
+        )
+
+        if schema is not None:
+            items = [
+                self._compact_record(number, name, schema) for number, name in rows
+            ]
+            if underthought:
+                for item, (_, name) in zip(items, rows):
+                    if HARD_NAME.search(name):
+                        self.metrics["failed_hard_records"] += 1
+                        item.update({"f": "", "l": "", "t": "trust"})
+            text = json.dumps(items, separators=(",", ":"))
+        else:
+            items = [
+                {
+                    "first_name": (name.split() or [""])[0].title(),
+                    "last_name": (name.split() or [""])[-1].title(),
+                    "entity_type": "person",
+                    "gender": "unknown",
+                    "gender_confidence": 0.0,
+                    "parsing_confidence": 0.9,
+                }
+                for _, name in rows
+            ]
+            if not asks_gender:
+                for item in items:
+                    del item["gender"], item["gender_confidence"]
+            text = f"```json\n{json.dumps(items, indent=2)}\n```"
+        usage = {
+            "promptTokenCount": prompt_tokens,
+            "candidatesTokenCount": _tokens(text),
+            "totalTokenCount": prompt_tokens + _tokens(text),
+        }
+        if cached_tokens:
+            usage["cachedContentTokenCount"] = cached_tokens
+        if thoughts:
+            usage["thoughtsTokenCount"] = thoughts
+            usage["totalTokenCount"] += thoughts
+        self.metrics["output_tokens"] += usage["candidatesTokenCount"]
+        return text, usage, len(rows), stall
+
+    @staticmethod
+    def _compact_record(
+        number: int, name: str, schema: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """One record in the shape the request's schema asks for"""
+        properties = schema.get("items", {}).get("properties", {})
+        values = {
+            "i": number,
+            "f": (name.split() or [""])[0].title(),
+            "l": (name.split() or [""])[-1].title(),
+            "t": "person",
+            "g": "unknown",
+            "gc": 0.0,
+            "pc": 0.9,
+        }
+        return {key: values.get(key) for key in properties}
+
+    async def create_cache(self, request: web.Request) -> web.Response:
+        if not self.caching_enabled:
+            return self._reject(
+                400, "Model does not support explicit CachedContent creation."
+            )
+        try:
+            payload = await request.json()
+        except ValueError:
+            return self._reject(400, "Invalid JSON payload received.")
+        model = payload.get("model")
+        if not isinstance(model, str) or not model.startswith("models/"):
+            return self._reject(400, "cachedContent.model must be models/{model}")
+        ttl = self._ttl_seconds(payload.get("ttl"))
+        if ttl is None or ttl <= 0:
+            return self._reject(400, "cachedContent.ttl must be a duration like 3600s")
+        instruction = payload.get("systemInstruction")
+        text = _parts_text(instruction) if instruction else None
+        if text is None and not payload.get("contents"):
+            return self._reject(
+                400, "cachedContent needs systemInstruction or contents"
+            )
+
+        name = f"cachedContents/stub{next(self._ids)}"
+        tokens = _tokens(text or "")
+        self.caches[name] = {
+            "model": model,
+            "tokens": tokens,
+            "gender": "gender_confidence" in json.dumps(payload),
+            "expires_at": time.time() + ttl,
+        }
+        self.metrics["cache_creates"] += 1
+        return web.json_response(
+            {"name": name, "model": model, "usageMetadata": {"totalTokenCount": tokens}}
+        )
+
+    async def update_cache(self, request: web.Request) -> web.Response:
+        name = f"cachedContents/{request.match_info['cache_id']}"
+        if request.query.get("updateMask") != "ttl":
+            return self._reject(400, "only updateMask=ttl is supported")
+        cache = self._live_cache(name)
+        if cache is None:
+            return self._reject(404, f"CachedContent not found: {name}")
+        ttl = self._ttl_seconds((await request.json()).get("ttl"))
+        if ttl is None or ttl <= 0:
+            return self._reject(400, "cachedContent.ttl must be a duration like 3600s")
+        cache["expires_at"] = time.time() + ttl
+        self.metrics["cache_refreshes"] += 1
+        return web.json_response({"name": name, "model": cache["model"]})
+
+    def create_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/v1beta/models/{model}:generateContent", self.generate)
+        app.router.add_post(
+            "/v1beta/models/{model}:streamGenerateContent", self.stream_generate
+        )
+        app.router.add_post("/v1beta/cachedContents", self.create_cache)
+        app.router.add_patch("/v1beta/cachedContents/{cache_id}", self.update_cache)
+        return app
+
+
+async def start_stub(port: int = 0, caching_enabled: bool = True, **options) -> tuple:
+    """Start the stub on localhost; returns (stub, runner, base_url)"""
+    stub = GeminiStub(caching_enabled=caching_enabled, **options)
+    # Cancel handlers (stalled requests) when the client goes away
+    runner = web.AppRunner(
+        stub.create_app(), handler_cancellation=True, shutdown_timeout=1.0
+    )
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", port)
+    await site.start()
+    sockets: List[Any] = site._server.sockets  # bound port when port=0
+    bound = sockets[0].getsockname()[1]
+    return stub, runner, f"http://127.0.0.1:{bound}/v1beta"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument(
+        "--no-cache", action="store_true", help="Reject cachedContents calls"
+    )
+    parser.add_argument(
+        "--shuffle", action="store_true", help="Return records in random order"
+    )
+    parser.add_argument(
+        "--drop-every", type=int, default=0, help="Leave out every Nth record"
+    )
+    parser.add_argument("--first-token-seconds", type=float, default=0.0)
+    parser.add_argument("--record-seconds", type=float, default=0.0)
+    parser.add_argument(
+        "--stall-every", type=int, default=0, help="Hang every Nth request"
+    )
+    parser.add_argument("--tail-fraction", type=float, default=0.0)
+    parser.add_argument("--tail-factor", type=float, default=1.0)
+    parser.add_argument("--connect-seconds", type=float, default=0.0)
+    args = parser.parse_args()
+    stub = GeminiStub(
+        caching_enabled=not args.no_cache,
+        shuffle=args.shuffle,
+        drop_every=args.drop_every,
+        first_token_seconds=args.first_token_seconds,
+        record_seconds=args.record_seconds,
+        stall_every=args.stall_every,
+        tail_fraction=args.tail_fraction,
+        tail_factor=args.tail_factor,
+        connect_seconds=args.connect_seconds,
+    )
+    print(f"Gemini stub on http://127.0.0.1:{args.port}/v1beta")
+    web.run_app(
+        stub.create_app(),
+        host="127.0.0.1",
+        port=args.port,
+        print=None,
+        handler_cancellation=True,
+    )
+
+
+if __name__ == "__main__":
+    main()